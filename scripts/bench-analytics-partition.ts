@@ -0,0 +1,100 @@
+/**
+ * Benchmark da separação de lançamentos por schema_type (analytics-utils) — uso local.
+ *
+ * Compara, com dados sintéticos de 10k e 100k lançamentos:
+ *   legado: um lancamentos.filter por tipo com indicadoresConfig.find por linha
+ *           (7 passadas da Visão Geral + 1 do período anterior)
+ *   atual : partitionBySchemaType (Map id → schema_type + uma passada)
+ * e o tempo total de generateExecutiveSummary já com a separação nova.
+ *
+ * Execução (na raiz do projeto):
+ *   npm run bench:analytics
+ */
+
+import { performance } from 'node:perf_hooks'
+import { generateExecutiveSummary, partitionBySchemaType } from '../src/lib/analytics-utils'
+import type { Database } from '../src/lib/database.types'
+
+type Lancamento = Database['public']['Tables']['lancamentos']['Row']
+
+const SCHEMA_TYPES = [
+  'ocorrencia_aero', 'ocorrencia_nao_aero', 'atividades_acessorias', 'taf', 'prova_teorica',
+  'treinamento', 'tempo_tp_epr', 'tempo_resposta', 'exercicio_posicionamento', 'inspecao_viaturas',
+  'estoque', 'controle_epi', 'controle_trocas', 'verificacao_tp', 'higienizacao_tp',
+]
+const TIPOS_VISAO_GERAL = [
+  'ocorrencia_aero', 'ocorrencia_nao_aero', 'tempo_resposta', 'treinamento', 'estoque', 'inspecao_viaturas', 'taf',
+]
+const RODADAS = 15
+
+const indicadoresConfig = SCHEMA_TYPES.map((schema_type, i) => ({ id: `ind-${i}`, schema_type }))
+const bases = Array.from({ length: 30 }, (_, i) => ({ id: `base-${i}`, nome: `BASE ${i}` }))
+
+function gerarLancamentos(n: number): Lancamento[] {
+  const lancamentos: Lancamento[] = []
+  for (let i = 0; i < n; i++) {
+    const indicador = indicadoresConfig[i % indicadoresConfig.length]
+    const dia = new Date(Date.UTC(2025, 0, 1) + (i % 365) * 86400000).toISOString().slice(0, 10)
+    lancamentos.push({
+      id: `l-${i}`,
+      data_referencia: dia,
+      base_id: bases[i % bases.length].id,
+      equipe_id: `eq-${i % 5}`,
+      user_id: `u-${i % 200}`,
+      indicador_id: indicador.id,
+      conteudo: indicador.schema_type === 'tempo_resposta'
+        ? { afericoes: [{ viatura: 'CCI-01', tempo: '02:30' }] }
+        : indicador.schema_type === 'treinamento'
+          ? { participantes: [{ nome: 'Fulano', horas: '01:30' }] }
+          : {},
+      created_at: dia,
+      updated_at: dia,
+    } as unknown as Lancamento)
+  }
+  return lancamentos
+}
+
+/** Cópia da separação anterior de generateExecutiveSummary (find dentro de filter). */
+function particaoLegada(lancamentos: Lancamento[]): number {
+  let total = 0
+  TIPOS_VISAO_GERAL.forEach((tipo) => {
+    total += lancamentos.filter((l) => {
+      const indicador = indicadoresConfig.find((i) => i.id === l.indicador_id)
+      return indicador?.schema_type === tipo
+    }).length
+  })
+  total += lancamentos.filter((l) => {
+    const indicador = indicadoresConfig.find((i) => i.id === l.indicador_id)
+    return indicador?.schema_type === 'ocorrencia_aero' || indicador?.schema_type === 'ocorrencia_nao_aero'
+  }).length
+  return total
+}
+
+function mediana(fn: () => unknown): number {
+  const tempos: number[] = []
+  fn() // aquecimento
+  for (let i = 0; i < RODADAS; i++) {
+    const inicio = performance.now()
+    fn()
+    tempos.push(performance.now() - inicio)
+  }
+  tempos.sort((a, b) => a - b)
+  return tempos[Math.floor(tempos.length / 2)]
+}
+
+console.log(`Mediana de ${RODADAS} execuções, ${indicadoresConfig.length} indicadores`)
+console.log('linhas'.padEnd(10) + 'legado ms'.padEnd(12) + 'atual ms'.padEnd(12) + 'ganho'.padEnd(10) + 'resumo completo ms')
+
+for (const n of [10_000, 100_000]) {
+  const lancamentos = gerarLancamentos(n)
+  const legado = mediana(() => particaoLegada(lancamentos))
+  const atual = mediana(() => partitionBySchemaType(lancamentos, indicadoresConfig))
+  const resumo = mediana(() => generateExecutiveSummary(lancamentos, bases, indicadoresConfig))
+  console.log(
+    String(n).padEnd(10) +
+      legado.toFixed(2).padEnd(12) +
+      atual.toFixed(2).padEnd(12) +
+      `${(legado / Math.max(atual, 0.001)).toFixed(1)}x`.padEnd(10) +
+      resumo.toFixed(2)
+  )
+}
@@ -0,0 +1,53 @@
+-- ============================================
+-- Paridade da conversão de tempos (migration 049) com o app — uso local / staging.
+-- ============================================
+-- Confere conteudo_duracao_numerica contra a mesma tabela de casos de
+-- testsprite/tests/duracoes-numericas.test.ts (mmssParaSegundos /
+-- hhmmParaSegundos em lancamento-normalizado.ts). Um caso divergente
+-- interrompe o script com a lista de diferenças.
+--
+-- Execução (somente leitura):
+--   psql "$DATABASE_URL" -f scripts/duracoes-paridade.sql
+-- ============================================
+
+DO $$
+DECLARE
+  v_divergencias TEXT;
+BEGIN
+  SELECT string_agg(format('%s "%s": esperado %s, obtido %s', c.formato, c.valor, c.esperado, r.obtido), E'\n')
+  INTO v_divergencias
+  FROM (VALUES
+    ('hh:mm', '', NULL::int),
+    ('hh:mm', '   ', NULL),
+    ('hh:mm', '08:00', 480),
+    ('hh:mm', '08:', 480),
+    ('hh:mm', '8', 480),
+    ('hh:mm', '1:5', 65),
+    ('hh:mm', ' 02:30', 150),
+    ('hh:mm', '08:30:15', 510),
+    ('hh:mm', '08:ab', 480),
+    ('hh:mm', '-01:00', NULL),
+    ('hh:mm', '+01:00', NULL),
+    ('hh:mm', ':30', NULL),
+    ('hh:mm', 'abc', NULL),
+    ('mm:ss', '', NULL),
+    ('mm:ss', '02:02', 122),
+    ('mm:ss', '05:', 300),
+    ('mm:ss', ':30', 30),
+    ('mm:ss', '1:5', 65),
+    ('mm:ss', ' 02 : 02 ', 122),
+    ('mm:ss', '02:02:10', 122),
+    ('mm:ss', '-01:00', NULL),
+    ('mm:ss', '1.5:30', NULL),
+    ('mm:ss', '02:02abc', NULL),
+    ('mm:ss', '0202', NULL)
+  ) AS c(formato, valor, esperado)
+  CROSS JOIN LATERAL (SELECT public.conteudo_duracao_numerica(c.valor, c.formato) AS obtido) r
+  WHERE r.obtido IS DISTINCT FROM c.esperado;
+
+  IF v_divergencias IS NOT NULL THEN
+    RAISE EXCEPTION E'conteudo_duracao_numerica diverge do app:\n%', v_divergencias;
+  END IF;
+  RAISE NOTICE 'conteudo_duracao_numerica: todos os casos iguais ao app';
+END;
+$$;
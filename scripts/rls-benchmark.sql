@@ -0,0 +1,97 @@
+-- ============================================
+-- Benchmark RLS por role (migration 043) — uso local / staging.
+-- ============================================
+-- Compara, para um usuário real de cada role (geral, chefe, auxiliar,
+-- gerente_sci), o custo por linha de:
+--   legado: SELECT em lancamentos com as policies de SELECT antigas
+--           (EXISTS em profiles / get_current_user_role_and_base() por linha)
+--   atual : SELECT em lancamentos como authenticated (policies da 043),
+--           com as claims do custom_access_token_hook (044) no JWT
+--           (os helpers usam a claim se não revogada, migration 056)
+-- e verifica que o plano atual usa InitPlan (helper avaliado uma vez) e
+-- nenhum SubPlan (avaliação por linha).
+--
+-- Execução (somente leitura; tudo é desfeito no ROLLBACK):
+--   psql "$DATABASE_URL" -f scripts/rls-benchmark.sql
+--
+-- Requer conexão como postgres (para trocar de role e ler o legado sem RLS).
+-- ============================================
+
+BEGIN;
+
+DO $$
+DECLARE
+  v_role TEXT;
+  v_user UUID;
+  v_plano JSON;
+  v_plano_txt TEXT;
+  v_linhas_lidas NUMERIC;
+  v_legado_ms NUMERIC;
+  v_atual_ms NUMERIC;
+  v_visiveis BIGINT;
+  v_rodadas CONSTANT INTEGER := 5;
+  i INTEGER;
+  v_legado_sql CONSTANT TEXT := $q$
+    EXPLAIN (ANALYZE, FORMAT JSON)
+    SELECT count(*) FROM public.lancamentos
+    WHERE EXISTS (SELECT 1 FROM public.profiles WHERE profiles.id = auth.uid() AND profiles.role = 'geral')
+       OR EXISTS (SELECT 1 FROM public.profiles WHERE profiles.id = auth.uid() AND profiles.role = 'chefe' AND profiles.base_id = lancamentos.base_id)
+       OR EXISTS (SELECT 1 FROM public.profiles WHERE profiles.id = auth.uid() AND profiles.role = 'auxiliar' AND profiles.base_id = lancamentos.base_id)
+       OR EXISTS (
+            SELECT 1 FROM public.get_current_user_role_and_base() AS my
+            WHERE (my.role = 'gerente_sci' OR (my.role = 'chefe' AND my.acesso_gerente_sci))
+              AND my.base_id IS NOT NULL AND my.base_id = lancamentos.base_id
+          )
+  $q$;
+  v_atual_sql CONSTANT TEXT := 'EXPLAIN (ANALYZE, FORMAT JSON) SELECT count(*) FROM public.lancamentos';
+BEGIN
+  SELECT count(*) INTO v_linhas_lidas FROM public.lancamentos;
+  RAISE NOTICE 'lancamentos: % linhas (média de % execuções por cenário)', v_linhas_lidas, v_rodadas;
+  RAISE NOTICE '%', rpad('role', 12) || rpad('visíveis', 10) || rpad('legado ms', 12) || rpad('atual ms', 12) || rpad('legado µs/linha', 18) || 'atual µs/linha';
+
+  FOREACH v_role IN ARRAY ARRAY['geral', 'chefe', 'auxiliar', 'gerente_sci'] LOOP
+    SELECT id INTO v_user FROM public.profiles WHERE role = v_role ORDER BY created_at LIMIT 1;
+    IF v_user IS NULL THEN
+      RAISE NOTICE '%', rpad(v_role, 12) || '(sem usuário com esta role)';
+      CONTINUE;
+    END IF;
+
+    -- Claims como emitidas pelo custom_access_token_hook (migration 044)
+    PERFORM set_config('request.jwt.claims', (public.custom_access_token_hook(
+      jsonb_build_object('user_id', v_user, 'claims', jsonb_build_object('sub', v_user, 'role', 'authenticated'))
+    ) -> 'claims')::text, true);
+    PERFORM set_config('request.jwt.claim.sub', v_user::text, true);
+
+    -- Legado (sem RLS, predicado antigo explícito)
+    v_legado_ms := 0;
+    FOR i IN 1..v_rodadas LOOP
+      EXECUTE v_legado_sql INTO v_plano;
+      v_legado_ms := v_legado_ms + (v_plano -> 0 ->> 'Execution Time')::numeric;
+    END LOOP;
+    v_legado_ms := v_legado_ms / v_rodadas;
+
+    -- Atual (RLS como authenticated)
+    EXECUTE 'SET LOCAL ROLE authenticated';
+    v_atual_ms := 0;
+    FOR i IN 1..v_rodadas LOOP
+      EXECUTE v_atual_sql INTO v_plano;
+      v_atual_ms := v_atual_ms + (v_plano -> 0 ->> 'Execution Time')::numeric;
+    END LOOP;
+    v_atual_ms := v_atual_ms / v_rodadas;
+    EXECUTE 'SELECT count(*) FROM public.lancamentos' INTO v_visiveis;
+    EXECUTE 'RESET ROLE';
+
+    RAISE NOTICE '%', rpad(v_role, 12) || rpad(v_visiveis::text, 10)
+      || rpad(round(v_legado_ms, 2)::text, 12) || rpad(round(v_atual_ms, 2)::text, 12)
+      || rpad(round(v_legado_ms * 1000 / GREATEST(v_linhas_lidas, 1), 3)::text, 18)
+      || round(v_atual_ms * 1000 / GREATEST(v_linhas_lidas, 1), 3)::text;
+
+    v_plano_txt := v_plano::text;
+    IF v_plano_txt NOT LIKE '%InitPlan%' OR v_plano_txt LIKE '%SubPlan%' THEN
+      RAISE WARNING '[%] plano atual sem InitPlan ou com SubPlan: policy reavaliada por linha', v_role;
+    END IF;
+  END LOOP;
+END;
+$$;
+
+ROLLBACK;
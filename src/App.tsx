@@ -4,6 +4,7 @@ import { Login } from './pages/Login'
 import { Logout } from './pages/Logout'
 import { ProtectedRoute } from './components/ProtectedRoute'
 import { UpdateModalGate } from './components/UpdateModalGate'
+import { useReferenceDataRevalidation } from './hooks/useReferenceData'
 
 // Lazy loading das páginas para reduzir bundle inicial
 const DashboardChefe = lazy(() => import('./pages/DashboardChefe').then(m => ({ default: m.DashboardChefe })))
@@ -34,6 +35,9 @@ function PageLoader() {
 }
 
 function App() {
+  // Confere versões de bases/equipes/indicadores/colaboradores ao voltar para a aba
+  useReferenceDataRevalidation()
+
   return (
     <BrowserRouter>
       <UpdateModalGate />
@@ -1,19 +1,14 @@
-import { useQuery } from '@tanstack/react-query'
-import { supabase } from '@/lib/supabase'
 import { Label } from '@/components/ui/label'
 import { Select } from '@/components/ui/select'
 import { DatePicker } from '@/components/ui/date-picker'
 import { Button } from '@/components/ui/button'
 import { formatBaseName, formatEquipeName } from '@/lib/utils'
-import type { Database } from '@/lib/database.types'
+import { useBases, useEquipes } from '@/hooks/useReferenceData'
+import { useColaboradores } from '@/hooks/useColaboradores'
 import { validateDateRange, enforceMaxDateRange } from '@/lib/date-utils'
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useMemo } from 'react'
 import { RotateCcw } from 'lucide-react'
 
-type Colaborador = Database['public']['Tables']['colaboradores']['Row']
-type Base = Database['public']['Tables']['bases']['Row']
-type Equipe = Database['public']['Tables']['equipes']['Row']
-
 interface AnalyticsFilterBarProps {
   baseId: string
   onBaseChange: (baseId: string) => void
@@ -102,42 +97,13 @@ export function AnalyticsFilterBar({
     }
   }
 
-  // Buscar bases
-  const { data: bases } = useQuery<Base[]>({
-    queryKey: ['bases'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('bases').select('*').order('nome')
-      if (error) throw error
-      return (data || []) as Base[]
-    },
-  })
-
-  // Buscar equipes
-  const { data: equipes } = useQuery<Equipe[]>({
-    queryKey: ['equipes'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('equipes').select('*').order('nome')
-      if (error) throw error
-      return (data || []) as Equipe[]
-    },
-  })
+  // Dados de referência (cache persistente)
+  const { data: bases } = useBases()
+  const { data: equipes } = useEquipes()
 
-  // Buscar colaboradores da base selecionada
-  const { data: colaboradores } = useQuery<Colaborador[]>({
-    queryKey: ['colaboradores', baseId],
-    enabled: !!baseId && showColaboradorFilter,
-    queryFn: async () => {
-      if (!baseId) return []
-      const { data, error } = await supabase
-        .from('colaboradores')
-        .select('*')
-        .eq('base_id', baseId)
-        .eq('ativo', true)
-        .order('nome')
-      if (error) throw error
-      return (data || []) as Colaborador[]
-    },
-  })
+  // Colaboradores ativos da base selecionada (mesma lista do useColaboradores, filtrada aqui)
+  const { data: todosColaboradores } = useColaboradores(baseId || null, { enabled: showColaboradorFilter })
+  const colaboradores = useMemo(() => todosColaboradores?.filter((c) => c.ativo), [todosColaboradores])
 
   // Calcular número de colunas dinâmicas baseado nos filtros visíveis
   const visibleFilters = 4 + (onEquipeChange ? 1 : 0) + (showColaboradorFilter ? 1 : 0) + (showTipoOcorrenciaFilter ? 1 : 0) + (showTipoOcorrenciaAeroFilter ? 1 : 0)
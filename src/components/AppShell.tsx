@@ -8,6 +8,8 @@ import { Settings, LogOut, Sun, Moon, Bell, Menu, X, ChevronRight } from 'lucide
 import { useNavigate } from 'react-router-dom'
 import { useQueryClient, useQuery } from '@tanstack/react-query'
 import { supabase } from '@/lib/supabase'
+import { clearReferenceCache } from '@/lib/reference-data'
+import { clearLancamentosLocais } from '@/lib/lancamentos-sync'
 
 const STORAGE_KEY_SUPORTE_VISTOS = 'suporte_resposta_vistos'
 
@@ -72,13 +74,14 @@ export function AppShell({ title, subtitle, baseEquipe, children, extraActions,
 
   const { data: feedbackIdsComResposta = [] } = useQuery({
     queryKey: ['notificacoes-resposta-suporte-ids', authUser?.user?.id],
-    queryFn: async () => {
+    queryFn: async ({ signal }) => {
       if (!authUser?.user?.id) return []
       const { data, error } = await supabase
         .from('feedbacks')
         .select('id')
         .eq('user_id', authUser.user.id)
         .not('resposta_suporte', 'is', null)
+        .abortSignal(signal)
       if (error) throw error
       return (data ?? []).map((r: { id: string }) => r.id)
     },
@@ -105,6 +108,7 @@ export function AppShell({ title, subtitle, baseEquipe, children, extraActions,
         if (key && (key.startsWith('supabase.') || key.startsWith('sb-'))) keysToRemove.push(key)
       }
       keysToRemove.forEach((k) => localStorage.removeItem(k))
+      await Promise.all([clearReferenceCache(), clearLancamentosLocais()])
       await supabase.auth.signOut()
       window.location.href = '/login'
     } catch {
@@ -1,7 +1,7 @@
-import { useState, useMemo } from 'react'
-import { useQuery } from '@tanstack/react-query'
-import { supabase } from '@/lib/supabase'
-import { useLancamentos } from '@/hooks/useLancamentos'
+import { useState, useMemo, useEffect } from 'react'
+import { useLancamentosInfinitos } from '@/hooks/useLancamentos'
+import { useVirtualRows } from '@/hooks/useVirtualRows'
+import { useEquipes, useIndicadoresConfig } from '@/hooks/useReferenceData'
 import { formatDateForDisplay, getDefaultDateRange } from '@/lib/date-utils'
 import { getIndicatorBadgeVariant, getResumoLancamento } from '@/lib/history-utils'
 import { getIndicadorDisplayName, sortIndicadoresPtrBaProximos } from '@/lib/indicadores-display'
@@ -21,13 +21,10 @@ import {
   Eye,
   Pencil,
   Trash2,
-  ChevronLeft,
-  ChevronRight,
   Lock,
   CalendarDays,
 } from 'lucide-react'
 
-type Equipe = Database['public']['Tables']['equipes']['Row']
 type LancamentoWithUser = import('@/hooks/useLancamentos').LancamentoWithUser
 type Indicador = Database['public']['Tables']['indicadores_config']['Row']
 
@@ -42,7 +39,10 @@ interface HistoryTableProps {
   getEquipeName: (equipeId: string) => string
 }
 
-const PAGE_SIZE = 20
+const PAGE_SIZE = 50
+// Altura estimada da linha (virtualização; a real é medida ao renderizar) e quantas linhas antes do fim disparam a próxima página
+const ALTURA_LINHA = 56
+const LIMIAR_PROXIMA_PAGINA = 20
 
 export function HistoryTable({
   baseId,
@@ -54,84 +54,65 @@ export function HistoryTable({
   getBaseName,
   getEquipeName,
 }: HistoryTableProps) {
-  const [page, setPage] = useState(1)
   const [indicadorFilter, setIndicadorFilter] = useState<string>('')
   const [equipeFilter, setEquipeFilter] = useState<string>('')
   const [dataInicioFilter, setDataInicioFilter] = useState<string>(() => getDefaultDateRange().dataInicio)
   const [dataFimFilter, setDataFimFilter] = useState<string>(() => getDefaultDateRange().dataFim)
 
-  const { data: indicadores } = useQuery<Indicador[]>({
-    queryKey: ['indicadores'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('indicadores_config').select('*').order('nome')
-      if (error) throw error
-      return data || []
-    },
-  })
+  const { data: indicadores } = useIndicadoresConfig()
 
-  const { data: equipes } = useQuery<Equipe[]>({
-    queryKey: ['equipes'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('equipes').select('*').order('nome')
-      if (error) throw error
-      return data || []
-    },
-    enabled: !!baseId,
-  })
+  const { data: equipes } = useEquipes()
 
-  const { data, isLoading, error } = useLancamentos({
+  // Rolagem contínua por páginas keyset (já na ordem do histórico); autor vem de autor_nome (migration 036)
+  const {
+    data: lancamentos,
+    total,
+    totalEstimado,
+    isLoading,
+    isFetchingMore,
+    error,
+    temMais,
+    carregarMais,
+  } = useLancamentosInfinitos({
     baseId: baseId || undefined,
     equipeId: equipeFilter || undefined,
     indicadorId: indicadorFilter || undefined,
     dataInicio: dataInicioFilter || undefined,
     dataFim: dataFimFilter || undefined,
-    page,
     pageSize: PAGE_SIZE,
+    // Histórico da base: lê da cópia local e só baixa o que mudou
+    localFirst: true,
     enabled: !!baseId,
   })
 
-  const lancamentosOrdenados = useMemo(() => {
-    const list = data?.data ?? []
-    return [...list].sort((a, b) => {
-      const cmpData = b.data_referencia.localeCompare(a.data_referencia)
-      if (cmpData !== 0) return cmpData
-      return (b.created_at || '').localeCompare(a.created_at || '')
-    })
-  }, [data?.data])
-
-  const userIds = useMemo(() => {
-    const ids = new Set<string>()
-    lancamentosOrdenados.forEach((l) => { if (l.user_id) ids.add(l.user_id) })
-    return [...ids]
-  }, [lancamentosOrdenados])
-
-  const { data: profilesList } = useQuery({
-    queryKey: ['profiles-nomes', userIds],
-    queryFn: async () => {
-      if (userIds.length === 0) return []
-      const { data, error } = await supabase.from('profiles').select('id, nome').in('id', userIds)
-      if (error) throw error
-      return (data ?? []) as { id: string; nome: string }[]
-    },
-    enabled: userIds.length > 0,
-  })
-
-  const profilesNomeMap = useMemo(() => {
-    const map = new Map<string, string>()
-    profilesList?.forEach((p) => map.set(p.id, p.nome))
-    return map
-  }, [profilesList])
-
   const indicadoresMap = useMemo(() => {
     const map = new Map<string, Indicador>()
     indicadores?.forEach((ind) => map.set(ind.id, ind))
     return map
   }, [indicadores])
 
+  // Lançamento de indicador desconhecido não é exibido: fica fora da virtualização
+  const linhas = useMemo(
+    () => lancamentos.filter((l) => indicadoresMap.has(l.indicador_id)),
+    [lancamentos, indicadoresMap]
+  )
+  const idsLinhas = useMemo(() => linhas.map((l) => l.id), [linhas])
+
+  // Só as linhas visíveis (mais a margem) vão para o DOM
+  const { containerRef, medirLinha, inicio, fim, espacoAntes, espacoDepois } = useVirtualRows({
+    ids: idsLinhas,
+    alturaLinha: ALTURA_LINHA,
+  })
+  const visiveis = linhas.slice(inicio, fim)
+
+  // Perto do fim da lista: acrescenta a próxima página (já pré-buscada)
+  useEffect(() => {
+    if (temMais && fim >= linhas.length - LIMIAR_PROXIMA_PAGINA) carregarMais()
+  }, [temMais, fim, linhas.length, carregarMais])
+
   const handleDataInicioChange = (novaDataInicio: string) => {
     setDataInicioFilter(novaDataInicio)
     if (novaDataInicio && dataFimFilter && novaDataInicio > dataFimFilter) setDataFimFilter(novaDataInicio)
-    setPage(1)
   }
 
   const handleDataFimChange = (novaDataFim: string) => {
@@ -140,7 +121,6 @@ export function HistoryTable({
       return
     }
     setDataFimFilter(novaDataFim)
-    setPage(1)
   }
 
   const handleClearFilters = () => {
@@ -149,7 +129,6 @@ export function HistoryTable({
     setEquipeFilter('')
     setDataInicioFilter(padrao.dataInicio)
     setDataFimFilter(padrao.dataFim)
-    setPage(1)
   }
 
   if (error) {
@@ -186,7 +165,7 @@ export function HistoryTable({
               <Select
                 id="indicador"
                 value={indicadorFilter}
-                onChange={(e) => { setIndicadorFilter(e.target.value); setPage(1) }}
+                onChange={(e) => setIndicadorFilter(e.target.value)}
               >
                 <option value="">Todos</option>
                 {sortIndicadoresPtrBaProximos(indicadores ?? []).map((ind) => (
@@ -200,7 +179,7 @@ export function HistoryTable({
               <Select
                 id="equipe"
                 value={equipeFilter}
-                onChange={(e) => { setEquipeFilter(e.target.value); setPage(1) }}
+                onChange={(e) => setEquipeFilter(e.target.value)}
               >
                 <option value="">Todas</option>
                 {equipes?.map((eq) => (
@@ -243,9 +222,9 @@ export function HistoryTable({
                 Lançamentos da sua base. Edite/exclua apenas os da sua equipe.
               </CardDescription>
             </div>
-            {data && data.total > 0 && (
+            {total > 0 && (
               <Badge variant="secondary" className="text-sm font-medium tabular-nums">
-                {data.total} {data.total === 1 ? 'registro' : 'registros'}
+                {totalEstimado && temMais ? '~' : ''}{total} {total === 1 ? 'registro' : 'registros'}
               </Badge>
             )}
           </div>
@@ -256,7 +235,7 @@ export function HistoryTable({
               <div className="h-8 w-8 rounded-full border-2 border-primary/30 border-t-primary animate-spin" />
               <p className="text-sm text-muted-foreground">Carregando lançamentos...</p>
             </div>
-          ) : !data || data.data.length === 0 ? (
+          ) : lancamentos.length === 0 ? (
             <div className="flex flex-col items-center justify-center py-20 text-center px-6">
               <div className="flex h-16 w-16 items-center justify-center rounded-full bg-muted mb-4">
                 <FileX2 className="h-7 w-7 text-muted-foreground" />
@@ -268,9 +247,9 @@ export function HistoryTable({
             </div>
           ) : (
             <>
-              <div className="overflow-x-auto scrollbar-thin">
+              <div ref={containerRef} className="overflow-auto max-h-[65vh] scrollbar-thin">
                 <table className="w-full text-sm">
-                  <thead>
+                  <thead className="sticky top-0 z-10 bg-card">
                     <tr className="bg-muted/40 border-b border-border">
                       <th className="text-left py-3 px-4 font-medium text-xs text-muted-foreground uppercase tracking-wider">Data</th>
                       <th className="text-left py-3 px-4 font-medium text-xs text-muted-foreground uppercase tracking-wider">Autor</th>
@@ -282,16 +261,21 @@ export function HistoryTable({
                     </tr>
                   </thead>
                   <tbody className="divide-y divide-border">
-                    {lancamentosOrdenados.map((lancamento) => {
-                      const indicador = indicadoresMap.get(lancamento.indicador_id)
-                      if (!indicador) return null
-                      const userName = getLancamentoAutorDisplayName(lancamento, profilesNomeMap)
+                    {espacoAntes > 0 && (
+                      <tr aria-hidden="true" style={{ height: espacoAntes }} />
+                    )}
+                    {visiveis.map((lancamento) => {
+                      const indicador = indicadoresMap.get(lancamento.indicador_id) as Indicador
+                      const userName = getLancamentoAutorDisplayName(lancamento)
 
                       const editable = canEdit(lancamento)
 
                       return (
                         <tr
                           key={lancamento.id}
+                          ref={medirLinha}
+                          data-linha-id={lancamento.id}
+                          style={{ height: ALTURA_LINHA }}
                           className="group hover:bg-muted/30 transition-colors duration-100"
                         >
                           <td className="py-3 px-4 font-medium tabular-nums whitespace-nowrap">
@@ -350,41 +334,25 @@ export function HistoryTable({
                         </tr>
                       )
                     })}
+                    {espacoDepois > 0 && (
+                      <tr aria-hidden="true" style={{ height: espacoDepois }} />
+                    )}
                   </tbody>
                 </table>
               </div>
 
-              {/* Paginação */}
-              {data.total > 0 && (
-                <div className="flex items-center justify-between px-4 sm:px-6 py-3 border-t border-border bg-muted/20">
-                  <p className="text-sm text-muted-foreground tabular-nums">
-                    Página {data.page} de {data.totalPages} — {data.total} {data.total === 1 ? 'registro' : 'registros'}
-                  </p>
-                  {data.totalPages > 1 && (
-                    <div className="flex items-center gap-1">
-                      <Button
-                        variant="ghost"
-                        size="icon"
-                        onClick={() => setPage(page - 1)}
-                        disabled={page === 1}
-                        className="h-8 w-8 rounded-md"
-                      >
-                        <ChevronLeft className="h-4 w-4" />
-                      </Button>
-                      <span className="text-sm font-medium px-2 tabular-nums">{page}</span>
-                      <Button
-                        variant="ghost"
-                        size="icon"
-                        onClick={() => setPage(page + 1)}
-                        disabled={page >= data.totalPages}
-                        className="h-8 w-8 rounded-md"
-                      >
-                        <ChevronRight className="h-4 w-4" />
-                      </Button>
-                    </div>
-                  )}
-                </div>
-              )}
+              {/* Rodapé: progresso da rolagem contínua */}
+              <div className="flex items-center justify-between px-4 sm:px-6 py-3 border-t border-border bg-muted/20">
+                <p className="text-sm text-muted-foreground tabular-nums">
+                  {lancamentos.length} de {totalEstimado && temMais ? '~' : ''}{total} {total === 1 ? 'registro' : 'registros'}
+                </p>
+                {isFetchingMore && (
+                  <div className="flex items-center gap-2 text-sm text-muted-foreground">
+                    <div className="h-4 w-4 rounded-full border-2 border-primary/30 border-t-primary animate-spin" />
+                    Carregando mais...
+                  </div>
+                )}
+              </div>
             </>
           )}
         </CardContent>
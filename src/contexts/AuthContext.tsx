@@ -1,7 +1,10 @@
-import { createContext, useContext, useEffect, useState, ReactNode } from 'react'
-import { User } from '@supabase/supabase-js'
+import { createContext, useCallback, useContext, useEffect, useState, ReactNode } from 'react'
+import { Session, User } from '@supabase/supabase-js'
 import { supabase } from '@/lib/supabase'
 import type { Database } from '@/lib/database.types'
+import { perfilDoAccessToken } from '@/lib/perfil-claims'
+import { clearReferenceCache } from '@/lib/reference-data'
+import { clearLancamentosLocais } from '@/lib/lancamentos-sync'
 
 type Profile = Database['public']['Tables']['profiles']['Row']
 
@@ -28,7 +31,8 @@ export function AuthProvider({ children }: { children: ReactNode }) {
     import.meta.env.VITE_SUPABASE_URL && 
     import.meta.env.VITE_SUPABASE_ANON_KEY
 
-  async function loadProfile(userId: string, retryCount = 0): Promise<Profile | null> {
+  // Estáveis (useCallback): usados pelos efeitos de sessão e do aviso de perfil alterado
+  const loadProfile = useCallback(async function loadProfile(userId: string, retryCount = 0): Promise<Profile | null> {
     const maxRetries = 2
     try {
       let profile: Profile | null = null
@@ -89,13 +93,32 @@ export function AuthProvider({ children }: { children: ReactNode }) {
       }
       return null
     }
-  }
+  }, [])
+
+  /**
+   * Perfil da claim "perfil" do access token (migration 044), sem ir ao banco.
+   * Sem a claim (hook desativado / token antigo), cai no loadProfile.
+   * Serve só para a tela: o acesso é decidido no servidor pelo perfil atual (migration 052).
+   */
+  const loadProfileFromSession = useCallback(
+    async (session: Session): Promise<Profile | null> => {
+      const claimProfile = perfilDoAccessToken(session.access_token, session.user.id)
+      if (!claimProfile) return loadProfile(session.user.id)
+      setAuthUser((prev) =>
+        prev?.user.id === session.user.id && JSON.stringify(prev.profile) === JSON.stringify(claimProfile)
+          ? prev
+          : { user: session.user, profile: claimProfile }
+      )
+      return claimProfile
+    },
+    [loadProfile]
+  )
 
   async function refreshAuth(): Promise<Profile | null> {
     try {
       const { data: { session } } = await supabase.auth.getSession()
       if (session?.user) {
-        return await loadProfile(session.user.id)
+        return await loadProfileFromSession(session)
       }
       setAuthUser(null)
       return null
@@ -134,7 +157,7 @@ export function AuthProvider({ children }: { children: ReactNode }) {
 
         if (mounted) {
           if (session?.user) {
-            await loadProfile(session.user.id)
+            await loadProfileFromSession(session)
           } else {
             setAuthUser(null)
           }
@@ -150,15 +173,18 @@ export function AuthProvider({ children }: { children: ReactNode }) {
 
           console.log('Auth state changed:', event)
           
-          // Ignorar apenas eventos de refresh token para evitar loops
+          // Refresh de token: só reaplicar a claim "perfil" (sem ir ao banco, evita loops)
           if (event === 'TOKEN_REFRESHED') {
+            if (session?.user && perfilDoAccessToken(session.access_token, session.user.id)) {
+              await loadProfileFromSession(session)
+            }
             return
           }
           
           // Para SIGNED_IN, sempre atualizar o perfil
           if (event === 'SIGNED_IN') {
             if (session?.user) {
-              await loadProfile(session.user.id)
+              await loadProfileFromSession(session)
             }
             setLoading(false)
             return
@@ -185,13 +211,17 @@ export function AuthProvider({ children }: { children: ReactNode }) {
             } catch (e) {
               console.warn('Erro ao limpar localStorage:', e)
             }
+
+            // Dados persistidos no IndexedDB (referência e lançamentos) não sobrevivem ao logout
+            void clearReferenceCache()
+            void clearLancamentosLocais()
             
             return
           }
           
           // Para outros eventos, atualizar conforme a sessão
           if (session?.user) {
-            await loadProfile(session.user.id)
+            await loadProfileFromSession(session)
           } else {
             setAuthUser(null)
           }
@@ -216,7 +246,38 @@ export function AuthProvider({ children }: { children: ReactNode }) {
         subscription.unsubscribe()
       }
     }
-  }, [hasConfig, isInitialized])
+  }, [hasConfig, isInitialized, loadProfileFromSession])
+
+  // Perfil alterado no banco (trigger da migration 044): renovar o token para receber as claims novas.
+  // Canal privado (migration 052): só o próprio usuário recebe e nenhum cliente publica no tópico.
+  const currentUserId = authUser?.user.id
+  useEffect(() => {
+    if (!hasConfig || !currentUserId) return
+
+    const channel = supabase
+      .channel(`perfil:${currentUserId}`, { config: { private: true } })
+      .on('broadcast', { event: 'perfil_alterado' }, async () => {
+        const { data, error } = await supabase.auth.refreshSession()
+        if (error) {
+          console.warn('Erro ao renovar sessão após alteração de perfil:', error)
+          return
+        }
+        if (data.session?.user) {
+          await loadProfileFromSession(data.session)
+        }
+      })
+
+    // Autorização do canal privado usa o access token atual
+    let ativo = true
+    void supabase.realtime.setAuth().then(() => {
+      if (ativo) channel.subscribe()
+    })
+
+    return () => {
+      ativo = false
+      supabase.removeChannel(channel)
+    }
+  }, [hasConfig, currentUserId, loadProfileFromSession])
 
   return (
     <AuthContext.Provider value={{ authUser, loading, refreshAuth }}>
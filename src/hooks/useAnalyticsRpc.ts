@@ -0,0 +1,108 @@
+import { useQuery } from '@tanstack/react-query'
+import { supabase } from '@/lib/supabase'
+import type { Json } from '@/lib/database.types'
+
+type AnalyticsRpcName =
+  | 'analytics_tempo_resposta'
+  | 'analytics_horas_treinamento'
+  | 'analytics_tempo_tp_epr'
+  | 'analytics_inspecao_viaturas'
+
+/**
+ * Views do Dashboard Analytics agregadas no servidor (migration 037).
+ * As demais views (e o fallback em caso de erro) usam os process* de analytics-utils.
+ */
+export const ANALYTICS_RPC_POR_VIEW: Record<string, AnalyticsRpcName> = {
+  tempo_resposta: 'analytics_tempo_resposta',
+  exercicio_posicionamento: 'analytics_tempo_resposta',
+  treinamento: 'analytics_horas_treinamento',
+  tempo_tp_epr: 'analytics_tempo_tp_epr',
+  inspecao_viaturas: 'analytics_inspecao_viaturas',
+}
+
+export function isAnalyticsRpcView(view: string): boolean {
+  return view in ANALYTICS_RPC_POR_VIEW
+}
+
+interface UseAnalyticsRpcParams {
+  view: string
+  baseId?: string
+  equipeId?: string
+  dataInicio?: string // YYYY-MM-DD
+  dataFim?: string // YYYY-MM-DD
+  colaboradorNome?: string
+  enabled?: boolean
+}
+
+/**
+ * Busca o payload de KPIs/gráficos já agregado no Postgres para a view.
+ * Retorna null quando não há lançamentos para os filtros (mesmo contrato do processedData).
+ * Sem retry: em caso de erro o dashboard cai imediatamente no processamento local.
+ * Troca de view/filtro cancela a chamada anterior (signal da query).
+ */
+export function useAnalyticsRpc({
+  view,
+  baseId,
+  equipeId,
+  dataInicio,
+  dataFim,
+  colaboradorNome,
+  enabled = true,
+}: UseAnalyticsRpcParams) {
+  const rpcName = ANALYTICS_RPC_POR_VIEW[view]
+
+  return useQuery<Json | null>({
+    queryKey: ['analytics-rpc', view, baseId, equipeId, dataInicio, dataFim, colaboradorNome],
+    enabled: enabled && !!rpcName,
+    retry: false,
+    // Mantém o resultado anterior apenas dentro da mesma view (payloads de views diferentes têm formatos diferentes)
+    placeholderData: (prev, prevQuery) => (prevQuery?.queryKey[1] === view ? prev : undefined),
+    queryFn: async ({ signal }) => {
+      const { data, error } = await supabase
+        .rpc(rpcName, {
+          p_schema_type: view,
+          p_base_id: baseId || null,
+          p_equipe_id: equipeId || null,
+          p_data_inicio: dataInicio || null,
+          p_data_fim: dataFim || null,
+          p_colaborador: colaboradorNome?.trim() || null,
+        })
+        .abortSignal(signal)
+      if (error) throw error
+      return data ?? null
+    },
+  })
+}
+
+interface UseResumoExecutivoRpcParams {
+  baseId?: string
+  equipeId?: string
+  dataInicio?: string // YYYY-MM-DD
+  dataFim?: string // YYYY-MM-DD
+  enabled?: boolean
+}
+
+/**
+ * KPIs da Visão Geral do período filtrado e do período anterior de mesma duração
+ * (migration 051), numa chamada. Mesclados ao resumo local com aplicarResumoExecutivo;
+ * sem retry: em caso de erro os cards ficam só com os valores locais, sem comparação.
+ */
+export function useResumoExecutivoRpc({ baseId, equipeId, dataInicio, dataFim, enabled = true }: UseResumoExecutivoRpcParams) {
+  return useQuery<Json | null>({
+    queryKey: ['analytics-resumo-executivo', baseId, equipeId, dataInicio, dataFim],
+    enabled,
+    retry: false,
+    queryFn: async ({ signal }) => {
+      const { data, error } = await supabase
+        .rpc('analytics_resumo_executivo', {
+          p_base_id: baseId || null,
+          p_equipe_id: equipeId || null,
+          p_data_inicio: dataInicio || null,
+          p_data_fim: dataFim || null,
+        })
+        .abortSignal(signal)
+      if (error) throw error
+      return data ?? null
+    },
+  })
+}
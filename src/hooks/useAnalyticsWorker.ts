@@ -0,0 +1,220 @@
+import { useEffect, useRef, useState } from 'react'
+import { processAnalyticsView, usesColaboradorFilter } from '@/lib/analytics-view'
+import type { AnalyticsView, AnalyticsViewContext, AnalyticsViewFilters } from '@/lib/analytics-view'
+import type { AnalyticsWorkerRequest, AnalyticsWorkerResponse } from '@/workers/analytics.worker'
+import type { Database } from '@/lib/database.types'
+
+type Lancamento = Database['public']['Tables']['lancamentos']['Row']
+
+interface UseAnalyticsWorkerParams {
+  view: AnalyticsView
+  lancamentos: Lancamento[]
+  filters: AnalyticsViewFilters
+  context: AnalyticsViewContext
+  enabled?: boolean
+}
+
+interface AnalyticsWorkerState {
+  requestId: number
+  view: AnalyticsView
+  data: unknown
+}
+
+// Mesmo limite do worker: ids dos datasets que ele ainda guarda
+const MAX_DATASETS = 2
+// Resultados recentes guardados por (view, dados, filtros)
+const MAX_RESULTADOS = 8
+
+// Identidade de arrays (lançamentos, bases, indicadores) -> id numérico.
+// Novo array = novo id: react-query mantém a referência quando os dados não mudam.
+const identityIds = new WeakMap<object, number>()
+let nextIdentityId = 1
+
+function getIdentityId(value: object | undefined): number {
+  if (!value) return 0
+  let id = identityIds.get(value)
+  if (id === undefined) {
+    id = nextIdentityId++
+    identityIds.set(value, id)
+  }
+  return id
+}
+
+function createWorker(): Worker | null {
+  if (typeof Worker === 'undefined') return null
+  try {
+    return new Worker(new URL('../workers/analytics.worker.ts', import.meta.url), { type: 'module' })
+  } catch (error) {
+    console.warn('Analytics worker indisponível, processando na main thread:', error)
+    return null
+  }
+}
+
+/**
+ * Processa a view do Dashboard Analytics no analytics.worker.
+ * - Lançamentos vão por structured clone, só quando o array muda;
+ *   trocar filtro/view envia apenas a mensagem de processamento.
+ * - Cada mudança de view/filtro/dados gera um pedido novo: o anterior é
+ *   cancelado no worker (se não começou) e sua resposta é descartada.
+ * - Sem suporte a Worker, ou se o worker falhar, processa na main thread.
+ * - Os últimos resultados ficam num LRU por (view, identidade dos dados,
+ *   filtros): voltar para uma view já vista com os mesmos filtros é imediato.
+ * Retorna null enquanto não há resultado da view atual.
+ */
+export function useAnalyticsWorker({
+  view,
+  lancamentos,
+  filters,
+  context,
+  enabled = true,
+}: UseAnalyticsWorkerParams) {
+  const workerRef = useRef<Worker | null | undefined>(undefined)
+  const sentDatasetsRef = useRef<number[]>([])
+  const latestRequestRef = useRef(0)
+  // View, fallback local e gravação no LRU do pedido atual (lidos pelo onmessage do worker)
+  const viewRef = useRef<AnalyticsView>(view)
+  const fallbackRef = useRef<() => void>(() => {})
+  const saveResultRef = useRef<(data: unknown) => void>(() => {})
+  // LRU de resultados: Map em ordem de uso (o primeiro é o menos recente)
+  const resultsRef = useRef(new Map<string, unknown>())
+  const [state, setState] = useState<AnalyticsWorkerState | null>(null)
+  const [isProcessing, setIsProcessing] = useState(false)
+
+  const { colaboradorNome, tipoOcorrencia, tipoOcorrenciaAero } = filters
+  const { bases, indicadoresConfig } = context
+
+  useEffect(() => {
+    return () => {
+      workerRef.current?.terminate()
+      workerRef.current = undefined
+    }
+  }, [])
+
+  useEffect(() => {
+    if (!enabled) {
+      latestRequestRef.current++
+      setIsProcessing(false)
+      return
+    }
+
+    const requestId = ++latestRequestRef.current
+    const requestFilters: AnalyticsViewFilters = { colaboradorNome, tipoOcorrencia, tipoOcorrenciaAero }
+    const requestContext: AnalyticsViewContext = { bases, indicadoresConfig }
+    const datasetId = getIdentityId(lancamentos)
+    // Só o que a view usa entra na chave (ex.: colaborador não invalida Ocorrência Aeronáutica)
+    const usaReferencias = view === 'visao_geral' || view === 'logistica'
+    const cacheKey = JSON.stringify([
+      view,
+      datasetId,
+      usaReferencias ? getIdentityId(bases) : 0,
+      usaReferencias ? getIdentityId(indicadoresConfig) : 0,
+      usesColaboradorFilter(view) ? colaboradorNome ?? '' : '',
+      view === 'ocorrencia_nao_aero' ? tipoOcorrencia ?? '' : '',
+      view === 'ocorrencia_aero' ? tipoOcorrenciaAero ?? '' : '',
+    ])
+
+    const results = resultsRef.current
+    const saveResult = (data: unknown) => {
+      results.delete(cacheKey)
+      results.set(cacheKey, data)
+      while (results.size > MAX_RESULTADOS) {
+        results.delete(results.keys().next().value as string)
+      }
+    }
+
+    // Mesma view, mesmos dados e filtros: resultado imediato, sem reprocessar
+    if (results.has(cacheKey)) {
+      const data = results.get(cacheKey)
+      saveResult(data)
+      setState({ requestId, view, data })
+      setIsProcessing(false)
+      return
+    }
+
+    const processLocally = () => {
+      if (requestId !== latestRequestRef.current) return
+      try {
+        const data = processAnalyticsView(view, lancamentos, requestFilters, requestContext)
+        saveResult(data)
+        setState({ requestId, view, data })
+      } catch (error) {
+        console.error('Erro ao processar analytics:', error)
+        setState({ requestId, view, data: null })
+      }
+      setIsProcessing(false)
+    }
+
+    if (workerRef.current === undefined) {
+      workerRef.current = createWorker()
+      if (workerRef.current) {
+        const worker = workerRef.current
+        worker.onmessage = (event: MessageEvent<AnalyticsWorkerResponse>) => {
+          const message = event.data
+          // Resposta de pedido já substituído: descartar
+          if (message.requestId !== latestRequestRef.current) return
+          if (message.type === 'result') {
+            saveResultRef.current(message.data)
+            setState({ requestId: message.requestId, view: viewRef.current, data: message.data })
+            setIsProcessing(false)
+          } else {
+            console.warn('Analytics worker falhou, processando na main thread:', message.message)
+            fallbackRef.current()
+          }
+        }
+        worker.onerror = (event) => {
+          console.warn('Analytics worker com erro, processando na main thread:', event.message)
+          event.preventDefault()
+          worker.terminate()
+          workerRef.current = null
+          sentDatasetsRef.current = []
+          fallbackRef.current()
+        }
+      }
+    }
+
+    viewRef.current = view
+    fallbackRef.current = processLocally
+    saveResultRef.current = saveResult
+
+    const worker = workerRef.current
+    if (!worker) {
+      processLocally()
+      return
+    }
+
+    setIsProcessing(true)
+
+    const sent = sentDatasetsRef.current
+    if (!sent.includes(datasetId)) {
+      const datasetMessage: AnalyticsWorkerRequest = { type: 'dataset', datasetId, lancamentos }
+      worker.postMessage(datasetMessage)
+      sent.push(datasetId)
+      while (sent.length > MAX_DATASETS) sent.shift()
+    } else {
+      // Dataset reutilizado: o worker renova a posição ao receber o pedido, mesmo se ele for substituído
+      sent.splice(sent.indexOf(datasetId), 1)
+      sent.push(datasetId)
+    }
+
+    const processMessage: AnalyticsWorkerRequest = {
+      type: 'process',
+      requestId,
+      datasetId,
+      view,
+      filters: requestFilters,
+      context: requestContext,
+    }
+    worker.postMessage(processMessage)
+
+    return () => {
+      const cancelMessage: AnalyticsWorkerRequest = { type: 'cancel', requestId }
+      workerRef.current?.postMessage(cancelMessage)
+    }
+  }, [enabled, view, lancamentos, colaboradorNome, tipoOcorrencia, tipoOcorrenciaAero, bases, indicadoresConfig])
+
+  // Resultado de outra view tem outro formato: não reaproveitar
+  const temResultadoDaView = state?.view === view
+  const data = state && temResultadoDaView ? state.data : null
+
+  return { data, isProcessing: isProcessing || (enabled && !temResultadoDaView) }
+}
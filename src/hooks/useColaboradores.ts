@@ -1,6 +1,13 @@
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { supabase } from '@/lib/supabase'
 import { useAuth } from '@/contexts/AuthContext'
+import {
+  fetchReferenceData,
+  invalidateReferenceData,
+  referenceKeys,
+  REFERENCE_GC_TIME,
+  REFERENCE_STALE_TIME,
+} from '@/lib/reference-data'
 import type { Database } from '@/lib/database.types'
 
 type Colaborador = Database['public']['Tables']['colaboradores']['Row']
@@ -8,29 +15,36 @@ type ColaboradorInsert = Database['public']['Tables']['colaboradores']['Insert']
 type ColaboradorUpdate = Database['public']['Tables']['colaboradores']['Update']
 
 /**
- * Hook para buscar colaboradores de uma base.
+ * Hook para buscar colaboradores de uma base (todos, ativos e inativos; filtre `ativo` no componente).
  * Para usuários que não são Gerente Geral (role !== 'geral'), o filtro é obrigatório pela base do perfil (defesa em profundidade).
+ * Lista persistida no cache de dados de referência (src/lib/reference-data.ts).
  */
-export function useColaboradores(baseId: string | null) {
+export function useColaboradores(baseId: string | null, options: { enabled?: boolean } = {}) {
   const { authUser } = useAuth()
+  const userId = authUser?.user?.id ?? null
   const isGerenteGeral = authUser?.profile?.role === 'geral'
   const userBaseId = authUser?.profile?.base_id ?? null
   const effectiveBaseId = isGerenteGeral ? baseId : (userBaseId ?? baseId)
 
   return useQuery({
-    queryKey: ['colaboradores', effectiveBaseId],
-    enabled: !!effectiveBaseId,
-    queryFn: async () => {
+    queryKey: referenceKeys.colaboradores(effectiveBaseId),
+    enabled: !!effectiveBaseId && !!userId && (options.enabled ?? true),
+    staleTime: REFERENCE_STALE_TIME,
+    gcTime: REFERENCE_GC_TIME,
+    queryFn: async ({ signal }) => {
       if (!effectiveBaseId) return []
 
-      const { data, error } = await supabase
-        .from('colaboradores')
-        .select('*')
-        .eq('base_id', effectiveBaseId)
-        .order('nome', { ascending: true })
-
-      if (error) throw error
-      return (data || []) as Colaborador[]
+      return fetchReferenceData('colaboradores', `${userId}:colaboradores:${effectiveBaseId}`, async () => {
+        const { data, error } = await supabase
+          .from('colaboradores')
+          .select('*')
+          .eq('base_id', effectiveBaseId)
+          .order('nome', { ascending: true })
+          .abortSignal(signal)
+
+        if (error) throw error
+        return (data || []) as Colaborador[]
+      })
     },
   })
 }
@@ -49,9 +63,9 @@ export function useCreateColaborador() {
       if (error) throw error
       return data as Colaborador
     },
-    onSuccess: (_, variables) => {
-      // Invalidar query de colaboradores da base
-      queryClient.invalidateQueries({ queryKey: ['colaboradores', variables.base_id] })
+    onSuccess: () => {
+      // Invalidar colaboradores (a versão da tabela muda para todas as bases)
+      invalidateReferenceData(queryClient, 'colaboradores')
     },
   })
 }
@@ -68,12 +82,11 @@ export function useCreateColaboradoresBatch() {
       const { data, error } = await table.insert(colaboradores).select()
 
       if (error) throw error
-      // baseId usado no onSuccess
       return { data: (data || []) as Colaborador[], baseId }
     },
-    onSuccess: (result) => {
-      // Invalidar query de colaboradores da base
-      queryClient.invalidateQueries({ queryKey: ['colaboradores', result.baseId] })
+    onSuccess: () => {
+      // Invalidar colaboradores (a versão da tabela muda para todas as bases)
+      invalidateReferenceData(queryClient, 'colaboradores')
     },
   })
 }
@@ -92,9 +105,9 @@ export function useUpdateColaborador() {
       if (error) throw error
       return data as Colaborador
     },
-    onSuccess: (data) => {
-      // Invalidar query de colaboradores da base
-      queryClient.invalidateQueries({ queryKey: ['colaboradores', data.base_id] })
+    onSuccess: () => {
+      // Invalidar colaboradores (a versão da tabela muda para todas as bases)
+      invalidateReferenceData(queryClient, 'colaboradores')
     },
   })
 }
@@ -110,12 +123,11 @@ export function useDeleteColaborador() {
       const { error } = await (supabase.from('colaboradores') as any).delete().eq('id', id)
 
       if (error) throw error
-      // baseId usado no onSuccess
       return baseId
     },
-    onSuccess: (baseId) => {
-      // Invalidar query de colaboradores da base
-      queryClient.invalidateQueries({ queryKey: ['colaboradores', baseId] })
+    onSuccess: () => {
+      // Invalidar colaboradores (a versão da tabela muda para todas as bases)
+      invalidateReferenceData(queryClient, 'colaboradores')
     },
   })
 }
@@ -4,6 +4,8 @@ import { useAuth } from '@/contexts/AuthContext'
 import type { Database } from '@/lib/database.types'
 import { formatDateForStorage } from '@/lib/date-utils'
 import { sanitizeLancamentoConteudo } from '@/lib/sanitize-conteudo'
+import { comDuracoesNumericas } from '@/lib/lancamento-normalizado'
+import { marcarLancamentosDesatualizados } from '@/lib/lancamentos-sync'
 
 type LancamentoInsert = Database['public']['Tables']['lancamentos']['Insert']
 type LancamentoUpdate = Database['public']['Tables']['lancamentos']['Update']
@@ -97,7 +99,9 @@ export function useLancamento() {
         }
 
         const conteudoSanitizado = sanitizeLancamentoConteudo(conteudo) as Record<string, unknown>
-        const conteudoTyped = conteudoSanitizado as Database['public']['Tables']['lancamentos']['Row']['conteudo']
+        // Tempos também como inteiros (tempo_seg, total_dia_min...): agregações somam sem reparsear
+        const conteudoComDuracoes = comDuracoesNumericas(conteudoSanitizado)
+        const conteudoTyped = conteudoComDuracoes as Database['public']['Tables']['lancamentos']['Row']['conteudo']
         const autorNome = (authUser.profile.nome || '').trim() || 'Usuário'
         const table = supabase.from('lancamentos')
 
@@ -154,6 +158,7 @@ export function useLancamento() {
       )
     },
     onSuccess: () => {
+      marcarLancamentosDesatualizados()
       queryClient.invalidateQueries({ queryKey: ['lancamentos'] })
       queryClient.invalidateQueries({ queryKey: ['stats-mes-atual'] })
       queryClient.invalidateQueries({ queryKey: ['stats-mes-anterior'] })
@@ -1,12 +1,19 @@
-import { useQuery } from '@tanstack/react-query'
+import { useCallback, useEffect, useState } from 'react'
+import { useQueries, useQuery, useQueryClient, type QueryClient } from '@tanstack/react-query'
 import { supabase } from '@/lib/supabase'
+import { useAuth } from '@/contexts/AuthContext'
+import { compararLancamentosDesc, lerLancamentosLocais } from '@/lib/lancamentos-sync'
+import type { LancamentosFiltroChave } from '@/lib/lancamentos-cache-patch'
 import type { Database } from '@/lib/database.types'
 
 type Lancamento = Database['public']['Tables']['lancamentos']['Row']
 
-/** Lançamento com nome do usuário (join com profiles). */
+/**
+ * Lançamento como exibido no histórico. O autor vem de autor_nome (migration 036);
+ * profiles só existe em linhas antigas ainda em cache ou vindas de search_lancamentos.
+ */
 export type LancamentoWithUser = Lancamento & {
-  profiles: { nome: string } | null
+  profiles?: { nome: string } | null
 }
 
 interface UseLancamentosParams {
@@ -21,6 +28,25 @@ interface UseLancamentosParams {
   pageSize?: number
   // Busca por texto (busca em local, tipo de ocorrência etc. dentro do JSONB)
   searchText?: string
+  /**
+   * 'keyset': pagina por cursor em (data_referencia DESC, created_at DESC, id DESC) e usa total
+   * estimado em cache (custo constante por página). 'offset' (padrão): .range() + count exato.
+   */
+  pagination?: 'offset' | 'keyset'
+  /** Cursor do início da página (modo keyset). null/undefined = primeira página. */
+  cursor?: LancamentosCursor | null
+  /**
+   * Lê da cópia local sincronizada (lancamentos-sync) quando há base e o período está
+   * na janela local; a rede só traz o que mudou. Busca por texto sempre vai ao servidor.
+   */
+  localFirst?: boolean
+}
+
+/** Posição na ordenação do histórico: último registro da página anterior. */
+export interface LancamentosCursor {
+  data_referencia: string
+  created_at: string
+  id: string
 }
 
 interface UseLancamentosResult {
@@ -29,102 +55,103 @@ interface UseLancamentosResult {
   page: number
   pageSize: number
   totalPages: number
+  /** Modo keyset: cursor da próxima página (null na última). */
+  nextCursor?: LancamentosCursor | null
+  /** true quando total é estimativa do planner (modo keyset). */
+  totalEstimado?: boolean
+}
+
+/** Retorno da RPC search_lancamentos (rows já vêm com profiles.nome). */
+interface SearchLancamentosResult {
+  total?: number
+  rows?: LancamentoWithUser[]
 }
 
 const DEFAULT_PAGE_SIZE = 20
+/** Total estimado é reaproveitado entre páginas; invalidações de ['lancamentos'] o renovam. */
+const TOTAL_ESTIMADO_STALE_TIME = 60 * 1000
+
+/**
+ * Filtro "depois do cursor" na ordenação DESC:
+ * data < d OR (data = d AND created_at < c) OR (data = d AND created_at = c AND id < i).
+ */
+function keysetFilter(cursor: LancamentosCursor): string {
+  const d = `"${cursor.data_referencia}"`
+  const c = `"${cursor.created_at}"`
+  const i = `"${cursor.id}"`
+  return [
+    `data_referencia.lt.${d}`,
+    `and(data_referencia.eq.${d},created_at.lt.${c})`,
+    `and(data_referencia.eq.${d},created_at.eq.${c},id.lt.${i})`,
+  ].join(',')
+}
 
-export function useLancamentos({
-  baseId,
-  equipeId,
-  indicadorId,
-  dataInicio,
-  dataFim,
-  enabled = true,
-  page = 1,
-  pageSize = DEFAULT_PAGE_SIZE,
-  searchText,
-}: UseLancamentosParams = {}) {
-  return useQuery<UseLancamentosResult>({
+/** Página da lista local (já filtrada e ordenada como o histórico). Total é exato. */
+function paginarLocais(
+  lancamentos: Lancamento[],
+  page: number,
+  pageSize: number,
+  keyset: boolean,
+  cursor: LancamentosCursor | null | undefined
+): UseLancamentosResult {
+  const total = lancamentos.length
+  let inicio = (page - 1) * pageSize
+  if (keyset) {
+    // Primeiro registro depois do cursor na ordenação DESC
+    const idx = cursor ? lancamentos.findIndex((l) => compararLancamentosDesc(l, cursor) > 0) : 0
+    inicio = idx === -1 ? total : idx
+  }
+  const data: LancamentoWithUser[] = lancamentos
+    .slice(inicio, inicio + pageSize)
+    .map((l) => ({ ...l, profiles: null }))
+  const ultimo = data[data.length - 1]
+
+  return {
+    data,
+    total,
+    page,
+    pageSize,
+    totalPages: Math.ceil(total / pageSize),
+    nextCursor: !keyset
+      ? undefined
+      : inicio + pageSize < total && ultimo
+        ? { data_referencia: ultimo.data_referencia, created_at: ultimo.created_at, id: ultimo.id }
+        : null,
+  }
+}
+
+/** queryKey + queryFn de uma página (compartilhados por useLancamentos, useLancamentosInfinitos e prefetch). */
+function lancamentosQuery(
+  {
+    baseId,
+    equipeId,
+    indicadorId,
+    dataInicio,
+    dataFim,
+    page = 1,
+    pageSize = DEFAULT_PAGE_SIZE,
+    searchText,
+    pagination = 'offset',
+    cursor,
+    localFirst = false,
+  }: UseLancamentosParams,
+  queryClient: QueryClient,
+  userId: string | undefined
+) {
+  const keyset = pagination === 'keyset'
+  // Filtros num objeto na chave: o realtime os lê para atualizar o cache sem refetch (lancamentos-cache-patch)
+  const filtroChave: LancamentosFiltroChave = { baseId, equipeId, indicadorId, dataInicio, dataFim, searchText }
+
+  return {
     queryKey: [
       'lancamentos',
-      baseId,
-      equipeId,
-      indicadorId,
-      dataInicio,
-      dataFim,
+      filtroChave,
       page,
       pageSize,
-      searchText,
+      keyset ? cursor ?? null : undefined,
     ],
-    enabled,
-    placeholderData: (prev) => prev,
-    queryFn: async () => {
-      // Função auxiliar para busca no cliente (fallback)
-      const performClientSideSearch = async (
-        searchText: string,
-        page: number,
-        pageSize: number,
-        from: number,
-        to: number,
-        baseId?: string,
-        equipeId?: string,
-        indicadorId?: string,
-        dataInicio?: string,
-        dataFim?: string
-      ): Promise<UseLancamentosResult> => {
-        // Buscar TODOS os registros (sem paginação) para filtrar corretamente
-        // Otimização: buscar apenas colunas necessárias + nome do usuário
-        let allQuery = supabase
-          .from('lancamentos')
-          .select('id, data_referencia, base_id, equipe_id, indicador_id, conteudo, user_id, autor_nome, created_at, updated_at, profiles!lancamentos_user_id_fkey(nome)')
-          .order('data_referencia', { ascending: false })
-          .order('created_at', { ascending: false })
-        
-        // Aplicar os mesmos filtros (exceto paginação e busca)
-        if (baseId) allQuery = allQuery.eq('base_id', baseId)
-        if (equipeId) allQuery = allQuery.eq('equipe_id', equipeId)
-        if (indicadorId) allQuery = allQuery.eq('indicador_id', indicadorId)
-        if (dataInicio) allQuery = allQuery.gte('data_referencia', dataInicio)
-        if (dataFim) allQuery = allQuery.lte('data_referencia', dataFim)
-        
-        const { data: allData, error: allError } = await allQuery
-        
-        if (allError) throw allError
-        
-        const allLancamentos = (allData || []) as LancamentoWithUser[]
-        
-        // Filtrar por texto no cliente
-        const searchLower = searchText.toLowerCase()
-        const filtered = allLancamentos.filter((lancamento) => {
-          const conteudo = lancamento.conteudo as Record<string, any>
-          if (!conteudo) return false
-
-          // Buscar em campos comuns
-          const local = String(conteudo.local || '').toLowerCase()
-          const tipoOcorrencia = String(conteudo.tipo_ocorrencia || '').toLowerCase()
-          const tipoAtividade = String(conteudo.tipo_atividade || '').toLowerCase()
-
-          return (
-            local.includes(searchLower) ||
-            tipoOcorrencia.includes(searchLower) ||
-            tipoAtividade.includes(searchLower)
-          )
-        })
-        
-        const totalFiltered = filtered.length
-        // Aplicar paginação no resultado filtrado
-        const lancamentos = filtered.slice(from, to + 1)
-        const totalPages = Math.ceil(totalFiltered / pageSize)
-
-        return {
-          data: lancamentos,
-          total: totalFiltered,
-          page,
-          pageSize,
-          totalPages,
-        }
-      }
-
+    // signal do TanStack Query: troca de filtro/página cancela as requisições em andamento
+    queryFn: async ({ signal }: { signal: AbortSignal }): Promise<UseLancamentosResult> => {
       // Calcular range para paginação
       const from = (page - 1) * pageSize
       const to = from + pageSize - 1
@@ -134,140 +161,15 @@ export function useLancamentos({
         .from('lancamentos')
         .select('*', { count: 'exact', head: true })
 
-      // Query para buscar dados (com paginação) + nome do usuário
+      // Query para buscar dados (com paginação); autor em autor_nome, sem join com profiles
       let dataQuery = supabase
         .from('lancamentos')
-        .select('*, profiles!lancamentos_user_id_fkey(nome)')
+        .select('*')
         .order('data_referencia', { ascending: false })
         .order('created_at', { ascending: false })
         .range(from, to)
 
-      // Se há busca por texto, tentar usar função RPC para busca otimizada no servidor
-      // Se a função não existir (migration não aplicada), fazer fallback para busca no cliente
-      if (searchText && searchText.trim() && searchText.length >= 2) {
-        try {
-          // Tentar buscar IDs usando função PostgreSQL RPC
-          const { data: matchingIds, error: searchError } = await supabase.rpc(
-            'search_lancamentos_jsonb',
-            { search_term: searchText.trim() } as any
-          )
-
-          // Se a função não existe ou deu erro, fazer fallback para busca no cliente
-          if (searchError) {
-            console.warn('Função RPC não disponível, usando busca no cliente:', searchError.message)
-            // Fallback: buscar todos e filtrar no cliente (comportamento anterior)
-            return await performClientSideSearch(
-              searchText.trim(),
-              page,
-              pageSize,
-              from,
-              to,
-              baseId,
-              equipeId,
-              indicadorId,
-              dataInicio,
-              dataFim
-            )
-          }
-
-          const ids = ((matchingIds as any[]) || []).map((row: { lancamento_id: string }) => row.lancamento_id)
-
-          if (ids.length === 0) {
-            // Nenhum resultado encontrado
-            return {
-              data: [],
-              total: 0,
-              page,
-              pageSize,
-              totalPages: 0,
-            }
-          }
-
-          // Construir query com filtros + IDs da busca
-          // Otimização: buscar apenas colunas necessárias + nome do usuário
-          let filteredQuery = supabase
-            .from('lancamentos')
-            .select('id, data_referencia, base_id, equipe_id, indicador_id, conteudo, user_id, autor_nome, created_at, updated_at, profiles!lancamentos_user_id_fkey(nome)', { count: 'exact' })
-            .in('id', ids)
-            .order('data_referencia', { ascending: false })
-            .order('created_at', { ascending: false })
-
-          // Aplicar outros filtros
-          if (baseId) {
-            filteredQuery = filteredQuery.eq('base_id', baseId)
-          }
-          if (equipeId) {
-            filteredQuery = filteredQuery.eq('equipe_id', equipeId)
-          }
-          if (indicadorId) {
-            filteredQuery = filteredQuery.eq('indicador_id', indicadorId)
-          }
-          if (dataInicio) {
-            filteredQuery = filteredQuery.gte('data_referencia', dataInicio)
-          }
-          if (dataFim) {
-            filteredQuery = filteredQuery.lte('data_referencia', dataFim)
-          }
-
-          // Contar total com filtros aplicados
-          const countResult = await filteredQuery
-
-          if (countResult.error) throw countResult.error
-
-          const total = countResult.count || 0
-
-          // Buscar dados com paginação
-          // Otimização: buscar apenas colunas necessárias + nome do usuário
-          let dataQuery = supabase
-            .from('lancamentos')
-            .select('id, data_referencia, base_id, equipe_id, indicador_id, conteudo, user_id, autor_nome, created_at, updated_at, profiles!lancamentos_user_id_fkey(nome)')
-            .in('id', ids)
-            .order('data_referencia', { ascending: false })
-            .order('created_at', { ascending: false })
-            .range(from, to)
-
-          // Aplicar mesmos filtros
-          if (baseId) dataQuery = dataQuery.eq('base_id', baseId)
-          if (equipeId) dataQuery = dataQuery.eq('equipe_id', equipeId)
-          if (indicadorId) dataQuery = dataQuery.eq('indicador_id', indicadorId)
-          if (dataInicio) dataQuery = dataQuery.gte('data_referencia', dataInicio)
-          if (dataFim) dataQuery = dataQuery.lte('data_referencia', dataFim)
-
-          const dataResult = await dataQuery
-
-          if (dataResult.error) throw dataResult.error
-
-          const lancamentos = (dataResult.data || []) as LancamentoWithUser[]
-          const totalPages = Math.ceil(total / pageSize)
-
-          return {
-            data: lancamentos,
-            total,
-            page,
-            pageSize,
-            totalPages,
-          }
-        } catch (error) {
-          // Se der qualquer erro na busca RPC, fazer fallback
-          console.warn('Erro na busca RPC, usando fallback:', error)
-          const trimmedSearch = searchText?.trim() || ''
-          return await performClientSideSearch(
-            trimmedSearch,
-            page,
-            pageSize,
-            from,
-            to,
-            baseId,
-            equipeId,
-            indicadorId,
-            dataInicio,
-            dataFim
-          )
-        }
-      }
-
-      // Sem busca por texto - usar query normal otimizada
-      // Aplicar filtros em ambas as queries
+      // Filtros comuns (listagem, contagem e total estimado)
       const applyFilters = (query: any) => {
         if (baseId) {
           query = query.eq('base_id', baseId)
@@ -287,8 +189,101 @@ export function useLancamentos({
         return query
       }
 
-      countQuery = applyFilters(countQuery)
-      dataQuery = applyFilters(dataQuery)
+      const termoBusca = searchText?.trim() ?? ''
+      const buscaTexto = termoBusca.length >= 2
+
+      // Cópia local: sincroniza em segundo plano e refaz as queries se algo mudou
+      if (localFirst && baseId && userId && !buscaTexto) {
+        const locais = await lerLancamentosLocais(
+          userId,
+          baseId,
+          { equipeId, indicadorId, dataInicio, dataFim },
+          () => queryClient.invalidateQueries({ queryKey: ['lancamentos'] })
+        )
+        if (locais) return paginarLocais(locais, page, pageSize, keyset, cursor)
+      }
+
+      // Busca por texto: filtros, paginação e total resolvidos no servidor (search_lancamentos, migration 039)
+      if (buscaTexto) {
+        const { data: result, error: searchError } = await supabase.rpc('search_lancamentos', {
+          p_search: termoBusca,
+          p_base_id: baseId || null,
+          p_equipe_id: equipeId || null,
+          p_indicador_id: indicadorId || null,
+          p_data_inicio: dataInicio || null,
+          p_data_fim: dataFim || null,
+          p_limit: pageSize,
+          p_offset: from,
+        }).abortSignal(signal)
+
+        if (searchError) throw searchError
+
+        const { total = 0, rows = [] } = (result ?? {}) as unknown as SearchLancamentosResult
+
+        return {
+          data: rows,
+          total,
+          page,
+          pageSize,
+          totalPages: Math.ceil(total / pageSize),
+        }
+      }
+
+      // Modo keyset: página seguinte ao cursor (pageSize + 1 para saber se há próxima) + total estimado em cache
+      if (keyset) {
+        let keysetQuery = applyFilters(
+          supabase.from('lancamentos').select('*')
+        )
+          .order('data_referencia', { ascending: false })
+          .order('created_at', { ascending: false })
+          .order('id', { ascending: false })
+          .limit(pageSize + 1)
+        if (cursor) keysetQuery = keysetQuery.or(keysetFilter(cursor))
+        keysetQuery = keysetQuery.abortSignal(signal)
+
+        const [total, dataResult] = await Promise.all([
+          queryClient.fetchQuery({
+            queryKey: ['lancamentos', 'total-estimado', baseId, equipeId, indicadorId, dataInicio, dataFim],
+            // Total compartilhado entre as páginas: cancelado só pelo próprio signal
+            queryFn: async ({ signal: signalTotal }) => {
+              const { count, error } = await applyFilters(
+                supabase.from('lancamentos').select('id', { count: 'estimated', head: true })
+              ).abortSignal(signalTotal)
+              if (error) throw error
+              return (count as number | null) ?? 0
+            },
+            staleTime: TOTAL_ESTIMADO_STALE_TIME,
+          }),
+          keysetQuery,
+        ])
+
+        if (dataResult.error) throw dataResult.error
+
+        const rows = (dataResult.data || []) as LancamentoWithUser[]
+        const lancamentos = rows.slice(0, pageSize)
+        const ultimo = lancamentos[lancamentos.length - 1]
+        const nextCursor =
+          rows.length > pageSize && ultimo
+            ? { data_referencia: ultimo.data_referencia, created_at: ultimo.created_at, id: ultimo.id }
+            : null
+        // Na última página o total é conhecido; antes dela a estimativa nunca fica abaixo do já percorrido
+        const totalAjustado = nextCursor
+          ? Math.max(total, from + lancamentos.length + 1)
+          : from + lancamentos.length
+
+        return {
+          data: lancamentos,
+          total: totalAjustado,
+          page,
+          pageSize,
+          totalPages: Math.ceil(totalAjustado / pageSize),
+          nextCursor,
+          totalEstimado: true,
+        }
+      }
+
+      countQuery = applyFilters(countQuery).abortSignal(signal)
+      dataQuery = applyFilters(dataQuery).abortSignal(signal)
 
       // Executar queries
       const [countResult, dataResult] = await Promise.all([
@@ -311,5 +306,136 @@ export function useLancamentos({
         totalPages,
       }
     },
+  }
+}
+
+export function useLancamentos(params: UseLancamentosParams = {}) {
+  const queryClient = useQueryClient()
+  const { authUser } = useAuth()
+
+  return useQuery<UseLancamentosResult>({
+    ...lancamentosQuery(params, queryClient, authUser?.user?.id),
+    enabled: params.enabled ?? true,
+    placeholderData: (prev) => prev,
   })
 }
+
+type UseLancamentosInfinitosParams = Omit<UseLancamentosParams, 'page' | 'pagination' | 'cursor'>
+
+function mesmoCursor(a: LancamentosCursor | null | undefined, b: LancamentosCursor | null | undefined) {
+  if (!a || !b) return a === b
+  return a.id === b.id && a.data_referencia === b.data_referencia && a.created_at === b.created_at
+}
+
+/**
+ * Histórico em rolagem contínua: páginas keyset encadeadas pelo nextCursor, cada uma
+ * com a mesma queryKey de useLancamentos (o realtime atualiza cada página em cache).
+ * carregarMais() acrescenta a próxima página, que já é pré-buscada assim que a última chega.
+ * Busca por texto pagina por offset e não é suportada aqui.
+ */
+export function useLancamentosInfinitos({
+  baseId,
+  equipeId,
+  indicadorId,
+  dataInicio,
+  dataFim,
+  enabled = true,
+  pageSize = DEFAULT_PAGE_SIZE,
+  localFirst = false,
+}: UseLancamentosInfinitosParams = {}) {
+  const queryClient = useQueryClient()
+  const { authUser } = useAuth()
+  const userId = authUser?.user?.id
+  const filtros = JSON.stringify([baseId, equipeId, indicadorId, dataInicio, dataFim, pageSize, localFirst])
+
+  // Cursor de início de cada página carregada; filtros diferentes recomeçam da primeira
+  const [estado, setEstado] = useState<{ filtros: string; cursors: (LancamentosCursor | null)[] }>({
+    filtros,
+    cursors: [null],
+  })
+  const cursors = estado.filtros === filtros ? estado.cursors : [null]
+
+  const paginaQuery = useCallback(
+    (cursor: LancamentosCursor | null, indice: number) =>
+      lancamentosQuery(
+        {
+          baseId,
+          equipeId,
+          indicadorId,
+          dataInicio,
+          dataFim,
+          page: indice + 1,
+          pageSize,
+          pagination: 'keyset',
+          cursor,
+          localFirst,
+        },
+        queryClient,
+        userId
+      ),
+    [baseId, equipeId, indicadorId, dataInicio, dataFim, pageSize, localFirst, queryClient, userId]
+  )
+
+  const resultados = useQueries({
+    queries: cursors.map((cursor, i) => ({
+      ...paginaQuery(cursor, i),
+      enabled,
+      // Troca de filtro mantém a lista anterior até a nova primeira página chegar
+      placeholderData: i === 0 ? (prev: UseLancamentosResult | undefined) => prev : undefined,
+    })),
+  })
+
+  // Página refeita (inserção/exclusão) pode terminar em outro registro: o encadeamento quebra ali
+  let quebraEm = -1
+  for (let i = 1; i < cursors.length; i++) {
+    const anterior = resultados[i - 1].data
+    if (anterior && !mesmoCursor(anterior.nextCursor, cursors[i])) {
+      quebraEm = i
+      break
+    }
+  }
+  const cursorQuebra = quebraEm > 0 ? resultados[quebraEm - 1].data?.nextCursor ?? null : null
+
+  useEffect(() => {
+    if (quebraEm === -1) return
+    setEstado((prev) => {
+      const atuais = prev.filtros === filtros ? prev.cursors : [null]
+      return { filtros, cursors: [...atuais.slice(0, quebraEm), ...(cursorQuebra ? [cursorQuebra] : [])] }
+    })
+  }, [quebraEm, cursorQuebra, filtros])
+
+  // Linhas das páginas consecutivas já carregadas
+  const paginas = quebraEm === -1 ? resultados : resultados.slice(0, quebraEm)
+  const carregadas = paginas.findIndex((r) => !r.data)
+  const prontas = carregadas === -1 ? paginas : paginas.slice(0, carregadas)
+  const data = prontas.flatMap((r) => r.data?.data ?? [])
+  const ultima = prontas[prontas.length - 1]?.data
+  const proximoCursor = carregadas === -1 && quebraEm === -1 ? ultima?.nextCursor ?? null : null
+
+  const carregarMais = useCallback(() => {
+    if (!proximoCursor) return
+    setEstado((prev) => {
+      const atuais = prev.filtros === filtros ? prev.cursors : [null]
+      if (atuais.some((c) => mesmoCursor(c, proximoCursor))) return prev
+      return { filtros, cursors: [...atuais, proximoCursor] }
+    })
+  }, [proximoCursor, filtros])
+
+  // Pré-busca da próxima página: ao rolar até o fim, ela já está em cache
+  const proximoIndice = cursors.length
+  useEffect(() => {
+    if (!enabled || !proximoCursor) return
+    void queryClient.prefetchQuery(paginaQuery(proximoCursor, proximoIndice))
+  }, [enabled, proximoCursor, proximoIndice, paginaQuery, queryClient])
+
+  return {
+    data,
+    total: ultima?.total ?? 0,
+    totalEstimado: ultima?.totalEstimado ?? false,
+    isLoading: resultados[0]?.isLoading ?? false,
+    isFetchingMore: resultados.length > 1 && resultados.some((r, i) => i > 0 && !r.data && r.isFetching),
+    error: resultados.find((r) => r.error)?.error ?? null,
+    temMais: !!proximoCursor,
+    carregarMais,
+  }
+}
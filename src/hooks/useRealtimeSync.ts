@@ -1,37 +1,156 @@
 import { useEffect } from 'react'
 import { useQueryClient } from '@tanstack/react-query'
 import { supabase, isSupabaseHttpProxyBase } from '@/lib/supabase'
+import { useAuth } from '@/contexts/AuthContext'
+import { aplicarAlteracoesLocais, marcarLancamentosDesatualizados } from '@/lib/lancamentos-sync'
+import { aplicarAlteracoesNoCache, consolidarEventos, type EventoLancamento } from '@/lib/lancamentos-cache-patch'
+import type { Database } from '@/lib/database.types'
+
+type Lancamento = Database['public']['Tables']['lancamentos']['Row']
+type EventoEnxuto = Database['public']['Tables']['lancamentos_eventos']['Row']
+
+// Janela de agrupamento: rajadas de eventos (importação, exclusão em lote) viram uma atualização
+const JANELA_EVENTOS_MS = 250
+// Ids por requisição ao buscar as linhas alteradas (limite de tamanho da URL)
+const LOTE_IDS = 100
 
 /**
- * Hook que se inscreve nas mudanças da tabela lancamentos (INSERT, UPDATE, DELETE)
- * e invalida as queries do TanStack Query para que todos os dashboards analíticos
- * sejam atualizados automaticamente sem piscar (use placeholderData: keepPreviousData nas queries).
+ * Converte eventos enxutos (migration 048) em eventos com a linha completa:
+ * busca em lote, por id, as linhas inseridas/alteradas. Linha que não volta
+ * (excluída nesse meio tempo ou fora do RLS) é tratada como exclusão.
+ */
+async function carregarEventos(enxutos: EventoEnxuto[]): Promise<EventoLancamento[]> {
+  const primeiraOperacao = new Map<string, EventoEnxuto['operacao']>()
+  const ultimo = new Map<string, EventoEnxuto>()
+  for (const e of enxutos) {
+    if (!primeiraOperacao.has(e.lancamento_id)) primeiraOperacao.set(e.lancamento_id, e.operacao)
+    // Reinsere para manter a ordem do último evento de cada id
+    ultimo.delete(e.lancamento_id)
+    ultimo.set(e.lancamento_id, e)
+  }
+
+  const gravados = [...ultimo.values()].filter((e) => e.operacao !== 'DELETE')
+  const linhas = new Map<string, Lancamento>()
+  for (let i = 0; i < gravados.length; i += LOTE_IDS) {
+    const lote = gravados.slice(i, i + LOTE_IDS)
+    const { data, error } = await supabase
+      .from('lancamentos')
+      .select('*')
+      .in('id', lote.map((e) => e.lancamento_id))
+      // Poda de partições (migration 041)
+      .in('data_referencia', [...new Set(lote.map((e) => e.data_referencia))])
+    if (error) throw error
+    for (const linha of (data || []) as Lancamento[]) linhas.set(linha.id, linha)
+  }
+
+  return [...ultimo.values()].map((e): EventoLancamento => {
+    const linha = e.operacao === 'DELETE' ? undefined : linhas.get(e.lancamento_id)
+    if (!linha) {
+      return { eventType: 'DELETE', new: {}, old: { id: e.lancamento_id, data_referencia: e.data_referencia } }
+    }
+    return {
+      eventType: primeiraOperacao.get(e.lancamento_id) === 'INSERT' ? 'INSERT' : 'UPDATE',
+      new: linha,
+      old: {},
+    }
+  })
+}
+
+/**
+ * Hook que se inscreve nos eventos enxutos de lancamentos (migration 048: ids,
+ * chaves e updated_at, sem conteudo), filtrados no servidor pela base do usuário
+ * (geral: todas as bases; o RLS de lancamentos_eventos vale para os demais).
+ * As linhas alteradas são buscadas em lote e aplicadas direto nos resultados em
+ * cache (lancamentos-cache-patch), conferindo base, equipe, indicador e período
+ * de cada query. Eventos são agrupados em janelas de JANELA_EVENTOS_MS e os lotes
+ * são aplicados em série, na ordem das janelas; se o lote não puder ser aplicado
+ * localmente, volta à invalidação das queries.
  * A inscrição é limpa no unmount para evitar vazamento de memória.
  */
 export function useRealtimeSync() {
   const queryClient = useQueryClient()
+  const { authUser } = useAuth()
+  const role = authUser?.profile?.role
+  const baseId = authUser?.profile?.base_id ?? null
 
   useEffect(() => {
-    if (isSupabaseHttpProxyBase) return
+    if (isSupabaseHttpProxyBase || !role) return
+    const todasAsBases = role === 'geral'
+    if (!todasAsBases && !baseId) return
+
+    let pendentes: EventoEnxuto[] = []
+    let timer: ReturnType<typeof setTimeout> | null = null
+    let ativo = true
+
+    const invalidarTudo = () => {
+      // Cópia local (IndexedDB) sincroniza antes da próxima leitura
+      marcarLancamentosDesatualizados()
+      queryClient.invalidateQueries({ queryKey: ['lancamentos'] })
+      queryClient.invalidateQueries({ queryKey: ['lancamentos-todos'] })
+      queryClient.invalidateQueries({ queryKey: ['analytics-rpc'] })
+      queryClient.invalidateQueries({ queryKey: ['analytics-resumo-executivo'] })
+    }
+
+    // Lotes são processados um de cada vez, na ordem das janelas: um lote
+    // antigo que termine depois não pode sobrescrever dados mais novos
+    let fila: Promise<void> = Promise.resolve()
+
+    const processar = async (enxutos: EventoEnxuto[]) => {
+      if (!ativo) return
+
+      let eventos: EventoLancamento[]
+      try {
+        eventos = await carregarEventos(enxutos)
+      } catch (error) {
+        console.warn('Falha ao buscar lançamentos alterados, invalidando o cache:', error)
+        if (ativo) invalidarTudo()
+        return
+      }
+      if (!ativo) return
+
+      const alteracoes = consolidarEventos(eventos)
+      if (!alteracoes) {
+        invalidarTudo()
+        return
+      }
+
+      aplicarAlteracoesNoCache(queryClient, alteracoes)
+      try {
+        await aplicarAlteracoesLocais([...alteracoes.gravados.values()], [...alteracoes.excluidos.keys()])
+      } catch (error) {
+        console.warn('Falha ao aplicar eventos na cópia local de lançamentos:', error)
+        marcarLancamentosDesatualizados()
+      }
+    }
+
+    const fecharJanela = () => {
+      timer = null
+      const enxutos = pendentes
+      pendentes = []
+      fila = fila.then(() => processar(enxutos))
+    }
 
     const channel = supabase
-      .channel('lancamentos-changes')
+      .channel(`lancamentos-eventos:${todasAsBases ? 'todas' : baseId}`)
       .on(
         'postgres_changes',
         {
-          event: '*',
+          event: 'INSERT',
           schema: 'public',
-          table: 'lancamentos',
+          table: 'lancamentos_eventos',
+          ...(todasAsBases ? {} : { filter: `base_id=eq.${baseId}` }),
         },
-        () => {
-          queryClient.invalidateQueries({ queryKey: ['lancamentos'] })
-          queryClient.invalidateQueries({ queryKey: ['lancamentos-todos'] })
+        (payload) => {
+          pendentes.push(payload.new as EventoEnxuto)
+          if (!timer) timer = setTimeout(fecharJanela, JANELA_EVENTOS_MS)
         }
       )
       .subscribe()
 
     return () => {
+      ativo = false
+      if (timer) clearTimeout(timer)
       supabase.removeChannel(channel)
     }
-  }, [queryClient])
+  }, [queryClient, role, baseId])
 }
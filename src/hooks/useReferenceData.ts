@@ -0,0 +1,98 @@
+import { useEffect } from 'react'
+import { useQuery, useQueryClient } from '@tanstack/react-query'
+import { supabase } from '@/lib/supabase'
+import { useAuth } from '@/contexts/AuthContext'
+import {
+  fetchReferenceData,
+  referenceKeys,
+  revalidateReferenceData,
+  REFERENCE_GC_TIME,
+  REFERENCE_STALE_TIME,
+} from '@/lib/reference-data'
+import type { Database } from '@/lib/database.types'
+
+type Base = Database['public']['Tables']['bases']['Row']
+type Equipe = Database['public']['Tables']['equipes']['Row']
+type IndicadorConfig = Database['public']['Tables']['indicadores_config']['Row']
+
+/**
+ * Hooks dos dados de referência (ver src/lib/reference-data.ts).
+ * Todas as páginas leem bases, equipes e indicadores por aqui: mesma chave,
+ * mesma forma (linha completa, ordenada por nome) e cópia persistida no IndexedDB.
+ */
+
+function useReferenceScope() {
+  const { authUser } = useAuth()
+  return authUser?.user?.id ?? null
+}
+
+export function useBases() {
+  const userId = useReferenceScope()
+
+  return useQuery<Base[]>({
+    queryKey: referenceKeys.bases,
+    enabled: !!userId,
+    staleTime: REFERENCE_STALE_TIME,
+    gcTime: REFERENCE_GC_TIME,
+    queryFn: ({ signal }) =>
+      fetchReferenceData('bases', `${userId}:bases`, async () => {
+        const { data, error } = await supabase.from('bases').select('*').order('nome').abortSignal(signal)
+        if (error) throw error
+        return (data || []) as Base[]
+      }),
+  })
+}
+
+export function useEquipes() {
+  const userId = useReferenceScope()
+
+  return useQuery<Equipe[]>({
+    queryKey: referenceKeys.equipes,
+    enabled: !!userId,
+    staleTime: REFERENCE_STALE_TIME,
+    gcTime: REFERENCE_GC_TIME,
+    queryFn: ({ signal }) =>
+      fetchReferenceData('equipes', `${userId}:equipes`, async () => {
+        const { data, error } = await supabase.from('equipes').select('*').order('nome').abortSignal(signal)
+        if (error) throw error
+        return (data || []) as Equipe[]
+      }),
+  })
+}
+
+export function useIndicadoresConfig() {
+  const userId = useReferenceScope()
+
+  return useQuery<IndicadorConfig[]>({
+    queryKey: referenceKeys.indicadoresConfig,
+    enabled: !!userId,
+    staleTime: REFERENCE_STALE_TIME,
+    gcTime: REFERENCE_GC_TIME,
+    queryFn: ({ signal }) =>
+      fetchReferenceData('indicadores_config', `${userId}:indicadores_config`, async () => {
+        const { data, error } = await supabase.from('indicadores_config').select('*').order('nome').abortSignal(signal)
+        if (error) throw error
+        return (data || []) as IndicadorConfig[]
+      }),
+  })
+}
+
+/**
+ * Confere as versões dos dados de referência quando a aba volta ao foco
+ * (no máximo uma vez a cada 5 minutos). Montado uma vez no App.
+ */
+export function useReferenceDataRevalidation() {
+  const queryClient = useQueryClient()
+
+  useEffect(() => {
+    const revalidar = () => {
+      if (document.visibilityState === 'visible') void revalidateReferenceData(queryClient)
+    }
+    window.addEventListener('focus', revalidar)
+    document.addEventListener('visibilitychange', revalidar)
+    return () => {
+      window.removeEventListener('focus', revalidar)
+      document.removeEventListener('visibilitychange', revalidar)
+    }
+  }, [queryClient])
+}
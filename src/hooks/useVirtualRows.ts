@@ -0,0 +1,125 @@
+import { useCallback, useEffect, useMemo, useRef, useState } from 'react'
+
+interface UseVirtualRowsParams {
+  /** Id de cada linha, na ordem da lista: as alturas medidas seguem a linha, não a posição */
+  ids: string[]
+  /** Altura estimada de cada linha (px), usada até a linha ser medida */
+  alturaLinha: number
+  /** Linhas extras renderizadas antes e depois da área visível */
+  margem?: number
+}
+
+/** Primeiro índice i com posicoes[i + 1] > y (linha que contém y) */
+function linhaEm(posicoes: number[], y: number) {
+  let baixo = 0
+  let alto = posicoes.length - 1
+  while (baixo < alto) {
+    const meio = (baixo + alto) >> 1
+    if (posicoes[meio + 1] > y) alto = meio
+    else baixo = meio + 1
+  }
+  return baixo
+}
+
+/**
+ * Janela de linhas visíveis de uma lista dentro de um contêiner com rolagem
+ * própria. Só [inicio, fim) é renderizado; espacoAntes e espacoDepois (px)
+ * preservam a altura total e a barra de rolagem.
+ * Passe containerRef como ref do elemento com overflow-y-auto e medirLinha como
+ * ref de cada linha renderizada, com data-linha-id={id da linha}: a altura real
+ * (bordas, texto quebrado) substitui a estimada, sem deslocar a janela. Como a
+ * medida é guardada por id, trocar o filtro ou inserir linhas no topo não
+ * atribui a altura de uma linha a outra.
+ */
+export function useVirtualRows({ ids, alturaLinha, margem = 10 }: UseVirtualRowsParams) {
+  const total = ids.length
+  const [container, setContainer] = useState<HTMLElement | null>(null)
+  const [janela, setJanela] = useState({ scrollTop: 0, altura: 0 })
+  // Alturas medidas por id da linha; versaoAlturas refaz as posições quando alguma muda
+  const alturasRef = useRef(new Map<string, number>())
+  const [versaoAlturas, setVersaoAlturas] = useState(0)
+  const linhasObserverRef = useRef<ResizeObserver | null>(null)
+
+  useEffect(() => {
+    if (!container) return
+    let frame = 0
+    const medir = () => {
+      frame = 0
+      setJanela({ scrollTop: container.scrollTop, altura: container.clientHeight })
+    }
+    // No máximo uma medição por frame durante a rolagem
+    const agendar = () => {
+      if (!frame) frame = requestAnimationFrame(medir)
+    }
+    medir()
+    container.addEventListener('scroll', agendar, { passive: true })
+    const observer = new ResizeObserver(agendar)
+    observer.observe(container)
+    return () => {
+      container.removeEventListener('scroll', agendar)
+      observer.disconnect()
+      if (frame) cancelAnimationFrame(frame)
+    }
+  }, [container])
+
+  useEffect(() => {
+    return () => {
+      linhasObserverRef.current?.disconnect()
+      linhasObserverRef.current = null
+    }
+  }, [])
+
+  const medirLinha = useCallback((elemento: HTMLElement | null) => {
+    if (!elemento) return
+    if (!linhasObserverRef.current) {
+      linhasObserverRef.current = new ResizeObserver((entradas) => {
+        let mudou = false
+        for (const entrada of entradas) {
+          const alvo = entrada.target as HTMLElement
+          // Linha que saiu da janela: mantém a última medida
+          if (!alvo.isConnected) {
+            linhasObserverRef.current?.unobserve(alvo)
+            continue
+          }
+          const id = alvo.dataset.linhaId
+          if (!id) continue
+          const altura = alvo.getBoundingClientRect().height
+          if (altura > 0 && Math.abs((alturasRef.current.get(id) ?? -1) - altura) > 0.5) {
+            alturasRef.current.set(id, altura)
+            mudou = true
+          }
+        }
+        if (mudou) setVersaoAlturas((v) => v + 1)
+      })
+    }
+    linhasObserverRef.current.observe(elemento)
+  }, [])
+
+  // posicoes[i] = topo da linha i; posicoes[total] = altura total
+  const posicoes = useMemo(() => {
+    const alturas = alturasRef.current
+    // Descarta medidas de linhas que saíram da lista (só quando sobram mais medidas que linhas)
+    if (alturas.size > total) {
+      const presentes = new Set(ids)
+      for (const id of alturas.keys()) if (!presentes.has(id)) alturas.delete(id)
+    }
+    const resultado = new Array<number>(total + 1)
+    resultado[0] = 0
+    for (let i = 0; i < total; i++) resultado[i + 1] = resultado[i] + (alturas.get(ids[i]) ?? alturaLinha)
+    return resultado
+    // versaoAlturas: alturasRef mudou
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [ids, alturaLinha, versaoAlturas])
+
+  const inicio = total === 0 ? 0 : Math.max(0, linhaEm(posicoes, janela.scrollTop) - margem)
+  const fim = total === 0 ? 0 : Math.min(total, linhaEm(posicoes, janela.scrollTop + janela.altura) + 1 + margem)
+
+  return {
+    containerRef: setContainer,
+    medirLinha,
+    inicio,
+    fim,
+    espacoAntes: posicoes[inicio],
+    espacoDepois: posicoes[total] - posicoes[fim],
+  }
+}
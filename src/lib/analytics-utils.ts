@@ -1,6 +1,15 @@
 import { format, parse } from 'date-fns'
 import { timeToMinutes, minutesToTime, calculateTimeDifference } from './masks'
 import { calculateTAFStatus } from './calculations'
+import {
+  normalizarLancamento,
+  mmssParaSegundos,
+  intervaloSegundos,
+  segundosTotalDia,
+  mesDe,
+  type DuracoesSegundos,
+  type ListaConteudo,
+} from './lancamento-normalizado'
 import type { Database } from './database.types'
 
 type Lancamento = Database['public']['Tables']['lancamentos']['Row']
@@ -19,35 +28,14 @@ type Lancamento = Database['public']['Tables']['lancamentos']['Row']
 export function filterByColaborador(lancamentos: Lancamento[], colaboradorNome: string): Lancamento[] {
   if (!colaboradorNome) return lancamentos
 
-  const filtered: Lancamento[] = []
-  
-  lancamentos.forEach((lancamento) => {
-    const conteudo = lancamento.conteudo as Record<string, unknown>
-    let hasMatch = false
-    
-    // Arrays comuns: avaliados, participantes, afericoes, colaboradores
-    const arrayKeys = ['avaliados', 'participantes', 'afericoes', 'colaboradores']
-    
-    arrayKeys.forEach((key) => {
-      if (Array.isArray(conteudo[key])) {
-        const array = conteudo[key] as Array<Record<string, unknown>>
-        const hasColaborador = array.some((item) => {
-          const nome = item.nome || item.motorista
-          return nome && String(nome).toLowerCase().includes(colaboradorNome.toLowerCase())
-        })
-        if (hasColaborador) {
-          hasMatch = true
-        }
-      }
-    })
-    
-    // Se encontrou match, incluir o lançamento
-    if (hasMatch) {
-      filtered.push(lancamento)
-    }
+  const busca = colaboradorNome.toLowerCase()
+  // Arrays comuns: avaliados, participantes, afericoes, colaboradores
+  const arrayKeys: ListaConteudo[] = ['avaliados', 'participantes', 'afericoes', 'colaboradores']
+
+  return lancamentos.filter((lancamento) => {
+    const { listas } = normalizarLancamento(lancamento)
+    return arrayKeys.some((key) => listas[key]?.some((item) => item.nomeBusca && item.nomeBusca.includes(busca)))
   })
-  
-  return filtered
 }
 
 /**
@@ -57,17 +45,13 @@ export function groupByMonth(lancamentos: Lancamento[]): Map<string, Lancamento[
   const grouped = new Map<string, Lancamento[]>()
   
   lancamentos.forEach((lancamento) => {
-    try {
-      const date = parse(lancamento.data_referencia, 'yyyy-MM-dd', new Date())
-      const monthKey = format(date, 'yyyy-MM')
-      
-      if (!grouped.has(monthKey)) {
-        grouped.set(monthKey, [])
-      }
-      grouped.get(monthKey)!.push(lancamento)
-    } catch {
-      // Ignora datas inválidas
+    const monthKey = normalizarLancamento(lancamento).mes
+    if (!monthKey) return // Ignora datas inválidas
+
+    if (!grouped.has(monthKey)) {
+      grouped.set(monthKey, [])
     }
+    grouped.get(monthKey)!.push(lancamento)
   })
   
   return grouped
@@ -109,6 +93,44 @@ export function groupByBase(lancamentos: Lancamento[], basesMap: Map<string, str
   return grouped
 }
 
+/**
+ * Mapa indicador_id → schema_type (montado uma vez; evita indicadoresConfig.find por linha)
+ */
+export function indexSchemaTypes(indicadoresConfig: Array<{ id: string; schema_type: string }>): Map<string, string> {
+  const schemaPorIndicador = new Map<string, string>()
+  indicadoresConfig.forEach((indicador) => {
+    schemaPorIndicador.set(indicador.id, indicador.schema_type)
+  })
+  return schemaPorIndicador
+}
+
+/**
+ * Separa lançamentos por schema_type em uma única passada.
+ * Os process* recebem o balde do seu tipo: buckets.get('estoque') ?? []
+ * Usa lancamentos.schema_type (migration 050) e, sem ele (select parcial, cópia
+ * local antiga), o mapa do indicador. Lançamentos de indicador desconhecido ficam de fora.
+ */
+export function partitionBySchemaType(
+  lancamentos: Lancamento[],
+  indicadoresConfig: Array<{ id: string; schema_type: string }> | Map<string, string>
+): Map<string, Lancamento[]> {
+  const schemaPorIndicador = indicadoresConfig instanceof Map ? indicadoresConfig : indexSchemaTypes(indicadoresConfig)
+  const buckets = new Map<string, Lancamento[]>()
+
+  lancamentos.forEach((lancamento) => {
+    const schemaType = lancamento.schema_type || schemaPorIndicador.get(lancamento.indicador_id)
+    if (!schemaType) return
+    const bucket = buckets.get(schemaType)
+    if (bucket) {
+      bucket.push(lancamento)
+    } else {
+      buckets.set(schemaType, [lancamento])
+    }
+  })
+
+  return buckets
+}
+
 // ============================================
 // PROCESSAMENTO ESPECÍFICO POR INDICADOR
 // ============================================
@@ -130,17 +152,17 @@ export function processOcorrenciaAeronautica(lancamentos: Lancamento[]) {
     },
   }))
 
+  const normalizados = lancamentos.map((l) => normalizarLancamento(l))
+
   // KPIs
   const totalOcorrencias = items.length
 
   // Performance de Resposta (1º CCI) - valor referência do campo tempo_chegada_1_cci
   const tempos1CCI: number[] = []
-  items.forEach((item) => {
-    if (item.conteudo.tempo_chegada_1_cci) {
-      const tempo = parseTimeMMSS(item.conteudo.tempo_chegada_1_cci)
-      if (tempo > 0) {
-        tempos1CCI.push(tempo)
-      }
+  normalizados.forEach(({ segundos }) => {
+    const tempo = segundos.tempo_chegada_1_cci ?? 0
+    if (tempo > 0) {
+      tempos1CCI.push(tempo)
     }
   })
   const tempoMedioResposta1CCI = tempos1CCI.length > 0
@@ -178,22 +200,14 @@ export function processOcorrenciaAeronautica(lancamentos: Lancamento[]) {
 
   // Gráfico 2: Agilidade da Equipe (Line Chart) - Performance de Resposta por Mês
   const tempoRespostaPorMes = new Map<string, { total: number; count: number }>()
-  items.forEach((item) => {
-    if (item.conteudo.tempo_chegada_1_cci) {
-      const tempo = parseTimeMMSS(item.conteudo.tempo_chegada_1_cci)
-      if (tempo > 0) {
-        try {
-          const date = parse(item.data_referencia, 'yyyy-MM-dd', new Date())
-          const monthKey = format(date, 'yyyy-MM')
-          const current = tempoRespostaPorMes.get(monthKey) || { total: 0, count: 0 }
-          tempoRespostaPorMes.set(monthKey, {
-            total: current.total + tempo,
-            count: current.count + 1,
-          })
-        } catch {
-          // Ignora datas inválidas
-        }
-      }
+  normalizados.forEach(({ mes: monthKey, segundos }) => {
+    const tempo = segundos.tempo_chegada_1_cci ?? 0
+    if (tempo > 0 && monthKey) {
+      const current = tempoRespostaPorMes.get(monthKey) || { total: 0, count: 0 }
+      tempoRespostaPorMes.set(monthKey, {
+        total: current.total + tempo,
+        count: current.count + 1,
+      })
     }
   })
   const agilidadeEquipe = Array.from(tempoRespostaPorMes.entries())
@@ -254,6 +268,11 @@ export function calculateResponseTimeAvg(horaAcionamento: string, horaChegada: s
   }
 }
 
+/** Duração da ocorrência (segundos): duracao_total ou hora_termino - hora_acionamento */
+function duracaoOcorrenciaSegundos(segundos: DuracoesSegundos): number | null {
+  return segundos.duracao_total ?? intervaloSegundos(segundos.hora_acionamento, segundos.hora_termino)
+}
+
 /**
  * 2. OCORRÊNCIA NÃO AERONÁUTICA
  */
@@ -270,20 +289,17 @@ export function processOcorrenciaNaoAeronautica(lancamentos: Lancamento[]) {
     },
   }))
 
+  const normalizados = lancamentos.map((l) => normalizarLancamento(l))
+
   // KPIs
   const totalOcorrencias = items.length
   
   // Calcular durações para valor referência
   const duracoes: number[] = []
-  items.forEach((item) => {
-    if (item.conteudo.duracao_total) {
-      duracoes.push(timeToMinutes(item.conteudo.duracao_total))
-    } else if (item.conteudo.hora_acionamento && item.conteudo.hora_termino) {
-      const diff = calculateTimeDifference(
-        item.conteudo.hora_acionamento,
-        item.conteudo.hora_termino
-      )
-      duracoes.push(timeToMinutes(diff))
+  normalizados.forEach(({ segundos }) => {
+    const duracao = duracaoOcorrenciaSegundos(segundos)
+    if (duracao !== null) {
+      duracoes.push(duracao / 60)
     }
   })
   const duracaoMedia = duracoes.length > 0 
@@ -292,12 +308,10 @@ export function processOcorrenciaNaoAeronautica(lancamentos: Lancamento[]) {
 
   // Calcular eficiência de chegada (hora_chegada - hora_acionamento)
   const temposResposta: number[] = []
-  items.forEach((item) => {
-    if (item.conteudo.hora_acionamento && item.conteudo.hora_chegada) {
-      const tempo = calculateResponseTimeAvg(item.conteudo.hora_acionamento, item.conteudo.hora_chegada)
-      if (tempo > 0) {
-        temposResposta.push(tempo)
-      }
+  normalizados.forEach(({ segundos }) => {
+    const tempo = (intervaloSegundos(segundos.hora_acionamento, segundos.hora_chegada) ?? 0) / 60
+    if (tempo > 0) {
+      temposResposta.push(tempo)
     }
   })
   const tempoMedioResposta = temposResposta.length > 0
@@ -338,17 +352,16 @@ export function processOcorrenciaNaoAeronautica(lancamentos: Lancamento[]) {
 
   // Eficiência por Tipo (Eficiência de Chegada por Tipo)
   const tempoRespostaPorTipo = new Map<string, { total: number; count: number }>()
-  items.forEach((item) => {
-    if (item.conteudo.hora_acionamento && item.conteudo.hora_chegada) {
+  items.forEach((item, i) => {
+    const { segundos } = normalizados[i]
+    const tempo = (intervaloSegundos(segundos.hora_acionamento, segundos.hora_chegada) ?? 0) / 60
+    if (tempo > 0) {
       const tipo = item.conteudo.tipo_ocorrencia || 'Não informado'
-      const tempo = calculateResponseTimeAvg(item.conteudo.hora_acionamento, item.conteudo.hora_chegada)
-      if (tempo > 0) {
-        const current = tempoRespostaPorTipo.get(tipo) || { total: 0, count: 0 }
-        tempoRespostaPorTipo.set(tipo, {
-          total: current.total + tempo,
-          count: current.count + 1,
-        })
-      }
+      const current = tempoRespostaPorTipo.get(tipo) || { total: 0, count: 0 }
+      tempoRespostaPorTipo.set(tipo, {
+        total: current.total + tempo,
+        count: current.count + 1,
+      })
     }
   })
   const eficienciaPorTipo = Array.from(tempoRespostaPorTipo.entries())
@@ -378,13 +391,9 @@ export function processOcorrenciaNaoAeronautica(lancamentos: Lancamento[]) {
 
   // Tempo Total por mês (mantido para compatibilidade, mas ordenado cronologicamente)
   const tempoPorMes = new Map<string, number>()
-  items.forEach((item) => {
-    const month = format(parse(item.data_referencia, 'yyyy-MM-dd', new Date()), 'yyyy-MM')
-    const tempo = item.conteudo.duracao_total
-      ? timeToMinutes(item.conteudo.duracao_total)
-      : item.conteudo.hora_acionamento && item.conteudo.hora_termino
-      ? timeToMinutes(calculateTimeDifference(item.conteudo.hora_acionamento, item.conteudo.hora_termino))
-      : 0
+  normalizados.forEach(({ mes: month, segundos }) => {
+    if (!month) return
+    const tempo = (duracaoOcorrenciaSegundos(segundos) ?? 0) / 60
     tempoPorMes.set(month, (tempoPorMes.get(month) || 0) + tempo)
   })
   const tempoTotalPorMes = Array.from(tempoPorMes.entries())
@@ -441,36 +450,38 @@ export function processTAF(lancamentos: Lancamento[], colaboradorNome?: string)
     data_referencia: string
     equipe_id: string
   }> = []
+  // Segundos e mês de cada avaliado (mesma posição em avaliados)
+  const temposAvaliados: number[] = []
+  const mesesAvaliados: string[] = []
+  const busca = colaboradorNome?.toLowerCase()
 
   lancamentos.forEach((lancamento) => {
-    const conteudo = lancamento.conteudo as { avaliados?: Array<Record<string, unknown>> }
-    if (conteudo.avaliados && Array.isArray(conteudo.avaliados)) {
-      conteudo.avaliados.forEach((avaliado) => {
-        const nome = (avaliado.nome as string) || ''
-        if (colaboradorNome && !nome.toLowerCase().includes(colaboradorNome.toLowerCase())) return
-        const idade = Number(avaliado.idade) || 0
-        const tempo = (avaliado.tempo as string) || ''
-        let status = String(avaliado.status || '').trim()
-        if ((!status || status === '-') && idade && tempo && tempo.includes(':')) {
-          const res = calculateTAFStatus(idade, tempo)
-          status = res.status
-        }
-        avaliados.push({
-          nome,
-          idade,
-          tempo,
-          status,
-          nota: avaliado.nota ? Number(avaliado.nota) : undefined,
-          data_referencia: lancamento.data_referencia,
-          equipe_id: lancamento.equipe_id,
-        })
+    const { listas, mes } = normalizarLancamento(lancamento)
+    listas.avaliados?.forEach(({ dados: avaliado, segundos, nomeBusca }) => {
+      const nome = (avaliado.nome as string) || ''
+      if (busca && !nomeBusca.includes(busca)) return
+      const idade = Number(avaliado.idade) || 0
+      const tempo = (avaliado.tempo as string) || ''
+      let status = String(avaliado.status || '').trim()
+      if ((!status || status === '-') && idade && tempo && tempo.includes(':')) {
+        const res = calculateTAFStatus(idade, tempo)
+        status = res.status
+      }
+      avaliados.push({
+        nome,
+        idade,
+        tempo,
+        status,
+        nota: avaliado.nota ? Number(avaliado.nota) : undefined,
+        data_referencia: lancamento.data_referencia,
+        equipe_id: lancamento.equipe_id,
       })
-    }
+      temposAvaliados.push(segundos.tempo ?? 0)
+      mesesAvaliados.push(mes)
+    })
   })
 
-  const tempos = avaliados
-    .filter((a) => a.tempo)
-    .map((a) => parseTimeMMSS(a.tempo))
+  const tempos = temposAvaliados.filter((_, i) => avaliados[i].tempo)
 
   // KPIs
   const menorTempo = tempos.length > 0 ? Math.min(...tempos) : 0
@@ -486,9 +497,9 @@ export function processTAF(lancamentos: Lancamento[], colaboradorNome?: string)
 
   // Valor referência por equipe
   const porEquipe = new Map<string, { total: number; count: number }>()
-  avaliados.forEach((a) => {
+  avaliados.forEach((a, i) => {
     if (a.tempo) {
-      const tempo = parseTimeMMSS(a.tempo)
+      const tempo = temposAvaliados[i]
       const current = porEquipe.get(a.equipe_id) || { total: 0, count: 0 }
       porEquipe.set(a.equipe_id, {
         total: current.total + tempo,
@@ -505,10 +516,10 @@ export function processTAF(lancamentos: Lancamento[], colaboradorNome?: string)
 
   // Evolução valor referência mensal
   const mediaPorMes = new Map<string, { total: number; count: number }>()
-  avaliados.forEach((a) => {
-    if (a.tempo) {
-      const month = format(parse(a.data_referencia, 'yyyy-MM-dd', new Date()), 'yyyy-MM')
-      const tempo = parseTimeMMSS(a.tempo)
+  avaliados.forEach((a, i) => {
+    const month = mesesAvaliados[i]
+    if (a.tempo && month) {
+      const tempo = temposAvaliados[i]
       const current = mediaPorMes.get(month) || { total: 0, count: 0 }
       mediaPorMes.set(month, {
         total: current.total + tempo,
@@ -519,10 +530,10 @@ export function processTAF(lancamentos: Lancamento[], colaboradorNome?: string)
 
   // Valor referência por idade
   const mediaPorIdade = new Map<number, { total: number; count: number }>()
-  avaliados.forEach((a) => {
+  avaliados.forEach((a, i) => {
     if (a.tempo) {
       const idade = Math.floor(a.idade / 10) * 10 // Agrupa por década
-      const tempo = parseTimeMMSS(a.tempo)
+      const tempo = temposAvaliados[i]
       const current = mediaPorIdade.get(idade) || { total: 0, count: 0 }
       mediaPorIdade.set(idade, {
         total: current.total + tempo,
@@ -554,7 +565,7 @@ export function processTAF(lancamentos: Lancamento[], colaboradorNome?: string)
 
   // Gráfico 3: Performance por Faixa Etária (Bar Chart)
   const performancePorFaixaEtaria = new Map<string, { total: number; count: number }>()
-  avaliados.forEach((a) => {
+  avaliados.forEach((a, i) => {
     if (a.tempo && a.idade) {
       let faixa = ''
       if (a.idade <= 30) {
@@ -564,7 +575,7 @@ export function processTAF(lancamentos: Lancamento[], colaboradorNome?: string)
       } else {
         faixa = 'Acima de 40 anos'
       }
-      const tempo = parseTimeMMSS(a.tempo)
+      const tempo = temposAvaliados[i]
       const current = performancePorFaixaEtaria.get(faixa) || { total: 0, count: 0 }
       performancePorFaixaEtaria.set(faixa, {
         total: current.total + tempo,
@@ -631,24 +642,21 @@ export function processTempoTPEPR(lancamentos: Lancamento[]) {
   }> = []
 
   lancamentos.forEach((lancamento) => {
-    const conteudo = lancamento.conteudo as { avaliados?: Array<Record<string, unknown>> }
-    if (conteudo.avaliados && Array.isArray(conteudo.avaliados)) {
-      conteudo.avaliados.forEach((avaliado) => {
-        const tempoStr = (avaliado.tempo as string) || ''
-        const tempoSegundos = parseTimeMMSS(tempoStr)
-        // Calcular status baseado em tempo <= 59s (Aprovado) vs > 59s (Reprovado)
-        const statusCalculado = tempoSegundos > 0 && tempoSegundos <= 59 ? 'Aprovado' : 'Reprovado'
-        
-        avaliados.push({
-          nome: (avaliado.nome as string) || '',
-          tempo: tempoStr,
-          status: statusCalculado,
-          data_referencia: lancamento.data_referencia,
-          equipe_id: lancamento.equipe_id,
-          tempoSegundos,
-        })
+    normalizarLancamento(lancamento).listas.avaliados?.forEach(({ dados: avaliado, segundos }) => {
+      const tempoStr = (avaliado.tempo as string) || ''
+      const tempoSegundos = segundos.tempo ?? 0
+      // Calcular status baseado em tempo <= 59s (Aprovado) vs > 59s (Reprovado)
+      const statusCalculado = tempoSegundos > 0 && tempoSegundos <= 59 ? 'Aprovado' : 'Reprovado'
+      
+      avaliados.push({
+        nome: (avaliado.nome as string) || '',
+        tempo: tempoStr,
+        status: statusCalculado,
+        data_referencia: lancamento.data_referencia,
+        equipe_id: lancamento.equipe_id,
+        tempoSegundos,
       })
-    }
+    })
   })
 
   const tempos = avaliados.filter((a) => a.tempoSegundos > 0).map((a) => a.tempoSegundos)
@@ -728,18 +736,13 @@ export function processTempoTPEPR(lancamentos: Lancamento[]) {
   // Gráfico 4: Evolução Mensal (Line Chart) - Ordenação Cronológica Corrigida
   const mediaPorMes = new Map<string, { total: number; count: number }>()
   avaliados.forEach((a) => {
-    if (a.tempoSegundos > 0) {
-      try {
-        const date = parse(a.data_referencia, 'yyyy-MM-dd', new Date())
-        const monthKey = format(date, 'yyyy-MM')
-        const current = mediaPorMes.get(monthKey) || { total: 0, count: 0 }
-        mediaPorMes.set(monthKey, {
-          total: current.total + a.tempoSegundos,
-          count: current.count + 1,
-        })
-      } catch {
-        // Ignorar datas inválidas
-      }
+    const monthKey = mesDe(a.data_referencia)
+    if (a.tempoSegundos > 0 && monthKey) {
+      const current = mediaPorMes.get(monthKey) || { total: 0, count: 0 }
+      mediaPorMes.set(monthKey, {
+        total: current.total + a.tempoSegundos,
+        count: current.count + 1,
+      })
     }
   })
   const graficoEvolucaoMediaMensal = Array.from(mediaPorMes.entries())
@@ -794,21 +797,18 @@ export function processTempoResposta(lancamentos: Lancamento[]) {
   }> = []
 
   lancamentos.forEach((lancamento) => {
-    const conteudo = lancamento.conteudo as { afericoes?: Array<Record<string, unknown>> }
-    if (conteudo.afericoes && Array.isArray(conteudo.afericoes)) {
-      conteudo.afericoes.forEach((afericao) => {
-        const tempoStr = (afericao.tempo as string) || ''
-        const tempoSegundos = parseTimeMMSS(tempoStr)
-        afericoes.push({
-          viatura: (afericao.viatura as string) || '',
-          motorista: (afericao.motorista as string) || '',
-          local: (afericao.local as string) || '',
-          tempo: tempoStr,
-          data_referencia: lancamento.data_referencia,
-          tempoSegundos,
-        })
+    normalizarLancamento(lancamento).listas.afericoes?.forEach(({ dados: afericao, segundos }) => {
+      const tempoStr = (afericao.tempo as string) || ''
+      const tempoSegundos = segundos.tempo ?? 0
+      afericoes.push({
+        viatura: (afericao.viatura as string) || '',
+        motorista: (afericao.motorista as string) || '',
+        local: (afericao.local as string) || '',
+        tempo: tempoStr,
+        data_referencia: lancamento.data_referencia,
+        tempoSegundos,
       })
-    }
+    })
   })
 
   const tempos = afericoes.filter((a) => a.tempoSegundos > 0).map((a) => a.tempoSegundos)
@@ -849,18 +849,13 @@ export function processTempoResposta(lancamentos: Lancamento[]) {
   // Gráfico 2: Curva de Agilidade (Line Chart) - Ordenação Cronológica Corrigida
   const mediaPorMes = new Map<string, { total: number; count: number }>()
   afericoes.forEach((a) => {
-    if (a.tempoSegundos > 0) {
-      try {
-        const date = parse(a.data_referencia, 'yyyy-MM-dd', new Date())
-        const monthKey = format(date, 'yyyy-MM')
-        const current = mediaPorMes.get(monthKey) || { total: 0, count: 0 }
-        mediaPorMes.set(monthKey, {
-          total: current.total + a.tempoSegundos,
-          count: current.count + 1,
-        })
-      } catch {
-        // Ignorar datas inválidas
-      }
+    const monthKey = mesDe(a.data_referencia)
+    if (a.tempoSegundos > 0 && monthKey) {
+      const current = mediaPorMes.get(monthKey) || { total: 0, count: 0 }
+      mediaPorMes.set(monthKey, {
+        total: current.total + a.tempoSegundos,
+        count: current.count + 1,
+      })
     }
   })
   const graficoCurvaAgilidade = Array.from(mediaPorMes.entries())
@@ -929,34 +924,46 @@ export function processHorasTreinamento(lancamentos: Lancamento[]) {
   const participantes: Array<{
     nome: string
     horas: string
+    horasMinutos: number
     data_referencia: string
+    lancamento_id: string
     equipe_id: string
   }> = []
 
   lancamentos.forEach((lancamento) => {
-    const conteudo = lancamento.conteudo as { participantes?: Array<Record<string, unknown>> }
-    if (conteudo.participantes && Array.isArray(conteudo.participantes)) {
-      conteudo.participantes.forEach((participante) => {
-        const totalDia = (participante.total_dia as string) || (participante.horas as string) || ''
-        participantes.push({
-          nome: (participante.nome as string) || '',
-          horas: totalDia,
-          data_referencia: lancamento.data_referencia,
-          equipe_id: lancamento.equipe_id,
-        })
+    normalizarLancamento(lancamento).listas.participantes?.forEach(({ dados: participante, segundos }) => {
+      const totalDia = (participante.total_dia as string) || (participante.horas as string) || ''
+      participantes.push({
+        nome: (participante.nome as string) || '',
+        horas: totalDia,
+        horasMinutos: segundosTotalDia({ dados: participante, segundos }) / 60,
+        data_referencia: lancamento.data_referencia,
+        lancamento_id: lancamento.id,
+        equipe_id: lancamento.equipe_id,
       })
-    }
+    })
   })
 
-  // Agrupar por colaborador e somar horas (meta: 16 horas mensais)
-  const horasPorColaborador = new Map<string, { totalHorasMinutos: number; equipe_id: string }>()
+  // Agrupar por colaborador e somar horas (meta: 16 horas mensais).
+  // Equipe = a do lançamento mais recente (data, depois id), independente da
+  // ordem do array; mesma regra de analytics_horas_treinamento (migration 058).
+  const horasPorColaborador = new Map<
+    string,
+    { totalHorasMinutos: number; equipe_id: string; data_referencia: string; lancamento_id: string }
+  >()
   participantes.forEach((p) => {
     if (p.horas && p.nome) {
-      const horasMinutos = timeToMinutes(p.horas)
-      const current = horasPorColaborador.get(p.nome) || { totalHorasMinutos: 0, equipe_id: p.equipe_id }
+      const current = horasPorColaborador.get(p.nome)
+      const maisRecente =
+        !current ||
+        p.data_referencia > current.data_referencia ||
+        (p.data_referencia === current.data_referencia && p.lancamento_id > current.lancamento_id)
+      const origem = maisRecente ? p : current
       horasPorColaborador.set(p.nome, {
-        totalHorasMinutos: current.totalHorasMinutos + horasMinutos,
-        equipe_id: p.equipe_id,
+        totalHorasMinutos: (current?.totalHorasMinutos ?? 0) + p.horasMinutos,
+        equipe_id: origem.equipe_id,
+        data_referencia: origem.data_referencia,
+        lancamento_id: origem.lancamento_id,
       })
     }
   })
@@ -1065,9 +1072,7 @@ export function processHorasTreinamento(lancamentos: Lancamento[]) {
  * Converte tempo mm:ss para segundos
  */
 export function parseTimeMMSS(time: string): number {
-  if (!time || !time.includes(':')) return 0
-  const [minutes, seconds] = time.split(':').map(Number)
-  return minutes * 60 + seconds
+  return mmssParaSegundos(time) ?? 0
 }
 
 /**
@@ -1101,13 +1106,18 @@ export function processAtividadesAcessorias(lancamentos: Lancamento[]) {
     tempo_gasto?: string
     data_referencia: string
   }> = []
+  // tempo_gasto em minutos e mês de cada atividade (mesma posição em atividades)
+  const minutosAtividades: number[] = []
+  const mesesAtividades: string[] = []
 
   const pushAtividade = (
     tipo: string,
     qtdEq: number | undefined,
     qtdBom: number | undefined,
     tempo: string | undefined,
-    dataRef: string
+    dataRef: string,
+    tempoSegundos: number | undefined,
+    mes: string
   ) => {
     atividades.push({
       tipo_atividade: tipo || 'Não informado',
@@ -1116,24 +1126,22 @@ export function processAtividadesAcessorias(lancamentos: Lancamento[]) {
       tempo_gasto: tempo,
       data_referencia: dataRef,
     })
+    minutosAtividades.push(tempo ? (tempoSegundos ?? 0) / 60 : 0)
+    mesesAtividades.push(mes)
   }
 
   lancamentos.forEach((lancamento) => {
-    const conteudo = lancamento.conteudo as {
-      atividades?: Array<Record<string, unknown>>
-      tipo_atividade?: string
-      qtd_equipamentos?: number
-      qtd_bombeiros?: number
-      tempo_gasto?: string
-    }
-    if (conteudo.atividades && Array.isArray(conteudo.atividades)) {
-      conteudo.atividades.forEach((atividade) => {
+    const { conteudo, listas, segundos, mes } = normalizarLancamento(lancamento)
+    if (listas.atividades) {
+      listas.atividades.forEach(({ dados: atividade, segundos: segundosAtividade }) => {
         pushAtividade(
           (atividade.tipo_atividade as string) || '',
           atividade.qtd_equipamentos ? Number(atividade.qtd_equipamentos) : undefined,
           atividade.qtd_bombeiros ? Number(atividade.qtd_bombeiros) : undefined,
           (atividade.tempo_gasto as string) || undefined,
-          lancamento.data_referencia
+          lancamento.data_referencia,
+          segundosAtividade.tempo_gasto,
+          mes
         )
       })
     } else if (conteudo.tipo_atividade) {
@@ -1142,7 +1150,9 @@ export function processAtividadesAcessorias(lancamentos: Lancamento[]) {
         conteudo.qtd_equipamentos !== undefined ? Number(conteudo.qtd_equipamentos) : undefined,
         conteudo.qtd_bombeiros !== undefined ? Number(conteudo.qtd_bombeiros) : undefined,
         conteudo.tempo_gasto ? String(conteudo.tempo_gasto) : undefined,
-        lancamento.data_referencia
+        lancamento.data_referencia,
+        segundos.tempo_gasto,
+        mes
       )
     }
   })
@@ -1151,12 +1161,7 @@ export function processAtividadesAcessorias(lancamentos: Lancamento[]) {
   const totalAtividades = atividades.length
 
   // Total de Horas Empenhadas: Soma de todo o tempo_gasto (HH:mm)
-  let totalHorasMinutos = 0
-  atividades.forEach((a) => {
-    if (a.tempo_gasto) {
-      totalHorasMinutos += timeToMinutes(a.tempo_gasto)
-    }
-  })
+  const totalHorasMinutos = minutosAtividades.reduce((sum, minutos) => sum + minutos, 0)
   const totalHorasEmpenhadas = minutesToTime(totalHorasMinutos)
 
   // Equipamentos Inspecionados: Soma do campo qtd_equipamentos
@@ -1174,28 +1179,20 @@ export function processAtividadesAcessorias(lancamentos: Lancamento[]) {
 
   // Gráfico 1: Onde gastamos nosso tempo? (Donut Chart) - Tempo por tipo_atividade
   const tempoPorTipo = new Map<string, number>()
-  atividades.forEach((a) => {
+  atividades.forEach((a, i) => {
     if (a.tempo_gasto && a.tipo_atividade) {
-      const tempoMinutos = timeToMinutes(a.tempo_gasto)
+      const tempoMinutos = minutosAtividades[i]
       const tipo = a.tipo_atividade || 'Não informado'
       tempoPorTipo.set(tipo, (tempoPorTipo.get(tipo) || 0) + tempoMinutos)
     }
   })
+  const totalGeral = Array.from(tempoPorTipo.values()).reduce((a, b) => a + b, 0)
   const graficoTempoPorTipo = Array.from(tempoPorTipo.entries())
-    .map(([tipo, minutos]) => {
-      void atividades.reduce((sum, a) => {
-        if (a.tipo_atividade === tipo && a.tempo_gasto) {
-          return sum + timeToMinutes(a.tempo_gasto)
-        }
-        return sum
-      }, 0)
-      const totalGeral = Array.from(tempoPorTipo.values()).reduce((a, b) => a + b, 0)
-      return {
-        name: tipo,
-        value: minutos,
-        porcentagem: totalGeral > 0 ? (minutos / totalGeral) * 100 : 0,
-      }
-    })
+    .map(([tipo, minutos]) => ({
+      name: tipo,
+      value: minutos,
+      porcentagem: totalGeral > 0 ? (minutos / totalGeral) * 100 : 0,
+    }))
     .sort((a, b) => b.value - a.value)
 
   // Gráfico 2: Ranking de Frequência (Bar Chart Horizontal) - Atividades por tipo
@@ -1210,18 +1207,13 @@ export function processAtividadesAcessorias(lancamentos: Lancamento[]) {
 
   // Gráfico 3: Evolução de Produtividade (Composed Chart) - Quantidade e Horas por mês
   const produtividadePorMes = new Map<string, { quantidade: number; horasMinutos: number }>()
-  atividades.forEach((a) => {
-    try {
-      const date = parse(a.data_referencia, 'yyyy-MM-dd', new Date())
-      const monthKey = format(date, 'yyyy-MM')
-      const current = produtividadePorMes.get(monthKey) || { quantidade: 0, horasMinutos: 0 }
-      produtividadePorMes.set(monthKey, {
-        quantidade: current.quantidade + 1,
-        horasMinutos: current.horasMinutos + (a.tempo_gasto ? timeToMinutes(a.tempo_gasto) : 0),
-      })
-    } catch {
-      // Ignora datas inválidas
-    }
+  mesesAtividades.forEach((monthKey, i) => {
+    if (!monthKey) return // Ignora datas inválidas
+    const current = produtividadePorMes.get(monthKey) || { quantidade: 0, horasMinutos: 0 }
+    produtividadePorMes.set(monthKey, {
+      quantidade: current.quantidade + 1,
+      horasMinutos: current.horasMinutos + minutosAtividades[i],
+    })
   })
   const graficoEvolucaoProdutividade = Array.from(produtividadePorMes.entries())
     .map(([month, data]) => {
@@ -1267,26 +1259,25 @@ export function processProvaTeorica(lancamentos: Lancamento[], colaboradorNome?:
     equipe_id: string
   }> = []
 
+  const busca = colaboradorNome?.toLowerCase()
+
   lancamentos.forEach((lancamento) => {
-    const conteudo = lancamento.conteudo as { avaliados?: Array<Record<string, unknown>> }
-    if (conteudo.avaliados && Array.isArray(conteudo.avaliados)) {
-      conteudo.avaliados.forEach((avaliado) => {
-        const nome = (avaliado.nome as string) || ''
-        if (!colaboradorNome || nome.toLowerCase().includes(colaboradorNome.toLowerCase())) {
-          const nota = Number(avaliado.nota) || 0
-          // CORREÇÃO CRÍTICA: Calcular status baseado na nota (>= 8.0 = Aprovado)
-          const status = nota >= 8.0 ? 'Aprovado' : 'Reprovado'
-          
-          avaliados.push({
-            nome,
-            nota,
-            status,
-            data_referencia: lancamento.data_referencia,
-            equipe_id: lancamento.equipe_id,
-          })
-        }
-      })
-    }
+    normalizarLancamento(lancamento).listas.avaliados?.forEach(({ dados: avaliado, nomeBusca }) => {
+      const nome = (avaliado.nome as string) || ''
+      if (!busca || nomeBusca.includes(busca)) {
+        const nota = Number(avaliado.nota) || 0
+        // CORREÇÃO CRÍTICA: Calcular status baseado na nota (>= 8.0 = Aprovado)
+        const status = nota >= 8.0 ? 'Aprovado' : 'Reprovado'
+        
+        avaliados.push({
+          nome,
+          nota,
+          status,
+          data_referencia: lancamento.data_referencia,
+          equipe_id: lancamento.equipe_id,
+        })
+      }
+    })
   })
 
   const total = avaliados.length
@@ -1348,16 +1339,13 @@ export function processProvaTeorica(lancamentos: Lancamento[], colaboradorNome?:
   // Gráfico 4: Evolução do Conhecimento (Line Chart) - CORRIGIDO: Ordenação cronológica
   const evolucaoConhecimentoRaw = Array.from(
     avaliados.reduce((acc, a) => {
-      try {
-        const month = format(parse(a.data_referencia, 'yyyy-MM-dd', new Date()), 'yyyy-MM')
-        const current = acc.get(month) || { total: 0, count: 0 }
-        acc.set(month, {
-          total: current.total + a.nota,
-          count: current.count + 1,
-        })
-      } catch {
-        // Ignora datas inválidas
-      }
+      const month = mesDe(a.data_referencia)
+      if (!month) return acc // Ignora datas inválidas
+      const current = acc.get(month) || { total: 0, count: 0 }
+      acc.set(month, {
+        total: current.total + a.nota,
+        count: current.count + 1,
+      })
       return acc
     }, new Map<string, { total: number; count: number }>()).entries()
   )
@@ -1434,16 +1422,13 @@ export function processInspecaoViaturas(lancamentos: Lancamento[]) {
   }> = []
 
   lancamentos.forEach((lancamento) => {
-    const conteudo = lancamento.conteudo as { inspecoes?: Array<Record<string, unknown>> }
-    if (conteudo.inspecoes && Array.isArray(conteudo.inspecoes)) {
-      conteudo.inspecoes.forEach((inspecao) => {
-        const n = normalizeInspecaoViaturaRow(inspecao)
-        inspecoes.push({
-          ...n,
-          data_referencia: lancamento.data_referencia,
-        })
+    normalizarLancamento(lancamento).listas.inspecoes?.forEach(({ dados: inspecao }) => {
+      const n = normalizeInspecaoViaturaRow(inspecao)
+      inspecoes.push({
+        ...n,
+        data_referencia: lancamento.data_referencia,
       })
-    }
+    })
   })
 
   const totalQtdInspecoes = inspecoes.reduce((sum, i) => sum + i.qtd_inspecoes, 0)
@@ -1485,14 +1470,10 @@ export function processInspecaoViaturas(lancamentos: Lancamento[]) {
   // Gráfico 3: Tendência de Desgaste (Line Chart) - Não conformidades por mês
   const naoConformePorMes = new Map<string, number>()
   inspecoes.forEach((i) => {
-    try {
-      const date = parse(i.data_referencia, 'yyyy-MM-dd', new Date())
-      const monthKey = format(date, 'yyyy-MM')
-      const current = naoConformePorMes.get(monthKey) || 0
-      naoConformePorMes.set(monthKey, current + i.qtd_itens_nao_conforme)
-    } catch {
-      // Ignorar datas inválidas
-    }
+    const monthKey = mesDe(i.data_referencia)
+    if (!monthKey) return // Ignorar datas inválidas
+    const current = naoConformePorMes.get(monthKey) || 0
+    naoConformePorMes.set(monthKey, current + i.qtd_itens_nao_conforme)
   })
   
   const graficoTendenciaDesgaste = Array.from(naoConformePorMes.entries())
@@ -1716,22 +1697,25 @@ export function processControleEPI(lancamentos: Lancamento[]) {
     data_referencia: string
   }> = []
 
+  // Soma e quantidade de total_epi_pct por mês (uma passada)
+  const epiPorMes = new Map<string, { total: number; count: number }>()
+
   lancamentos.forEach((lancamento) => {
-    const conteudo = lancamento.conteudo as { colaboradores?: Array<Record<string, unknown>> }
-    if (conteudo.colaboradores && Array.isArray(conteudo.colaboradores)) {
-      conteudo.colaboradores.forEach((colab) => {
-        colaboradores.push({
-          nome: (colab.nome as string) || '',
-          epi_entregue: Number(colab.epi_entregue) || 0,
-          epi_previsto: Number(colab.epi_previsto) || 0,
-          unif_entregue: Number(colab.unif_entregue) || 0,
-          unif_previsto: Number(colab.unif_previsto) || 0,
-          total_epi_pct: Number(colab.total_epi_pct) || 0,
-          total_unif_pct: Number(colab.total_unif_pct) || 0,
-          data_referencia: lancamento.data_referencia,
-        })
+    const { listas, mes } = normalizarLancamento(lancamento)
+    listas.colaboradores?.forEach(({ dados: colab }) => {
+      colaboradores.push({
+        nome: (colab.nome as string) || '',
+        epi_entregue: Number(colab.epi_entregue) || 0,
+        epi_previsto: Number(colab.epi_previsto) || 0,
+        unif_entregue: Number(colab.unif_entregue) || 0,
+        unif_previsto: Number(colab.unif_previsto) || 0,
+        total_epi_pct: Number(colab.total_epi_pct) || 0,
+        total_unif_pct: Number(colab.total_unif_pct) || 0,
+        data_referencia: lancamento.data_referencia,
       })
-    }
+      const current = epiPorMes.get(mes) || { total: 0, count: 0 }
+      epiPorMes.set(mes, { total: current.total + (Number(colab.total_epi_pct) || 0), count: current.count + 1 })
+    })
   })
 
   const totalEPI = colaboradores.reduce((sum, c) => sum + c.total_epi_pct, 0)
@@ -1746,13 +1730,8 @@ export function processControleEPI(lancamentos: Lancamento[]) {
     },
     graficoEntregaEPI: Array.from(groupByMonth(lancamentos).entries())
       .map(([month]) => {
-        const mesColabs = colaboradores.filter((c) => {
-          const monthKey = format(parse(c.data_referencia, 'yyyy-MM-dd', new Date()), 'yyyy-MM')
-          return monthKey === month
-        })
-        const mediaMes = mesColabs.length > 0
-          ? mesColabs.reduce((sum, c) => sum + c.total_epi_pct, 0) / mesColabs.length
-          : 0
+        const mesEpi = epiPorMes.get(month)
+        const mediaMes = mesEpi && mesEpi.count > 0 ? mesEpi.total / mesEpi.count : 0
         try {
           return {
             mes: format(parse(month + '-01', 'yyyy-MM-dd', new Date()), 'MMM/yyyy'),
@@ -1776,14 +1755,17 @@ export function processControleTrocas(lancamentos: Lancamento[]) {
     qtd_trocas: number
     data_referencia: string
   }> = []
+  const trocasPorMes = new Map<string, number>()
 
   lancamentos.forEach((lancamento) => {
-    const conteudo = lancamento.conteudo as { qtd_trocas?: number }
+    const { conteudo, mes } = normalizarLancamento(lancamento)
     if (conteudo.qtd_trocas !== undefined) {
+      const qtd = Number(conteudo.qtd_trocas) || 0
       trocas.push({
-        qtd_trocas: Number(conteudo.qtd_trocas) || 0,
+        qtd_trocas: qtd,
         data_referencia: lancamento.data_referencia,
       })
+      trocasPorMes.set(mes, (trocasPorMes.get(mes) || 0) + qtd)
     }
   })
 
@@ -1792,11 +1774,7 @@ export function processControleTrocas(lancamentos: Lancamento[]) {
   // Evolução mensal
   const monthlyData = Array.from(groupByMonth(lancamentos).entries())
     .map(([month]) => {
-      const mesTrocas = trocas.filter((t) => {
-        const monthKey = format(parse(t.data_referencia, 'yyyy-MM-dd', new Date()), 'yyyy-MM')
-        return monthKey === month
-      })
-      const totalMes = mesTrocas.reduce((sum, t) => sum + t.qtd_trocas, 0)
+      const totalMes = trocasPorMes.get(month) || 0
       try {
         return {
           mes: format(parse(month + '-01', 'yyyy-MM-dd', new Date()), 'MMM/yyyy'),
@@ -1830,79 +1808,33 @@ export function generateExecutiveSummary(
   bases: Array<{ id: string; nome: string }>,
   indicadoresConfig: Array<{ id: string; schema_type: string }>
 ) {
-  // Separar lançamentos por tipo de indicador
-  const ocorrenciasAero = lancamentos.filter((l) => {
-    const indicador = indicadoresConfig.find((i) => i.id === l.indicador_id)
-    return indicador?.schema_type === 'ocorrencia_aero'
-  })
-  const ocorrenciasNaoAero = lancamentos.filter((l) => {
-    const indicador = indicadoresConfig.find((i) => i.id === l.indicador_id)
-    return indicador?.schema_type === 'ocorrencia_nao_aero'
-  })
-  const tempoResposta = lancamentos.filter((l) => {
-    const indicador = indicadoresConfig.find((i) => i.id === l.indicador_id)
-    return indicador?.schema_type === 'tempo_resposta'
-  })
-  const treinamento = lancamentos.filter((l) => {
-    const indicador = indicadoresConfig.find((i) => i.id === l.indicador_id)
-    return indicador?.schema_type === 'treinamento'
-  })
-  const estoque = lancamentos.filter((l) => {
-    const indicador = indicadoresConfig.find((i) => i.id === l.indicador_id)
-    return indicador?.schema_type === 'estoque'
-  })
-  const inspecaoViaturas = lancamentos.filter((l) => {
-    const indicador = indicadoresConfig.find((i) => i.id === l.indicador_id)
-    return indicador?.schema_type === 'inspecao_viaturas'
-  })
-  const taf = lancamentos.filter((l) => {
-    const indicador = indicadoresConfig.find((i) => i.id === l.indicador_id)
-    return indicador?.schema_type === 'taf'
-  })
+  // Separar lançamentos por tipo de indicador (uma passada)
+  const buckets = partitionBySchemaType(lancamentos, indicadoresConfig)
+  const ocorrenciasAero = buckets.get('ocorrencia_aero') ?? []
+  const ocorrenciasNaoAero = buckets.get('ocorrencia_nao_aero') ?? []
+  const tempoResposta = buckets.get('tempo_resposta') ?? []
+  const treinamento = buckets.get('treinamento') ?? []
+  const estoque = buckets.get('estoque') ?? []
+  const inspecaoViaturas = buckets.get('inspecao_viaturas') ?? []
+  const taf = buckets.get('taf') ?? []
+  const ocorrencias = ocorrenciasAero.concat(ocorrenciasNaoAero)
+
+  const basesNomeMap = new Map(bases.map((b) => [b.id, b.nome]))
+  const getBaseNome = (baseId: string) => basesNomeMap.get(baseId) || baseId
 
   // 1. Volume Operacional (Ocorrências Aero + Não Aero)
   const totalOcorrencias = ocorrenciasAero.length + ocorrenciasNaoAero.length
-
-  // Calcular período anterior para comparação (30 dias antes do período atual)
-  // Se não houver filtro de data, usar a data mais recente como referência
-  const datasOcorrencias = ocorrenciasAero.concat(ocorrenciasNaoAero).map(l => l.data_referencia).sort().reverse()
-  const dataMaisAntiga = datasOcorrencias.length > 0 ? datasOcorrencias[datasOcorrencias.length - 1] : ''
-  
-  // Calcular período anterior (30 dias antes da data mais antiga do período atual)
-  let ocorrenciasPeriodoAnterior = 0
-  if (dataMaisAntiga) {
-    try {
-      const dataRef = parse(dataMaisAntiga, 'yyyy-MM-dd', new Date())
-      const dataInicioAnterior = format(new Date(dataRef.getTime() - 30 * 24 * 60 * 60 * 1000), 'yyyy-MM-dd')
-      const dataFimAnterior = format(new Date(dataRef.getTime() - 1 * 24 * 60 * 60 * 1000), 'yyyy-MM-dd')
-      
-      ocorrenciasPeriodoAnterior = lancamentos.filter((l) => {
-        const indicador = indicadoresConfig.find((i) => i.id === l.indicador_id)
-        const isOcorrencia = indicador?.schema_type === 'ocorrencia_aero' || indicador?.schema_type === 'ocorrencia_nao_aero'
-        return isOcorrencia && l.data_referencia >= dataInicioAnterior && l.data_referencia <= dataFimAnterior
-      }).length
-    } catch {
-      // Se houver erro no parse, usar 0
-      ocorrenciasPeriodoAnterior = 0
-    }
-  }
-  
-  const crescimentoVolume = ocorrenciasPeriodoAnterior > 0 
-    ? ((totalOcorrencias - ocorrenciasPeriodoAnterior) / ocorrenciasPeriodoAnterior) * 100 
-    : totalOcorrencias > 0 ? 100 : 0
+  // O período anterior não está nos lançamentos carregados: a comparação vem da
+  // RPC analytics_resumo_executivo (aplicarResumoExecutivo); aqui fica sem comparação
 
   // 2. Agilidade (Índice de Agilidade Operacional)
   const temposResposta: number[] = []
   tempoResposta.forEach((lancamento) => {
-    const conteudo = lancamento.conteudo as { afericoes?: Array<Record<string, unknown>> }
-    if (conteudo.afericoes && Array.isArray(conteudo.afericoes)) {
-      conteudo.afericoes.forEach((afericao) => {
-        const tempo = (afericao.tempo as string) || ''
-        if (tempo) {
-          temposResposta.push(parseTimeMMSS(tempo))
-        }
-      })
-    }
+    normalizarLancamento(lancamento).listas.afericoes?.forEach(({ dados: afericao, segundos }) => {
+      if (afericao.tempo) {
+        temposResposta.push(segundos.tempo ?? 0)
+      }
+    })
   })
   const tempoMedioResposta = temposResposta.length > 0 
     ? temposResposta.reduce((a, b) => a + b, 0) / temposResposta.length 
@@ -1913,15 +1845,9 @@ export function generateExecutiveSummary(
   // 3. Força de Trabalho (Total Horas de Treinamento)
   let totalHorasTreinamento = 0
   treinamento.forEach((lancamento) => {
-    const conteudo = lancamento.conteudo as { participantes?: Array<Record<string, unknown>> }
-    if (conteudo.participantes && Array.isArray(conteudo.participantes)) {
-      conteudo.participantes.forEach((participante) => {
-        const horas = (participante.total_dia as string) || (participante.horas as string) || ''
-        if (horas) {
-          totalHorasTreinamento += timeToMinutes(horas)
-        }
-      })
-    }
+    normalizarLancamento(lancamento).listas.participantes?.forEach(({ dados: participante, segundos }) => {
+      totalHorasTreinamento += segundosTotalDia({ dados: participante, segundos }) / 60
+    })
   })
 
   // 4. Alertas Críticos (Bases com estoque crítico OU viatura não conforme)
@@ -1963,30 +1889,26 @@ export function generateExecutiveSummary(
   const monthlyData = new Map<string, { ocorrencias: number; tempoResposta: number; count: number }>()
   
   // Agregar ocorrências por mês
-  ocorrenciasAero.concat(ocorrenciasNaoAero).forEach((l) => {
-    const month = format(parse(l.data_referencia, 'yyyy-MM-dd', new Date()), 'yyyy-MM')
+  ocorrencias.forEach((l) => {
+    const month = normalizarLancamento(l).mes
     const current = monthlyData.get(month) || { ocorrencias: 0, tempoResposta: 0, count: 0 }
     monthlyData.set(month, { ...current, ocorrencias: current.ocorrencias + 1 })
   })
 
   // Agregar tempos de resposta por mês
   tempoResposta.forEach((lancamento) => {
-    const month = format(parse(lancamento.data_referencia, 'yyyy-MM-dd', new Date()), 'yyyy-MM')
-    const conteudo = lancamento.conteudo as { afericoes?: Array<Record<string, unknown>> }
-    if (conteudo.afericoes && Array.isArray(conteudo.afericoes)) {
-      conteudo.afericoes.forEach((afericao) => {
-        const tempo = (afericao.tempo as string) || ''
-        if (tempo) {
-          const current = monthlyData.get(month) || { ocorrencias: 0, tempoResposta: 0, count: 0 }
-          const tempoSegundos = parseTimeMMSS(tempo)
-          monthlyData.set(month, {
-            ...current,
-            tempoResposta: current.tempoResposta + tempoSegundos,
-            count: current.count + 1,
-          })
-        }
-      })
-    }
+    const { mes: month, listas } = normalizarLancamento(lancamento)
+    listas.afericoes?.forEach(({ dados: afericao, segundos }) => {
+      if (afericao.tempo) {
+        const current = monthlyData.get(month) || { ocorrencias: 0, tempoResposta: 0, count: 0 }
+        const tempoSegundos = segundos.tempo ?? 0
+        monthlyData.set(month, {
+          ...current,
+          tempoResposta: current.tempoResposta + tempoSegundos,
+          count: current.count + 1,
+        })
+      }
+    })
   })
 
   const graficoComposed = Array.from(monthlyData.entries())
@@ -2007,8 +1929,8 @@ export function generateExecutiveSummary(
 
   // 6. Ranking de Bases (Top 5 com mais ocorrências)
   const ocorrenciasPorBase = new Map<string, number>()
-  ocorrenciasAero.concat(ocorrenciasNaoAero).forEach((l) => {
-    const baseNome = bases.find((b) => b.id === l.base_id)?.nome || l.base_id
+  ocorrencias.forEach((l) => {
+    const baseNome = getBaseNome(l.base_id)
     ocorrenciasPorBase.set(baseNome, (ocorrenciasPorBase.get(baseNome) || 0) + 1)
   })
   const rankingBases = Array.from(ocorrenciasPorBase.entries())
@@ -2026,7 +1948,7 @@ export function generateExecutiveSummary(
     if (conteudo.avaliados && Array.isArray(conteudo.avaliados)) {
       const reprovados = conteudo.avaliados.filter((a) => (a.status as string) === 'Reprovado').length
       if (reprovados > 0) {
-        const baseNome = bases.find((b) => b.id === lancamento.base_id)?.nome || lancamento.base_id
+        const baseNome = getBaseNome(lancamento.base_id)
         reprovadosPorBase.set(baseNome, (reprovadosPorBase.get(baseNome) || 0) + reprovados)
       }
     }
@@ -2041,7 +1963,7 @@ export function generateExecutiveSummary(
     const poAtual = c.po_quimico_quantidade_estoque_reserva_tecnica ?? c.po_quimico_atual
     const lgeAtual = c.lge_quantidade_estoque_reserva_tecnica ?? c.lge_atual
     const nitAtual = c.nitrogenio_quantidade_estoque_reserva_tecnica ?? c.nitrogenio_atual
-    const baseNome = bases.find((b) => b.id === lancamento.base_id)?.nome || lancamento.base_id
+    const baseNome = getBaseNome(lancamento.base_id)
 
     if (poAtual !== undefined && c.po_quimico_exigido !== undefined && Number(poAtual) < Number(c.po_quimico_exigido)) {
       pontosAtencao.push({ tipo: 'estoque', mensagem: 'Estoque de Pó Químico Crítico', base: baseNome })
@@ -2062,7 +1984,7 @@ export function generateExecutiveSummary(
         const qtdNaoConforme =
           Number(inspecao.qtd_itens_nao_conforme) || Number(inspecao.qtd_nao_conforme) || 0
         if (qtdNaoConforme > 0) {
-          const baseNome = bases.find((b) => b.id === lancamento.base_id)?.nome || lancamento.base_id
+          const baseNome = getBaseNome(lancamento.base_id)
           const viatura = (inspecao.viatura as string) || 'Desconhecida'
           pontosAtencao.push({ tipo: 'viatura', mensagem: `Viatura ${viatura} Não Conforme`, base: baseNome })
         }
@@ -2074,8 +1996,8 @@ export function generateExecutiveSummary(
     kpis: {
       volumeOperacional: {
         valor: totalOcorrencias || 0,
-        crescimento: isNaN(crescimentoVolume) ? 0 : crescimentoVolume,
-        periodoAnterior: ocorrenciasPeriodoAnterior || 0,
+        crescimento: null as number | null,
+        periodoAnterior: null as number | null,
       },
       agilidade: {
         tempoMedio: tempoMedioResposta > 0 ? secondsToMMSS(tempoMedioResposta) : '00:00',
@@ -2097,3 +2019,87 @@ export function generateExecutiveSummary(
   }
 }
 
+
+/** Resultado de generateExecutiveSummary (payload da Visão Geral) */
+export type ResumoExecutivo = ReturnType<typeof generateExecutiveSummary>
+
+/** KPIs de um período devolvidos por analytics_resumo_executivo (migration 051) */
+export interface ResumoExecutivoPeriodo {
+  dataInicio: string | null
+  dataFim: string | null
+  volume: number
+  afericoes: number
+  tempoMedioSegundos: number
+  treinamentoMinutos: number
+  efetivoTreinamento: number
+  efetivoConforme: number
+  tafAvaliados: number
+  tafAprovados: number
+}
+
+/** Período filtrado e período anterior de mesma duração (null sem data inicial) */
+export interface ResumoExecutivoServidor {
+  atual: ResumoExecutivoPeriodo
+  anterior: ResumoExecutivoPeriodo | null
+}
+
+// Variação percentual; null sem período anterior ou com período anterior zerado
+function variacaoPercentual(atual: number, anterior: number | undefined): number | null {
+  if (anterior === undefined || anterior <= 0) return null
+  return ((atual - anterior) / anterior) * 100
+}
+
+function percentualDe(parte: number, total: number): number | null {
+  return total > 0 ? (parte / total) * 100 : null
+}
+
+/**
+ * Substitui os KPIs do resumo local pelos do servidor (período filtrado completo) e
+ * acrescenta a comparação com o período anterior, a conformidade PTR-BA e a aprovação
+ * no TAF. Gráficos, ranking e pontos de atenção continuam os de generateExecutiveSummary.
+ */
+export function aplicarResumoExecutivo(
+  resumo: ResumoExecutivo,
+  servidor: ResumoExecutivoServidor | null | undefined
+) {
+  if (!servidor?.atual) return resumo
+  const { atual, anterior } = servidor
+
+  const tempoMedioMinutos = atual.tempoMedioSegundos / 60
+  const percentualTafAnterior = anterior ? percentualDe(anterior.tafAprovados, anterior.tafAvaliados) : null
+
+  return {
+    ...resumo,
+    kpis: {
+      ...resumo.kpis,
+      volumeOperacional: {
+        valor: atual.volume,
+        crescimento: variacaoPercentual(atual.volume, anterior?.volume),
+        periodoAnterior: anterior ? anterior.volume : null,
+      },
+      agilidade: {
+        tempoMedio: atual.tempoMedioSegundos > 0 ? secondsToMMSS(atual.tempoMedioSegundos) : '00:00',
+        tempoMedioMinutos,
+        cor: tempoMedioMinutos < 3 ? 'green' : 'yellow',
+        tempoMedioAnterior: anterior && anterior.afericoes > 0 ? secondsToMMSS(anterior.tempoMedioSegundos) : null,
+      },
+      forcaTrabalho: {
+        totalHoras: atual.treinamentoMinutos > 0 ? minutesToTime(atual.treinamentoMinutos) : '00:00',
+        totalMinutos: atual.treinamentoMinutos,
+        crescimento: variacaoPercentual(atual.treinamentoMinutos, anterior?.treinamentoMinutos),
+      },
+      conformidadeTreinamento: {
+        percentual: percentualDe(atual.efetivoConforme, atual.efetivoTreinamento),
+        efetivo: atual.efetivoTreinamento,
+        conformes: atual.efetivoConforme,
+        percentualAnterior: anterior ? percentualDe(anterior.efetivoConforme, anterior.efetivoTreinamento) : null,
+      },
+      aprovacaoTAF: {
+        percentual: percentualDe(atual.tafAprovados, atual.tafAvaliados),
+        avaliados: atual.tafAvaliados,
+        aprovados: atual.tafAprovados,
+        percentualAnterior: percentualTafAnterior,
+      },
+    },
+  }
+}
@@ -0,0 +1,229 @@
+import {
+  processOcorrenciaAeronautica,
+  processOcorrenciaNaoAeronautica,
+  processAtividadesAcessorias,
+  processTAF,
+  processProvaTeorica,
+  processTempoTPEPR,
+  processTempoResposta,
+  processExercicioPosicionamento,
+  processHorasTreinamento,
+  processInspecaoViaturas,
+  processControleEstoque,
+  processControleEPI,
+  processControleTrocas,
+  filterByColaborador,
+  generateExecutiveSummary,
+  partitionBySchemaType,
+} from './analytics-utils'
+import type { Database } from './database.types'
+
+type Lancamento = Database['public']['Tables']['lancamentos']['Row']
+
+/**
+ * Processamento local das views do Dashboard Analytics (filtros de tela + process*).
+ * Roda no analytics.worker (fora da main thread) e, se o worker não estiver
+ * disponível, direto no componente — mesmo resultado nos dois caminhos.
+ */
+
+export type AnalyticsView =
+  | 'visao_geral'
+  | 'ocorrencia_aero'
+  | 'ocorrencia_nao_aero'
+  | 'atividades_acessorias'
+  | 'taf'
+  | 'prova_teorica'
+  | 'treinamento'
+  | 'tempo_tp_epr'
+  | 'tempo_resposta'
+  | 'exercicio_posicionamento'
+  | 'inspecao_viaturas'
+  | 'logistica'
+
+/** Filtros aplicados no cliente sobre os lançamentos já buscados */
+export interface AnalyticsViewFilters {
+  colaboradorNome?: string
+  tipoOcorrencia?: string
+  tipoOcorrenciaAero?: string
+}
+
+/** Dados de referência usados pela Visão Geral e Logística */
+export interface AnalyticsViewContext {
+  bases?: Array<{ id: string; nome: string }>
+  indicadoresConfig?: Array<{ id: string; schema_type: string }>
+}
+
+/** Tipos lidos pelo resumo executivo (generateExecutiveSummary) */
+const SCHEMAS_VISAO_GERAL = [
+  'ocorrencia_aero',
+  'ocorrencia_nao_aero',
+  'tempo_resposta',
+  'treinamento',
+  'estoque',
+  'inspecao_viaturas',
+  'taf',
+]
+const SCHEMAS_LOGISTICA = ['estoque', 'controle_epi', 'controle_trocas']
+
+/**
+ * Classes de indicador que a view combina (filtro schemaTypes da busca): o servidor
+ * devolve só esses tipos, em vez de todos os lançamentos do período.
+ * undefined para as views de um indicador só (filtradas por indicador_id).
+ */
+export function schemaTypesDaView(view: AnalyticsView): string[] | undefined {
+  if (view === 'visao_geral') return SCHEMAS_VISAO_GERAL
+  if (view === 'logistica') return SCHEMAS_LOGISTICA
+  return undefined
+}
+
+/** Campos do Controle de Estoque (modelo atual, _atual legado e itens[] antigo) */
+const CONTEUDO_ESTOQUE = [
+  'itens',
+  'po_quimico_quantidade_estoque_reserva_tecnica',
+  'po_quimico_atual',
+  'po_quimico_exigido',
+  'lge_quantidade_estoque_reserva_tecnica',
+  'lge_atual',
+  'lge_exigido',
+  'nitrogenio_quantidade_estoque_reserva_tecnica',
+  'nitrogenio_atual',
+  'nitrogenio_exigido',
+]
+
+/**
+ * Chaves do conteudo que cada view agrega (carga "todos os lançamentos"). A busca
+ * traz só essas chaves (JSON path do PostgREST) em vez do conteudo inteiro, que
+ * inclui observações, detalhamentos e campos de outras views.
+ * Views fora do mapa buscam o conteudo completo.
+ */
+const PROJECOES_CONTEUDO: Partial<Record<AnalyticsView, string[]>> = {
+  // generateExecutiveSummary: tempos de resposta, horas de treinamento, viaturas, TAF e estoque
+  visao_geral: ['afericoes', 'participantes', 'inspecoes', 'avaliados', ...CONTEUDO_ESTOQUE],
+  taf: ['avaliados'],
+  atividades_acessorias: ['atividades', 'tipo_atividade', 'qtd_equipamentos', 'qtd_bombeiros', 'tempo_gasto', 'tempo_gasto_min'],
+  logistica: [...CONTEUDO_ESTOQUE, 'colaboradores', 'qtd_trocas'],
+}
+
+// Prefixo das colunas projetadas no select (alias de cada JSON path)
+const PREFIXO_PROJECAO = 'conteudo__'
+
+const COLUNAS_ANALYTICS = 'id, data_referencia, base_id, equipe_id, indicador_id, schema_type, user_id'
+
+/**
+ * Select da carga da view: colunas do lançamento + conteudo (inteiro ou projetado).
+ * Linhas projetadas não trazem updated_at, então normalizarLancamento não as guarda
+ * no cache (a linha completa de mesmo id + updated_at tem outro conteudo).
+ */
+export function selectAnalyticsView(view: AnalyticsView): string {
+  const chaves = PROJECOES_CONTEUDO[view]
+  if (!chaves) return `${COLUNAS_ANALYTICS}, conteudo`
+  return [COLUNAS_ANALYTICS, ...chaves.map((chave) => `${PREFIXO_PROJECAO}${chave}:conteudo->${chave}`)].join(', ')
+}
+
+/** Remonta `conteudo` a partir das colunas projetadas (linhas completas passam inalteradas) */
+export function remontarConteudo<T extends object>(linha: T): T {
+  let conteudo: Record<string, unknown> | null = null
+  const resultado: Record<string, unknown> = {}
+  for (const [coluna, valor] of Object.entries(linha)) {
+    if (!coluna.startsWith(PREFIXO_PROJECAO)) {
+      resultado[coluna] = valor
+      continue
+    }
+    if (!conteudo) conteudo = {}
+    if (valor !== null && valor !== undefined) conteudo[coluna.slice(PREFIXO_PROJECAO.length)] = valor
+  }
+  if (!conteudo) return linha
+  resultado.conteudo = conteudo
+  return resultado as T
+}
+
+export function usesColaboradorFilter(view: AnalyticsView): boolean {
+  return view === 'taf' || view === 'prova_teorica' || view === 'treinamento' || view === 'tempo_tp_epr'
+}
+
+/**
+ * Aplica os filtros de tela (colaborador, tipo de ocorrência) da view
+ */
+export function filterLancamentosForView(
+  view: AnalyticsView,
+  lancamentos: Lancamento[],
+  filters: AnalyticsViewFilters
+): Lancamento[] {
+  const { colaboradorNome, tipoOcorrencia, tipoOcorrenciaAero } = filters
+
+  let filtered =
+    colaboradorNome && usesColaboradorFilter(view)
+      ? filterByColaborador(lancamentos, colaboradorNome)
+      : lancamentos
+
+  // Ocorrência Não Aeronáutica: tipo de ocorrência
+  if (view === 'ocorrencia_nao_aero' && tipoOcorrencia) {
+    filtered = filtered.filter((l) => {
+      const c = l.conteudo as { tipo_ocorrencia?: string }
+      return (c.tipo_ocorrencia || '') === tipoOcorrencia
+    })
+  }
+
+  // Ocorrência Aeronáutica: Posicionamento / Intervenção
+  if (view === 'ocorrencia_aero' && tipoOcorrenciaAero) {
+    filtered = filtered.filter((l) => {
+      const c = l.conteudo as { acao?: string }
+      return (c.acao || '') === tipoOcorrenciaAero
+    })
+  }
+
+  return filtered
+}
+
+/**
+ * Payload de KPIs/gráficos da view (mesmo contrato do processedData).
+ * Retorna null quando não há lançamentos (ou configurações, na Visão Geral).
+ */
+export function processAnalyticsView(
+  view: AnalyticsView,
+  lancamentos: Lancamento[],
+  filters: AnalyticsViewFilters,
+  context: AnalyticsViewContext
+): unknown {
+  const { bases, indicadoresConfig } = context
+  const filteredLancamentos = filterLancamentosForView(view, lancamentos, filters)
+
+  if (filteredLancamentos.length === 0 && view !== 'visao_geral') return null
+
+  switch (view) {
+    case 'visao_geral':
+      // Sempre processar visão geral, mesmo sem lançamentos, para exibir zeros
+      return bases && indicadoresConfig ? generateExecutiveSummary(lancamentos, bases, indicadoresConfig) : null
+    case 'ocorrencia_aero':
+      return processOcorrenciaAeronautica(filteredLancamentos)
+    case 'ocorrencia_nao_aero':
+      return processOcorrenciaNaoAeronautica(filteredLancamentos)
+    case 'atividades_acessorias':
+      return processAtividadesAcessorias(filteredLancamentos)
+    case 'taf':
+      return processTAF(filteredLancamentos, filters.colaboradorNome || undefined)
+    case 'prova_teorica':
+      return processProvaTeorica(filteredLancamentos, filters.colaboradorNome || undefined)
+    case 'treinamento':
+      return processHorasTreinamento(filteredLancamentos)
+    case 'tempo_tp_epr':
+      return processTempoTPEPR(filteredLancamentos)
+    case 'tempo_resposta':
+      return processTempoResposta(filteredLancamentos)
+    case 'exercicio_posicionamento':
+      return processExercicioPosicionamento(filteredLancamentos)
+    case 'inspecao_viaturas':
+      return processInspecaoViaturas(filteredLancamentos)
+    case 'logistica': {
+      // Agrupar dados de logística (uma passada por schema_type)
+      const buckets = partitionBySchemaType(filteredLancamentos, indicadoresConfig ?? [])
+      return {
+        estoque: processControleEstoque(buckets.get('estoque') ?? [], bases),
+        epi: processControleEPI(buckets.get('controle_epi') ?? []),
+        trocas: processControleTrocas(buckets.get('controle_trocas') ?? []),
+      }
+    }
+    default:
+      return null
+  }
+}
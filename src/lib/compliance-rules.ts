@@ -1,6 +1,9 @@
 /**
  * Regras de Compliance (Aderência)
  * Define a classificação e periodicidade esperada para cada indicador
+ *
+ * Espelhadas em SQL por compliance_regras() (migration 045), usada pela RPC
+ * compliance_status da página Aderência — alterar os dois lugares juntos.
  */
 
 export type GrupoCompliance = 'A' | 'B' | 'C'
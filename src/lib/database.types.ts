@@ -6,6 +6,16 @@ export type Json =
   | { [key: string]: Json | undefined }
   | Json[]
 
+/** Filtros comuns das RPCs de Analytics (migration 037). */
+interface AnalyticsRpcArgs {
+  p_schema_type?: string
+  p_base_id?: string | null
+  p_equipe_id?: string | null
+  p_data_inicio?: string | null
+  p_data_fim?: string | null
+  p_colaborador?: string | null
+}
+
 export interface Database {
   public: {
     Tables: {
@@ -86,6 +96,23 @@ export interface Database {
           created_at?: string
         }
       }
+      reference_data_versions: {
+        Row: {
+          tabela: string
+          versao: number
+          atualizado_em: string
+        }
+        Insert: {
+          tabela: string
+          versao?: number
+          atualizado_em?: string
+        }
+        Update: {
+          tabela?: string
+          versao?: number
+          atualizado_em?: string
+        }
+      }
       profiles: {
         Row: {
           id: string
@@ -162,6 +189,7 @@ export interface Database {
           autor_nome: string | null
           indicador_id: string
           conteudo: Json
+          schema_type: string | null
         }
         Insert: {
           id?: string
@@ -174,6 +202,7 @@ export interface Database {
           autor_nome?: string | null
           indicador_id: string
           conteudo: Json
+          schema_type?: string | null
         }
         Update: {
           id?: string
@@ -186,7 +215,143 @@ export interface Database {
           autor_nome?: string | null
           indicador_id?: string
           conteudo?: Json
+          schema_type?: string | null
+        }
+      }
+      lancamentos_excluidos: {
+        Row: {
+          id: string
+          data_referencia: string
+          base_id: string
+          equipe_id: string | null
+          indicador_id: string | null
+          excluido_em: string
+        }
+        Insert: {
+          id: string
+          data_referencia: string
+          base_id: string
+          equipe_id?: string | null
+          indicador_id?: string | null
+          excluido_em?: string
+        }
+        Update: {
+          id?: string
+          data_referencia?: string
+          base_id?: string
+          equipe_id?: string | null
+          indicador_id?: string | null
+          excluido_em?: string
+        }
+      }
+      lancamentos_eventos: {
+        Row: {
+          id: number
+          lancamento_id: string
+          operacao: 'INSERT' | 'UPDATE' | 'DELETE'
+          data_referencia: string
+          base_id: string
+          equipe_id: string | null
+          indicador_id: string | null
+          updated_at: string | null
+          criado_em: string
         }
+        // Mantida por trigger (migration 048); sem escrita pelo cliente
+        Insert: Record<string, never>
+        Update: Record<string, never>
+      }
+      lancamentos_monthly_agg: {
+        Row: {
+          base_id: string
+          equipe_id: string
+          indicador_id: string
+          mes: string
+          total_lancamentos: number
+          taf_avaliados: number
+          taf_aprovados: number
+          taf_reprovados: number
+          treinamento_minutos: number
+          tempo_resposta_qtd: number
+          tempo_resposta_soma_seg: number
+          tempo_resposta_soma_quadrados: number
+          updated_at: string
+        }
+        // Mantida por trigger (migration 038); sem escrita pelo cliente
+        Insert: Record<string, never>
+        Update: Record<string, never>
+      }
+      lancamento_avaliados: {
+        Row: {
+          lancamento_id: string
+          ordem: number
+          data_referencia: string
+          base_id: string
+          equipe_id: string
+          indicador_id: string
+          nome: string
+          nome_normalizado: string
+          idade: number | null
+          tempo: string | null
+          tempo_segundos: number | null
+          nota: number | null
+          status: string | null
+        }
+        // Mantida por trigger (migration 042); sem escrita pelo cliente
+        Insert: Record<string, never>
+        Update: Record<string, never>
+      }
+      lancamento_participantes: {
+        Row: {
+          lancamento_id: string
+          ordem: number
+          data_referencia: string
+          base_id: string
+          equipe_id: string
+          indicador_id: string
+          nome: string
+          nome_normalizado: string
+          horas: string | null
+          minutos: number
+        }
+        // Mantida por trigger (migration 042); sem escrita pelo cliente
+        Insert: Record<string, never>
+        Update: Record<string, never>
+      }
+      lancamento_afericoes: {
+        Row: {
+          lancamento_id: string
+          ordem: number
+          data_referencia: string
+          base_id: string
+          equipe_id: string
+          indicador_id: string
+          viatura: string | null
+          motorista: string
+          motorista_normalizado: string
+          local: string | null
+          tempo: string | null
+          tempo_segundos: number | null
+        }
+        // Mantida por trigger (migration 042); sem escrita pelo cliente
+        Insert: Record<string, never>
+        Update: Record<string, never>
+      }
+      lancamento_inspecoes: {
+        Row: {
+          lancamento_id: string
+          ordem: number
+          data_referencia: string
+          base_id: string
+          equipe_id: string
+          indicador_id: string
+          viatura: string | null
+          qtd_inspecoes: number
+          qtd_itens_inspecionados: number
+          qtd_itens_nao_conforme: number
+        }
+        // Mantida por trigger (migration 042); sem escrita pelo cliente
+        Insert: Record<string, never>
+        Update: Record<string, never>
       }
     }
     Functions: {
@@ -205,6 +370,51 @@ export interface Database {
         Args: Record<string, never>
         Returns: Json
       }
+      search_lancamentos: {
+        Args: {
+          p_search: string
+          p_base_id?: string | null
+          p_equipe_id?: string | null
+          p_indicador_id?: string | null
+          p_data_inicio?: string | null
+          p_data_fim?: string | null
+          p_limit?: number
+          p_offset?: number
+        }
+        Returns: Json
+      }
+      compliance_status: {
+        Args: {
+          p_mes: string
+          p_hoje?: string
+        }
+        Returns: Json
+      }
+      analytics_tempo_resposta: {
+        Args: AnalyticsRpcArgs
+        Returns: Json
+      }
+      analytics_horas_treinamento: {
+        Args: AnalyticsRpcArgs
+        Returns: Json
+      }
+      analytics_tempo_tp_epr: {
+        Args: AnalyticsRpcArgs
+        Returns: Json
+      }
+      analytics_inspecao_viaturas: {
+        Args: AnalyticsRpcArgs
+        Returns: Json
+      }
+      analytics_resumo_executivo: {
+        Args: {
+          p_base_id?: string | null
+          p_equipe_id?: string | null
+          p_data_inicio?: string | null
+          p_data_fim?: string | null
+        }
+        Returns: Json
+      }
     }
   }
 }
@@ -0,0 +1,151 @@
+import { contarLancamentos, percorrerLancamentosEmFaixas } from './lancamentos-loader'
+import { criarSerializadorLancamentos, type ExportContexto } from './export-utils'
+import type { LancamentosFiltroChave } from './lancamentos-cache-patch'
+import type { ExportWorkerRequest, ExportWorkerResponse } from '@/workers/export.worker'
+import type { Database } from './database.types'
+
+type Lancamento = Database['public']['Tables']['lancamentos']['Row']
+
+/**
+ * Exportação CSV em partes (Explorador de Dados): as páginas do filtro são lidas uma
+ * a uma (percorrerLancamentosEmFaixas), achatadas e serializadas no export.worker e
+ * guardadas como partes de Blob. Nada mantém todos os lançamentos, todas as linhas
+ * achatadas ou o CSV inteiro numa string. Sem Worker, serializa na main thread,
+ * cedendo o event loop entre lotes.
+ */
+
+export interface ProgressoExportacao {
+  processados: number
+  total: number
+}
+
+interface Serializador {
+  lote(lancamentos: Lancamento[]): Promise<{ csv: string; linhas: number }>
+  cabecalho(): Promise<string>
+  encerrar(): void
+}
+
+function serializadorLocal(colunas: string[], contexto: ExportContexto): Serializador {
+  const serializador = criarSerializadorLancamentos(colunas, contexto)
+  return {
+    async lote(lancamentos) {
+      // Deixa a tela atualizar (progresso, botão cancelar) entre lotes
+      await new Promise((resolve) => setTimeout(resolve, 0))
+      return serializador.lote(lancamentos)
+    },
+    async cabecalho() {
+      return serializador.cabecalho()
+    },
+    encerrar() {},
+  }
+}
+
+function serializadorWorker(colunas: string[], contexto: ExportContexto): Serializador | null {
+  if (typeof Worker === 'undefined') return null
+  let worker: Worker
+  try {
+    worker = new Worker(new URL('../workers/export.worker.ts', import.meta.url), { type: 'module' })
+  } catch (error) {
+    console.warn('Worker de exportação indisponível, serializando na main thread:', error)
+    return null
+  }
+
+  // Um pedido por vez: a exportação aguarda cada lote antes de enviar o próximo
+  let pendente: { resolve: (m: ExportWorkerResponse) => void; reject: (e: Error) => void } | null = null
+  const responder = (fn: (p: NonNullable<typeof pendente>) => void) => {
+    const atual = pendente
+    pendente = null
+    if (atual) fn(atual)
+  }
+  worker.onmessage = (event: MessageEvent<ExportWorkerResponse>) => {
+    const message = event.data
+    if (message.type === 'error') responder((p) => p.reject(new Error(message.message)))
+    else responder((p) => p.resolve(message))
+  }
+  worker.onerror = (event) => {
+    event.preventDefault()
+    responder((p) => p.reject(new Error(event.message || 'Falha no worker de exportação')))
+  }
+
+  const pedir = (message: ExportWorkerRequest) =>
+    new Promise<ExportWorkerResponse>((resolve, reject) => {
+      pendente = { resolve, reject }
+      worker.postMessage(message)
+    })
+
+  const inicio: ExportWorkerRequest = { type: 'inicio', colunas, contexto }
+  worker.postMessage(inicio)
+  let loteId = 0
+
+  return {
+    async lote(lancamentos) {
+      const resposta = await pedir({ type: 'lote', loteId: ++loteId, lancamentos })
+      if (resposta.type !== 'parte') throw new Error('Resposta inesperada do worker de exportação')
+      return { csv: resposta.csv, linhas: resposta.linhas }
+    },
+    async cabecalho() {
+      const resposta = await pedir({ type: 'fim' })
+      if (resposta.type !== 'cabecalho') throw new Error('Resposta inesperada do worker de exportação')
+      return resposta.csv
+    },
+    encerrar() {
+      worker.terminate()
+      responder((p) => p.reject(new DOMException('Operação cancelada', 'AbortError')))
+    },
+  }
+}
+
+interface ExportarLancamentosCSVOpcoes {
+  filtros: LancamentosFiltroChave
+  /** Cabeçalho inicial (colunasExportacao dos schemas do filtro) */
+  colunas: string[]
+  contexto: ExportContexto
+  maxLinhas: number
+  signal: AbortSignal
+  onProgresso?: (progresso: ProgressoExportacao) => void
+}
+
+/**
+ * Exporta os lançamentos do filtro. Retorna as partes do CSV (cabeçalho primeiro,
+ * para downloadCSVParts) e a quantidade de linhas geradas. Lança AbortError se
+ * o signal for abortado.
+ */
+export async function exportarLancamentosCSV({
+  filtros,
+  colunas,
+  contexto,
+  maxLinhas,
+  signal,
+  onProgresso,
+}: ExportarLancamentosCSVOpcoes): Promise<{ partes: string[]; linhas: number }> {
+  const total = Math.min(await contarLancamentos(filtros, signal), maxLinhas)
+  onProgresso?.({ processados: 0, total })
+
+  const serializador = serializadorWorker(colunas, contexto) ?? serializadorLocal(colunas, contexto)
+  const abortar = () => serializador.encerrar()
+  signal.addEventListener('abort', abortar)
+
+  try {
+    const partes: string[] = []
+    let linhas = 0
+    let processados = 0
+    await percorrerLancamentosEmFaixas<Lancamento>({
+      select: '*',
+      filtros,
+      maxLinhas,
+      signal,
+      onLote: async (lancamentos) => {
+        const parte = await serializador.lote(lancamentos)
+        if (parte.csv) partes.push(parte.csv)
+        linhas += parte.linhas
+        processados += lancamentos.length
+        onProgresso?.({ processados, total: Math.max(total, processados) })
+      },
+    })
+    if (linhas === 0) return { partes: [], linhas: 0 }
+    return { partes: [await serializador.cabecalho(), ...partes], linhas }
+  } finally {
+    signal.removeEventListener('abort', abortar)
+    serializador.encerrar()
+  }
+}
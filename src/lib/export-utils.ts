@@ -4,6 +4,8 @@
  * para formato tabular compatível com Excel (UTF-8 BOM).
  */
 
+import { getLancamentoAutorDisplayName } from './lancamento-autor-display'
+import { normalizarLancamento, hhmmParaSegundos, ehCampoDuracaoNumerica, type ListaConteudo } from './lancamento-normalizado'
 import type { Database } from './database.types'
 
 type Lancamento = Database['public']['Tables']['lancamentos']['Row']
@@ -43,6 +45,9 @@ function toExportValue(value: unknown): string | number {
   return String(value).trim()
 }
 
+/** Listas desdobradas em linhas, na ordem de prioridade (a primeira presente vence) */
+const LISTAS_EXPORTACAO: ListaConteudo[] = ['avaliados', 'participantes', 'afericoes', 'colaboradores', 'inspecoes']
+
 /**
  * Achata (flatten) um lançamento em uma ou mais linhas CSV.
  * Indicadores com listas (Grupo B): cada item vira uma linha; cabeçalho repetido em todas.
@@ -54,7 +59,9 @@ export function flattenLancamento(
   baseName: string,
   equipeName: string
 ): FlattenedRow[] {
-  const conteudo = lancamento.conteudo as Record<string, any>
+  // Sem cache: a exportação em partes passa por cada lançamento uma única vez
+  const normalizado = normalizarLancamento(lancamento, false)
+  const conteudo = normalizado.conteudo as Record<string, any>
   const schemaType = indicador.schema_type
 
   const baseRow: FlattenedRow = {
@@ -68,28 +75,17 @@ export function flattenLancamento(
     indicador_tipo: schemaType,
   }
 
-  const hasArray =
-    Array.isArray(conteudo?.avaliados) ||
-    Array.isArray(conteudo?.participantes) ||
-    Array.isArray(conteudo?.afericoes) ||
-    Array.isArray(conteudo?.colaboradores) ||
-    Array.isArray(conteudo?.inspecoes)
-
-  if (hasArray) {
-    let arrayKey = 'avaliados'
-    if (conteudo?.avaliados) arrayKey = 'avaliados'
-    else if (conteudo?.participantes) arrayKey = 'participantes'
-    else if (conteudo?.afericoes) arrayKey = 'afericoes'
-    else if (conteudo?.colaboradores) arrayKey = 'colaboradores'
-    else if (conteudo?.inspecoes) arrayKey = 'inspecoes'
+  const arrayKey = LISTAS_EXPORTACAO.find((key) => normalizado.listas[key])
 
-    const items = conteudo[arrayKey] as Array<Record<string, any>>
+  if (arrayKey) {
+    const items = normalizado.listas[arrayKey] ?? []
 
-    if (!items || items.length === 0) {
+    if (items.length === 0) {
       return [flattenConteudo(baseRow, conteudo, schemaType)]
     }
 
-    return items.map((item) => {
+    return items.map(({ dados }) => {
+      const item = dados as Record<string, any>
       const row = { ...baseRow } as FlattenedRow
 
       switch (schemaType) {
@@ -154,7 +150,7 @@ export function flattenLancamento(
         default:
           Object.keys(item).forEach((key) => {
             const value = item[key]
-            if (value !== null && value !== undefined) {
+            if (value !== null && value !== undefined && !ehCampoDuracaoNumerica(key)) {
               row[key] = toExportValue(value) as string | number
             }
           })
@@ -259,7 +255,7 @@ function flattenConteudo(
     default:
       Object.keys(conteudo).forEach((key) => {
         const value = conteudo[key]
-        if (value !== null && value !== undefined && !Array.isArray(value)) {
+        if (value !== null && value !== undefined && !Array.isArray(value) && !ehCampoDuracaoNumerica(key)) {
           row[key] = toExportValue(value) as string | number
         }
       })
@@ -268,6 +264,21 @@ function flattenConteudo(
   return row
 }
 
+function serializeRow(row: FlattenedRow, headers: string[]): string {
+  return headers
+    .map((key) => {
+      const value = row[key]
+      const str = value !== null && value !== undefined ? String(value).trim() : ''
+      const formatted = formatCellForCSV(str, key)
+      return escapeCSVValue(formatted)
+    })
+    .join(',')
+}
+
+function serializeHeader(headers: string[]): string {
+  return headers.map((key) => escapeCSVValue(capitalizeForExport(String(key)))).join(',')
+}
+
 /**
  * Converte array de linhas achatadas em string CSV
  */
@@ -278,19 +289,124 @@ export function convertToCSV(rows: FlattenedRow[]): string {
   rows.forEach((row) => Object.keys(row).forEach((key) => allKeys.add(key)))
   const headers = Array.from(allKeys).sort()
 
-  const headerRow = headers.map((key) => escapeCSVValue(capitalizeForExport(String(key)))).join(',')
-  const dataRows = rows.map((row) =>
-    headers
-      .map((key) => {
-        const value = row[key]
-        const str = value !== null && value !== undefined ? String(value).trim() : ''
-        const formatted = formatCellForCSV(str, key)
-        return escapeCSVValue(formatted)
-      })
-      .join(',')
-  )
+  return [serializeHeader(headers), ...rows.map((row) => serializeRow(row, headers))].join('\n')
+}
 
-  return [headerRow, ...dataRows].join('\n')
+// --- Exportação em partes (streaming) ---
+
+/** Colunas comuns a todas as linhas (baseRow de flattenLancamento) */
+const COLUNAS_BASE = [
+  'id',
+  'data_hora_registro',
+  'data_referencia',
+  'usuario',
+  'base',
+  'equipe',
+  'indicador',
+  'indicador_tipo',
+]
+
+/** Colunas que flattenLancamento/flattenConteudo geram para cada schema_type conhecido */
+const COLUNAS_POR_SCHEMA: Record<string, string[]> = {
+  taf: ['nome', 'idade', 'tempo', 'status', 'nota'],
+  prova_teorica: ['nome', 'nota', 'status'],
+  treinamento: ['nome', 'horas', 'temas_ptr'],
+  ptr_ba_extras: ['nome', 'horas'],
+  inspecao_viaturas: ['viatura', 'qtd_inspecoes', 'qtd_itens_inspecionados', 'qtd_itens_nao_conforme'],
+  tempo_tp_epr: ['nome', 'tempo', 'status', 'tempo_medio'],
+  tempo_resposta: ['viatura', 'motorista', 'local', 'tempo'],
+  exercicio_posicionamento: ['viatura', 'motorista', 'local', 'tempo'],
+  controle_epi: ['nome', 'epi_entregue', 'epi_previsto', 'unif_entregue', 'unif_previsto', 'total_epi_pct', 'total_unif_pct'],
+  ocorrencia_aero: ['local', 'acao', 'hora_acionamento', 'tempo_chegada_1_cci', 'tempo_chegada_ult_cci', 'termino_ocorrencia'],
+  ocorrencia_nao_aero: ['tipo_ocorrencia', 'observacoes', 'local', 'hora_acionamento', 'hora_chegada', 'hora_termino', 'duracao_total'],
+  atividades_acessorias: ['tipo_atividade', 'qtd_bombeiros', 'tempo_gasto', 'qtd_equipamentos'],
+  estoque: [
+    'po_quimico_quantidade_linha',
+    'po_quimico_cat_aerodromo',
+    'po_quimico_exigido',
+    'po_quimico_quantidade_estoque_reserva_tecnica',
+    'lge_quantidade_linha',
+    'lge_exigido',
+    'lge_quantidade_estoque_reserva_tecnica',
+    'nitrogenio_quantidade_linha',
+    'nitrogenio_exigido',
+    'nitrogenio_quantidade_estoque_reserva_tecnica',
+  ],
+  controle_trocas: ['qtd_trocas'],
+  verificacao_tp: ['qtd_conformes', 'qtd_verificados', 'qtd_total_equipe'],
+  higienizacao_tp: ['qtd_higienizados_mes', 'qtd_total_sci'],
+}
+
+/**
+ * Cabeçalho derivado dos schemas exportados (mesma ordem alfabética de convertToCSV),
+ * conhecido antes de ler os dados.
+ */
+export function colunasExportacao(schemaTypes: Iterable<string>): string[] {
+  const colunas = new Set(COLUNAS_BASE)
+  for (const schemaType of schemaTypes) {
+    COLUNAS_POR_SCHEMA[schemaType]?.forEach((coluna) => colunas.add(coluna))
+  }
+  return Array.from(colunas).sort()
+}
+
+/**
+ * Serializador CSV incremental: cada chamada de serializar() devolve só as linhas
+ * daquele lote (terminadas em \n). Chaves fora de colunasIniciais (schemas sem
+ * mapeamento, ramo default) entram no fim do cabeçalho; linhas anteriores ficam
+ * com essas células vazias. cabecalho() é gerado no fim e vai como primeira parte.
+ */
+export function criarCsvIncremental(colunasIniciais: string[]) {
+  const headers = [...colunasIniciais]
+  const conhecidas = new Set(headers)
+
+  return {
+    serializar(rows: FlattenedRow[]): string {
+      let csv = ''
+      for (const row of rows) {
+        for (const key of Object.keys(row)) {
+          if (conhecidas.has(key)) continue
+          conhecidas.add(key)
+          headers.push(key)
+        }
+        csv += serializeRow(row, headers) + '\n'
+      }
+      return csv
+    },
+    cabecalho: () => serializeHeader(headers) + '\n',
+  }
+}
+
+/** Nomes e configurações usados para achatar lançamentos fora do componente (worker) */
+export interface ExportContexto {
+  indicadores: Indicador[]
+  bases: Array<[string, string]>
+  equipes: Array<[string, string]>
+  profiles: Array<[string, string]>
+}
+
+/** flattenLancamento + serialização incremental, lote a lote (export.worker ou main thread) */
+export function criarSerializadorLancamentos(colunasIniciais: string[], contexto: ExportContexto) {
+  const indicadoresMap = new Map(contexto.indicadores.map((ind) => [ind.id, ind]))
+  const basesMap = new Map(contexto.bases)
+  const equipesMap = new Map(contexto.equipes)
+  const profilesMap = new Map(contexto.profiles)
+  const csv = criarCsvIncremental(colunasIniciais)
+
+  return {
+    lote(lancamentos: Lancamento[]): { csv: string; linhas: number } {
+      const rows: FlattenedRow[] = []
+      for (const lancamento of lancamentos) {
+        const indicador = indicadoresMap.get(lancamento.indicador_id)
+        if (!indicador) continue
+        const userName = getLancamentoAutorDisplayName(lancamento, profilesMap)
+        const baseName = basesMap.get(lancamento.base_id) || lancamento.base_id
+        const equipeName = equipesMap.get(lancamento.equipe_id) || lancamento.equipe_id
+        for (const row of flattenLancamento(lancamento, indicador, userName, baseName, equipeName)) rows.push(row)
+      }
+      return { csv: csv.serializar(rows), linhas: rows.length }
+    },
+    cabecalho: csv.cabecalho,
+  }
 }
 
 /** Padrão hora (HH:mm ou MM:SS) — envolver em aspas no CSV para Excel preservar dois pontos */
@@ -313,7 +429,12 @@ function escapeCSVValue(value: string): string {
  * Download do CSV com UTF-8 BOM para Excel reconhecer acentos e caracteres especiais
  */
 export function downloadCSV(csvContent: string, filename: string): void {
-  const blob = new Blob(['\ufeff' + csvContent], { type: 'text/csv;charset=utf-8;' })
+  downloadCSVParts([csvContent], filename)
+}
+
+/** Download de um CSV montado em partes (sem concatenar numa string única) */
+export function downloadCSVParts(parts: BlobPart[], filename: string): void {
+  const blob = new Blob(['\ufeff', ...parts], { type: 'text/csv;charset=utf-8;' })
   const link = document.createElement('a')
   const url = URL.createObjectURL(blob)
   link.setAttribute('href', url)
@@ -355,13 +476,7 @@ export interface TreinamentoConsolidadoRow {
 
 /** Converte string "HH:mm" em minutos totais */
 export function hhmmToMinutes(hhmm: string): number {
-  const trimmed = String(hhmm ?? '').trim()
-  if (!trimmed) return 0
-  const parts = trimmed.split(':')
-  const h = parseInt(parts[0], 10)
-  const m = parts.length > 1 ? parseInt(parts[1], 10) : 0
-  if (Number.isNaN(h) || Number.isNaN(m)) return 0
-  return h * 60 + m
+  return (hhmmParaSegundos(hhmm) ?? 0) / 60
 }
 
 /** Converte minutos totais em string "HH:mm" */
@@ -391,73 +506,84 @@ export function buildTreinamentoConsolidadoRows(
   lancamentos: Lancamento[],
   basesMap: Map<string, string>
 ): TreinamentoConsolidadoRow[] {
+  const consolidado = criarConsolidadoTreinamento(basesMap)
+  consolidado.adicionar(lancamentos)
+  return consolidado.linhas()
+}
+
+/**
+ * Versão incremental de buildTreinamentoConsolidadoRows: adicionar() recebe os
+ * lançamentos lote a lote (exportação em partes) e só os totais ficam em memória.
+ */
+export function criarConsolidadoTreinamento(basesMap: Map<string, string>) {
   type Key = string
   const sumMinutes = new Map<Key, number>()
   const countPlantoes = new Map<Key, number>()
   const keyToMeta = new Map<Key, { base: string; nomeColaborador: string; year: number; month: number }>()
 
-  for (const lancamento of lancamentos) {
-    const conteudo = lancamento.conteudo as Record<string, unknown> | null
-    const participantes = Array.isArray(conteudo?.participantes) ? conteudo.participantes as Array<{ nome?: string; horas?: string }> : []
-    const baseName = basesMap.get(lancamento.base_id) ?? lancamento.base_id
+  const adicionar = (lancamentos: Lancamento[]) => {
+    for (const lancamento of lancamentos) {
+      const { listas, mes } = normalizarLancamento(lancamento, false)
+      const baseName = basesMap.get(lancamento.base_id) ?? lancamento.base_id
 
-    const ref = lancamento.data_referencia
-    if (!ref) continue
-    const [yStr, mStr] = ref.split('-')
-    const year = parseInt(yStr, 10)
-    const month = parseInt(mStr, 10)
-    if (Number.isNaN(year) || Number.isNaN(month)) continue
+      if (!mes) continue
+      const [year, month] = mes.split('-').map(Number)
 
-    for (const p of participantes) {
-      const nome = String((p as any).nome ?? '').trim()
-      if (!nome) continue
-      const horasNew = (p as any).total_dia
-      const horasOld = (p as any).horas
-      const minutos = hhmmToMinutes(typeof horasNew === 'string' ? horasNew : typeof horasOld === 'string' ? horasOld : '')
-      if (minutos === 0) continue
+      for (const { dados: p, segundos } of listas.participantes ?? []) {
+        const nome = String(p.nome ?? '').trim()
+        if (!nome) continue
+        const segundosDia =
+          typeof p.total_dia === 'string' ? segundos.total_dia : typeof p.horas === 'string' ? segundos.horas : undefined
+        const minutos = (segundosDia ?? 0) / 60
+        if (minutos === 0) continue
 
-      const key: Key = `${year}-${String(month).padStart(2, '0')}|${baseName}|${nome}`
+        const key: Key = `${mes}|${baseName}|${nome}`
 
-      sumMinutes.set(key, (sumMinutes.get(key) ?? 0) + minutos)
-      countPlantoes.set(key, (countPlantoes.get(key) ?? 0) + 1)
-      if (!keyToMeta.has(key)) {
-        keyToMeta.set(key, { base: baseName, nomeColaborador: nome, year, month })
+        sumMinutes.set(key, (sumMinutes.get(key) ?? 0) + minutos)
+        countPlantoes.set(key, (countPlantoes.get(key) ?? 0) + 1)
+        if (!keyToMeta.has(key)) {
+          keyToMeta.set(key, { base: baseName, nomeColaborador: nome, year, month })
+        }
       }
     }
   }
 
-  const rows: TreinamentoConsolidadoRow[] = []
-  for (const key of sumMinutes.keys()) {
-    const totalMin = sumMinutes.get(key) ?? 0
-    const qtd = countPlantoes.get(key) ?? 0
-    const meta = keyToMeta.get(key)
-    if (!meta) continue
-
-    const dataReferencia = getLastDayOfMonthFormatted(meta.year, meta.month)
-    const cargaHorariaTotal = minutesToHHmm(totalMin)
-    const statusCompliance = totalMin >= COMPLIANCE_MINUTES ? 'CONFORME' : 'PENDENTE'
-
-    rows.push({
-      dataReferencia,
-      base: meta.base,
-      nomeColaborador: meta.nomeColaborador,
-      cargaHorariaTotal,
-      statusCompliance,
-      qtdPlantoes: qtd,
+  const linhas = (): TreinamentoConsolidadoRow[] => {
+    const rows: TreinamentoConsolidadoRow[] = []
+    for (const key of sumMinutes.keys()) {
+      const totalMin = sumMinutes.get(key) ?? 0
+      const qtd = countPlantoes.get(key) ?? 0
+      const meta = keyToMeta.get(key)
+      if (!meta) continue
+
+      const dataReferencia = getLastDayOfMonthFormatted(meta.year, meta.month)
+      const cargaHorariaTotal = minutesToHHmm(totalMin)
+      const statusCompliance = totalMin >= COMPLIANCE_MINUTES ? 'CONFORME' : 'PENDENTE'
+
+      rows.push({
+        dataReferencia,
+        base: meta.base,
+        nomeColaborador: meta.nomeColaborador,
+        cargaHorariaTotal,
+        statusCompliance,
+        qtdPlantoes: qtd,
+      })
+    }
+
+    rows.sort((a, b) => {
+      const da = a.dataReferencia.split('/')
+      const db = b.dataReferencia.split('/')
+      const dateA = `${da[2]}-${da[1]}-${da[0]}`
+      const dateB = `${db[2]}-${db[1]}-${db[0]}`
+      if (dateA !== dateB) return dateA.localeCompare(dateB)
+      if (a.base !== b.base) return a.base.localeCompare(b.base)
+      return a.nomeColaborador.localeCompare(b.nomeColaborador)
     })
-  }
 
-  rows.sort((a, b) => {
-    const da = a.dataReferencia.split('/')
-    const db = b.dataReferencia.split('/')
-    const dateA = `${da[2]}-${da[1]}-${da[0]}`
-    const dateB = `${db[2]}-${db[1]}-${db[0]}`
-    if (dateA !== dateB) return dateA.localeCompare(dateB)
-    if (a.base !== b.base) return a.base.localeCompare(b.base)
-    return a.nomeColaborador.localeCompare(b.nomeColaborador)
-  })
+    return rows
+  }
 
-  return rows
+  return { adicionar, linhas }
 }
 
 /**
@@ -552,16 +678,19 @@ export function buildTreinamentoGranularRows(
     }
   }
 
-  rows.sort((a, b) => {
-    const dateCmp = a.data.split('/').reverse().join('').localeCompare(b.data.split('/').reverse().join(''))
-    if (dateCmp !== 0) return dateCmp
-    if (a.base !== b.base) return a.base.localeCompare(b.base)
-    return a.colaborador.localeCompare(b.colaborador)
-  })
+  rows.sort(compararTreinamentoGranular)
 
   return rows
 }
 
+/** Ordem do relatório detalhado: data, base, colaborador (para juntar lotes da exportação em partes) */
+export function compararTreinamentoGranular(a: TreinamentoGranularRow, b: TreinamentoGranularRow): number {
+  const dateCmp = a.data.split('/').reverse().join('').localeCompare(b.data.split('/').reverse().join(''))
+  if (dateCmp !== 0) return dateCmp
+  if (a.base !== b.base) return a.base.localeCompare(b.base)
+  return a.colaborador.localeCompare(b.colaborador)
+}
+
 /**
  * Gera o conteúdo CSV: Data, Base, Equipe, Colaborador, Tema 1, Tema 2, Tema 3, ... (nome do PTR aplicado no dia), Total de horas.
  */
@@ -1,4 +1,5 @@
 import type { Database } from '@/lib/database.types'
+import { normalizarLancamento, segundosTotalDia } from '@/lib/lancamento-normalizado'
 import type { BadgeProps } from '@/components/ui/badge'
 
 type Lancamento = Database['public']['Tables']['lancamentos']['Row']
@@ -43,8 +44,10 @@ export function getResumoLancamento(
   lancamento: Lancamento,
   indicador: Indicador | undefined
 ): string {
-  const conteudo = lancamento.conteudo as Record<string, any>
-  if (!conteudo) return 'Sem informações'
+  if (!lancamento.conteudo) return 'Sem informações'
+  // Normalizado uma vez por versão do lançamento (a tabela re-renderiza as linhas ao rolar)
+  const normalizado = normalizarLancamento(lancamento)
+  const conteudo = normalizado.conteudo as Record<string, any>
 
   const schemaType = indicador?.schema_type
 
@@ -77,17 +80,10 @@ export function getResumoLancamento(
       return 'Prova Teórica registrada'
 
     case 'treinamento':
-      if (Array.isArray(conteudo.participantes)) {
-        const count = conteudo.participantes.length
-        const totalMin = conteudo.participantes.reduce((sum: number, p: any) => {
-          const h = p.total_dia || p.horas
-          if (typeof h === 'string' && /^\d{1,2}:\d{2}$/.test(h)) {
-            const [hh, mm] = h.split(':').map(Number)
-            return sum + (hh || 0) * 60 + (mm || 0)
-          }
-          return sum
-        }, 0)
-        const horas = Math.floor(totalMin / 60)
+      if (normalizado.listas.participantes) {
+        const count = normalizado.listas.participantes.length
+        const totalSeg = normalizado.listas.participantes.reduce((sum, p) => sum + segundosTotalDia(p), 0)
+        const horas = Math.floor(totalSeg / 3600)
         return `${count} ${count === 1 ? 'colaborador' : 'colaboradores'} - ${horas}h`
       }
       return 'Treinamento registrado'
@@ -0,0 +1,178 @@
+/**
+ * Armazenamento local em IndexedDB (banco "medmais-cache"):
+ *   - "entradas": chave/valor (dados de referência, metadados de sincronização);
+ *   - "lancamentos": um registro por lançamento, agrupado por escopo
+ *     (usuário + base), usado pela sincronização incremental.
+ * Todas as funções falham em silêncio (retornam undefined / não gravam) quando
+ * o IndexedDB não existe ou está bloqueado (ex.: navegação privada): o cache é
+ * só uma otimização, a fonte de verdade continua sendo o Supabase.
+ */
+
+const DB_NAME = 'medmais-cache'
+const DB_VERSION = 2
+const STORE = 'entradas'
+
+/** Stores com registros agrupados por escopo (chave [escopo, id]) */
+export type ScopedStore = 'lancamentos'
+const SCOPED_STORES: ScopedStore[] = ['lancamentos']
+
+interface ScopedRecord<T> {
+  escopo: string
+  id: string
+  valor: T
+}
+
+let dbPromise: Promise<IDBDatabase | null> | null = null
+
+function openDb(): Promise<IDBDatabase | null> {
+  if (dbPromise) return dbPromise
+  dbPromise = new Promise((resolve) => {
+    if (typeof indexedDB === 'undefined') {
+      resolve(null)
+      return
+    }
+    try {
+      const request = indexedDB.open(DB_NAME, DB_VERSION)
+      request.onupgradeneeded = () => {
+        const db = request.result
+        if (!db.objectStoreNames.contains(STORE)) {
+          db.createObjectStore(STORE)
+        }
+        for (const store of SCOPED_STORES) {
+          if (!db.objectStoreNames.contains(store)) {
+            db.createObjectStore(store, { keyPath: ['escopo', 'id'] }).createIndex('escopo', 'escopo')
+          }
+        }
+      }
+      request.onsuccess = () => resolve(request.result)
+      request.onerror = () => resolve(null)
+      request.onblocked = () => resolve(null)
+    } catch {
+      resolve(null)
+    }
+  })
+  return dbPromise
+}
+
+function requestToPromise<T>(request: IDBRequest<T>): Promise<T> {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result)
+    request.onerror = () => reject(request.error)
+  })
+}
+
+export async function idbGet<T>(key: string): Promise<T | undefined> {
+  const db = await openDb()
+  if (!db) return undefined
+  try {
+    return (await requestToPromise(db.transaction(STORE, 'readonly').objectStore(STORE).get(key))) as T | undefined
+  } catch {
+    return undefined
+  }
+}
+
+export async function idbSet(key: string, value: unknown): Promise<void> {
+  const db = await openDb()
+  if (!db) return
+  try {
+    await requestToPromise(db.transaction(STORE, 'readwrite').objectStore(STORE).put(value, key))
+  } catch {
+    // Cota excedida / banco fechado: segue sem cache
+  }
+}
+
+/** Remove todas as chaves que começam com o prefixo. */
+export async function idbDeleteByPrefix(prefix: string): Promise<void> {
+  const db = await openDb()
+  if (!db) return
+  try {
+    // '\uffff' fecha o intervalo: todas as chaves string com esse prefixo
+    const range = IDBKeyRange.bound(prefix, prefix + '\uffff')
+    await requestToPromise(db.transaction(STORE, 'readwrite').objectStore(STORE).delete(range))
+  } catch {
+    // Ignora: entradas antigas são descartadas pela verificação de versão
+  }
+}
+
+function transactionDone(tx: IDBTransaction): Promise<void> {
+  return new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve()
+    tx.onerror = () => reject(tx.error)
+    tx.onabort = () => reject(tx.error)
+  })
+}
+
+/** Indica se o IndexedDB está utilizável (para decidir entre leitura local e rede) */
+export async function idbDisponivel(): Promise<boolean> {
+  return (await openDb()) !== null
+}
+
+/** Todos os valores de um escopo; undefined se o IndexedDB não estiver disponível */
+export async function idbScopedGetAll<T>(store: ScopedStore, escopo: string): Promise<T[] | undefined> {
+  const db = await openDb()
+  if (!db) return undefined
+  try {
+    const registros = (await requestToPromise(
+      db.transaction(store, 'readonly').objectStore(store).index('escopo').getAll(escopo)
+    )) as ScopedRecord<T>[]
+    return registros.map((r) => r.valor)
+  } catch {
+    return undefined
+  }
+}
+
+/**
+ * Aplica exclusões e gravações num escopo em uma única transação.
+ * substituir: apaga o escopo inteiro antes de gravar (carga completa).
+ * manter: se informado, remove do escopo os valores que não passam no filtro.
+ * Retorna false se nada pôde ser gravado.
+ */
+export async function idbScopedApply<T extends { id: string }>(
+  store: ScopedStore,
+  escopo: string,
+  {
+    gravar = [],
+    excluirIds = [],
+    substituir = false,
+    manter,
+  }: { gravar?: T[]; excluirIds?: string[]; substituir?: boolean; manter?: (valor: T) => boolean }
+): Promise<boolean> {
+  const db = await openDb()
+  if (!db) return false
+  try {
+    const tx = db.transaction(store, 'readwrite')
+    const objectStore = tx.objectStore(store)
+    if (substituir) {
+      objectStore.delete(IDBKeyRange.bound([escopo], [escopo, []]))
+    } else if (manter) {
+      const cursorRequest = objectStore.index('escopo').openCursor(escopo)
+      cursorRequest.onsuccess = () => {
+        const cursor = cursorRequest.result
+        if (!cursor) return
+        if (!manter((cursor.value as ScopedRecord<T>).valor)) cursor.delete()
+        cursor.continue()
+      }
+    }
+    for (const id of excluirIds) objectStore.delete([escopo, id])
+    for (const valor of gravar) {
+      const registro: ScopedRecord<T> = { escopo, id: valor.id, valor }
+      objectStore.put(registro)
+    }
+    await transactionDone(tx)
+    return true
+  } catch {
+    return false
+  }
+}
+
+/** Remove os registros de todos os escopos que começam com o prefixo */
+export async function idbScopedDeleteByPrefix(store: ScopedStore, prefix: string): Promise<void> {
+  const db = await openDb()
+  if (!db) return
+  try {
+    const range = IDBKeyRange.bound([prefix], [prefix + '\uffff'])
+    await requestToPromise(db.transaction(store, 'readwrite').objectStore(store).delete(range))
+  } catch {
+    // Ignora: próxima sincronização recarrega o escopo
+  }
+}
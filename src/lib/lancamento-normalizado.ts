@@ -0,0 +1,214 @@
+import type { Database } from './database.types'
+
+type Lancamento = Database['public']['Tables']['lancamentos']['Row']
+
+/**
+ * Lançamento normalizado: o `conteudo` JSONB lido uma única vez, com chave de mês
+ * pronta, durações em segundos inteiros e os itens das listas já expandidos.
+ * Analytics (analytics-utils), exportação (export-utils) e histórico (history-utils)
+ * consomem este registro em vez de reparsear strings ("02:02", "08:00") e datas.
+ *
+ * Cada tempo é gravado também como inteiro ao lado da string (comDuracoesNumericas no
+ * useLancamento e trigger trg_lancamentos_duracoes, migration 049): "tempo" ganha
+ * "tempo_seg" (segundos) e "total_dia" ganha "total_dia_min" (minutos). A
+ * normalização usa esses inteiros e só converte a string quando eles faltam.
+ *
+ * normalizarLancamento guarda o resultado por id + updated_at: um lançamento
+ * inalterado não é renormalizado quando chega em outro array (refetch, novo
+ * dataset no analytics.worker, patch do realtime). A exportação em partes usa
+ * normalizarLancamento(l, false) para não reter as linhas já gravadas.
+ */
+
+/** Listas do conteúdo expandidas em itens */
+export const LISTAS_CONTEUDO = ['avaliados', 'participantes', 'afericoes', 'colaboradores', 'inspecoes', 'atividades'] as const
+export type ListaConteudo = (typeof LISTAS_CONTEUDO)[number]
+
+/** Formato de cada campo de tempo do conteúdo (na raiz ou nos itens das listas) */
+const CAMPOS_TEMPO: Record<string, 'mm:ss' | 'hh:mm'> = {
+  tempo: 'mm:ss',
+  tempo_chegada_1_cci: 'mm:ss',
+  tempo_chegada_ult_cci: 'mm:ss',
+  tempo_medio: 'mm:ss',
+  hora_acionamento: 'hh:mm',
+  hora_chegada: 'hh:mm',
+  hora_termino: 'hh:mm',
+  termino_ocorrencia: 'hh:mm',
+  duracao_total: 'hh:mm',
+  horas: 'hh:mm',
+  total_dia: 'hh:mm',
+  tempo_gasto: 'hh:mm',
+}
+
+/** Campo numérico gravado ao lado de cada tempo: segundos (mm:ss) ou minutos (hh:mm) */
+const SUFIXO_NUMERICO = { 'mm:ss': '_seg', 'hh:mm': '_min' } as const
+
+const CAMPOS_NUMERICOS = new Set(Object.keys(CAMPOS_TEMPO).map((campo) => campoNumerico(campo)))
+
+function campoNumerico(campo: string): string {
+  return campo + SUFIXO_NUMERICO[CAMPOS_TEMPO[campo]]
+}
+
+/** Chave de um campo numérico derivado de tempo (ex.: tempo_seg), fora das colunas exportadas */
+export function ehCampoDuracaoNumerica(chave: string): boolean {
+  return CAMPOS_NUMERICOS.has(chave)
+}
+
+/** Segundos por campo de tempo; campos vazios ou inválidos ficam de fora */
+export type DuracoesSegundos = Partial<Record<string, number>>
+
+export interface ItemNormalizado {
+  dados: Record<string, unknown>
+  segundos: DuracoesSegundos
+  /** nome (ou motorista) em minúsculas, para o filtro por colaborador */
+  nomeBusca: string
+}
+
+export interface LancamentoNormalizado {
+  lancamento: Lancamento
+  conteudo: Record<string, unknown>
+  /** yyyy-MM de data_referencia ('' se inválida) */
+  mes: string
+  segundos: DuracoesSegundos
+  listas: Partial<Record<ListaConteudo, ItemNormalizado[]>>
+}
+
+// Mesmas expressões de conteudo_duracao_numerica (migration 049): o inteiro que o
+// trigger grava e o que o app calcula a partir da string precisam coincidir.
+// Só dígitos (sinal ou decimal invalidam) e no máximo 6 por parte.
+const RE_MMSS = /^\s*(\d{0,6})\s*:\s*(\d{0,6})\s*(?::|$)/
+const RE_HHMM = /^\s*(\d{1,6})(?::(\d{1,6}))?/
+
+/** "mm:ss" em segundos (parte vazia vale 0: "05:" = 300); null se vazio ou inválido */
+export function mmssParaSegundos(valor: string): number | null {
+  const m = RE_MMSS.exec(String(valor ?? ''))
+  if (!m) return null
+  return Number(m[1] || 0) * 60 + Number(m[2] || 0)
+}
+
+/**
+ * "HH:mm" em segundos; null se vazio ou inválido. Lê as horas e, se vierem logo
+ * depois de ":", os minutos: "8" e "08:" valem 8 h, "1:5" vale 1 h 05, segundos
+ * extras são ignorados.
+ */
+export function hhmmParaSegundos(valor: string): number | null {
+  const m = RE_HHMM.exec(String(valor ?? ''))
+  if (!m) return null
+  return (Number(m[1]) * 60 + Number(m[2] || 0)) * 60
+}
+
+/** Intervalo entre dois horários do dia (segundos); fim menor que início = dia seguinte */
+export function intervaloSegundos(inicio: number | undefined, fim: number | undefined): number | null {
+  if (inicio === undefined || fim === undefined) return null
+  return fim >= inicio ? fim - inicio : 24 * 60 * 60 - inicio + fim
+}
+
+/** Horas do participante no dia (segundos): total_dia (atual) ou horas (legado) */
+export function segundosTotalDia({ dados, segundos }: Pick<ItemNormalizado, 'dados' | 'segundos'>): number {
+  return (dados.total_dia ? segundos.total_dia : segundos.horas) ?? 0
+}
+
+/** Chave yyyy-MM de uma data YYYY-MM-DD ('' se inválida) */
+export function mesDe(dataReferencia: string | null | undefined): string {
+  return dataReferencia && /^\d{4}-\d{2}/.test(dataReferencia) ? dataReferencia.slice(0, 7) : ''
+}
+
+function converterTempo(campo: string, valor: string): number | null {
+  return CAMPOS_TEMPO[campo] === 'mm:ss' ? mmssParaSegundos(valor) : hhmmParaSegundos(valor)
+}
+
+function duracoes(dados: Record<string, unknown>): DuracoesSegundos {
+  const segundos: DuracoesSegundos = {}
+  for (const campo in CAMPOS_TEMPO) {
+    const valor = dados[campo]
+    if (typeof valor !== 'string') continue
+    const gravado = dados[campoNumerico(campo)]
+    // Inteiro gravado (migration 049) dispensa a conversão da string
+    const s =
+      typeof gravado === 'number' && Number.isFinite(gravado)
+        ? gravado * (CAMPOS_TEMPO[campo] === 'mm:ss' ? 1 : 60)
+        : converterTempo(campo, valor)
+    if (s !== null) segundos[campo] = s
+  }
+  return segundos
+}
+
+/** Cópia do objeto com os campos numéricos refeitos a partir das strings de tempo */
+function gravarDuracoes(dados: Record<string, unknown>): Record<string, unknown> {
+  const resultado = { ...dados }
+  for (const campo in CAMPOS_TEMPO) {
+    const chave = campoNumerico(campo)
+    delete resultado[chave]
+    const valor = dados[campo]
+    if (typeof valor !== 'string') continue
+    const s = converterTempo(campo, valor)
+    if (s !== null) resultado[chave] = Math.round(CAMPOS_TEMPO[campo] === 'mm:ss' ? s : s / 60)
+  }
+  return resultado
+}
+
+const ehObjeto = (valor: unknown): valor is Record<string, unknown> =>
+  !!valor && typeof valor === 'object' && !Array.isArray(valor)
+
+/**
+ * Conteúdo pronto para gravar: cada tempo (na raiz e nos itens das listas) ganha o
+ * inteiro correspondente (tempo -> tempo_seg, horas -> horas_min); inteiros de
+ * tempos apagados ou inválidos são removidos. Mesma regra da migration 049
+ * (mmssParaSegundos / hhmmParaSegundos reproduzem conteudo_duracao_numerica).
+ */
+export function comDuracoesNumericas(conteudo: Record<string, unknown>): Record<string, unknown> {
+  const resultado = gravarDuracoes(conteudo)
+  for (const lista of LISTAS_CONTEUDO) {
+    const valor = resultado[lista]
+    if (Array.isArray(valor)) resultado[lista] = valor.map((item) => (ehObjeto(item) ? gravarDuracoes(item) : item))
+  }
+  return resultado
+}
+
+function normalizarItem(valor: unknown): ItemNormalizado {
+  const dados = (valor && typeof valor === 'object' ? valor : {}) as Record<string, unknown>
+  return {
+    dados,
+    segundos: duracoes(dados),
+    nomeBusca: String(dados.nome || dados.motorista || '').toLowerCase(),
+  }
+}
+
+function criarNormalizado(lancamento: Lancamento): LancamentoNormalizado {
+  const conteudo = (lancamento.conteudo && typeof lancamento.conteudo === 'object' ? lancamento.conteudo : {}) as Record<
+    string,
+    unknown
+  >
+  const listas: LancamentoNormalizado['listas'] = {}
+  for (const lista of LISTAS_CONTEUDO) {
+    const valor = conteudo[lista]
+    if (Array.isArray(valor)) listas[lista] = valor.map(normalizarItem)
+  }
+  return {
+    lancamento,
+    conteudo,
+    mes: mesDe(lancamento.data_referencia),
+    segundos: duracoes(conteudo),
+    listas,
+  }
+}
+
+// Limite do cache: acima dele, as entradas mais antigas saem primeiro
+const LIMITE_CACHE = 50000
+const cache = new Map<string, LancamentoNormalizado>()
+
+export function normalizarLancamento(lancamento: Lancamento, usarCache = true): LancamentoNormalizado {
+  // Sem updated_at (select parcial) não há como saber se a versão guardada é a mesma
+  if (!usarCache || !lancamento.updated_at) return criarNormalizado(lancamento)
+
+  const guardado = cache.get(lancamento.id)
+  if (guardado && guardado.lancamento.updated_at === lancamento.updated_at) return guardado
+
+  const normalizado = criarNormalizado(lancamento)
+  if (guardado) cache.delete(lancamento.id)
+  cache.set(lancamento.id, normalizado)
+  if (cache.size > LIMITE_CACHE) {
+    const maisAntigo = cache.keys().next().value
+    if (maisAntigo !== undefined) cache.delete(maisAntigo)
+  }
+  return normalizado
+}
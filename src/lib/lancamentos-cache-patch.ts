@@ -0,0 +1,250 @@
+import type { QueryClient } from '@tanstack/react-query'
+import { differenceInCalendarDays, format, parseISO, subDays } from 'date-fns'
+import { compararLancamentosDesc } from './lancamentos-sync'
+import type { Database } from './database.types'
+
+type Lancamento = Database['public']['Tables']['lancamentos']['Row']
+
+/**
+ * Aplica eventos realtime de lancamentos direto nos resultados em cache,
+ * em vez de invalidar (e rebaixar) todas as queries a cada gravação:
+ *   - ['lancamentos-todos', filtro, view] (lista completa do Analytics):
+ *     remove/insere/substitui as linhas conforme base, equipe, indicador e período;
+ *   - ['lancamentos', filtro, page, pageSize, cursor] (páginas do Histórico):
+ *     substitui a linha quando ela continua na mesma posição; inserção, exclusão
+ *     na página ou mudança de posição invalidam só aquela página;
+ *   - ['analytics-rpc', view, baseId, equipeId, dataInicio, dataFim, ...] e
+ *     ['analytics-resumo-executivo', baseId, equipeId, dataInicio, dataFim]:
+ *     agregados do servidor, invalidados só quando a mudança cai nos filtros
+ *     (no resumo executivo, também no período anterior que ele compara).
+ */
+
+/** Filtros das queries de lançamentos (segundo elemento da queryKey) */
+export interface LancamentosFiltroChave {
+  baseId?: string
+  equipeId?: string
+  indicadorId?: string
+  /** Classes de indicador (lancamentos.schema_type, migration 050) */
+  schemaTypes?: string[]
+  dataInicio?: string
+  dataFim?: string
+  searchText?: string
+}
+
+/** Lote consolidado de eventos: estado final de cada id */
+export interface AlteracoesLancamentos {
+  gravados: Map<string, Lancamento>
+  excluidos: Map<string, { id: string; data_referencia?: string }>
+  /** ids gravados por INSERT (sem versão anterior em nenhum filtro) */
+  inseridos: Set<string>
+}
+
+export interface EventoLancamento {
+  eventType: 'INSERT' | 'UPDATE' | 'DELETE'
+  new: Partial<Lancamento>
+  old: Partial<Lancamento>
+}
+
+const CAMPOS_OBRIGATORIOS: Array<keyof Lancamento> = [
+  'id',
+  'data_referencia',
+  'base_id',
+  'equipe_id',
+  'indicador_id',
+  'created_at',
+  'updated_at',
+  'conteudo',
+]
+
+function linhaCompleta(row: Partial<Lancamento>): row is Lancamento {
+  return CAMPOS_OBRIGATORIOS.every((campo) => row[campo] !== undefined && row[campo] !== null)
+}
+
+/**
+ * Consolida eventos na ordem de chegada (o último estado de cada id vence).
+ * Retorna null se algum evento não puder ser aplicado localmente (payload incompleto).
+ */
+export function consolidarEventos(eventos: EventoLancamento[]): AlteracoesLancamentos | null {
+  const gravados = new Map<string, Lancamento>()
+  const excluidos = new Map<string, { id: string; data_referencia?: string }>()
+  const inseridos = new Set<string>()
+
+  for (const evento of eventos) {
+    if (evento.eventType === 'DELETE') {
+      const id = evento.old?.id
+      if (!id) return null
+      gravados.delete(id)
+      inseridos.delete(id)
+      excluidos.set(id, { id, data_referencia: evento.old.data_referencia })
+    } else {
+      if (!linhaCompleta(evento.new)) return null
+      // Linha que mudou de partição chega como DELETE + INSERT: conta como alteração
+      if (evento.eventType === 'INSERT' && !excluidos.has(evento.new.id)) inseridos.add(evento.new.id)
+      excluidos.delete(evento.new.id)
+      gravados.set(evento.new.id, evento.new)
+    }
+  }
+
+  return { gravados, excluidos, inseridos }
+}
+
+export function atendeFiltro(
+  l: Pick<Lancamento, 'base_id' | 'equipe_id' | 'indicador_id' | 'schema_type' | 'data_referencia'>,
+  f: LancamentosFiltroChave
+) {
+  return (
+    (!f.baseId || l.base_id === f.baseId) &&
+    (!f.equipeId || l.equipe_id === f.equipeId) &&
+    (!f.indicadorId || l.indicador_id === f.indicadorId) &&
+    (!f.schemaTypes || f.schemaTypes.includes(l.schema_type ?? '')) &&
+    (!f.dataInicio || l.data_referencia >= f.dataInicio) &&
+    (!f.dataFim || l.data_referencia <= f.dataFim)
+  )
+}
+
+/** Exclusão pode ter afetado o filtro? (DELETE só traz id e data_referencia) */
+function exclusaoNoPeriodo(e: { data_referencia?: string }, f: LancamentosFiltroChave) {
+  if (!e.data_referencia) return true
+  return (!f.dataInicio || e.data_referencia >= f.dataInicio) && (!f.dataFim || e.data_referencia <= f.dataFim)
+}
+
+/** Alguma linha gravada ou excluída do lote cai no filtro */
+function alteracaoNoFiltro(filtro: LancamentosFiltroChave, alt: AlteracoesLancamentos) {
+  for (const l of alt.gravados.values()) if (atendeFiltro(l, filtro)) return true
+  for (const e of alt.excluidos.values()) if (exclusaoNoPeriodo(e, filtro)) return true
+  return false
+}
+
+/**
+ * Início do período anterior de mesma duração que analytics_resumo_executivo
+ * compara (migration 051): mesma quantidade de dias, terminando na véspera de dataInicio.
+ */
+function inicioComPeriodoAnterior(dataInicio?: string, dataFim?: string) {
+  if (!dataInicio) return undefined
+  const inicio = parseISO(dataInicio)
+  const dias = differenceInCalendarDays(dataFim ? parseISO(dataFim) : new Date(), inicio) + 1
+  return format(subDays(inicio, dias), 'yyyy-MM-dd')
+}
+
+function filtroDaChave(valor: unknown): LancamentosFiltroChave | null {
+  return valor && typeof valor === 'object' ? (valor as LancamentosFiltroChave) : null
+}
+
+/** Lista completa: resultado novo, ou null se nada mudou para este filtro */
+function aplicarNaLista(lista: Lancamento[], filtro: LancamentosFiltroChave, alt: AlteracoesLancamentos): Lancamento[] | null {
+  let mudou = false
+  const resultado = lista.filter((l) => {
+    const sai = alt.excluidos.has(l.id) || alt.gravados.has(l.id)
+    if (sai) mudou = true
+    return !sai
+  })
+  for (const l of alt.gravados.values()) {
+    if (atendeFiltro(l, filtro)) {
+      resultado.push(l)
+      mudou = true
+    }
+  }
+  if (!mudou) return null
+  // Mesma ordem da busca (data_referencia DESC); sort é estável
+  return resultado.sort((a, b) => b.data_referencia.localeCompare(a.data_referencia))
+}
+
+interface PaginaLancamentos {
+  data: Array<Lancamento & { profiles?: { nome: string } | null }>
+}
+
+/** Página do histórico: nova página, 'invalidar' ou null (nada a fazer) */
+function aplicarNaPagina(
+  pagina: PaginaLancamentos,
+  filtro: LancamentosFiltroChave,
+  keyset: boolean,
+  alt: AlteracoesLancamentos
+): PaginaLancamentos | 'invalidar' | null {
+  const idsNaPagina = new Set(pagina.data.map((l) => l.id))
+  const buscaTexto = (filtro.searchText?.trim().length ?? 0) >= 2
+
+  for (const l of alt.gravados.values()) {
+    if (idsNaPagina.has(l.id)) continue
+    // Linha nova no filtro (ou que entrou nele): composição da página e total mudam
+    if (atendeFiltro(l, filtro)) return 'invalidar'
+    // Offset: linha alterada fora da página pode ter saído do filtro e deslocado as páginas
+    if (!keyset && !alt.inseridos.has(l.id)) return 'invalidar'
+  }
+  for (const e of alt.excluidos.values()) {
+    if (idsNaPagina.has(e.id)) return 'invalidar'
+    // Paginação por offset desloca as páginas seguintes; keyset não
+    if (!keyset && exclusaoNoPeriodo(e, filtro)) return 'invalidar'
+  }
+
+  let mudou = false
+  const data = pagina.data.map((atual) => {
+    const novo = alt.gravados.get(atual.id)
+    if (!novo) return atual
+    mudou = true
+    return { ...novo, profiles: atual.profiles ?? null }
+  })
+  if (!mudou) return null
+
+  for (let i = 0; i < data.length; i++) {
+    const novo = data[i]
+    const atual = pagina.data[i]
+    if (novo === atual) continue
+    // Saiu do filtro, a busca por texto não pode ser conferida aqui, ou mudou de posição na ordenação
+    if (!atendeFiltro(novo, filtro) || buscaTexto || compararLancamentosDesc(novo, atual) !== 0) return 'invalidar'
+  }
+  return { ...pagina, data }
+}
+
+/**
+ * Aplica o lote em todas as queries de lançamentos em cache.
+ * Queries que não puderem ser atualizadas localmente são invalidadas individualmente.
+ */
+export function aplicarAlteracoesNoCache(queryClient: QueryClient, alt: AlteracoesLancamentos) {
+  if (alt.gravados.size === 0 && alt.excluidos.size === 0) return
+
+  for (const query of queryClient.getQueryCache().findAll({ queryKey: ['lancamentos-todos'] })) {
+    const filtro = filtroDaChave(query.queryKey[1])
+    const lista = query.state.data as Lancamento[] | undefined
+    if (!filtro) {
+      void queryClient.invalidateQueries({ queryKey: query.queryKey, exact: true })
+      continue
+    }
+    if (!lista) continue
+    const novaLista = aplicarNaLista(lista, filtro, alt)
+    if (novaLista) queryClient.setQueryData(query.queryKey, novaLista)
+  }
+
+  for (const query of queryClient.getQueryCache().findAll({ queryKey: ['lancamentos'] })) {
+    // Total estimado: só fica desatualizado (recalculado na próxima página pedida)
+    if (query.queryKey[1] === 'total-estimado') {
+      void queryClient.invalidateQueries({ queryKey: query.queryKey, exact: true, refetchType: 'none' })
+      continue
+    }
+    const filtro = filtroDaChave(query.queryKey[1])
+    const pagina = query.state.data as PaginaLancamentos | undefined
+    if (!filtro) {
+      void queryClient.invalidateQueries({ queryKey: query.queryKey, exact: true })
+      continue
+    }
+    if (!pagina) continue
+    const resultado = aplicarNaPagina(pagina, filtro, query.queryKey[4] !== undefined, alt)
+    if (resultado === 'invalidar') void queryClient.invalidateQueries({ queryKey: query.queryKey, exact: true })
+    else if (resultado) queryClient.setQueryData(query.queryKey, resultado)
+  }
+
+  // Agregados do servidor: refaz só os que cobrem alguma linha alterada
+  void queryClient.invalidateQueries({
+    queryKey: ['analytics-rpc'],
+    predicate: (query) => {
+      const [, , baseId, equipeId, dataInicio, dataFim] = query.queryKey as Array<string | undefined>
+      return alteracaoNoFiltro({ baseId, equipeId, dataInicio, dataFim }, alt)
+    },
+  })
+  void queryClient.invalidateQueries({
+    queryKey: ['analytics-resumo-executivo'],
+    predicate: (query) => {
+      const [, baseId, equipeId, dataInicio, dataFim] = query.queryKey as Array<string | undefined>
+      return alteracaoNoFiltro({ baseId, equipeId, dataInicio: inicioComPeriodoAnterior(dataInicio, dataFim), dataFim }, alt)
+    },
+  })
+}
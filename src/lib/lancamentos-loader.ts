@@ -0,0 +1,250 @@
+import { supabase } from './supabase'
+import { formatDateForStorage } from './date-utils'
+import type { LancamentosFiltroChave } from './lancamentos-cache-patch'
+
+/**
+ * Carga de "todos os lançamentos" de um filtro em faixas, em vez de um único
+ * select sem limite (que esbarra no max-rows do PostgREST e chega como um
+ * JSON gigante, sujeito ao timeout de 25 s de src/lib/supabase.ts):
+ *   1. limites: menor e maior data_referencia do filtro (2 consultas de 1 linha);
+ *   2. faixas mensais entre os limites (mesmo recorte das partições, migration 041);
+ *   3. cada faixa é lida em páginas keyset de PAGINA linhas, com até
+ *      `concorrencia` faixas em paralelo, das mais recentes para as mais antigas.
+ * O resultado sai em data_referencia DESC, id DESC. onParcial recebe o prefixo
+ * contínuo já carregado a cada faixa concluída (atualização progressiva da tela).
+ * percorrerLancamentosEmFaixas entrega as mesmas páginas uma a uma, sem acumular
+ * (exportações grandes).
+ */
+
+// Abaixo do max-rows padrão do PostgREST no Supabase (1000)
+const PAGINA = 1000
+const CONCORRENCIA_PADRAO = 4
+
+interface LinhaLancamento {
+  id: string
+  data_referencia: string
+}
+
+export interface CarregarEmFaixasOpcoes<T> {
+  /** Colunas do select (PostgREST) */
+  select: string
+  filtros: LancamentosFiltroChave
+  /** Faixas em paralelo */
+  concorrencia?: number
+  /** Para de buscar faixas mais antigas ao atingir o limite (resultado cortado nele) */
+  maxLinhas?: number
+  /** Ajuste de cada linha ao chegar, uma vez por linha (ex.: remontarConteudo das projeções) */
+  mapear?: (linha: T) => T
+  onParcial?: (linhas: T[]) => void
+  /** signal da query (TanStack Query): cancela as faixas em andamento e as que faltam */
+  signal?: AbortSignal
+}
+
+function aplicarFiltros(query: any, filtros: LancamentosFiltroChave) {
+  if (filtros.baseId) query = query.eq('base_id', filtros.baseId)
+  if (filtros.equipeId) query = query.eq('equipe_id', filtros.equipeId)
+  if (filtros.indicadorId) query = query.eq('indicador_id', filtros.indicadorId)
+  if (filtros.schemaTypes) query = query.in('schema_type', filtros.schemaTypes)
+  if (filtros.dataInicio) query = query.gte('data_referencia', filtros.dataInicio)
+  if (filtros.dataFim) query = query.lte('data_referencia', filtros.dataFim)
+  return query
+}
+
+async function limite(
+  filtros: LancamentosFiltroChave,
+  ascending: boolean,
+  signal?: AbortSignal
+): Promise<string | null> {
+  let q = aplicarFiltros(supabase.from('lancamentos').select('data_referencia'), filtros)
+    .order('data_referencia', { ascending })
+    .limit(1)
+  if (signal) q = q.abortSignal(signal)
+  const { data, error } = await q
+  if (error) throw error
+  return ((data || []) as Array<{ data_referencia: string }>)[0]?.data_referencia ?? null
+}
+
+/** Faixas mensais [inicio, fim] de maisRecente até maisAntiga (YYYY-MM-DD) */
+function faixasMensais(maisAntiga: string, maisRecente: string): Array<{ inicio: string; fim: string }> {
+  const faixas: Array<{ inicio: string; fim: string }> = []
+  const [ano, mes] = maisRecente.split('-').map(Number)
+  for (let m = mes - 1; ; m--) {
+    const inicioMes = formatDateForStorage(new Date(ano, m, 1))
+    const fimMes = formatDateForStorage(new Date(ano, m + 1, 0))
+    faixas.push({
+      inicio: inicioMes < maisAntiga ? maisAntiga : inicioMes,
+      fim: fimMes > maisRecente ? maisRecente : fimMes,
+    })
+    if (inicioMes <= maisAntiga) return faixas
+  }
+}
+
+/** Uma página da faixa, depois de `ultimo` em data_referencia DESC, id DESC */
+async function buscarPagina<T extends LinhaLancamento>(
+  select: string,
+  filtros: LancamentosFiltroChave,
+  faixa: { inicio: string; fim: string },
+  ultimo: T | null,
+  signal?: AbortSignal
+): Promise<T[]> {
+  let q = aplicarFiltros(supabase.from('lancamentos').select(select), {
+    ...filtros,
+    dataInicio: faixa.inicio,
+    dataFim: faixa.fim,
+  })
+    .order('data_referencia', { ascending: false })
+    .order('id', { ascending: false })
+    .limit(PAGINA)
+  if (ultimo) {
+    const d = `"${ultimo.data_referencia}"`
+    q = q.or(`data_referencia.lt.${d},and(data_referencia.eq.${d},id.lt.${ultimo.id})`)
+  }
+  if (signal) q = q.abortSignal(signal)
+
+  const { data, error } = await q
+  if (error) throw error
+  return (data || []) as unknown as T[]
+}
+
+async function carregarFaixa<T extends LinhaLancamento>(
+  select: string,
+  filtros: LancamentosFiltroChave,
+  faixa: { inicio: string; fim: string },
+  maxLinhas: number,
+  mapear?: (linha: T) => T,
+  signal?: AbortSignal
+): Promise<T[]> {
+  const linhas: T[] = []
+  let ultimo: T | null = null
+
+  while (linhas.length < maxLinhas) {
+    const pagina = await buscarPagina<T>(select, filtros, faixa, ultimo, signal)
+    linhas.push(...(mapear ? pagina.map(mapear) : pagina))
+    if (pagina.length < PAGINA) break
+    ultimo = pagina[pagina.length - 1]
+  }
+  return linhas
+}
+
+export async function carregarLancamentosEmFaixas<T extends LinhaLancamento>({
+  select,
+  filtros,
+  concorrencia = CONCORRENCIA_PADRAO,
+  maxLinhas = Infinity,
+  mapear,
+  onParcial,
+  signal,
+}: CarregarEmFaixasOpcoes<T>): Promise<T[]> {
+  const [maisAntiga, maisRecente] = await Promise.all([limite(filtros, true, signal), limite(filtros, false, signal)])
+  if (!maisAntiga || !maisRecente) return []
+
+  const faixas = faixasMensais(maisAntiga, maisRecente)
+  const resultados: Array<T[] | undefined> = new Array(faixas.length)
+  let proxima = 0
+  let carregadas = 0
+  let prefixoEmitido = 0
+
+  const emitirPrefixo = () => {
+    let fim = prefixoEmitido
+    while (fim < faixas.length && resultados[fim]) fim++
+    if (fim === prefixoEmitido) return
+    prefixoEmitido = fim
+    onParcial?.(resultados.slice(0, fim).flat() as T[])
+  }
+
+  // Faixas são iniciadas em ordem: as já iniciadas formam sempre um prefixo das mais recentes
+  const trabalhador = async () => {
+    while (proxima < faixas.length && carregadas < maxLinhas) {
+      verificarCancelamento(signal)
+      const indice = proxima++
+      const linhas = await carregarFaixa<T>(select, filtros, faixas[indice], maxLinhas, mapear, signal)
+      // Query cancelada: não atualiza a tela com o prefixo de um filtro abandonado
+      verificarCancelamento(signal)
+      resultados[indice] = linhas
+      carregadas += linhas.length
+      emitirPrefixo()
+    }
+  }
+  await Promise.all(Array.from({ length: Math.min(concorrencia, faixas.length) }, trabalhador))
+
+  const todas = resultados.filter((r): r is T[] => !!r).flat()
+  return todas.length > maxLinhas ? todas.slice(0, maxLinhas) : todas
+}
+
+function verificarCancelamento(signal?: AbortSignal) {
+  if (signal?.aborted) throw new DOMException('Operação cancelada', 'AbortError')
+}
+
+/** Total de lançamentos do filtro (progresso das exportações) */
+export async function contarLancamentos(filtros: LancamentosFiltroChave, signal?: AbortSignal): Promise<number> {
+  let q = aplicarFiltros(supabase.from('lancamentos').select('id', { count: 'exact', head: true }), filtros)
+  if (signal) q = q.abortSignal(signal)
+  const { count, error } = await q
+  if (error) throw error
+  return (count as number | null) ?? 0
+}
+
+/** Páginas do filtro em data_referencia DESC, id DESC: faixa a faixa, keyset dentro de cada faixa */
+async function* paginasEmFaixas<T extends LinhaLancamento>(
+  select: string,
+  filtros: LancamentosFiltroChave,
+  signal?: AbortSignal
+): AsyncGenerator<T[]> {
+  const [maisAntiga, maisRecente] = await Promise.all([limite(filtros, true, signal), limite(filtros, false, signal)])
+  if (!maisAntiga || !maisRecente) return
+
+  for (const faixa of faixasMensais(maisAntiga, maisRecente)) {
+    let ultimo: T | null = null
+    for (;;) {
+      verificarCancelamento(signal)
+      const pagina = await buscarPagina<T>(select, filtros, faixa, ultimo, signal)
+      if (pagina.length > 0) yield pagina
+      if (pagina.length < PAGINA) break
+      ultimo = pagina[pagina.length - 1]
+    }
+  }
+}
+
+export interface PercorrerOpcoes<T> {
+  select: string
+  filtros: LancamentosFiltroChave
+  maxLinhas?: number
+  signal?: AbortSignal
+  /** Recebe cada página (na ordem); a próxima já está sendo buscada enquanto ela é processada */
+  onLote: (linhas: T[]) => void | Promise<void>
+}
+
+/**
+ * Percorre o filtro página a página sem acumular o resultado (exportações grandes):
+ * no máximo a página atual e a seguinte ficam em memória. Cancelável por signal
+ * (lança AbortError).
+ */
+export async function percorrerLancamentosEmFaixas<T extends LinhaLancamento>({
+  select,
+  filtros,
+  maxLinhas = Infinity,
+  signal,
+  onLote,
+}: PercorrerOpcoes<T>): Promise<number> {
+  const paginas = paginasEmFaixas<T>(select, filtros, signal)
+  let entregues = 0
+  try {
+    let proxima = paginas.next()
+    // Página pedida e abandonada (limite, cancelamento) não vira rejeição sem tratamento
+    proxima.catch(() => {})
+    while (entregues < maxLinhas) {
+      const { value, done } = await proxima
+      if (done) break
+      // Busca da próxima página em paralelo com o processamento desta
+      proxima = paginas.next()
+      proxima.catch(() => {})
+      const lote = entregues + value.length > maxLinhas ? value.slice(0, maxLinhas - entregues) : value
+      entregues += lote.length
+      await onLote(lote)
+      verificarCancelamento(signal)
+    }
+  } finally {
+    await paginas.return(undefined)
+  }
+  return entregues
+}
@@ -0,0 +1,312 @@
+import { supabase } from './supabase'
+import { formatDateForStorage } from './date-utils'
+import { idbGet, idbSet, idbDeleteByPrefix, idbScopedApply, idbScopedDeleteByPrefix, idbScopedGetAll } from './idb-cache'
+import type { Database } from './database.types'
+
+type Lancamento = Database['public']['Tables']['lancamentos']['Row']
+
+/**
+ * Cópia local (IndexedDB) dos lançamentos de uma base, sincronizada de forma
+ * incremental (migration 047):
+ *   - carga completa na primeira vez: lançamentos da base desde janelaLocalDesde();
+ *   - depois, só linhas com updated_at > watermark e tombstones de
+ *     lancamentos_excluidos com excluido_em > watermark de exclusões (linhas
+ *     excluídas ou que trocaram de base, migration 057).
+ * Leituras (Analytics, Histórico) filtram a cópia local; a rede só traz o que mudou.
+ * Escopo = usuário + base: cada usuário só guarda o que o RLS lhe mostrou.
+ */
+
+// Meses mantidos localmente (a partir do 1º dia do mês)
+const JANELA_MESES = 24
+// Transações longas podem gravar updated_at anterior ao watermark: reler essa margem
+const MARGEM_WATERMARK_MS = 5 * 60 * 1000
+// Tombstones ficam 90 dias no banco; sem sincronizar há 60, recarrega tudo
+const RECARGA_COMPLETA_APOS_MS = 60 * 24 * 60 * 60 * 1000
+// Intervalo mínimo entre sincronizações em segundo plano do mesmo escopo
+const SYNC_MIN_INTERVALO_MS = 30 * 1000
+const PAGINA = 1000
+const META_PREFIX = 'lanc-sync:'
+
+interface SyncMeta {
+  desde: string
+  watermark: string | null
+  watermarkExclusoes: string | null
+  sincronizadoEm: number
+}
+
+export interface LancamentosLocaisFiltros {
+  equipeId?: string
+  indicadorId?: string
+  schemaTypes?: string[]
+  dataInicio?: string
+  dataFim?: string
+}
+
+const emAndamento = new Map<string, Promise<boolean>>()
+// Início da última sincronização concluída / última tentativa em segundo plano, por escopo
+const sincronizadoEm = new Map<string, number>()
+const tentativaEm = new Map<string, number>()
+const memoria = new Map<string, Lancamento[]>()
+// Última mudança conhecida no servidor (marcarLancamentosDesatualizados)
+let alteradoEm = 0
+
+function escopoDe(userId: string, baseId: string) {
+  return `${userId}:${baseId}`
+}
+
+/** Primeiro dia do mês JANELA_MESES atrás (YYYY-MM-DD) */
+export function janelaLocalDesde(hoje = new Date()): string {
+  return formatDateForStorage(new Date(hoje.getFullYear(), hoje.getMonth() - JANELA_MESES, 1))
+}
+
+function menosMargem(iso: string): string {
+  return new Date(Date.parse(iso) - MARGEM_WATERMARK_MS).toISOString()
+}
+
+function maior(a: string | null, b: string | null): string | null {
+  if (!a) return b
+  if (!b) return a
+  return Date.parse(a) >= Date.parse(b) ? a : b
+}
+
+/** Lançamentos da base com updated_at > aPartirDe, paginados por (updated_at, id) */
+async function buscarAlterados(baseId: string, desde: string, aPartirDe: string | null): Promise<Lancamento[]> {
+  const linhas: Lancamento[] = []
+  let ultimo: Lancamento | null = null
+
+  for (;;) {
+    let q = supabase
+      .from('lancamentos')
+      .select('*')
+      .eq('base_id', baseId)
+      .gte('data_referencia', desde)
+      .order('updated_at', { ascending: true })
+      .order('id', { ascending: true })
+      .limit(PAGINA)
+
+    if (ultimo) {
+      const u = `"${ultimo.updated_at}"`
+      q = q.or(`updated_at.gt.${u},and(updated_at.eq.${u},id.gt.${ultimo.id})`)
+    } else if (aPartirDe) {
+      q = q.gt('updated_at', aPartirDe)
+    }
+
+    const { data, error } = await q
+    if (error) throw error
+    const pagina = (data || []) as Lancamento[]
+    linhas.push(...pagina)
+    if (pagina.length < PAGINA) return linhas
+    ultimo = pagina[pagina.length - 1]
+  }
+}
+
+async function buscarExclusoes(baseId: string, aPartirDe: string | null) {
+  let q = supabase
+    .from('lancamentos_excluidos')
+    .select('id, excluido_em')
+    .eq('base_id', baseId)
+    .order('excluido_em', { ascending: true })
+  if (aPartirDe) q = q.gt('excluido_em', aPartirDe)
+  const { data, error } = await q
+  if (error) throw error
+  return (data || []) as Array<{ id: string; excluido_em: string }>
+}
+
+async function ultimaExclusao(baseId: string): Promise<string | null> {
+  const { data, error } = await supabase
+    .from('lancamentos_excluidos')
+    .select('excluido_em')
+    .eq('base_id', baseId)
+    .order('excluido_em', { ascending: false })
+    .limit(1)
+  if (error) throw error
+  return ((data || []) as Array<{ excluido_em: string }>)[0]?.excluido_em ?? null
+}
+
+/**
+ * Sincroniza o escopo. Retorna true se algo mudou na cópia local.
+ * Lança erro se a sincronização falhar (ex.: migration 047 não aplicada).
+ */
+async function sincronizar(userId: string, baseId: string): Promise<boolean> {
+  const inicio = Date.now()
+  const escopo = escopoDe(userId, baseId)
+  const chaveMeta = `${META_PREFIX}${escopo}`
+  const meta = await idbGet<SyncMeta>(chaveMeta)
+  const desde = janelaLocalDesde()
+  const completo = !meta || meta.desde > desde || Date.now() - meta.sincronizadoEm > RECARGA_COMPLETA_APOS_MS
+
+  let novoMeta: SyncMeta
+  let mudou: boolean
+
+  if (completo) {
+    // Watermark de exclusões lido antes da carga: nada excluído durante a carga fica de fora
+    const watermarkExclusoes = await ultimaExclusao(baseId)
+    const linhas = await buscarAlterados(baseId, desde, null)
+    const gravado = await idbScopedApply('lancamentos', escopo, { gravar: linhas, substituir: true })
+    if (!gravado) throw new Error('IndexedDB indisponível para lançamentos')
+    novoMeta = {
+      desde,
+      watermark: linhas.reduce<string | null>((acc, l) => maior(acc, l.updated_at), null),
+      watermarkExclusoes,
+      sincronizadoEm: Date.now(),
+    }
+    mudou = true
+  } else {
+    const [linhas, exclusoes] = await Promise.all([
+      buscarAlterados(baseId, desde, meta.watermark ? menosMargem(meta.watermark) : null),
+      buscarExclusoes(baseId, meta.watermarkExclusoes ? menosMargem(meta.watermarkExclusoes) : null),
+    ])
+    // Exclusões antes das gravações: linha que mudou de partição (tombstone + linha nova) permanece
+    const gravado = await idbScopedApply('lancamentos', escopo, {
+      excluirIds: exclusoes.map((e) => e.id),
+      gravar: linhas,
+      // Virada de mês: descarta o que saiu da janela
+      manter: meta.desde !== desde ? (l: Lancamento) => l.data_referencia >= desde : undefined,
+    })
+    if (!gravado) throw new Error('IndexedDB indisponível para lançamentos')
+    novoMeta = {
+      desde,
+      watermark: linhas.reduce((acc, l) => maior(acc, l.updated_at), meta.watermark),
+      watermarkExclusoes: exclusoes.reduce((acc, e) => maior(acc, e.excluido_em), meta.watermarkExclusoes),
+      sincronizadoEm: Date.now(),
+    }
+    // Linhas da margem já conhecidas não contam como mudança
+    mudou =
+      meta.desde !== desde ||
+      linhas.some((l) => !meta.watermark || l.updated_at > meta.watermark) ||
+      exclusoes.some((e) => !meta.watermarkExclusoes || e.excluido_em > meta.watermarkExclusoes)
+  }
+
+  await idbSet(chaveMeta, novoMeta)
+  sincronizadoEm.set(escopo, inicio)
+  if (mudou) memoria.delete(escopo)
+  return mudou
+}
+
+function sincronizarUnico(userId: string, baseId: string): Promise<boolean> {
+  const escopo = escopoDe(userId, baseId)
+  const atual = emAndamento.get(escopo)
+  if (atual) return atual
+  const promise = sincronizar(userId, baseId).finally(() => emAndamento.delete(escopo))
+  emAndamento.set(escopo, promise)
+  return promise
+}
+
+function filtrar(lancamentos: Lancamento[], filtros: LancamentosLocaisFiltros): Lancamento[] {
+  const { equipeId, indicadorId, schemaTypes, dataInicio, dataFim } = filtros
+  return lancamentos.filter(
+    (l) =>
+      (!equipeId || l.equipe_id === equipeId) &&
+      (!indicadorId || l.indicador_id === indicadorId) &&
+      (!schemaTypes || schemaTypes.includes(l.schema_type ?? '')) &&
+      (!dataInicio || l.data_referencia >= dataInicio) &&
+      (!dataFim || l.data_referencia <= dataFim)
+  )
+}
+
+/** Ordenação do histórico: data_referencia, created_at e id, decrescentes */
+export function compararLancamentosDesc(
+  a: Pick<Lancamento, 'data_referencia' | 'created_at' | 'id'>,
+  b: Pick<Lancamento, 'data_referencia' | 'created_at' | 'id'>
+): number {
+  if (a.data_referencia !== b.data_referencia) return a.data_referencia < b.data_referencia ? 1 : -1
+  if (a.created_at !== b.created_at) return a.created_at < b.created_at ? 1 : -1
+  if (a.id !== b.id) return a.id < b.id ? 1 : -1
+  return 0
+}
+
+/**
+ * Lançamentos da base lidos da cópia local, ordenados como o histórico.
+ * - Primeira vez no escopo: aguarda a carga completa.
+ * - Depois: devolve a cópia local e sincroniza em segundo plano (no máximo a
+ *   cada SYNC_MIN_INTERVALO_MS); onAtualizado é chamado se algo mudou.
+ * - Após marcarLancamentosDesatualizados (realtime, gravação local): aguarda a
+ *   sincronização antes de ler.
+ * Retorna null quando a leitura local não se aplica (período anterior à
+ * janela local, IndexedDB indisponível ou sincronização falhou): use a rede.
+ */
+export async function lerLancamentosLocais(
+  userId: string,
+  baseId: string,
+  filtros: LancamentosLocaisFiltros,
+  onAtualizado?: () => void
+): Promise<Lancamento[] | null> {
+  if (!filtros.dataInicio || filtros.dataInicio < janelaLocalDesde()) return null
+
+  const escopo = escopoDe(userId, baseId)
+  try {
+    const meta = await idbGet<SyncMeta>(`${META_PREFIX}${escopo}`)
+    if (!meta) await sincronizarUnico(userId, baseId)
+    // Sincronização em andamento pode ter começado antes da mudança: repetir até cobri-la
+    while ((sincronizadoEm.get(escopo) ?? 0) < alteradoEm) {
+      await sincronizarUnico(userId, baseId)
+    }
+    const ultima = Math.max(sincronizadoEm.get(escopo) ?? 0, tentativaEm.get(escopo) ?? 0)
+    if (Date.now() - ultima > SYNC_MIN_INTERVALO_MS) {
+      tentativaEm.set(escopo, Date.now())
+      sincronizarUnico(userId, baseId)
+        .then((mudou) => {
+          if (mudou) onAtualizado?.()
+        })
+        .catch((error) => console.warn('Sincronização de lançamentos em segundo plano falhou:', error))
+    }
+  } catch (error) {
+    console.warn('Sincronização de lançamentos indisponível, buscando pela rede:', error)
+    return null
+  }
+
+  let todos = memoria.get(escopo)
+  if (!todos) {
+    const locais = await idbScopedGetAll<Lancamento>('lancamentos', escopo)
+    if (!locais) return null
+    todos = locais.sort(compararLancamentosDesc)
+    memoria.set(escopo, todos)
+  }
+  return filtrar(todos, filtros)
+}
+
+/**
+ * Algo mudou no servidor (evento realtime, gravação/exclusão local): a próxima
+ * leitura local sincroniza antes de responder.
+ */
+export function marcarLancamentosDesatualizados() {
+  alteradoEm = Date.now()
+}
+
+/**
+ * Aplica um lote de eventos realtime nas cópias locais já sincronizadas nesta
+ * sessão, sem esperar a próxima sincronização (que relê o mesmo intervalo pelo
+ * watermark e confirma o resultado). Escopo com sincronização em andamento ou
+ * falha ao gravar: volta a marcar como desatualizado.
+ */
+export async function aplicarAlteracoesLocais(gravados: Lancamento[], excluidosIds: string[]) {
+  const desde = janelaLocalDesde()
+  await Promise.all(
+    [...sincronizadoEm.keys()].map(async (escopo) => {
+      if (emAndamento.has(escopo)) {
+        alteradoEm = Date.now()
+        return
+      }
+      const baseId = escopo.slice(escopo.indexOf(':') + 1)
+      const daBase = gravados.filter((l) => l.base_id === baseId && l.data_referencia >= desde)
+      // Linha que mudou de base (ou saiu da janela) deixa de pertencer ao escopo
+      const sairam = gravados.filter((l) => !daBase.includes(l)).map((l) => l.id)
+      const gravado = await idbScopedApply('lancamentos', escopo, {
+        excluirIds: [...excluidosIds, ...sairam],
+        gravar: daBase,
+      })
+      memoria.delete(escopo)
+      if (!gravado) alteradoEm = Date.now()
+    })
+  )
+}
+
+/** Remove as cópias locais (logout) */
+export async function clearLancamentosLocais() {
+  emAndamento.clear()
+  sincronizadoEm.clear()
+  tentativaEm.clear()
+  memoria.clear()
+  alteradoEm = 0
+  await Promise.all([idbScopedDeleteByPrefix('lancamentos', ''), idbDeleteByPrefix(META_PREFIX)])
+}
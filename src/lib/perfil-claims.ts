@@ -0,0 +1,45 @@
+import type { Database } from './database.types'
+
+type Profile = Database['public']['Tables']['profiles']['Row']
+
+/** Payload (claims) de um JWT, decodificado de base64url; null se malformado. Não valida assinatura. */
+export function payloadDoJwt(token: string | null | undefined): Record<string, any> | null {
+  const payload = token?.split('.')[1]
+  if (!payload) return null
+  try {
+    const base64 = payload.replace(/-/g, '+').replace(/_/g, '/').padEnd(Math.ceil(payload.length / 4) * 4, '=')
+    const bytes = Uint8Array.from(atob(base64), (c) => c.charCodeAt(0))
+    return JSON.parse(new TextDecoder().decode(bytes))
+  } catch {
+    return null
+  }
+}
+
+/**
+ * Perfil gravado na claim "perfil" do access token pelo custom_access_token_hook
+ * (migration 044). Retorna null se o token não tiver a claim (hook desativado ou
+ * token emitido antes do hook) — nesse caso o chamador deve ler public.profiles.
+ *
+ * Só para exibição: no servidor, RLS e edge functions só aceitam a claim se o
+ * token foi emitido depois da última alteração do perfil (migration 056).
+ * Não valida assinatura: usar só com o token da sessão devolvido pelo supabase-js.
+ */
+export function perfilDoAccessToken(accessToken: string | null | undefined, userId: string): Profile | null {
+  try {
+    const claims = payloadDoJwt(accessToken)
+    const perfil = claims?.perfil
+    if (claims?.sub !== userId || !perfil || typeof perfil.role !== 'string') return null
+    return {
+      id: userId,
+      nome: perfil.nome ?? '',
+      role: perfil.role as Profile['role'],
+      base_id: perfil.base_id ?? null,
+      equipe_id: perfil.equipe_id ?? null,
+      acesso_gerente_sci: perfil.acesso_gerente_sci ?? false,
+      created_at: perfil.created_at ?? '',
+      updated_at: perfil.updated_at ?? '',
+    }
+  } catch {
+    return null
+  }
+}
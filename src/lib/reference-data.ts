@@ -0,0 +1,149 @@
+import type { QueryClient } from '@tanstack/react-query'
+import { supabase } from './supabase'
+import { idbDeleteByPrefix, idbGet, idbSet } from './idb-cache'
+
+/**
+ * Cache persistente dos dados de referência (bases, equipes, indicadores_config,
+ * colaboradores).
+ *
+ * - Uma chave de query por tabela (referenceKeys), sempre com a linha completa
+ *   ordenada por nome: nenhuma página grava um select parcial sob a chave de outra.
+ * - Cada lista fica no IndexedDB junto com a versão da tabela
+ *   (reference_data_versions, migration 046). Conferida há menos de
+ *   VERSOES_TTL, a cópia local é usada sem ir ao servidor; depois disso, uma
+ *   leitura de reference_data_versions decide se a lista precisa ser baixada de novo.
+ * - Sem a tabela de versões (migration não aplicada) o cache persistente é
+ *   ignorado e as listas vêm direto do Supabase, como antes.
+ */
+
+export type ReferenceTable = 'bases' | 'equipes' | 'indicadores_config' | 'colaboradores'
+
+export const referenceKeys = {
+  all: ['referencia'] as const,
+  bases: ['referencia', 'bases'] as const,
+  equipes: ['referencia', 'equipes'] as const,
+  indicadoresConfig: ['referencia', 'indicadores_config'] as const,
+  colaboradores: (baseId: string | null) => ['referencia', 'colaboradores', baseId] as const,
+}
+
+// Mudanças chegam pela conferência de versão, não pelo staleTime
+export const REFERENCE_STALE_TIME = 24 * 60 * 60 * 1000 // 24 horas
+export const REFERENCE_GC_TIME = 24 * 60 * 60 * 1000
+
+// Intervalo mínimo entre conferências de versão
+const VERSOES_TTL = 5 * 60 * 1000 // 5 minutos
+const IDB_PREFIX = 'ref:'
+
+interface ReferenceEntry<T> {
+  versao: number
+  verificadoEm: number
+  data: T
+}
+
+type Versoes = Map<string, number>
+
+let versoesCache: { em: number; promise: Promise<Versoes | null> } | null = null
+// Versão com que cada tabela foi servida por último às queries (base da revalidação)
+const versoesServidas = new Map<ReferenceTable, number>()
+// Tabelas alteradas (nesta aba ou detectadas na revalidação): ignorar cópia "recém-conferida"
+const alteradaEm = new Map<ReferenceTable, number>()
+
+async function buscarVersoes(): Promise<Versoes | null> {
+  try {
+    const { data, error } = await supabase.from('reference_data_versions').select('tabela, versao')
+    if (error) throw error
+    const versoes: Versoes = new Map()
+    for (const row of (data || []) as Array<{ tabela: string; versao: number }>) {
+      versoes.set(row.tabela, row.versao)
+    }
+    return versoes
+  } catch (error) {
+    console.warn('Versões dos dados de referência indisponíveis, buscando sem cache:', error)
+    return null
+  }
+}
+
+function getReferenceVersions(): Promise<Versoes | null> {
+  if (versoesCache && Date.now() - versoesCache.em < VERSOES_TTL) return versoesCache.promise
+  const cache = { em: Date.now(), promise: buscarVersoes() }
+  versoesCache = cache
+  // Falha não fica memorizada: a próxima leitura tenta de novo
+  cache.promise.then((versoes) => {
+    if (!versoes && versoesCache === cache) versoesCache = null
+  })
+  return cache.promise
+}
+
+/**
+ * queryFn dos dados de referência: devolve a cópia do IndexedDB quando a versão
+ * da tabela não mudou e só chama fetcher quando mudou (ou não há cópia).
+ * escopo identifica a lista dentro do cache (inclui o usuário; ex.: "<userId>:bases").
+ */
+export async function fetchReferenceData<T>(
+  tabela: ReferenceTable,
+  escopo: string,
+  fetcher: () => Promise<T>
+): Promise<T> {
+  const chave = `${IDB_PREFIX}${escopo}`
+  const salvo = await idbGet<ReferenceEntry<T>>(chave)
+
+  if (salvo && salvo.verificadoEm > (alteradaEm.get(tabela) ?? 0) && Date.now() - salvo.verificadoEm < VERSOES_TTL) {
+    versoesServidas.set(tabela, salvo.versao)
+    return salvo.data
+  }
+
+  // Versão lida antes dos dados: se a tabela mudar no meio, a próxima conferência baixa de novo
+  const versao = (await getReferenceVersions())?.get(tabela)
+  if (versao === undefined) {
+    versoesServidas.delete(tabela)
+    return fetcher()
+  }
+
+  if (salvo && salvo.versao === versao) {
+    void idbSet(chave, { ...salvo, verificadoEm: Date.now() })
+    versoesServidas.set(tabela, versao)
+    return salvo.data
+  }
+
+  const data = await fetcher()
+  const entrada: ReferenceEntry<T> = { versao, verificadoEm: Date.now(), data }
+  void idbSet(chave, entrada)
+  versoesServidas.set(tabela, versao)
+  return data
+}
+
+/**
+ * Após uma escrita do próprio usuário (cadastro de base, colaborador...):
+ * descarta a versão memorizada e refaz as queries da tabela.
+ */
+export function invalidateReferenceData(queryClient: QueryClient, tabela: ReferenceTable) {
+  versoesCache = null
+  alteradaEm.set(tabela, Date.now())
+  return queryClient.invalidateQueries({ queryKey: [...referenceKeys.all, tabela] })
+}
+
+/**
+ * Confere as versões no servidor (no máximo uma vez por VERSOES_TTL) e refaz
+ * apenas as queries das tabelas cuja versão atual difere da que foi servida a elas.
+ */
+export async function revalidateReferenceData(queryClient: QueryClient) {
+  if (versoesServidas.size === 0) return
+  if (versoesCache && Date.now() - versoesCache.em < VERSOES_TTL) return
+
+  const atuais = await getReferenceVersions()
+  if (!atuais) return
+
+  for (const [tabela, servida] of versoesServidas) {
+    if (atuais.get(tabela) === servida) continue
+    alteradaEm.set(tabela, Date.now())
+    void queryClient.invalidateQueries({ queryKey: [...referenceKeys.all, tabela] })
+  }
+}
+
+/** Remove as cópias persistidas (logout) */
+export function clearReferenceCache() {
+  versoesCache = null
+  versoesServidas.clear()
+  alteradaEm.clear()
+  return idbDeleteByPrefix(IDB_PREFIX)
+}
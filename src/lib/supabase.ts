@@ -35,16 +35,23 @@ export const supabase = createClient<Database>(
       storageKey: 'supabase.auth.token',
     },
     global: {
-      // Timeout de 25 segundos para requisições (permite insert concluir em rede/PC lentos)
+      // Timeout de 25 segundos para requisições (permite insert concluir em rede/PC lentos).
+      // O signal de quem chamou (.abortSignal(signal) das queries do TanStack Query) também
+      // cancela: troca de view/filtro aborta a requisição na hora, sem esperar o timeout.
       fetch: (url, options = {}) => {
         const controller = new AbortController()
         const timeoutId = setTimeout(() => controller.abort(), 25000) // 25 segundos
-        
+        const externo = options.signal
+        const abortarExterno = () => controller.abort(externo?.reason)
+        if (externo?.aborted) abortarExterno()
+        else externo?.addEventListener('abort', abortarExterno, { once: true })
+
         return fetch(url, {
           ...options,
           signal: controller.signal,
         }).finally(() => {
           clearTimeout(timeoutId)
+          externo?.removeEventListener('abort', abortarExterno)
         })
       },
     },
@@ -6,18 +6,11 @@ import { AppShell } from '@/components/AppShell'
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card'
 import { Input } from '@/components/ui/input'
 import { Label } from '@/components/ui/label'
-import { getRulesByGrupo, isGrupoA, isGrupoB } from '@/lib/compliance-rules'
 import { formatDateForDisplay } from '@/lib/date-utils'
 import { formatBaseName } from '@/lib/utils'
-import type { Database } from '@/lib/database.types'
-import { format, startOfMonth, parse, isToday, isYesterday, differenceInDays, startOfDay } from 'date-fns'
+import { format, startOfMonth, parse, startOfDay } from 'date-fns'
 import { Info } from 'lucide-react'
 
-type Base = Database['public']['Tables']['bases']['Row']
-type Indicador = Database['public']['Tables']['indicadores_config']['Row']
-type Lancamento = Database['public']['Tables']['lancamentos']['Row']
-type Profile = Database['public']['Tables']['profiles']['Row']
-
 interface BaseComplianceStatus {
   baseId: string
   baseNome: string
@@ -27,7 +20,13 @@ interface BaseComplianceStatus {
   }
   grupoCCompliant: number // Quantos de 9 estão OK
   grupoCFaltantes: string[] // Nomes dos indicadores que faltam
-  ultimaOcorrencia?: string // Data da última ocorrência (Grupo B)
+  ultimaOcorrencia: string | null // Data da última ocorrência (Grupo B)
+}
+
+/** Retorno da RPC compliance_status (migration 045). */
+interface ComplianceStatusResult {
+  bases: BaseComplianceStatus[]
+  usuariosInativos: { id: string; nome: string }[]
 }
 
 export function Aderencia() {
@@ -53,209 +52,33 @@ export function Aderencia() {
   const mesSelecionado = format(mesAnoDate, 'yyyy-MM')
   const mesFechado = mesSelecionado < mesAtual
 
-  // Buscar bases (excluindo ADMINISTRATIVO)
-  const { data: bases } = useQuery<Base[]>({
-    queryKey: ['bases'],
-    queryFn: async () => {
-      const { data, error } = await supabase
-        .from('bases')
-        .select('*')
-        .neq('nome', 'ADMINISTRATIVO')
-        .order('nome')
-      if (error) throw error
-      return (data || []) as Base[]
-    },
-  })
-
-  // Buscar indicadores
-  const { data: indicadores } = useQuery<Indicador[]>({
-    queryKey: ['indicadores'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('indicadores_config').select('*').order('nome')
-      if (error) throw error
-      return (data || []) as Indicador[]
-    },
-  })
-
-  // Buscar todos os lançamentos do período (últimos 30 dias para Grupo A, mês selecionado para Grupo C)
-  const { data: lancamentos, isLoading, error: lancamentosError } = useQuery<Lancamento[]>({
-    queryKey: ['lancamentos-compliance', mesAno, mesAnoDate],
-    queryFn: async () => {
-      try {
-        // Buscar do início do mês selecionado até hoje (para capturar Grupo A também)
-        const dataInicioBusca = format(startOfMonth(mesAnoDate), 'yyyy-MM-dd')
-        const dataFimBusca = format(hoje, 'yyyy-MM-dd')
-        
-        // Otimização: buscar apenas colunas necessárias para compliance
-        const { data, error } = await supabase
-          .from('lancamentos')
-          .select('id, data_referencia, base_id, indicador_id, user_id')
-          .gte('data_referencia', dataInicioBusca)
-          .lte('data_referencia', dataFimBusca)
-          .order('data_referencia', { ascending: false })
-        
-        if (error) {
-          console.error('Erro ao buscar lançamentos:', error)
-          throw error
-        }
-        
-        return (data || []) as Lancamento[]
-      } catch (err) {
-        console.error('Erro na query de compliance:', err)
-        return []
-      }
-    },
-    enabled: !!mesAnoDate,
-  })
-
-  // Buscar usuários para verificar inatividade
-  const { data: usuarios } = useQuery<Profile[]>({
-    queryKey: ['profiles'],
-    queryFn: async () => {
+  // Aderência calculada no banco (migration 045): uma chamada com bases, Grupos A/B/C e inativos
+  const hojeStr = format(hoje, 'yyyy-MM-dd')
+  const { data: compliance, isLoading, error: lancamentosError } = useQuery<ComplianceStatusResult>({
+    queryKey: ['compliance-status', mesSelecionado, hojeStr],
+    // signal: trocar de mês cancela a chamada anterior
+    queryFn: async ({ signal }) => {
       const { data, error } = await supabase
-        .from('profiles')
-        .select('*')
-        .eq('role', 'chefe') // Apenas Chefes de Equipe
-      if (error) throw error
-      return (data || []) as Profile[]
-    },
-  })
-
-  // Calcular status de compliance por base
-  const compliancePorBase = useMemo<BaseComplianceStatus[]>(() => {
-    if (!bases || !indicadores || !lancamentos) return []
-
-    return bases.map((base) => {
-      // GRUPO A: Verificar lançamentos de hoje e ontem
-      const lancamentosGrupoA = lancamentos.filter((l) => {
-        const indicador = indicadores.find((i) => i.id === l.indicador_id)
-        return indicador && isGrupoA(indicador.schema_type) && l.base_id === base.id
-      })
-
-      const atividadesAcessorias = lancamentosGrupoA.filter((l) => {
-        const indicador = indicadores.find((i) => i.id === l.indicador_id)
-        return indicador?.schema_type === 'atividades_acessorias'
-      })
-
-      const treinamento = lancamentosGrupoA.filter((l) => {
-        const indicador = indicadores.find((i) => i.id === l.indicador_id)
-        return indicador?.schema_type === 'treinamento'
-      })
-
-      const getStatusGrupoA = (lancamentos: Lancamento[]): 'ok' | 'pendente' | 'atrasado' => {
-        if (!lancamentos || lancamentos.length === 0) return 'atrasado'
-        
-        const lancamentoHoje = lancamentos.find((l) => {
-          try {
-            if (!l.data_referencia) return false
-            const dataLanc = parse(l.data_referencia, 'yyyy-MM-dd', new Date())
-            return isToday(dataLanc)
-          } catch {
-            return false
-          }
+        .rpc('compliance_status', {
+          p_mes: format(startOfMonth(mesAnoDate), 'yyyy-MM-dd'),
+          p_hoje: hojeStr,
         })
-
-        if (lancamentoHoje) return 'ok'
-
-        const lancamentoOntem = lancamentos.find((l) => {
-          try {
-            if (!l.data_referencia) return false
-            const dataLanc = parse(l.data_referencia, 'yyyy-MM-dd', new Date())
-            return isYesterday(dataLanc)
-          } catch {
-            return false
-          }
-        })
-
-        if (lancamentoOntem) return 'pendente'
-
-        // Verificar quantos dias desde o último lançamento
-        const ultimoLancamento = lancamentos[0]
-        if (ultimoLancamento && ultimoLancamento.data_referencia) {
-          try {
-            const dataUltimo = parse(ultimoLancamento.data_referencia, 'yyyy-MM-dd', new Date())
-            const diasDesdeUltimo = differenceInDays(hoje, dataUltimo)
-            return diasDesdeUltimo >= 2 ? 'atrasado' : 'pendente'
-          } catch {
-            return 'atrasado'
-          }
-        }
-
-        return 'atrasado'
+        .abortSignal(signal)
+      if (error) {
+        console.error('Erro na query de compliance:', error)
+        throw error
       }
-
-      // GRUPO C: Verificar compliance mensal
-      const grupoCRules = getRulesByGrupo('C')
-      let grupoCCompliant = 0
-      const grupoCFaltantes: string[] = []
-
-      grupoCRules.forEach((rule) => {
-        const indicador = indicadores.find((i) => i.schema_type === rule.schema_type)
-        if (!indicador) return
-
-        const temLancamentoMes = lancamentos.some((l) => {
-          try {
-            const dataLanc = parse(l.data_referencia, 'yyyy-MM-dd', new Date())
-            const mesLanc = format(dataLanc, 'yyyy-MM')
-            return (
-              l.base_id === base.id &&
-              l.indicador_id === indicador.id &&
-              mesLanc === mesSelecionado
-            )
-          } catch {
-            return false
-          }
-        })
-
-        if (temLancamentoMes) {
-          grupoCCompliant++
-        } else {
-          grupoCFaltantes.push(rule.nome)
-        }
-      })
-
-      // GRUPO B: Última ocorrência
-      const lancamentosGrupoB = lancamentos.filter((l) => {
-        const indicador = indicadores.find((i) => i.id === l.indicador_id)
-        return indicador && isGrupoB(indicador.schema_type) && l.base_id === base.id
-      })
-
-      const ultimaOcorrencia = lancamentosGrupoB[0]?.data_referencia
-
+      const result = data as unknown as ComplianceStatusResult | null
       return {
-        baseId: base.id,
-        baseNome: formatBaseName(base.nome),
-        grupoAStatus: {
-          atividadesAcessorias: getStatusGrupoA(atividadesAcessorias),
-          treinamento: getStatusGrupoA(treinamento),
-        },
-        grupoCCompliant,
-        grupoCFaltantes,
-        ultimaOcorrencia,
+        bases: (result?.bases ?? []).map((b) => ({ ...b, baseNome: formatBaseName(b.baseNome) })),
+        usuariosInativos: result?.usuariosInativos ?? [],
       }
-    })
-  }, [bases, indicadores, lancamentos, mesSelecionado, hoje])
-
-  // Calcular usuários inativos (sem acesso há > 30 dias)
-  const usuariosInativos = useMemo(() => {
-    if (!usuarios || !lancamentos) return []
-
-    const limite30Dias = new Date(hoje.getTime() - 30 * 24 * 60 * 60 * 1000)
-
-    return usuarios.filter((usuario) => {
-      // Verificar se fez algum lançamento nos últimos 30 dias
-      const temLancamentoRecente = lancamentos.some((l) => {
-        try {
-          const dataLanc = parse(l.data_referencia, 'yyyy-MM-dd', new Date())
-          return l.user_id === usuario.id && dataLanc >= limite30Dias
-        } catch {
-          return false
-        }
-      })
+    },
+    enabled: !!mesAnoDate,
+  })
 
-      return !temLancamentoRecente
-    })
-  }, [usuarios, lancamentos, hoje])
+  const compliancePorBase = compliance?.bases ?? []
+  const usuariosInativos = compliance?.usuariosInativos ?? []
 
   // Componente de Tooltip para pendências mensais
   function PendenciasTooltip({ faltantes }: { faltantes: string[] }) {
@@ -346,10 +169,6 @@ export function Aderencia() {
               <div className="text-center py-8 text-red-600">
                 Erro ao carregar dados: {lancamentosError instanceof Error ? lancamentosError.message : 'Erro desconhecido'}
               </div>
-            ) : !bases || !indicadores ? (
-              <div className="text-center py-8 text-gray-500">
-                Carregando configurações...
-              </div>
             ) : compliancePorBase.length === 0 ? (
               <div className="text-center py-8 text-gray-500">
                 Nenhuma base encontrada para análise de compliance.
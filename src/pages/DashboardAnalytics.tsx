@@ -1,30 +1,19 @@
 import { useState, useEffect } from 'react'
-import { useQuery } from '@tanstack/react-query'
-import { supabase } from '@/lib/supabase'
+import { useQuery, useQueryClient } from '@tanstack/react-query'
 import { useRealtimeSync } from '@/hooks/useRealtimeSync'
 import type { Database } from '@/lib/database.types'
 import { useLancamentos } from '@/hooks/useLancamentos'
+import { lerLancamentosLocais } from '@/lib/lancamentos-sync'
+import { carregarLancamentosEmFaixas } from '@/lib/lancamentos-loader'
+import type { LancamentosFiltroChave } from '@/lib/lancamentos-cache-patch'
+import { useAnalyticsRpc, useResumoExecutivoRpc, isAnalyticsRpcView } from '@/hooks/useAnalyticsRpc'
 import { useAuth } from '@/contexts/AuthContext'
 import { Button } from '@/components/ui/button'
 import { AppShell, type SidebarItem } from '@/components/AppShell'
 import { getDefaultDateRange, validateDateRange, enforceMaxDateRange } from '@/lib/date-utils'
-import {
-  processOcorrenciaAeronautica,
-  processOcorrenciaNaoAeronautica,
-  processAtividadesAcessorias,
-  processTAF,
-  processProvaTeorica,
-  processTempoTPEPR,
-  processTempoResposta,
-  processExercicioPosicionamento,
-  processHorasTreinamento,
-  processInspecaoViaturas,
-  processControleEstoque,
-  processControleEPI,
-  processControleTrocas,
-  filterByColaborador,
-  generateExecutiveSummary,
-} from '@/lib/analytics-utils'
+import { useAnalyticsWorker } from '@/hooks/useAnalyticsWorker'
+import { useBases, useEquipes, useIndicadoresConfig } from '@/hooks/useReferenceData'
+import { remontarConteudo, schemaTypesDaView, selectAnalyticsView, type AnalyticsView } from '@/lib/analytics-view'
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card'
 import { LineChart } from '@/components/charts/LineChart'
 import { BarChart } from '@/components/charts/BarChart'
@@ -33,10 +22,14 @@ import { ComposedChart } from '@/components/charts/ComposedChart'
 import { GroupedBarChart } from '@/components/charts/GroupedBarChart'
 import { AnalyticsFilterBar } from '@/components/AnalyticsFilterBar'
 import { TrendingUp, TrendingDown, AlertTriangle, Clock, Users, Info, ArrowUpDown } from 'lucide-react'
-import { parseTimeMMSS } from '@/lib/analytics-utils'
+import {
+  aplicarResumoExecutivo,
+  parseTimeMMSS,
+  type ResumoExecutivo,
+  type ResumoExecutivoServidor,
+} from '@/lib/analytics-utils'
 import { formatBaseName, formatEquipeName } from '@/lib/utils'
 
-type IndicadorConfig = Database['public']['Tables']['indicadores_config']['Row']
 
 // Componente de Tabela de Resultados Prova Teórica com ordenação e paginação
 function ProvaTeoricaResultsTable({ avaliados, equipes }: { avaliados: Array<{ nome: string; nota: number; status: string; data_referencia: string; equipe_id: string }>; equipes: Array<{ id: string; nome: string }> }) {
@@ -257,19 +250,12 @@ function TafResultsTable({ avaliados }: { avaliados: Array<{ nome: string; idade
   )
 }
 
-type ViewType =
-  | 'visao_geral'
-  | 'ocorrencia_aero'
-  | 'ocorrencia_nao_aero'
-  | 'atividades_acessorias'
-  | 'taf'
-  | 'prova_teorica'
-  | 'treinamento'
-  | 'tempo_tp_epr'
-  | 'tempo_resposta'
-  | 'exercicio_posicionamento'
-  | 'inspecao_viaturas'
-  | 'logistica'
+type ViewType = AnalyticsView
+
+// Referência estável para "sem dados" (o worker reenvia o dataset quando a identidade do array muda)
+const SEM_LANCAMENTOS: Database['public']['Tables']['lancamentos']['Row'][] = []
+// Intervalo mínimo entre resultados parciais da carga em faixas (cada um é reprocessado no worker)
+const INTERVALO_PARCIAL_MS = 1000
 
 // Componente de Tooltip com ícone de informação
 function InfoTooltip({ text }: { text: string }) {
@@ -395,34 +381,13 @@ export function DashboardAnalytics() {
   // Buscar bases (usado no AnalyticsFilterBar)
 
   // Buscar indicadores config
-  const { data: indicadoresConfig } = useQuery<IndicadorConfig[]>({
-    queryKey: ['indicadores_config'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('indicadores_config').select('*').order('nome')
-      if (error) throw error
-      return (data || []) as IndicadorConfig[]
-    },
-  })
+  const { data: indicadoresConfig } = useIndicadoresConfig()
 
   // Buscar bases para a visão geral
-  const { data: bases } = useQuery<Array<{ id: string; nome: string }>>({
-    queryKey: ['bases'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('bases').select('id, nome').order('nome')
-      if (error) throw error
-      return (data || []) as Array<{ id: string; nome: string }>
-    },
-  })
+  const { data: bases } = useBases()
 
   // Buscar equipes para exibir nomes nos gráficos por equipe (em vez de IDs)
-  const { data: equipes } = useQuery<Array<{ id: string; nome: string }>>({
-    queryKey: ['equipes'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('equipes').select('id, nome').order('nome')
-      if (error) throw error
-      return (data || []) as Array<{ id: string; nome: string }>
-    },
-  })
+  const { data: equipes } = useEquipes()
 
   const getEquipeName = (id: string) => formatEquipeName(equipes?.find((e) => e.id === id)?.nome || id)
 
@@ -456,151 +421,145 @@ export function DashboardAnalytics() {
   // Isso garante que mesmo se alguém tentar manipular o código no navegador, o filtro correto será aplicado
   const userBaseId = isChefe ? authUser?.profile?.base_id : baseId
 
+  const showColaboradorFilter =
+    view === 'taf' || view === 'prova_teorica' || view === 'treinamento' || view === 'tempo_tp_epr'
+  const showTipoOcorrenciaFilter = view === 'ocorrencia_nao_aero'
+  const showTipoOcorrenciaAeroFilter = view === 'ocorrencia_aero'
+
+  // Views agregadas no servidor (RPCs da migration 037): só KPIs/gráficos trafegam, sem o conteudo bruto.
+  // Se a RPC falhar (ex.: migration ainda não aplicada), cai no processamento local abaixo.
+  const analyticsRpc = useAnalyticsRpc({
+    view,
+    baseId: userBaseId || undefined,
+    equipeId: equipeId || undefined,
+    dataInicio: dataInicio || undefined,
+    dataFim: dataFim || undefined,
+    colaboradorNome: showColaboradorFilter ? colaboradorNome : undefined,
+  })
+  const usarAnalyticsServidor = isAnalyticsRpcView(view) && !analyticsRpc.isError
+
+  // KPIs da Visão Geral com o período anterior equivalente (migration 051), numa chamada.
+  // Gráficos e alertas seguem no processamento local; se a RPC falhar, os cards ficam sem comparação.
+  const resumoExecutivoRpc = useResumoExecutivoRpc({
+    baseId: userBaseId || undefined,
+    equipeId: equipeId || undefined,
+    dataInicio: dataInicio || undefined,
+    dataFim: dataFim || undefined,
+    enabled: view === 'visao_geral',
+  })
+
   // Buscar lançamentos (sem filtro de indicador para visão geral)
-  // Para visão geral e atividades_acessorias, buscar TODOS os dados sem paginação
-  const viewsComTodosLancamentos: ViewType[] = ['visao_geral', 'atividades_acessorias', 'taf']
+  // Para visão geral, logística, atividades_acessorias e TAF, buscar TODOS os dados sem paginação
+  const viewsComTodosLancamentos: ViewType[] = ['visao_geral', 'atividades_acessorias', 'taf', 'logistica']
   const { data: lancamentosResult, isLoading: isLoadingLancamentos } = useLancamentos({
     baseId: userBaseId || undefined,
     equipeId: equipeId || undefined,
     indicadorId: viewsComTodosLancamentos.includes(view) ? undefined : getIndicadorId(),
     dataInicio: dataInicio || undefined,
     dataFim: dataFim || undefined,
-    enabled: !viewsComTodosLancamentos.includes(view),
+    enabled: !viewsComTodosLancamentos.includes(view) && !usarAnalyticsServidor,
     pageSize: 20,
   })
 
-  // Query que busca TODOS os lançamentos (sem paginação) para visão geral, atividades acessórias e TAF
+  // Query que busca TODOS os lançamentos (sem paginação) para visão geral, logística, atividades acessórias e TAF
   // TAF precisa de todos os dados para calcular corretamente a taxa de aprovação e os gráficos
-  const { data: todosLancamentosResult, isLoading: isLoadingTodos } = useQuery({
-    queryKey: ['lancamentos-todos', userBaseId, equipeId, dataInicio, dataFim, view, getIndicadorId()],
+  // Visão geral e logística combinam vários indicadores: o servidor filtra por schema_type (migration 050)
+  const queryClient = useQueryClient()
+  // Filtros num objeto na chave: o realtime os lê para atualizar o cache sem refetch (lancamentos-cache-patch)
+  const filtroTodos: LancamentosFiltroChave = {
+    baseId: userBaseId || undefined,
+    equipeId: equipeId || undefined,
+    indicadorId: view === 'atividades_acessorias' || view === 'taf' ? getIndicadorId() : undefined,
+    schemaTypes: schemaTypesDaView(view),
+    dataInicio: dataInicio || undefined,
+    dataFim: dataFim || undefined,
+  }
+  const chaveTodos = JSON.stringify(['lancamentos-todos', filtroTodos, view])
+  // Prefixo já carregado das faixas: fica fora do cache da query, que só recebe o resultado completo
+  const [parcialTodos, setParcialTodos] = useState<{
+    chave: string
+    linhas: Database['public']['Tables']['lancamentos']['Row'][]
+  } | null>(null)
+  const {
+    data: todosLancamentosResult,
+    isLoading: isLoadingTodos,
+    isPlaceholderData: isPlaceholderTodos,
+  } = useQuery({
+    queryKey: ['lancamentos-todos', filtroTodos, view],
     enabled: viewsComTodosLancamentos.includes(view),
     placeholderData: (prev) => prev,
-    queryFn: async () => {
-      // Otimização: buscar apenas colunas necessárias para Analytics
-      // Para Analytics, precisamos: id, data_referencia, base_id, equipe_id, indicador_id, conteudo
-      let q = supabase
-        .from('lancamentos')
-        .select('id, data_referencia, base_id, equipe_id, indicador_id, conteudo, user_id')
-        .order('data_referencia', { ascending: false })
-
-      if (isChefe && authUser?.profile?.base_id) {
-        q = q.eq('base_id', authUser.profile.base_id)
-      } else if (baseId) {
-        q = q.eq('base_id', baseId)
-      }
-      if (equipeId) q = q.eq('equipe_id', equipeId)
-      if (dataInicio) q = q.gte('data_referencia', dataInicio)
-      if (dataFim) q = q.lte('data_referencia', dataFim)
-
-      if (view === 'atividades_acessorias' || view === 'taf') {
-        const indicadorId = getIndicadorId()
-        if (indicadorId) q = q.eq('indicador_id', indicadorId)
+    // signal: ao trocar de view ou filtro, as faixas ainda em andamento são canceladas
+    queryFn: async ({ signal }) => {
+      // Com base definida: cópia local (IndexedDB) sincronizada de forma incremental
+      const userId = authUser?.user?.id
+      if (filtroTodos.baseId && userId) {
+        const locais = await lerLancamentosLocais(userId, filtroTodos.baseId, filtroTodos, () =>
+          queryClient.invalidateQueries({ queryKey: ['lancamentos-todos'] })
+        )
+        if (locais) return locais
       }
 
-      const { data, error } = await q
-      if (error) throw error
-      return (data || []) as Database['public']['Tables']['lancamentos']['Row'][]
+      // Otimização: buscar apenas colunas necessárias para Analytics
+      // Para Analytics, precisamos: id, data_referencia, base_id, equipe_id, indicador_id, schema_type e,
+      // do conteudo, só as chaves que a view agrega (selectAnalyticsView; remontadas ao chegar)
+      // Carga em faixas mensais paralelas (sem max-rows nem resposta única gigante); o que já
+      // chegou é mostrado como parcial, no máximo a cada INTERVALO_PARCIAL_MS
+      let ultimoParcial = 0
+      return carregarLancamentosEmFaixas<Database['public']['Tables']['lancamentos']['Row']>({
+        select: selectAnalyticsView(view),
+        filtros: filtroTodos,
+        mapear: remontarConteudo,
+        onParcial: (linhas) => {
+          const agora = Date.now()
+          if (agora - ultimoParcial < INTERVALO_PARCIAL_MS) return
+          ultimoParcial = agora
+          setParcialTodos({ chave: chaveTodos, linhas })
+        },
+        signal,
+      })
     },
   })
 
-  const lancamentos = viewsComTodosLancamentos.includes(view)
-    ? (todosLancamentosResult || [])
-    : (lancamentosResult?.data || [])
-  const isLoading = viewsComTodosLancamentos.includes(view) ? isLoadingTodos : isLoadingLancamentos
-
-  // Aplicar filtro por colaborador se necessário
-  let filteredLancamentos =
-    colaboradorNome && (view === 'taf' || view === 'prova_teorica' || view === 'treinamento' || view === 'tempo_tp_epr')
-      ? filterByColaborador(lancamentos, colaboradorNome)
-      : lancamentos
-
-  // Aplicar filtro por tipo de ocorrência (Ocorrência Não Aeronáutica)
-  if (view === 'ocorrencia_nao_aero' && tipoOcorrencia) {
-    filteredLancamentos = filteredLancamentos.filter((l) => {
-      const c = l.conteudo as { tipo_ocorrencia?: string }
-      return (c.tipo_ocorrencia || '') === tipoOcorrencia
-    })
-  }
-
-  // Aplicar filtro por tipo de ocorrência (Ocorrência Aeronáutica: Posicionamento / Intervenção)
-  if (view === 'ocorrencia_aero' && tipoOcorrenciaAero) {
-    filteredLancamentos = filteredLancamentos.filter((l) => {
-      const c = l.conteudo as { acao?: string }
-      return (c.acao || '') === tipoOcorrenciaAero
-    })
-  }
+  // Parcial só vale enquanto o filtro atual ainda não tem resultado próprio
+  const aguardandoTodos = isLoadingTodos || isPlaceholderTodos
+  const lancamentosParciais =
+    viewsComTodosLancamentos.includes(view) && aguardandoTodos && parcialTodos?.chave === chaveTodos
+      ? parcialTodos.linhas
+      : null
+  useEffect(() => {
+    if (!aguardandoTodos) setParcialTodos(null)
+  }, [aguardandoTodos])
 
-  // Processar dados conforme view
-  let processedData: any = null
-  if (filteredLancamentos.length > 0 || view === 'visao_geral') {
-    switch (view) {
-      case 'visao_geral':
-        if (bases && indicadoresConfig) {
-          // Sempre processar visão geral, mesmo sem lançamentos, para exibir zeros
-          processedData = generateExecutiveSummary(lancamentos || [], bases, indicadoresConfig)
-        }
-        break
-      case 'ocorrencia_aero':
-        processedData = processOcorrenciaAeronautica(filteredLancamentos)
-        break
-      case 'ocorrencia_nao_aero':
-        processedData = processOcorrenciaNaoAeronautica(filteredLancamentos)
-        break
-      case 'atividades_acessorias':
-        processedData = processAtividadesAcessorias(filteredLancamentos)
-        break
-      case 'taf':
-        processedData = processTAF(filteredLancamentos, colaboradorNome || undefined)
-        break
-      case 'prova_teorica':
-        processedData = processProvaTeorica(filteredLancamentos, colaboradorNome || undefined)
-        break
-      case 'treinamento':
-        processedData = processHorasTreinamento(filteredLancamentos)
-        break
-      case 'tempo_tp_epr':
-        processedData = processTempoTPEPR(filteredLancamentos)
-        break
-      case 'tempo_resposta':
-        processedData = processTempoResposta(filteredLancamentos)
-        break
-      case 'exercicio_posicionamento':
-        processedData = processExercicioPosicionamento(filteredLancamentos)
-        break
-      case 'inspecao_viaturas':
-        processedData = processInspecaoViaturas(filteredLancamentos)
-        break
-      case 'logistica':
-        // Agrupar dados de logística
-        processedData = {
-          estoque: processControleEstoque(
-            filteredLancamentos.filter((l) => {
-              const indicador = indicadoresConfig?.find((i) => i.id === l.indicador_id)
-              return indicador?.schema_type === 'estoque'
-            }),
-            bases
-          ),
-          epi: processControleEPI(
-            filteredLancamentos.filter((l) => {
-              const indicador = indicadoresConfig?.find((i) => i.id === l.indicador_id)
-              return indicador?.schema_type === 'controle_epi'
-            })
-          ),
-          trocas: processControleTrocas(
-            filteredLancamentos.filter((l) => {
-              const indicador = indicadoresConfig?.find((i) => i.id === l.indicador_id)
-              return indicador?.schema_type === 'controle_trocas'
-            })
-          ),
-        }
-        break
-    }
-  }
+  const lancamentos = viewsComTodosLancamentos.includes(view)
+    ? (lancamentosParciais ?? todosLancamentosResult ?? SEM_LANCAMENTOS)
+    : (lancamentosResult?.data ?? SEM_LANCAMENTOS)
+  const isLoading = usarAnalyticsServidor
+    ? analyticsRpc.isLoading
+    : viewsComTodosLancamentos.includes(view)
+      ? isLoadingTodos && !lancamentosParciais
+      : isLoadingLancamentos
+
+  // Processamento local (views sem RPC ou fallback) no analytics.worker, fora da main thread
+  const analyticsWorker = useAnalyticsWorker({
+    view,
+    lancamentos,
+    filters: { colaboradorNome, tipoOcorrencia, tipoOcorrenciaAero },
+    context: { bases, indicadoresConfig },
+    enabled: !usarAnalyticsServidor && !isLoading,
+  })
 
-  const showColaboradorFilter =
-    view === 'taf' || view === 'prova_teorica' || view === 'treinamento' || view === 'tempo_tp_epr'
-  const showTipoOcorrenciaFilter = view === 'ocorrencia_nao_aero'
-  const showTipoOcorrenciaAeroFilter = view === 'ocorrencia_aero'
+  const processedData: any = usarAnalyticsServidor
+    ? (analyticsRpc.data ?? null)
+    : view === 'visao_geral' && analyticsWorker.data
+      ? aplicarResumoExecutivo(
+          analyticsWorker.data as ResumoExecutivo,
+          resumoExecutivoRpc.data as unknown as ResumoExecutivoServidor | null | undefined
+        )
+      : analyticsWorker.data
+  const isProcessing = !usarAnalyticsServidor && analyticsWorker.isProcessing && !processedData
+  // Parcial na tela: carga em andamento, ou resultado de um parcial enquanto o worker processa o próximo
+  const exibindoParcial =
+    !!lancamentosParciais || (!usarAnalyticsServidor && analyticsWorker.isProcessing && !!processedData)
 
   useRealtimeSync()
 
@@ -655,8 +614,16 @@ export function DashboardAnalytics() {
                   onClearFilters={handleClearFilters}
                 />
 
+              {exibindoParcial && !isLoading && !isProcessing && (
+                <p className="mt-4 text-xs text-amber-700 bg-amber-50 dark:bg-amber-950/30 dark:text-amber-200 px-3 py-2 rounded-lg">
+                  {lancamentosParciais
+                    ? `Resultados parciais: ${lancamentosParciais.length.toLocaleString('pt-BR')} lançamentos carregados até agora. Os números serão atualizados ao fim da carga.`
+                    : 'Atualizando resultados...'}
+                </p>
+              )}
+
               {/* Conteúdo Dinâmico */}
-              {isLoading ? (
+              {isLoading || isProcessing ? (
                 <div className="text-center py-8">Carregando dados...</div>
               ) : view === 'visao_geral' && !processedData ? (
                 <div className="text-center py-8 text-gray-500">
@@ -2292,28 +2259,38 @@ export function DashboardAnalytics() {
                   {view === 'visao_geral' && processedData && (
                     <div className="space-y-6">
                         {/* KPIs */}
-                        <div className="grid grid-cols-1 md:grid-cols-4 gap-4">
+                        <div className={`grid grid-cols-1 gap-4 ${processedData.kpis?.aprovacaoTAF ? 'md:grid-cols-3' : 'md:grid-cols-4'}`}>
                           <Card>
                             <CardHeader className="pb-3">
                               <div className="flex items-center gap-2">
                                 <CardTitle className="text-sm font-medium text-gray-600">Volume Operacional</CardTitle>
-                                <InfoTooltip text="Soma total de ocorrências (Aeronáuticas + Não Aeronáuticas) no período filtrado. Compara com o período anterior (30 dias) mostrando a porcentagem de crescimento." />
+                                <InfoTooltip text="Soma total de ocorrências (Aeronáuticas + Não Aeronáuticas) no período filtrado. Compara com o período anterior de mesma duração (imediatamente antes da data inicial) mostrando a porcentagem de crescimento." />
                               </div>
                             </CardHeader>
                             <CardContent>
                               <div className="text-3xl font-bold">{processedData.kpis?.volumeOperacional?.valor ?? 0}</div>
-                              <div className="flex items-center gap-2 mt-2">
-                                {(processedData.kpis?.volumeOperacional?.crescimento ?? 0) >= 0 ? (
-                                  <TrendingUp className="h-4 w-4 text-green-600" />
-                                ) : (
-                                  <TrendingDown className="h-4 w-4 text-red-600" />
-                                )}
-                                <span className={`text-sm ${(processedData.kpis?.volumeOperacional?.crescimento ?? 0) >= 0 ? 'text-green-600' : 'text-red-600'}`}>
-                                  {(processedData.kpis?.volumeOperacional?.crescimento ?? 0) >= 0 ? '+' : ''}
-                                  {(processedData.kpis?.volumeOperacional?.crescimento ?? 0).toFixed(1)}%
-                                </span>
-                                <span className="text-xs text-gray-500">vs período anterior</span>
-                              </div>
+                              {processedData.kpis?.volumeOperacional?.crescimento != null ? (
+                                <div className="flex items-center gap-2 mt-2">
+                                  {processedData.kpis.volumeOperacional.crescimento >= 0 ? (
+                                    <TrendingUp className="h-4 w-4 text-green-600" />
+                                  ) : (
+                                    <TrendingDown className="h-4 w-4 text-red-600" />
+                                  )}
+                                  <span className={`text-sm ${processedData.kpis.volumeOperacional.crescimento >= 0 ? 'text-green-600' : 'text-red-600'}`}>
+                                    {processedData.kpis.volumeOperacional.crescimento >= 0 ? '+' : ''}
+                                    {processedData.kpis.volumeOperacional.crescimento.toFixed(1)}%
+                                  </span>
+                                  <span className="text-xs text-gray-500">
+                                    vs período anterior ({processedData.kpis.volumeOperacional.periodoAnterior})
+                                  </span>
+                                </div>
+                              ) : (
+                                <div className="mt-2 text-xs text-gray-500">
+                                  {processedData.kpis?.volumeOperacional?.periodoAnterior === 0
+                                    ? 'Nenhuma ocorrência no período anterior'
+                                    : 'Sem comparação com o período anterior'}
+                                </div>
+                              )}
                             </CardContent>
                           </Card>
                           <Card>
@@ -2332,6 +2309,11 @@ export function DashboardAnalytics() {
                                 <span className={`text-sm px-2 py-1 rounded ${(processedData.kpis?.agilidade?.cor ?? 'yellow') === 'green' ? 'bg-green-100 text-green-700' : 'bg-yellow-100 text-yellow-700'}`}>
                                   {(processedData.kpis?.agilidade?.tempoMedioMinutos ?? 0) < 3 ? 'Meta atingida' : 'Atenção necessária'}
                                 </span>
+                                {processedData.kpis?.agilidade?.tempoMedioAnterior && (
+                                  <span className="ml-2 text-xs text-gray-500">
+                                    Anterior: {processedData.kpis.agilidade.tempoMedioAnterior}
+                                  </span>
+                                )}
                               </div>
                             </CardContent>
                           </Card>
@@ -2347,9 +2329,57 @@ export function DashboardAnalytics() {
                                 <Users className="h-5 w-5 text-blue-600" />
                                 <div className="text-3xl font-bold">{processedData.kpis?.forcaTrabalho?.totalHoras ?? '00:00'}</div>
                               </div>
-                              <div className="mt-2 text-xs text-gray-500">Total de horas de treinamento</div>
+                              <div className="mt-2 text-xs text-gray-500">
+                                Total de horas de treinamento
+                                {processedData.kpis?.forcaTrabalho?.crescimento != null &&
+                                  ` (${processedData.kpis.forcaTrabalho.crescimento >= 0 ? '+' : ''}${processedData.kpis.forcaTrabalho.crescimento.toFixed(1)}% vs período anterior)`}
+                              </div>
                             </CardContent>
                           </Card>
+                          {processedData.kpis?.conformidadeTreinamento && (
+                            <Card>
+                              <CardHeader className="pb-3">
+                                <div className="flex items-center gap-2">
+                                  <CardTitle className="text-sm font-medium text-gray-600">Conformidade PTR-BA</CardTitle>
+                                  <InfoTooltip text="Percentual de colaboradores com pelo menos 16 horas de treinamento no período filtrado, comparado com o período anterior de mesma duração." />
+                                </div>
+                              </CardHeader>
+                              <CardContent>
+                                <div className="text-3xl font-bold">
+                                  {processedData.kpis.conformidadeTreinamento.percentual != null
+                                    ? `${processedData.kpis.conformidadeTreinamento.percentual.toFixed(1)}%`
+                                    : '—'}
+                                </div>
+                                <div className="mt-2 text-xs text-gray-500">
+                                  {processedData.kpis.conformidadeTreinamento.conformes} de {processedData.kpis.conformidadeTreinamento.efetivo} colaboradores
+                                  {processedData.kpis.conformidadeTreinamento.percentualAnterior != null &&
+                                    ` · anterior ${processedData.kpis.conformidadeTreinamento.percentualAnterior.toFixed(1)}%`}
+                                </div>
+                              </CardContent>
+                            </Card>
+                          )}
+                          {processedData.kpis?.aprovacaoTAF && (
+                            <Card>
+                              <CardHeader className="pb-3">
+                                <div className="flex items-center gap-2">
+                                  <CardTitle className="text-sm font-medium text-gray-600">Aprovação no TAF</CardTitle>
+                                  <InfoTooltip text="Percentual de avaliados aprovados no Teste de Aptidão Física no período filtrado, comparado com o período anterior de mesma duração." />
+                                </div>
+                              </CardHeader>
+                              <CardContent>
+                                <div className="text-3xl font-bold">
+                                  {processedData.kpis.aprovacaoTAF.percentual != null
+                                    ? `${processedData.kpis.aprovacaoTAF.percentual.toFixed(1)}%`
+                                    : '—'}
+                                </div>
+                                <div className="mt-2 text-xs text-gray-500">
+                                  {processedData.kpis.aprovacaoTAF.aprovados} de {processedData.kpis.aprovacaoTAF.avaliados} avaliados
+                                  {processedData.kpis.aprovacaoTAF.percentualAnterior != null &&
+                                    ` · anterior ${processedData.kpis.aprovacaoTAF.percentualAnterior.toFixed(1)}%`}
+                                </div>
+                              </CardContent>
+                            </Card>
+                          )}
                           <Card>
                             <CardHeader className="pb-3">
                               <div className="flex items-center gap-2">
@@ -3,6 +3,8 @@ import { useNavigate } from 'react-router-dom'
 import { useAuth } from '@/contexts/AuthContext'
 import { Button } from '@/components/ui/button'
 import { supabase } from '@/lib/supabase'
+import { useBases, useEquipes, useIndicadoresConfig } from '@/hooks/useReferenceData'
+import { marcarLancamentosDesatualizados } from '@/lib/lancamentos-sync'
 import { useQuery, useQueryClient } from '@tanstack/react-query'
 import { HistoryTable } from '@/components/HistoryTable'
 import { AppShell } from '@/components/AppShell'
@@ -52,8 +54,6 @@ import {
 
 type Indicador = Database['public']['Tables']['indicadores_config']['Row']
 type Lancamento = Database['public']['Tables']['lancamentos']['Row']
-type Base = Database['public']['Tables']['bases']['Row']
-type Equipe = Database['public']['Tables']['equipes']['Row']
 
 const INDICADOR_ICONS: Record<string, React.ComponentType<{ className?: string }>> = {
   ocorrencia_aero: AlertTriangle,
@@ -111,6 +111,38 @@ function getMonthRange(offset = 0) {
   return { start, end }
 }
 
+/**
+ * Total de lançamentos da base no mês. Lê o agregado mensal (migration 038: poucas linhas por
+ * equipe/indicador); se a tabela não estiver disponível, conta direto em lancamentos.
+ */
+async function countLancamentosMes(
+  baseId: string,
+  range: { start: string; end: string },
+  signal?: AbortSignal
+): Promise<number> {
+  let aggQuery = supabase
+    .from('lancamentos_monthly_agg')
+    .select('total_lancamentos')
+    .eq('base_id', baseId)
+    .eq('mes', range.start)
+  if (signal) aggQuery = aggQuery.abortSignal(signal)
+  const { data: agg, error: aggError } = await aggQuery
+  if (!aggError && agg) {
+    return agg.reduce((sum, row) => sum + (row.total_lancamentos ?? 0), 0)
+  }
+
+  let countQuery = supabase
+    .from('lancamentos')
+    .select('id', { count: 'exact', head: true })
+    .eq('base_id', baseId)
+    .gte('data_referencia', range.start)
+    .lte('data_referencia', range.end)
+  if (signal) countQuery = countQuery.abortSignal(signal)
+  const { count, error } = await countQuery
+  if (error) throw error
+  return count ?? 0
+}
+
 export function DashboardChefe() {
   const { authUser } = useAuth()
   const navigate = useNavigate()
@@ -126,63 +158,24 @@ export function DashboardChefe() {
   const nome = authUser?.profile?.nome || ''
   const primeiroNome = nome.split(' ')[0] || 'Usuário'
 
-  const { data: indicadores } = useQuery<Indicador[]>({
-    queryKey: ['indicadores'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('indicadores_config').select('*').order('nome')
-      if (error) throw error
-      return data || []
-    },
-  })
+  const { data: indicadores } = useIndicadoresConfig()
 
-  const { data: bases } = useQuery<Base[]>({
-    queryKey: ['bases'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('bases').select('*')
-      if (error) throw error
-      return data || []
-    },
-  })
+  const { data: bases } = useBases()
 
-  const { data: equipes } = useQuery<Equipe[]>({
-    queryKey: ['equipes'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('equipes').select('*')
-      if (error) throw error
-      return data || []
-    },
-  })
+  const { data: equipes } = useEquipes()
 
   const mesAtual = useMemo(() => getMonthRange(0), [])
   const mesAnterior = useMemo(() => getMonthRange(-1), [])
 
   const { data: countMesAtual } = useQuery({
     queryKey: ['stats-mes-atual', baseId, mesAtual.start, mesAtual.end],
-    queryFn: async () => {
-      const { count, error } = await supabase
-        .from('lancamentos')
-        .select('id', { count: 'exact' })
-        .eq('base_id', baseId!)
-        .gte('data_referencia', mesAtual.start)
-        .lte('data_referencia', mesAtual.end)
-      if (error) throw error
-      return count ?? 0
-    },
+    queryFn: ({ signal }) => countLancamentosMes(baseId!, mesAtual, signal),
     enabled: !!baseId,
   })
 
   const { data: countMesAnterior } = useQuery({
     queryKey: ['stats-mes-anterior', baseId, mesAnterior.start, mesAnterior.end],
-    queryFn: async () => {
-      const { count, error } = await supabase
-        .from('lancamentos')
-        .select('id', { count: 'exact' })
-        .eq('base_id', baseId!)
-        .gte('data_referencia', mesAnterior.start)
-        .lte('data_referencia', mesAnterior.end)
-      if (error) throw error
-      return count ?? 0
-    },
+    queryFn: ({ signal }) => countLancamentosMes(baseId!, mesAnterior, signal),
     enabled: !!baseId,
   })
 
@@ -224,6 +217,7 @@ export function DashboardChefe() {
     if (error) {
       alert(`Erro ao excluir: ${error.message}`)
     } else {
+      marcarLancamentosDesatualizados()
       queryClient.invalidateQueries({ queryKey: ['lancamentos'] })
       queryClient.invalidateQueries({ queryKey: ['stats-mes-atual'] })
       queryClient.invalidateQueries({ queryKey: ['stats-mes-anterior'] })
@@ -235,6 +229,7 @@ export function DashboardChefe() {
     setDrawerMode(null)
     setSelectedIndicador(null)
     setSelectedLancamento(null)
+    marcarLancamentosDesatualizados()
     queryClient.invalidateQueries({ queryKey: ['lancamentos'] })
     queryClient.invalidateQueries({ queryKey: ['stats-mes-atual'] })
     queryClient.invalidateQueries({ queryKey: ['stats-mes-anterior'] })
@@ -57,11 +57,12 @@ export function DashboardGerente() {
 
   const { data: feedbackPendentes } = useQuery({
     queryKey: ['suporte-feedbacks-pendentes'],
-    queryFn: async () => {
+    queryFn: async ({ signal }) => {
       const { count, error } = await supabase
         .from('feedbacks')
         .select('*', { count: 'exact', head: true })
         .eq('status', 'pendente')
+        .abortSignal(signal)
       if (error) throw error
       return count ?? 0
     },
@@ -1,23 +1,29 @@
-import React, { useState, useMemo, useEffect } from 'react'
+import React, { useState, useMemo, useEffect, useRef, useCallback } from 'react'
 import { useQuery } from '@tanstack/react-query'
 import { supabase } from '@/lib/supabase'
-import { useLancamentos } from '@/hooks/useLancamentos'
+import { useLancamentos, type LancamentosCursor } from '@/hooks/useLancamentos'
+import { contarLancamentos, percorrerLancamentosEmFaixas } from '@/lib/lancamentos-loader'
+import type { LancamentosFiltroChave } from '@/lib/lancamentos-cache-patch'
+import { exportarLancamentosCSV, type ProgressoExportacao } from '@/lib/export-stream'
 import { formatDateForDisplay } from '@/lib/date-utils'
 import {
-  flattenLancamento,
-  convertToCSV,
+  colunasExportacao,
   downloadCSV,
+  downloadCSVParts,
   generateFilename,
-  buildTreinamentoConsolidadoRows,
+  criarConsolidadoTreinamento,
   buildTreinamentoConsolidadoCSV,
   buildTreinamentoGranularRows,
   buildTreinamentoGranularCSV,
+  compararTreinamentoGranular,
+  type TreinamentoGranularRow,
 } from '@/lib/export-utils'
 import { getIndicadorDisplayName, sortIndicadoresPtrBaProximos } from '@/lib/indicadores-display'
 import { formatBaseName, formatEquipeName } from '@/lib/utils'
 import { getLancamentoAutorDisplayName } from '@/lib/lancamento-autor-display'
 import type { Database } from '@/lib/database.types'
 import { useAuth } from '@/contexts/AuthContext'
+import { useBases, useEquipes, useIndicadoresConfig } from '@/hooks/useReferenceData'
 import { AppShell } from '@/components/AppShell'
 import { FormDrawer } from '@/components/ui/form-drawer'
 import { Button } from '@/components/ui/button'
@@ -48,16 +54,16 @@ import {
 
 type Lancamento = Database['public']['Tables']['lancamentos']['Row']
 type Indicador = Database['public']['Tables']['indicadores_config']['Row']
-type Base = Database['public']['Tables']['bases']['Row']
-type Equipe = Database['public']['Tables']['equipes']['Row']
 type Profile = Database['public']['Tables']['profiles']['Row']
 
 const PAGE_SIZE = 20
-const MAX_EXPORT_ROWS = 3000 // Limite para exportação
+const MAX_EXPORT_ROWS = 200000 // Limite para exportação (lida e gravada em partes)
 
 export function DataExplorer() {
   const { authUser } = useAuth()
   const [page, setPage] = useState(1)
+  // Cursor de início de cada página já visitada (índice 0 = primeira página)
+  const [cursors, setCursors] = useState<(LancamentosCursor | null)[]>([null])
   const [baseId, setBaseId] = useState<string>('')
   const [equipeId, setEquipeId] = useState<string>('')
   const [indicadorId, setIndicadorId] = useState<string>('')
@@ -66,6 +72,9 @@ export function DataExplorer() {
   const [isExporting, setIsExporting] = useState(false)
   const [isExportingConsolidado, setIsExportingConsolidado] = useState(false)
   const [isExportingGranular, setIsExportingGranular] = useState(false)
+  // Exportação em andamento: progresso e cancelamento (uma por vez)
+  const [exportProgresso, setExportProgresso] = useState<ProgressoExportacao | null>(null)
+  const exportAbortRef = useRef<AbortController | null>(null)
   const [selectedLancamento, setSelectedLancamento] = useState<Lancamento | null>(null)
   const [selectedIndicador, setSelectedIndicador] = useState<Indicador | null>(null)
   const [showViewModal, setShowViewModal] = useState(false)
@@ -98,38 +107,17 @@ export function DataExplorer() {
   }, [])
 
   // Buscar bases, equipes e indicadores
-  const { data: bases } = useQuery<Base[]>({
-    queryKey: ['bases'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('bases').select('*').order('nome')
-      if (error) throw error
-      return data || []
-    },
-  })
+  const { data: bases } = useBases()
 
-  const { data: equipes } = useQuery<Equipe[]>({
-    queryKey: ['equipes'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('equipes').select('*').order('nome')
-      if (error) throw error
-      return data || []
-    },
-  })
+  const { data: equipes } = useEquipes()
 
-  const { data: indicadores } = useQuery<Indicador[]>({
-    queryKey: ['indicadores'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('indicadores_config').select('*').order('nome')
-      if (error) throw error
-      return data || []
-    },
-  })
+  const { data: indicadores } = useIndicadoresConfig()
 
   // Buscar todos os perfis para mapear user_id -> nome
   const { data: profiles } = useQuery<Profile[]>({
     queryKey: ['profiles-all'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('profiles').select('id, nome')
+    queryFn: async ({ signal }) => {
+      const { data, error } = await supabase.from('profiles').select('id, nome').abortSignal(signal)
       if (error) throw error
       return (data || []) as Profile[]
     },
@@ -169,6 +157,12 @@ export function DataExplorer() {
     return map
   }, [indicadores])
 
+  // Cursores pertencem ao filtro em que foram lidos: qualquer mudança de filtro volta à página 1
+  const resetPaginacao = useCallback(() => {
+    setPage(1)
+    setCursors([null])
+  }, [])
+
   // Validar e ajustar range de datas
   useEffect(() => {
     if (dataInicio && dataFim) {
@@ -178,9 +172,10 @@ export function DataExplorer() {
         const adjusted = enforceMaxDateRange(dataInicio, dataFim)
         setDataInicio(adjusted.dataInicio)
         setDataFim(adjusted.dataFim)
+        resetPaginacao()
       }
     }
-  }, [dataInicio, dataFim])
+  }, [dataInicio, dataFim, resetPaginacao])
 
   // Buscar lançamentos com paginação
   const { data: lancamentosData, isLoading, error } = useLancamentos({
@@ -191,70 +186,98 @@ export function DataExplorer() {
     dataFim: dataFim || undefined,
     page,
     pageSize: PAGE_SIZE,
+    pagination: 'keyset',
+    cursor: page > 1 ? cursors[page - 1] ?? null : null,
     enabled: true, // Sempre habilitado para gerente
   })
 
+  // Cancela a exportação em andamento ao sair da página
+  useEffect(() => () => exportAbortRef.current?.abort(), [])
+
+  const iniciarExportacao = () => {
+    exportAbortRef.current?.abort()
+    const controller = new AbortController()
+    exportAbortRef.current = controller
+    setExportProgresso(null)
+    return controller
+  }
+
+  const finalizarExportacao = (controller: AbortController) => {
+    if (exportAbortRef.current !== controller) return
+    exportAbortRef.current = null
+    setExportProgresso(null)
+  }
+
+  const handleCancelExport = () => exportAbortRef.current?.abort()
+
+  const exportacaoCancelada = (error: unknown) => error instanceof DOMException && error.name === 'AbortError'
+
+  const filtrosExportacao = (): LancamentosFiltroChave => ({ baseId, equipeId, indicadorId, dataInicio, dataFim })
+
+  /** Percorre os lançamentos do filtro em páginas, com progresso; retorna quantos foram lidos */
+  const percorrerParaExportacao = async (signal: AbortSignal, onLote: (lancamentos: Lancamento[]) => void) => {
+    const filtros = filtrosExportacao()
+    const total = Math.min(await contarLancamentos(filtros, signal), MAX_EXPORT_ROWS)
+    setExportProgresso({ processados: 0, total })
+    let processados = 0
+    await percorrerLancamentosEmFaixas<Lancamento>({
+      select: '*',
+      filtros,
+      maxLinhas: MAX_EXPORT_ROWS,
+      signal,
+      onLote: (lancamentos) => {
+        onLote(lancamentos)
+        processados += lancamentos.length
+        setExportProgresso({ processados, total: Math.max(total, processados) })
+      },
+    })
+    return processados
+  }
+
   // Função para exportar CSV
   const handleExportCSV = async () => {
     if (!lancamentosData) return
 
     setIsExporting(true)
+    const controller = iniciarExportacao()
     try {
-      // Buscar TODOS os lançamentos filtrados (sem paginação) para exportação
-      // Limitar a MAX_EXPORT_ROWS para evitar sobrecarga
-      let exportQuery = supabase
-        .from('lancamentos')
-        .select('*')
-        .order('data_referencia', { ascending: false })
-        .limit(MAX_EXPORT_ROWS)
-
-      // Aplicar filtros
-      if (baseId) exportQuery = exportQuery.eq('base_id', baseId)
-      if (equipeId) exportQuery = exportQuery.eq('equipe_id', equipeId)
-      if (indicadorId) exportQuery = exportQuery.eq('indicador_id', indicadorId)
-      if (dataInicio) exportQuery = exportQuery.gte('data_referencia', dataInicio)
-      if (dataFim) exportQuery = exportQuery.lte('data_referencia', dataFim)
-
-      const { data: allLancamentos, error: exportError } = await exportQuery
-
-      if (exportError) {
-        alert(`Erro ao exportar: ${exportError.message}`)
-        return
-      }
-
-      if (!allLancamentos || allLancamentos.length === 0) {
+      // Cabeçalho derivado dos schemas do filtro (todos os indicadores quando não há filtro);
+      // páginas achatadas e serializadas no worker, sem montar o CSV inteiro em memória
+      const schemaTypes = indicadorId
+        ? [indicadoresMap.get(indicadorId)?.schema_type ?? '']
+        : (indicadores ?? []).map((ind) => ind.schema_type)
+
+      const { partes, linhas } = await exportarLancamentosCSV({
+        filtros: filtrosExportacao(),
+        colunas: colunasExportacao(schemaTypes),
+        contexto: {
+          indicadores: indicadores ?? [],
+          bases: [...basesMap],
+          equipes: [...equipesMap],
+          profiles: [...profilesMap],
+        },
+        maxLinhas: MAX_EXPORT_ROWS,
+        signal: controller.signal,
+        onProgresso: setExportProgresso,
+      })
+
+      if (linhas === 0) {
         alert('Nenhum dado encontrado para exportar')
         return
       }
 
-      // Achatar todos os lançamentos
-      const flattenedRows: Array<Record<string, any>> = []
-      
-      for (const lancamento of allLancamentos as Lancamento[]) {
-        const indicador = indicadoresMap.get(lancamento.indicador_id)
-        if (!indicador) continue
-
-        const userName = getLancamentoAutorDisplayName(lancamento, profilesMap)
-        const baseName = basesMap.get(lancamento.base_id) || lancamento.base_id
-        const equipeName = equipesMap.get(lancamento.equipe_id) || lancamento.equipe_id
-
-        const rows = flattenLancamento(lancamento, indicador, userName, baseName, equipeName)
-        flattenedRows.push(...rows)
-      }
-
-      // Converter para CSV
-      const csvContent = convertToCSV(flattenedRows)
-      
       // Fazer download
       const filename = generateFilename('relatorio_indicadores')
-      downloadCSV(csvContent, filename)
+      downloadCSVParts(partes, filename)
 
-      alert(`Exportação concluída! ${flattenedRows.length} linha(s) exportada(s).`)
+      alert(`Exportação concluída! ${linhas} linha(s) exportada(s).`)
     } catch (error) {
+      if (exportacaoCancelada(error)) return
       console.error('Erro ao exportar:', error)
       alert(`Erro ao exportar: ${error instanceof Error ? error.message : 'Erro desconhecido'}`)
     } finally {
       setIsExporting(false)
+      finalizarExportacao(controller)
     }
   }
 
@@ -265,42 +288,30 @@ export function DataExplorer() {
     if (!indicador || indicador.schema_type !== 'treinamento') return
 
     setIsExportingConsolidado(true)
+    const controller = iniciarExportacao()
     try {
-      let exportQuery = supabase
-        .from('lancamentos')
-        .select('*')
-        .eq('indicador_id', indicadorId)
-        .order('data_referencia', { ascending: false })
-        .limit(MAX_EXPORT_ROWS)
-
-      if (baseId) exportQuery = exportQuery.eq('base_id', baseId)
-      if (equipeId) exportQuery = exportQuery.eq('equipe_id', equipeId)
-      if (dataInicio) exportQuery = exportQuery.gte('data_referencia', dataInicio)
-      if (dataFim) exportQuery = exportQuery.lte('data_referencia', dataFim)
-
-      const { data: allLancamentos, error: exportError } = await exportQuery
-
-      if (exportError) {
-        alert(`Erro ao exportar: ${exportError.message}`)
-        return
-      }
+      // Só os totais por colaborador/mês ficam em memória
+      const consolidado = criarConsolidadoTreinamento(basesMap)
+      const lidos = await percorrerParaExportacao(controller.signal, consolidado.adicionar)
 
-      if (!allLancamentos || allLancamentos.length === 0) {
+      if (lidos === 0) {
         alert('Nenhum lançamento de treinamento encontrado para o período e filtros selecionados.')
         return
       }
 
-      const rows = buildTreinamentoConsolidadoRows(allLancamentos as Lancamento[], basesMap)
+      const rows = consolidado.linhas()
       const csvContent = buildTreinamentoConsolidadoCSV(rows)
       const filename = generateFilename('fechamento_mensal_ptr_ba')
       downloadCSV(csvContent, filename)
 
       alert(`Fechamento mensal exportado! ${rows.length} linha(s) consolidada(s).`)
     } catch (error) {
+      if (exportacaoCancelada(error)) return
       console.error('Erro ao exportar fechamento mensal:', error)
       alert(`Erro ao exportar: ${error instanceof Error ? error.message : 'Erro desconhecido'}`)
     } finally {
       setIsExportingConsolidado(false)
+      finalizarExportacao(controller)
     }
   }
 
@@ -311,42 +322,32 @@ export function DataExplorer() {
     if (!indicador || indicador.schema_type !== 'treinamento') return
 
     setIsExportingGranular(true)
+    const controller = iniciarExportacao()
     try {
-      let exportQuery = supabase
-        .from('lancamentos')
-        .select('*')
-        .eq('indicador_id', indicadorId)
-        .order('data_referencia', { ascending: false })
-        .limit(MAX_EXPORT_ROWS)
-
-      if (baseId) exportQuery = exportQuery.eq('base_id', baseId)
-      if (equipeId) exportQuery = exportQuery.eq('equipe_id', equipeId)
-      if (dataInicio) exportQuery = exportQuery.gte('data_referencia', dataInicio)
-      if (dataFim) exportQuery = exportQuery.lte('data_referencia', dataFim)
-
-      const { data: allLancamentos, error: exportError } = await exportQuery
-
-      if (exportError) {
-        alert(`Erro ao exportar: ${exportError.message}`)
-        return
-      }
+      // Linhas por dia/colaborador geradas lote a lote; os lançamentos brutos não ficam em memória
+      const rows: TreinamentoGranularRow[] = []
+      const lidos = await percorrerParaExportacao(controller.signal, (lancamentos) => {
+        for (const row of buildTreinamentoGranularRows(lancamentos, basesMap, equipesMap)) rows.push(row)
+      })
 
-      if (!allLancamentos || allLancamentos.length === 0) {
+      if (lidos === 0) {
         alert('Nenhum lançamento de treinamento encontrado para o período e filtros selecionados.')
         return
       }
 
-      const rows = buildTreinamentoGranularRows(allLancamentos as Lancamento[], basesMap, equipesMap)
+      rows.sort(compararTreinamentoGranular)
       const csvContent = buildTreinamentoGranularCSV(rows)
       const filename = generateFilename('treinamento_detalhado_por_tema')
       downloadCSV(csvContent, filename)
 
       alert(`Exportação detalhada concluída! ${rows.length} linha(s) (uma por dia por colaborador; cada tema em uma coluna).`)
     } catch (error) {
+      if (exportacaoCancelada(error)) return
       console.error('Erro ao exportar detalhado:', error)
       alert(`Erro ao exportar: ${error instanceof Error ? error.message : 'Erro desconhecido'}`)
     } finally {
       setIsExportingGranular(false)
+      finalizarExportacao(controller)
     }
   }
 
@@ -371,6 +372,11 @@ export function DataExplorer() {
     : null
 
   const handlePageChange = (newPage: number) => {
+    if (newPage > page) {
+      const nextCursor = lancamentosData?.nextCursor
+      if (!nextCursor) return
+      setCursors((prev) => [...prev.slice(0, page), nextCursor])
+    }
     setPage(newPage)
     window.scrollTo({ top: 0, behavior: 'smooth' })
   }
@@ -382,7 +388,7 @@ export function DataExplorer() {
     const defaultRange = getDefaultDateRange()
     setDataInicio(defaultRange.dataInicio)
     setDataFim(defaultRange.dataFim)
-    setPage(1)
+    resetPaginacao()
   }
 
   return (
@@ -399,7 +405,10 @@ export function DataExplorer() {
             <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-5 gap-4">
               <div className="space-y-2">
                 <Label>Base</Label>
-                <Select value={baseId} onChange={(e) => setBaseId(e.target.value)}>
+                <Select value={baseId} onChange={(e) => {
+                  setBaseId(e.target.value)
+                  resetPaginacao()
+                }}>
                   <option value="">Todas as Bases</option>
                   {bases?.map((base) => (
                     <option key={base.id} value={base.id}>
@@ -411,7 +420,10 @@ export function DataExplorer() {
 
               <div className="space-y-2">
                 <Label>Equipe</Label>
-                <Select value={equipeId} onChange={(e) => setEquipeId(e.target.value)}>
+                <Select value={equipeId} onChange={(e) => {
+                  setEquipeId(e.target.value)
+                  resetPaginacao()
+                }}>
                   <option value="">Todas as Equipes</option>
                   {equipes?.map((equipe) => (
                     <option key={equipe.id} value={equipe.id}>
@@ -423,7 +435,10 @@ export function DataExplorer() {
 
               <div className="space-y-2">
                 <Label>Indicador</Label>
-                <Select value={indicadorId} onChange={(e) => setIndicadorId(e.target.value)}>
+                <Select value={indicadorId} onChange={(e) => {
+                  setIndicadorId(e.target.value)
+                  resetPaginacao()
+                }}>
                   <option value="">Todos os Indicadores</option>
                   {sortIndicadoresPtrBaProximos(indicadores ?? []).map((indicador) => (
                     <option key={indicador.id} value={indicador.id}>
@@ -438,7 +453,10 @@ export function DataExplorer() {
                 <Input
                   type="date"
                   value={dataInicio}
-                  onChange={(e) => setDataInicio(e.target.value)}
+                  onChange={(e) => {
+                    setDataInicio(e.target.value)
+                    resetPaginacao()
+                  }}
                 />
               </div>
 
@@ -447,7 +465,10 @@ export function DataExplorer() {
                 <Input
                   type="date"
                   value={dataFim}
-                  onChange={(e) => setDataFim(e.target.value)}
+                  onChange={(e) => {
+                    setDataFim(e.target.value)
+                    resetPaginacao()
+                  }}
                 />
               </div>
             </div>
@@ -499,11 +520,31 @@ export function DataExplorer() {
                 </Button>
               )}
             </div>
+            {exportProgresso && (
+              <div className="mt-3 space-y-1">
+                <div className="h-2 w-full rounded-full bg-muted overflow-hidden">
+                  <div
+                    className="h-full bg-primary transition-all"
+                    style={{
+                      width: `${exportProgresso.total > 0 ? Math.round((exportProgresso.processados / exportProgresso.total) * 100) : 0}%`,
+                    }}
+                  />
+                </div>
+                <div className="flex items-center justify-between text-xs text-muted-foreground">
+                  <span>
+                    {exportProgresso.processados.toLocaleString('pt-BR')} de {exportProgresso.total.toLocaleString('pt-BR')} lançamento(s)
+                  </span>
+                  <Button variant="ghost" size="sm" onClick={handleCancelExport}>
+                    Cancelar
+                  </Button>
+                </div>
+              </div>
+            )}
             {lancamentosData && (
               <p className="text-sm text-muted-foreground mt-2 text-center">
                 {lancamentosData.total} lançamento(s) encontrado(s)
                 {lancamentosData.total > MAX_EXPORT_ROWS && (
-                  <span className="text-orange-600"> (máximo {MAX_EXPORT_ROWS} linhas na exportação)</span>
+                  <span className="text-orange-600"> (máximo {MAX_EXPORT_ROWS.toLocaleString('pt-BR')} linhas na exportação)</span>
                 )}
               </p>
             )}
@@ -606,7 +647,7 @@ export function DataExplorer() {
                         variant="outline"
                         size="sm"
                         onClick={() => handlePageChange(page + 1)}
-                        disabled={page >= lancamentosData.totalPages}
+                        disabled={!lancamentosData.nextCursor}
                       >
                         Próximo
                       </Button>
@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { supabase } from '@/lib/supabase'
 import { useAuth } from '@/contexts/AuthContext'
+import { useBases, useEquipes } from '@/hooks/useReferenceData'
 import { useForm } from 'react-hook-form'
 import { zodResolver } from '@hookform/resolvers/zod'
 import { z } from 'zod'
@@ -17,8 +18,6 @@ import { Eye, EyeOff, Pencil, Trash2, Users, Search, UserPlus } from 'lucide-rea
 import { formatBaseName, formatEquipeName, parseResponseJson } from '@/lib/utils'
 import type { Database } from '@/lib/database.types'
 
-type Base = Database['public']['Tables']['bases']['Row']
-type Equipe = Database['public']['Tables']['equipes']['Row']
 
 const createUserSchema = z.object({
   nome: z.string().min(1, 'Nome é obrigatório'),
@@ -93,7 +92,7 @@ const ROLE_COLORS: Record<string, string> = {
 }
 
 export function GestaoUsuarios() {
-  const { authUser } = useAuth()
+  const { authUser, refreshAuth } = useAuth()
   const isGerenteSCI = authUser?.profile?.role === 'gerente_sci'
   const isGerenteGeral = authUser?.profile?.role === 'geral'
   const gerenteSCIBaseId = authUser?.profile?.base_id ?? ''
@@ -122,7 +121,7 @@ export function GestaoUsuarios() {
   const baseFilter = isBaseLocked ? gerenteSCIBaseId : filtroBaseId
   const { data: usuarios, isLoading, error: usuariosError } = useQuery<UsuarioComEmail[]>({
     queryKey: ['usuarios', baseFilter],
-    queryFn: async () => {
+    queryFn: async ({ signal }) => {
       try {
         let profiles: Profile[] = []
         if (baseFilter && baseFilter !== '') {
@@ -131,6 +130,7 @@ export function GestaoUsuarios() {
             .select('*')
             .eq('base_id', baseFilter)
             .order('created_at', { ascending: false })
+            .abortSignal(signal)
           if (errorBase) throw errorBase
           if (isBaseLocked) {
             profiles = (usuariosBase as Profile[]) || []
@@ -140,6 +140,7 @@ export function GestaoUsuarios() {
               .select('*')
               .eq('role', 'geral')
               .order('created_at', { ascending: false })
+              .abortSignal(signal)
             if (errorGeral) throw errorGeral
             const allProfiles: Profile[] = [...(usuariosBase as Profile[] || []), ...(gerentesGerais as Profile[] || [])]
             profiles = allProfiles.filter((profile, index, self) =>
@@ -151,6 +152,7 @@ export function GestaoUsuarios() {
             .from('profiles')
             .select('*')
             .order('created_at', { ascending: false })
+            .abortSignal(signal)
           if (error) throw error
           profiles = (data as Profile[]) || []
         }
@@ -180,27 +182,9 @@ export function GestaoUsuarios() {
     }
   }, [isBaseLocked, gerenteSCIBaseId])
 
-  const { data: bases, error: basesError } = useQuery<Base[]>({
-    queryKey: ['bases'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('bases').select('*').order('nome')
-      if (error) throw error
-      return data || []
-    },
-    retry: 1,
-    refetchOnWindowFocus: false,
-  })
+  const { data: bases, error: basesError } = useBases()
 
-  const { data: equipes, error: equipesError } = useQuery<Equipe[]>({
-    queryKey: ['equipes'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('equipes').select('*').order('nome')
-      if (error) throw error
-      return data || []
-    },
-    retry: 1,
-    refetchOnWindowFocus: false,
-  })
+  const { data: equipes, error: equipesError } = useEquipes()
 
   const {
     register,
@@ -400,6 +384,11 @@ export function GestaoUsuarios() {
     },
     onSuccess: async (updated: { acesso_gerente_sci?: boolean | null }, variables: UpdateUserFormData) => {
       queryClient.invalidateQueries({ queryKey: ['usuarios'] })
+      // Editou o próprio perfil: token novo com a claim "perfil" atualizada (migration 044)
+      if (variables.id === authUser?.user.id) {
+        await supabase.auth.refreshSession()
+        await refreshAuth()
+      }
       setShowDrawer(false)
       setIsEditMode(false)
       reset()
@@ -2,9 +2,8 @@ import { useState } from 'react'
 import { useAuth } from '@/contexts/AuthContext'
 import { Button } from '@/components/ui/button'
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card'
-import { supabase } from '@/lib/supabase'
+import { useBases, useEquipes, useIndicadoresConfig } from '@/hooks/useReferenceData'
 import { useNavigate } from 'react-router-dom'
-import { useQuery } from '@tanstack/react-query'
 import { HistoryTable } from '@/components/HistoryTable'
 import { AppShell } from '@/components/AppShell'
 import {
@@ -31,8 +30,6 @@ import { getIndicadorDisplayName } from '@/lib/indicadores-display'
 
 type Lancamento = Database['public']['Tables']['lancamentos']['Row']
 type Indicador = Database['public']['Tables']['indicadores_config']['Row']
-type Base = Database['public']['Tables']['bases']['Row']
-type Equipe = Database['public']['Tables']['equipes']['Row']
 
 const FORM_COMPONENTS: Record<string, React.ComponentType<any>> = {
   ocorrencia_aero: OcorrenciaAeronauticaForm,
@@ -65,35 +62,14 @@ export function LancamentosBase() {
   const [selectedLancamento, setSelectedLancamento] = useState<Lancamento | null>(null)
   const [selectedIndicador, setSelectedIndicador] = useState<Indicador | null>(null)
 
-  const { data: bases } = useQuery<Base[]>({
-    queryKey: ['bases'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('bases').select('*')
-      if (error) throw error
-      return data || []
-    },
-  })
+  const { data: bases } = useBases()
 
-  const { data: equipes } = useQuery<Equipe[]>({
-    queryKey: ['equipes'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('equipes').select('*')
-      if (error) throw error
-      return data || []
-    },
-  })
+  const { data: equipes } = useEquipes()
 
   const getBaseName = (id: string) => formatBaseName(bases?.find((b) => b.id === id)?.nome ?? '') || 'N/A'
   const getEquipeName = (id: string) => formatEquipeName(equipes?.find((e) => e.id === id)?.nome || 'N/A')
 
-  const { data: indicadores } = useQuery<Indicador[]>({
-    queryKey: ['indicadores'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('indicadores_config').select('*').order('nome')
-      if (error) throw error
-      return data || []
-    },
-  })
+  const { data: indicadores } = useIndicadoresConfig()
 
   const handleView = (lancamento: Lancamento) => {
     const indicador = indicadores?.find((ind) => ind.id === lancamento.indicador_id)
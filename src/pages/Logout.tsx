@@ -1,6 +1,8 @@
 import { useEffect } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { supabase } from '@/lib/supabase'
+import { clearReferenceCache } from '@/lib/reference-data'
+import { clearLancamentosLocais } from '@/lib/lancamentos-sync'
 
 export function Logout() {
   const navigate = useNavigate()
@@ -16,6 +18,7 @@ export function Logout() {
           }
         }
         keysToRemove.forEach(key => localStorage.removeItem(key))
+        await Promise.all([clearReferenceCache(), clearLancamentosLocais()])
         await supabase.auth.signOut()
       } catch {
         // Ignora erros
@@ -6,6 +6,7 @@ import { z } from 'zod'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { supabase } from '@/lib/supabase'
 import { useAuth } from '@/contexts/AuthContext'
+import { useBases, useEquipes } from '@/hooks/useReferenceData'
 import { Button } from '@/components/ui/button'
 import { Input } from '@/components/ui/input'
 import { Label } from '@/components/ui/label'
@@ -20,8 +21,6 @@ import { formatBaseName, formatEquipeName } from '@/lib/utils'
 import { renderTextWithBold, type UpdateInfo } from '@/components/UpdateModal'
 import type { Database } from '@/lib/database.types'
 
-type Base = Database['public']['Tables']['bases']['Row']
-type Equipe = Database['public']['Tables']['equipes']['Row']
 type Feedback = Database['public']['Tables']['feedbacks']['Row']
 
 // Schema para troca de senha
@@ -70,34 +69,21 @@ export function Settings() {
   }, [tabParam])
 
   // Buscar bases e equipes para exibir nomes
-  const { data: bases } = useQuery<Base[]>({
-    queryKey: ['bases'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('bases').select('*').order('nome')
-      if (error) throw error
-      return data || []
-    },
-  })
+  const { data: bases } = useBases()
 
-  const { data: equipes } = useQuery<Equipe[]>({
-    queryKey: ['equipes'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('equipes').select('*').order('nome')
-      if (error) throw error
-      return data || []
-    },
-  })
+  const { data: equipes } = useEquipes()
 
   // Buscar feedbacks do usuário
   const { data: feedbacks } = useQuery<Feedback[]>({
     queryKey: ['feedbacks', authUser?.user?.id],
-    queryFn: async () => {
+    queryFn: async ({ signal }) => {
       if (!authUser?.user.id) return []
       const { data, error } = await supabase
         .from('feedbacks')
         .select('*')
         .eq('user_id', authUser.user.id)
         .order('created_at', { ascending: false })
+        .abortSignal(signal)
       if (error) throw error
       return data || []
     },
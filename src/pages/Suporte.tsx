@@ -103,7 +103,7 @@ export function Suporte() {
     error,
   } = useQuery({
     queryKey: ['suporte-feedbacks', paginaAtual, itensPorPagina, filtroStatus],
-    queryFn: async (): Promise<{ list: FeedbackWithAuthor[]; total: number }> => {
+    queryFn: async ({ signal }): Promise<{ list: FeedbackWithAuthor[]; total: number }> => {
       const from = (paginaAtual - 1) * itensPorPagina
       const to = from + itensPorPagina - 1
       let query = supabase
@@ -113,7 +113,7 @@ export function Suporte() {
       if (filtroStatus !== 'todos') {
         query = query.eq('status', filtroStatus)
       }
-      const { data, error: err, count } = await query.range(from, to)
+      const { data, error: err, count } = await query.range(from, to).abortSignal(signal)
       if (err) throw err
       const rows = (data ?? []) as FeedbackJoinRow[]
       const list: FeedbackWithAuthor[] = rows.map((row) => ({
@@ -1,7 +1,9 @@
 import { useState } from 'react'
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
+import { useMutation, useQueryClient } from '@tanstack/react-query'
 import { supabase } from '@/lib/supabase'
 import { useAuth } from '@/contexts/AuthContext'
+import { useBases } from '@/hooks/useReferenceData'
+import { invalidateReferenceData } from '@/lib/reference-data'
 import { Button } from '@/components/ui/button'
 import { Input } from '@/components/ui/input'
 import { Label } from '@/components/ui/label'
@@ -23,14 +25,7 @@ export function Bases() {
   const [deleteConfirmBase, setDeleteConfirmBase] = useState<Base | null>(null)
   const [deleteTypedName, setDeleteTypedName] = useState('')
 
-  const { data: bases, isLoading, error } = useQuery<Base[]>({
-    queryKey: ['bases'],
-    queryFn: async () => {
-      const { data, error: err } = await supabase.from('bases').select('*').order('nome')
-      if (err) throw err
-      return data || []
-    },
-  })
+  const { data: bases, isLoading, error } = useBases()
 
   const createMutation = useMutation({
     mutationFn: async (nomeBase: string) => {
@@ -45,7 +40,7 @@ export function Bases() {
       return data
     },
     onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ['bases'] })
+      invalidateReferenceData(queryClient, 'bases')
       setShowDrawer(false)
       setNome('')
       setEditingBase(null)
@@ -63,7 +58,7 @@ export function Bases() {
       if (err) throw err
     },
     onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ['bases'] })
+      invalidateReferenceData(queryClient, 'bases')
       setShowDrawer(false)
       setNome('')
       setEditingBase(null)
@@ -76,7 +71,7 @@ export function Bases() {
       if (err) throw err
     },
     onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ['bases'] })
+      invalidateReferenceData(queryClient, 'bases')
       setDeleteConfirmBase(null)
       setDeleteTypedName('')
     },
@@ -1,7 +1,6 @@
 import { useState, useEffect } from 'react'
-import { useQuery } from '@tanstack/react-query'
-import { supabase } from '@/lib/supabase'
 import { useAuth } from '@/contexts/AuthContext'
+import { useBases } from '@/hooks/useReferenceData'
 import { Button } from '@/components/ui/button'
 import { Input } from '@/components/ui/input'
 import { Label } from '@/components/ui/label'
@@ -21,7 +20,6 @@ import { formatBaseName } from '@/lib/utils'
 import { Pencil, Trash2, UserPlus, Users, Search } from 'lucide-react'
 import type { Database } from '@/lib/database.types'
 
-type Base = Database['public']['Tables']['bases']['Row']
 type Colaborador = Database['public']['Tables']['colaboradores']['Row']
 
 export function Colaboradores() {
@@ -43,14 +41,7 @@ export function Colaboradores() {
   const [nomeIndividual, setNomeIndividual] = useState('')
   const [nomesBatch, setNomesBatch] = useState('')
 
-  const { data: bases } = useQuery<Base[]>({
-    queryKey: ['bases'],
-    queryFn: async () => {
-      const { data, error } = await supabase.from('bases').select('*').order('nome')
-      if (error) throw error
-      return data || []
-    },
-  })
+  const { data: bases } = useBases()
 
   const { data: colaboradores, isLoading } = useColaboradores(selectedBaseId || null)
   const createColaborador = useCreateColaborador()
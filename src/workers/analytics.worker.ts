@@ -0,0 +1,110 @@
+import { processAnalyticsView } from '@/lib/analytics-view'
+import type { AnalyticsView, AnalyticsViewContext, AnalyticsViewFilters } from '@/lib/analytics-view'
+import type { Database } from '@/lib/database.types'
+
+type Lancamento = Database['public']['Tables']['lancamentos']['Row']
+
+/**
+ * Worker do Dashboard Analytics: roda processAnalyticsView fora da main thread.
+ *
+ * Protocolo (ver useAnalyticsWorker):
+ *   dataset -> array de lançamentos (structured clone, sem JSON na main thread);
+ *              só é reenviado quando o array de lançamentos muda.
+ *   process -> view + filtros sobre um dataset já recebido. O dataset é marcado
+ *              como usado ao chegar o pedido, mesmo que outro o substitua depois:
+ *              é a mesma ordem de descarte que o hook acompanha.
+ *   cancel  -> descarta o pedido se ainda não começou.
+ * Pedidos que chegam enquanto outro roda substituem os anteriores: só o
+ * último pedido pendente é processado.
+ */
+
+export type AnalyticsWorkerRequest =
+  | { type: 'dataset'; datasetId: number; lancamentos: Lancamento[] }
+  | {
+      type: 'process'
+      requestId: number
+      datasetId: number
+      view: AnalyticsView
+      filters: AnalyticsViewFilters
+      context: AnalyticsViewContext
+    }
+  | { type: 'cancel'; requestId: number }
+
+export type AnalyticsWorkerResponse =
+  | { type: 'result'; requestId: number; data: unknown }
+  | { type: 'error'; requestId: number; message: string }
+
+type ProcessRequest = Extract<AnalyticsWorkerRequest, { type: 'process' }>
+
+// Mantém só os datasets mais recentes (voltar para a view anterior não reenvia os dados)
+const MAX_DATASETS = 2
+const datasets = new Map<number, Lancamento[]>()
+
+// Tipagem do escopo do worker (o tsconfig do app usa a lib DOM)
+const ctx = self as unknown as Worker
+
+let pending: ProcessRequest | null = null
+let scheduled = false
+
+function post(message: AnalyticsWorkerResponse) {
+  ctx.postMessage(message)
+}
+
+function runPending() {
+  scheduled = false
+  const request = pending
+  pending = null
+  if (!request) return
+
+  const lancamentos = datasets.get(request.datasetId)
+  if (!lancamentos) {
+    post({ type: 'error', requestId: request.requestId, message: 'Dataset não encontrado no worker' })
+    return
+  }
+
+  try {
+    const data = processAnalyticsView(request.view, lancamentos, request.filters, request.context)
+    post({ type: 'result', requestId: request.requestId, data })
+  } catch (error) {
+    post({
+      type: 'error',
+      requestId: request.requestId,
+      message: error instanceof Error ? error.message : String(error),
+    })
+  }
+}
+
+ctx.onmessage = (event: MessageEvent<AnalyticsWorkerRequest>) => {
+  const message = event.data
+
+  switch (message.type) {
+    case 'dataset': {
+      datasets.delete(message.datasetId)
+      datasets.set(message.datasetId, message.lancamentos)
+      while (datasets.size > MAX_DATASETS) {
+        const maisAntigo = datasets.keys().next().value as number
+        datasets.delete(maisAntigo)
+      }
+      break
+    }
+    case 'process': {
+      // Usado agora: vai para o fim da fila de descarte, como no hook ao enviar o pedido
+      const lancamentos = datasets.get(message.datasetId)
+      if (lancamentos) {
+        datasets.delete(message.datasetId)
+        datasets.set(message.datasetId, lancamentos)
+      }
+      // Substitui o pedido pendente; roda em tarefa separada para que mensagens já na fila o substituam antes
+      pending = message
+      if (!scheduled) {
+        scheduled = true
+        setTimeout(runPending, 0)
+      }
+      break
+    }
+    case 'cancel': {
+      if (pending?.requestId === message.requestId) pending = null
+      break
+    }
+  }
+}
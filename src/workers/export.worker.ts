@@ -0,0 +1,56 @@
+import { criarSerializadorLancamentos, type ExportContexto } from '@/lib/export-utils'
+import type { Database } from '@/lib/database.types'
+
+type Lancamento = Database['public']['Tables']['lancamentos']['Row']
+
+/**
+ * Worker da exportação CSV em partes: achata e serializa cada lote fora da main thread.
+ *
+ * Protocolo (ver exportarLancamentosCSV em src/lib/export-stream.ts):
+ *   inicio -> colunas iniciais + nomes (indicadores, bases, equipes, usuários);
+ *   lote   -> página de lançamentos; responde com o trecho CSV daquele lote;
+ *   fim    -> responde com o cabeçalho final (inclui colunas descobertas no caminho).
+ */
+
+export type ExportWorkerRequest =
+  | { type: 'inicio'; colunas: string[]; contexto: ExportContexto }
+  | { type: 'lote'; loteId: number; lancamentos: Lancamento[] }
+  | { type: 'fim' }
+
+export type ExportWorkerResponse =
+  | { type: 'parte'; loteId: number; csv: string; linhas: number }
+  | { type: 'cabecalho'; csv: string }
+  | { type: 'error'; message: string }
+
+// Tipagem do escopo do worker (o tsconfig do app usa a lib DOM)
+const ctx = self as unknown as Worker
+
+let serializador: ReturnType<typeof criarSerializadorLancamentos> | null = null
+
+function post(message: ExportWorkerResponse) {
+  ctx.postMessage(message)
+}
+
+ctx.onmessage = (event: MessageEvent<ExportWorkerRequest>) => {
+  const message = event.data
+  try {
+    switch (message.type) {
+      case 'inicio':
+        serializador = criarSerializadorLancamentos(message.colunas, message.contexto)
+        break
+      case 'lote': {
+        if (!serializador) throw new Error('Exportação não iniciada no worker')
+        const { csv, linhas } = serializador.lote(message.lancamentos)
+        post({ type: 'parte', loteId: message.loteId, csv, linhas })
+        break
+      }
+      case 'fim':
+        if (!serializador) throw new Error('Exportação não iniciada no worker')
+        post({ type: 'cabecalho', csv: serializador.cabecalho() })
+        serializador = null
+        break
+    }
+  } catch (error) {
+    post({ type: 'error', message: error instanceof Error ? error.message : String(error) })
+  }
+}
@@ -1,7 +1,9 @@
 /**
  * Autorização para funções de gestão de usuários:
  * - Valida JWT via Auth API (não confiar só em payload decodificado manualmente).
- * - Lê role (e flags) em public.profiles no banco.
+ * - Lê role (e flags) da claim "perfil" do token já validado (migration 044), se o
+ *   token foi emitido depois da última alteração do perfil (perfil_claims_revogadas,
+ *   migration 056); sem claim ou com claim revogada, lê public.profiles no banco.
  * - global: role = 'geral'
  * - base: gerente_sci ou chefe com acesso_gerente_sci — operações restritas à própria base_id
  */
@@ -26,6 +28,42 @@ type ProfileRow = {
   acesso_gerente_sci: boolean | null
 }
 
+/** Claim "perfil" gravada pelo custom_access_token_hook e o iat do token. Só chamar após auth.getUser(token) validar o token. */
+function perfilDaClaim(token: string): { perfil: ProfileRow; emitidoEm: number } | null {
+  try {
+    const payload = token.split('.')[1]
+    if (!payload) return null
+    const base64 = payload.replace(/-/g, '+').replace(/_/g, '/').padEnd(Math.ceil(payload.length / 4) * 4, '=')
+    const bytes = Uint8Array.from(atob(base64), (c) => c.charCodeAt(0))
+    const claims = JSON.parse(new TextDecoder().decode(bytes))
+    const perfil = claims?.perfil
+    if (!perfil || typeof perfil.role !== 'string' || typeof claims.iat !== 'number') return null
+    return {
+      perfil: {
+        role: perfil.role,
+        base_id: perfil.base_id ?? null,
+        acesso_gerente_sci: perfil.acesso_gerente_sci ?? null,
+      },
+      emitidoEm: claims.iat * 1000,
+    }
+  } catch {
+    return null
+  }
+}
+
+/** Mesma regra de public.perfil_claim(): claim emitida antes da última alteração do perfil não vale */
+// deno-lint-ignore no-explicit-any
+async function claimRevogada(supabaseAdmin: any, uid: string, emitidoEm: number): Promise<boolean> {
+  const { data, error } = await supabaseAdmin
+    .from('perfil_claims_revogadas')
+    .select('alterado_em')
+    .eq('user_id', uid)
+    .maybeSingle()
+  // Sem a tabela (migration não aplicada) ou erro: não confiar na claim
+  if (error) return true
+  return !!data && new Date(data.alterado_em).getTime() >= emitidoEm
+}
+
 // deno-lint-ignore no-explicit-any
 export async function resolveUserManagementCaller(
   supabaseAdmin: any,
@@ -62,22 +100,27 @@ export async function resolveUserManagementCaller(
   }
 
   const uid = userData.user.id
-  const { data: profile, error: profErr } = await supabaseAdmin
-    .from('profiles')
-    .select('role, base_id, acesso_gerente_sci')
-    .eq('id', uid)
-    .maybeSingle()
+  const claim = perfilDaClaim(token)
+  let p = claim && !(await claimRevogada(supabaseAdmin, uid, claim.emitidoEm)) ? claim.perfil : null
 
-  if (profErr || !profile) {
-    return {
-      response: new Response(JSON.stringify({ error: 'Perfil não encontrado' }), {
-        status: 403,
-        headers: { ...corsHeaders, 'Content-Type': 'application/json' },
-      }),
+  if (!p) {
+    const { data: profile, error: profErr } = await supabaseAdmin
+      .from('profiles')
+      .select('role, base_id, acesso_gerente_sci')
+      .eq('id', uid)
+      .maybeSingle()
+
+    if (profErr || !profile) {
+      return {
+        response: new Response(JSON.stringify({ error: 'Perfil não encontrado' }), {
+          status: 403,
+          headers: { ...corsHeaders, 'Content-Type': 'application/json' },
+        }),
+      }
     }
-  }
 
-  const p = profile as ProfileRow
+    p = profile as ProfileRow
+  }
 
   if (p.role === 'geral') {
     return { ctx: { scope: 'global', userId: uid } }
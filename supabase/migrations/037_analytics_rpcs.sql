@@ -0,0 +1,567 @@
+-- ============================================
+-- MIGRATION 037: RPCs de Analytics agregadas no servidor
+-- ============================================
+-- O Dashboard Analytics baixava todos os lançamentos (com o JSONB conteudo
+-- completo) e agregava no navegador (src/lib/analytics-utils.ts).
+-- Estas funções devolvem o mesmo payload de KPIs/gráficos já agregado,
+-- uma por schema_type, para as views que não exibem lista linha a linha:
+--   - analytics_tempo_resposta   (tempo_resposta, exercicio_posicionamento)
+--   - analytics_horas_treinamento (treinamento)
+--   - analytics_tempo_tp_epr      (tempo_tp_epr)
+--   - analytics_inspecao_viaturas (inspecao_viaturas)
+--
+-- SECURITY INVOKER (padrão): o RLS de lancamentos continua valendo, então
+-- Chefe/Auxiliar só agregam a própria base, como na consulta direta.
+-- Retornam NULL quando nenhum lançamento atende aos filtros (o frontend
+-- exibe "Nenhum dado encontrado"). As funções TS seguem como fallback.
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '120s';
+
+-- --------------------------------------------
+-- Helpers
+-- --------------------------------------------
+
+-- "mm:ss" -> segundos / "hh:mm" -> minutos (mesma aritmética de
+-- parseTimeMMSS e timeToMinutes no frontend). Valor inválido -> 0.
+CREATE OR REPLACE FUNCTION public.analytics_tempo_para_unidades(p_tempo TEXT)
+RETURNS INTEGER
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT COALESCE(m[1]::int * 60 + m[2]::int, 0)
+  FROM (SELECT regexp_match(COALESCE(p_tempo, ''), '^\s*(\d+):(\d+)') AS m) t;
+$$;
+
+COMMENT ON FUNCTION public.analytics_tempo_para_unidades(TEXT) IS
+  'Converte "mm:ss" em segundos (ou "hh:mm" em minutos). Inválido/vazio retorna 0.';
+
+-- Segundos -> "mm:ss" (espelha secondsToMMSS)
+CREATE OR REPLACE FUNCTION public.analytics_segundos_para_mmss(p_segundos NUMERIC)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT lpad(floor(COALESCE(p_segundos, 0) / 60)::bigint::text, 2, '0')
+    || ':' || lpad(floor(mod(COALESCE(p_segundos, 0), 60))::bigint::text, 2, '0');
+$$;
+
+COMMENT ON FUNCTION public.analytics_segundos_para_mmss(NUMERIC) IS
+  'Formata segundos como "mm:ss" (mesmo formato de secondsToMMSS no frontend).';
+
+-- Texto numérico -> numeric (equivalente a Number(x) || 0)
+CREATE OR REPLACE FUNCTION public.analytics_numero(p_valor TEXT)
+RETURNS NUMERIC
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT CASE
+    WHEN btrim(COALESCE(p_valor, '')) ~ '^-?\d+(\.\d+)?$' THEN btrim(p_valor)::numeric
+    ELSE 0
+  END;
+$$;
+
+COMMENT ON FUNCTION public.analytics_numero(TEXT) IS
+  'Converte texto numérico do JSONB em numeric; valores vazios/inválidos retornam 0.';
+
+-- Espelha filterByColaborador: procura o nome (ou motorista) nos arrays do conteudo
+CREATE OR REPLACE FUNCTION public.analytics_conteudo_tem_colaborador(p_conteudo JSONB, p_nome TEXT)
+RETURNS BOOLEAN
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT EXISTS (
+    SELECT 1
+    FROM unnest(ARRAY['avaliados', 'participantes', 'afericoes', 'colaboradores']) AS k(chave)
+    CROSS JOIN LATERAL jsonb_array_elements(
+      CASE WHEN jsonb_typeof(p_conteudo -> k.chave) = 'array' THEN p_conteudo -> k.chave ELSE '[]'::jsonb END
+    ) AS item(valor)
+    WHERE strpos(
+      lower(COALESCE(NULLIF(item.valor ->> 'nome', ''), item.valor ->> 'motorista', '')),
+      lower(p_nome)
+    ) > 0
+  );
+$$;
+
+COMMENT ON FUNCTION public.analytics_conteudo_tem_colaborador(JSONB, TEXT) IS
+  'True se algum item de avaliados/participantes/afericoes/colaboradores contém o nome (case-insensitive).';
+
+-- Lançamentos de um schema_type com os mesmos filtros do Dashboard Analytics.
+-- SECURITY INVOKER: RLS aplicado normalmente.
+CREATE OR REPLACE FUNCTION public.analytics_lancamentos_filtrados(
+  p_schema_type TEXT,
+  p_base_id UUID DEFAULT NULL,
+  p_equipe_id UUID DEFAULT NULL,
+  p_data_inicio DATE DEFAULT NULL,
+  p_data_fim DATE DEFAULT NULL,
+  p_colaborador TEXT DEFAULT NULL
+)
+RETURNS SETOF public.lancamentos
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  SELECT l.*
+  FROM public.lancamentos l
+  JOIN public.indicadores_config ic ON ic.id = l.indicador_id
+  WHERE ic.schema_type = p_schema_type
+    AND (p_base_id IS NULL OR l.base_id = p_base_id)
+    AND (p_equipe_id IS NULL OR l.equipe_id = p_equipe_id)
+    AND (p_data_inicio IS NULL OR l.data_referencia >= p_data_inicio)
+    AND (p_data_fim IS NULL OR l.data_referencia <= p_data_fim)
+    AND (
+      NULLIF(btrim(COALESCE(p_colaborador, '')), '') IS NULL
+      OR public.analytics_conteudo_tem_colaborador(l.conteudo, btrim(p_colaborador))
+    );
+$$;
+
+COMMENT ON FUNCTION public.analytics_lancamentos_filtrados(TEXT, UUID, UUID, DATE, DATE, TEXT) IS
+  'Lançamentos do schema_type informado filtrados por base/equipe/período/colaborador (RLS do chamador).';
+
+-- --------------------------------------------
+-- Tempo Resposta / Exercício de Posicionamento (espelha processTempoResposta)
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.analytics_tempo_resposta(
+  p_schema_type TEXT DEFAULT 'tempo_resposta',
+  p_base_id UUID DEFAULT NULL,
+  p_equipe_id UUID DEFAULT NULL,
+  p_data_inicio DATE DEFAULT NULL,
+  p_data_fim DATE DEFAULT NULL,
+  p_colaborador TEXT DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH lanc AS (
+    SELECT * FROM public.analytics_lancamentos_filtrados(
+      p_schema_type, p_base_id, p_equipe_id, p_data_inicio, p_data_fim, p_colaborador
+    )
+  ),
+  afericoes AS (
+    SELECT
+      COALESCE(a.valor ->> 'viatura', '') AS viatura,
+      l.data_referencia,
+      a.ord,
+      public.analytics_tempo_para_unidades(a.valor ->> 'tempo') AS segundos
+    FROM lanc l
+    CROSS JOIN LATERAL jsonb_array_elements(
+      CASE WHEN jsonb_typeof(l.conteudo -> 'afericoes') = 'array' THEN l.conteudo -> 'afericoes' ELSE '[]'::jsonb END
+    ) WITH ORDINALITY AS a(valor, ord)
+  ),
+  validas AS (
+    SELECT * FROM afericoes WHERE segundos > 0
+  ),
+  resumo AS (
+    SELECT count(*) AS total, avg(segundos) AS media, min(segundos) AS menor, max(segundos) AS maior
+    FROM validas
+  ),
+  recorde AS (
+    SELECT viatura, segundos FROM validas ORDER BY segundos ASC, data_referencia DESC, ord LIMIT 1
+  ),
+  alerta AS (
+    SELECT viatura, segundos FROM validas ORDER BY segundos DESC, data_referencia DESC, ord LIMIT 1
+  ),
+  por_viatura AS (
+    SELECT viatura, avg(segundos) AS media FROM validas GROUP BY viatura
+  ),
+  por_mes AS (
+    SELECT date_trunc('month', data_referencia)::date AS mes, avg(segundos) AS media
+    FROM validas
+    GROUP BY 1
+  ),
+  faixas AS (
+    SELECT
+      count(*) FILTER (WHERE segundos < 120) AS excelente,
+      count(*) FILTER (WHERE segundos BETWEEN 120 AND 180) AS bom,
+      count(*) FILTER (WHERE segundos > 180) AS critico
+    FROM validas
+  )
+  SELECT jsonb_build_object(
+    'kpis', jsonb_build_object(
+      'menorTempo', (SELECT jsonb_build_object('tempo', public.analytics_segundos_para_mmss(segundos), 'viatura', viatura) FROM recorde),
+      'maiorTempo', (SELECT jsonb_build_object('tempo', public.analytics_segundos_para_mmss(segundos), 'viatura', viatura) FROM alerta),
+      'tempoMedioGeral', public.analytics_segundos_para_mmss(round(COALESCE(r.media, 0))),
+      'tempoMedioGeralSegundos', COALESCE(r.media, 0),
+      'totalExercicios', r.total
+    ),
+    'graficoPerformancePorViatura', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+        'viatura', viatura,
+        'mediaSegundos', media,
+        'mediaFormatada', public.analytics_segundos_para_mmss(round(media))
+      ) ORDER BY viatura)
+      FROM por_viatura
+    ), '[]'::jsonb),
+    'graficoCurvaAgilidade', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+        'mes', to_char(mes, 'Mon/YYYY'),
+        'mesKey', to_char(mes, 'YYYY-MM'),
+        'mediaSegundos', media,
+        'mediaFormatada', public.analytics_segundos_para_mmss(round(media))
+      ) ORDER BY mes)
+      FROM por_mes
+    ), '[]'::jsonb),
+    'graficoConsistencia', jsonb_build_array(
+      jsonb_build_object('name', 'Excelente (< 2min)', 'value', f.excelente,
+        'porcentagem', CASE WHEN r.total > 0 THEN f.excelente * 100.0 / r.total ELSE 0 END),
+      jsonb_build_object('name', 'Bom (2min - 3min)', 'value', f.bom,
+        'porcentagem', CASE WHEN r.total > 0 THEN f.bom * 100.0 / r.total ELSE 0 END),
+      jsonb_build_object('name', 'Crítico (> 3min)', 'value', f.critico,
+        'porcentagem', CASE WHEN r.total > 0 THEN f.critico * 100.0 / r.total ELSE 0 END)
+    ),
+    -- A view não exibe a lista linha a linha; omitida para manter o payload pequeno.
+    'listaCompleta', '[]'::jsonb
+  )
+  FROM resumo r, faixas f
+  WHERE EXISTS (SELECT 1 FROM lanc);
+$$;
+
+COMMENT ON FUNCTION public.analytics_tempo_resposta(TEXT, UUID, UUID, DATE, DATE, TEXT) IS
+  'Analytics de Tempo Resposta / Exercício de Posicionamento agregado no servidor (payload de processTempoResposta).';
+
+-- --------------------------------------------
+-- PTR-BA Horas de Treinamento (espelha processHorasTreinamento)
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.analytics_horas_treinamento(
+  p_schema_type TEXT DEFAULT 'treinamento',
+  p_base_id UUID DEFAULT NULL,
+  p_equipe_id UUID DEFAULT NULL,
+  p_data_inicio DATE DEFAULT NULL,
+  p_data_fim DATE DEFAULT NULL,
+  p_colaborador TEXT DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH lanc AS (
+    SELECT * FROM public.analytics_lancamentos_filtrados(
+      p_schema_type, p_base_id, p_equipe_id, p_data_inicio, p_data_fim, p_colaborador
+    )
+  ),
+  participantes AS (
+    SELECT
+      p.valor ->> 'nome' AS nome,
+      COALESCE(NULLIF(p.valor ->> 'total_dia', ''), p.valor ->> 'horas') AS horas,
+      l.equipe_id,
+      l.data_referencia
+    FROM lanc l
+    CROSS JOIN LATERAL jsonb_array_elements(
+      CASE WHEN jsonb_typeof(l.conteudo -> 'participantes') = 'array' THEN l.conteudo -> 'participantes' ELSE '[]'::jsonb END
+    ) AS p(valor)
+  ),
+  por_colaborador AS (
+    SELECT
+      nome,
+      sum(public.analytics_tempo_para_unidades(horas)) AS minutos,
+      (array_agg(equipe_id ORDER BY data_referencia ASC))[1] AS equipe_id
+    FROM participantes
+    WHERE COALESCE(nome, '') <> '' AND COALESCE(horas, '') <> ''
+    GROUP BY nome
+  ),
+  resumo AS (
+    SELECT
+      count(*) AS total,
+      count(*) FILTER (WHERE minutos >= 16 * 60) AS apto,
+      count(*) FILTER (WHERE minutos < 16 * 60) AS irregular,
+      COALESCE(avg(minutos / 60.0), 0) AS media_horas
+    FROM por_colaborador
+  ),
+  faixas AS (
+    SELECT
+      CASE
+        WHEN minutos / 60.0 < 8 THEN '0-8h'
+        WHEN minutos / 60.0 < 16 THEN '8-15h'
+        WHEN minutos / 60.0 <= 24 THEN '16-24h'
+        ELSE '25h+'
+      END AS faixa,
+      count(*) AS quantidade
+    FROM por_colaborador
+    GROUP BY 1
+  ),
+  por_equipe AS (
+    SELECT equipe_id, avg(minutos / 60.0) AS media_horas
+    FROM por_colaborador
+    GROUP BY equipe_id
+  )
+  SELECT jsonb_build_object(
+    'kpis', jsonb_build_object(
+      'efetivoTotalAnalisado', r.total,
+      'efetivoApto', r.apto,
+      'efetivoAptoPercentual', CASE WHEN r.total > 0 THEN round(r.apto * 100.0 / r.total, 1) ELSE 0 END,
+      'efetivoIrregular', r.irregular,
+      'efetivoIrregularPercentual', CASE WHEN r.total > 0 THEN round(r.irregular * 100.0 / r.total, 1) ELSE 0 END,
+      'mediaHorasGeral', round(r.media_horas, 2),
+      'mediaHorasGeralFormatada', to_char(round(r.media_horas, 2), 'FM9999990.00')
+    ),
+    'graficoSituacaoTropa', jsonb_build_array(
+      jsonb_build_object('name', 'Conforme (>=16h)', 'value', r.apto,
+        'porcentagem', CASE WHEN r.total > 0 THEN r.apto * 100.0 / r.total ELSE 0 END),
+      jsonb_build_object('name', 'Não Conforme (<16h)', 'value', r.irregular,
+        'porcentagem', CASE WHEN r.total > 0 THEN r.irregular * 100.0 / r.total ELSE 0 END)
+    ),
+    'graficoDistribuicaoCargaHoraria', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object('faixa', faixa, 'quantidade', quantidade)
+        ORDER BY array_position(ARRAY['0-8h', '8-15h', '16-24h', '25h+'], faixa))
+      FROM faixas
+    ), '[]'::jsonb),
+    'graficoDesempenhoPorEquipe', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object('equipe', equipe_id, 'mediaHoras', media_horas) ORDER BY media_horas DESC)
+      FROM por_equipe
+    ), '[]'::jsonb),
+    'listaCompleta', '[]'::jsonb
+  )
+  FROM resumo r
+  WHERE EXISTS (SELECT 1 FROM lanc);
+$$;
+
+COMMENT ON FUNCTION public.analytics_horas_treinamento(TEXT, UUID, UUID, DATE, DATE, TEXT) IS
+  'Analytics de PTR-BA Horas de Treinamento (meta 16h) agregado no servidor (payload de processHorasTreinamento).';
+
+-- --------------------------------------------
+-- Tempo TP/EPR (espelha processTempoTPEPR; meta 59s)
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.analytics_tempo_tp_epr(
+  p_schema_type TEXT DEFAULT 'tempo_tp_epr',
+  p_base_id UUID DEFAULT NULL,
+  p_equipe_id UUID DEFAULT NULL,
+  p_data_inicio DATE DEFAULT NULL,
+  p_data_fim DATE DEFAULT NULL,
+  p_colaborador TEXT DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH lanc AS (
+    SELECT * FROM public.analytics_lancamentos_filtrados(
+      p_schema_type, p_base_id, p_equipe_id, p_data_inicio, p_data_fim, p_colaborador
+    )
+  ),
+  avaliados AS (
+    SELECT
+      COALESCE(a.valor ->> 'nome', '') AS nome,
+      l.equipe_id,
+      l.data_referencia,
+      a.ord,
+      public.analytics_tempo_para_unidades(a.valor ->> 'tempo') AS segundos
+    FROM lanc l
+    CROSS JOIN LATERAL jsonb_array_elements(
+      CASE WHEN jsonb_typeof(l.conteudo -> 'avaliados') = 'array' THEN l.conteudo -> 'avaliados' ELSE '[]'::jsonb END
+    ) WITH ORDINALITY AS a(valor, ord)
+  ),
+  validas AS (
+    SELECT * FROM avaliados WHERE segundos > 0
+  ),
+  resumo AS (
+    SELECT
+      count(*) AS total,
+      count(*) FILTER (WHERE segundos <= 59) AS dentro_meta,
+      avg(segundos) AS media
+    FROM validas
+  ),
+  recorde AS (
+    SELECT nome, equipe_id, segundos FROM validas ORDER BY segundos ASC, data_referencia DESC, ord LIMIT 1
+  ),
+  por_equipe AS (
+    SELECT equipe_id, avg(segundos) AS media FROM validas GROUP BY equipe_id
+  ),
+  faixas AS (
+    SELECT
+      CASE
+        WHEN segundos BETWEEN 30 AND 40 THEN '30-40s'
+        WHEN segundos BETWEEN 41 AND 50 THEN '41-50s'
+        WHEN segundos BETWEEN 51 AND 59 THEN '51-59s'
+        WHEN segundos BETWEEN 60 AND 70 THEN '1m-1m10s'
+        WHEN segundos > 70 THEN '1m10s+'
+        ELSE '<30s'
+      END AS faixa,
+      count(*) AS qtd
+    FROM validas
+    GROUP BY 1
+  ),
+  por_mes AS (
+    SELECT date_trunc('month', data_referencia)::date AS mes, avg(segundos) AS media
+    FROM validas
+    GROUP BY 1
+  ),
+  taxa AS (
+    SELECT CASE WHEN total > 0 THEN dentro_meta * 100.0 / total ELSE 0 END AS prontidao FROM resumo
+  )
+  SELECT jsonb_build_object(
+    'kpis', jsonb_build_object(
+      'totalAvaliacoes', r.total,
+      'taxaProntidao', round(t.prontidao, 2),
+      'tempoMedioGeral', public.analytics_segundos_para_mmss(round(COALESCE(r.media, 0))),
+      'tempoMedioGeralSegundos', COALESCE(r.media, 0),
+      'recorde', (
+        SELECT jsonb_build_object(
+          'tempo', public.analytics_segundos_para_mmss(segundos),
+          'nome', nome,
+          'equipe_id', equipe_id
+        )
+        FROM recorde
+      )
+    ),
+    'graficoAderenciaMeta', jsonb_build_array(
+      jsonb_build_object('name', 'Dentro da Meta (≤59s)', 'value', r.dentro_meta, 'porcentagem', t.prontidao),
+      jsonb_build_object('name', 'Acima da Meta (>59s)', 'value', r.total - r.dentro_meta, 'porcentagem', 100 - t.prontidao)
+    ),
+    'graficoPerformancePorEquipe', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+        'equipe', equipe_id,
+        'mediaSegundos', media,
+        'mediaFormatada', public.analytics_segundos_para_mmss(round(media))
+      ))
+      FROM por_equipe
+    ), '[]'::jsonb),
+    'graficoDistribuicaoTempos', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object('faixa', faixa, 'qtd', qtd)
+        ORDER BY array_position(ARRAY['<30s', '30-40s', '41-50s', '51-59s', '1m-1m10s', '1m10s+'], faixa))
+      FROM faixas
+    ), '[]'::jsonb),
+    'graficoEvolucaoMediaMensal', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+        'mes', to_char(mes, 'Mon/YYYY'),
+        'mesKey', to_char(mes, 'YYYY-MM'),
+        'mediaSegundos', media,
+        'mediaFormatada', public.analytics_segundos_para_mmss(round(media))
+      ) ORDER BY mes)
+      FROM por_mes
+    ), '[]'::jsonb),
+    'listaCompleta', '[]'::jsonb
+  )
+  FROM resumo r, taxa t
+  WHERE EXISTS (SELECT 1 FROM lanc);
+$$;
+
+COMMENT ON FUNCTION public.analytics_tempo_tp_epr(TEXT, UUID, UUID, DATE, DATE, TEXT) IS
+  'Analytics de Tempo TP/EPR (meta 59s) agregado no servidor (payload de processTempoTPEPR).';
+
+-- --------------------------------------------
+-- Inspeção de Viaturas (espelha processInspecaoViaturas / normalizeInspecaoViaturaRow)
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.analytics_inspecao_viaturas(
+  p_schema_type TEXT DEFAULT 'inspecao_viaturas',
+  p_base_id UUID DEFAULT NULL,
+  p_equipe_id UUID DEFAULT NULL,
+  p_data_inicio DATE DEFAULT NULL,
+  p_data_fim DATE DEFAULT NULL,
+  p_colaborador TEXT DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH lanc AS (
+    SELECT * FROM public.analytics_lancamentos_filtrados(
+      p_schema_type, p_base_id, p_equipe_id, p_data_inicio, p_data_fim, p_colaborador
+    )
+  ),
+  inspecoes AS (
+    SELECT
+      btrim(COALESCE(i.valor ->> 'viatura', '')) AS viatura,
+      l.data_referencia,
+      public.analytics_numero(i.valor ->> 'qtd_inspecoes') AS qtd_inspecoes,
+      CASE
+        WHEN btrim(COALESCE(i.valor ->> 'qtd_itens_inspecionados', '')) <> ''
+          THEN public.analytics_numero(i.valor ->> 'qtd_itens_inspecionados')
+        ELSE public.analytics_numero(i.valor ->> 'qtd_inspecoes')
+      END AS qtd_itens_inspecionados,
+      COALESCE(
+        NULLIF(public.analytics_numero(i.valor ->> 'qtd_itens_nao_conforme'), 0),
+        public.analytics_numero(i.valor ->> 'qtd_nao_conforme')
+      ) AS qtd_itens_nao_conforme
+    FROM lanc l
+    CROSS JOIN LATERAL jsonb_array_elements(
+      CASE WHEN jsonb_typeof(l.conteudo -> 'inspecoes') = 'array' THEN l.conteudo -> 'inspecoes' ELSE '[]'::jsonb END
+    ) AS i(valor)
+  ),
+  resumo AS (
+    SELECT
+      COALESCE(sum(qtd_inspecoes), 0) AS total_inspecoes,
+      COALESCE(sum(qtd_itens_inspecionados), 0) AS total_itens,
+      COALESCE(sum(qtd_itens_nao_conforme), 0) AS total_nao_conforme
+    FROM inspecoes
+  ),
+  taxa AS (
+    SELECT
+      greatest(0, total_itens - total_nao_conforme) AS total_conforme,
+      CASE
+        WHEN total_itens > 0 THEN greatest(0, total_itens - total_nao_conforme) * 100.0 / total_itens
+        ELSE 100
+      END AS conformidade
+    FROM resumo
+  ),
+  por_viatura AS (
+    SELECT viatura, sum(qtd_inspecoes) AS inspecoes, sum(qtd_itens_nao_conforme) AS nao_conforme
+    FROM inspecoes
+    GROUP BY viatura
+  ),
+  por_mes AS (
+    SELECT date_trunc('month', data_referencia)::date AS mes, sum(qtd_itens_nao_conforme) AS nao_conforme
+    FROM inspecoes
+    GROUP BY 1
+  )
+  SELECT jsonb_build_object(
+    'kpis', jsonb_build_object(
+      'totalQtdInspecoes', r.total_inspecoes,
+      'totalItensInspecionados', r.total_itens,
+      'totalNaoConforme', r.total_nao_conforme,
+      'taxaConformidadeGlobal', round(t.conformidade, 2),
+      'viaturaMaisCritica', (
+        SELECT jsonb_build_object('viatura', viatura, 'naoConforme', nao_conforme)
+        FROM por_viatura
+        ORDER BY nao_conforme DESC
+        LIMIT 1
+      )
+    ),
+    'graficoSaudeFrota', jsonb_build_array(
+      jsonb_build_object('name', 'Conformes', 'value', t.total_conforme, 'porcentagem', t.conformidade),
+      jsonb_build_object('name', 'Não Conformes', 'value', r.total_nao_conforme, 'porcentagem', 100 - t.conformidade)
+    ),
+    'graficoRankingProblemas', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+        'viatura', viatura,
+        'inspecoes', inspecoes,
+        'naoConforme', nao_conforme
+      ) ORDER BY nao_conforme DESC)
+      FROM por_viatura
+    ), '[]'::jsonb),
+    'graficoTendenciaDesgaste', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+        'mes', to_char(mes, 'Mon/YYYY'),
+        'mesKey', to_char(mes, 'YYYY-MM'),
+        'naoConforme', nao_conforme
+      ) ORDER BY mes)
+      FROM por_mes
+    ), '[]'::jsonb),
+    'listaCompleta', '[]'::jsonb
+  )
+  FROM resumo r, taxa t
+  WHERE EXISTS (SELECT 1 FROM lanc);
+$$;
+
+COMMENT ON FUNCTION public.analytics_inspecao_viaturas(TEXT, UUID, UUID, DATE, DATE, TEXT) IS
+  'Analytics de Inspeção de Viaturas agregado no servidor (payload de processInspecaoViaturas).';
+
+-- --------------------------------------------
+-- Permissões
+-- --------------------------------------------
+GRANT EXECUTE ON FUNCTION public.analytics_tempo_resposta(TEXT, UUID, UUID, DATE, DATE, TEXT) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.analytics_horas_treinamento(TEXT, UUID, UUID, DATE, DATE, TEXT) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.analytics_tempo_tp_epr(TEXT, UUID, UUID, DATE, DATE, TEXT) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.analytics_inspecao_viaturas(TEXT, UUID, UUID, DATE, DATE, TEXT) TO authenticated;
+
+RESET lock_timeout;
+RESET statement_timeout;
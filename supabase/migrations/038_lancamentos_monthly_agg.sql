@@ -0,0 +1,293 @@
+-- ============================================
+-- MIGRATION 038: Agregado mensal incremental de lançamentos
+-- ============================================
+-- Tabela lancamentos_monthly_agg com uma linha por
+-- (base_id, equipe_id, indicador_id, mês), mantida por trigger em
+-- INSERT/UPDATE/DELETE de lancamentos. Guarda contagens e as somas usadas
+-- pelos painéis (ocorrências, aprovações TAF, minutos de treinamento,
+-- soma/soma dos quadrados dos tempos de resposta), para que contadores
+-- mensais leiam algumas centenas de linhas em vez de varrer a tabela fato.
+--
+-- Escrita apenas pelo trigger (SECURITY DEFINER); leitura com RLS por base.
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '300s';
+
+-- --------------------------------------------
+-- 1. Tabela
+-- --------------------------------------------
+CREATE TABLE IF NOT EXISTS public.lancamentos_monthly_agg (
+    base_id UUID NOT NULL REFERENCES public.bases(id) ON DELETE CASCADE,
+    equipe_id UUID NOT NULL REFERENCES public.equipes(id) ON DELETE CASCADE,
+    indicador_id UUID NOT NULL REFERENCES public.indicadores_config(id) ON DELETE CASCADE,
+    mes DATE NOT NULL,
+    total_lancamentos INTEGER NOT NULL DEFAULT 0,
+    taf_avaliados INTEGER NOT NULL DEFAULT 0,
+    taf_aprovados INTEGER NOT NULL DEFAULT 0,
+    taf_reprovados INTEGER NOT NULL DEFAULT 0,
+    treinamento_minutos BIGINT NOT NULL DEFAULT 0,
+    tempo_resposta_qtd INTEGER NOT NULL DEFAULT 0,
+    tempo_resposta_soma_seg BIGINT NOT NULL DEFAULT 0,
+    tempo_resposta_soma_quadrados BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (base_id, equipe_id, indicador_id, mes),
+    CONSTRAINT lancamentos_monthly_agg_mes_primeiro_dia CHECK (EXTRACT(DAY FROM mes) = 1)
+);
+
+CREATE INDEX IF NOT EXISTS idx_lancamentos_monthly_agg_mes_base
+    ON public.lancamentos_monthly_agg (mes, base_id);
+
+COMMENT ON TABLE public.lancamentos_monthly_agg IS
+  'Agregado mensal de lancamentos por base/equipe/indicador. Mantido por trigger (trg_lancamentos_monthly_agg); não escrever diretamente.';
+COMMENT ON COLUMN public.lancamentos_monthly_agg.mes IS 'Primeiro dia do mês de data_referencia.';
+COMMENT ON COLUMN public.lancamentos_monthly_agg.taf_aprovados IS
+  'Avaliados TAF com status Aprovado (status informado ou calculado por idade/tempo, como calculateTAFStatus).';
+COMMENT ON COLUMN public.lancamentos_monthly_agg.treinamento_minutos IS
+  'Soma de total_dia/horas (hh:mm) dos participantes de treinamento, em minutos.';
+COMMENT ON COLUMN public.lancamentos_monthly_agg.tempo_resposta_soma_quadrados IS
+  'Soma dos quadrados dos tempos de aferição (s²) — permite desvio padrão sem reler o JSONB.';
+
+-- --------------------------------------------
+-- 2. Contribuição de um lançamento
+-- --------------------------------------------
+
+-- Status TAF normalizado (minúsculo). Sem status informado: regra de calculateTAFStatus
+-- (aprovado até 3:00 para < 40 anos e até 4:00 para >= 40 anos).
+CREATE OR REPLACE FUNCTION public.taf_status_avaliado(p_avaliado JSONB)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT CASE
+    WHEN s.status NOT IN ('', '-') THEN lower(s.status)
+    WHEN s.idade > 0 AND s.tempo LIKE '%:%' THEN
+      CASE WHEN s.segundos <= CASE WHEN s.idade < 40 THEN 180 ELSE 240 END THEN 'aprovado' ELSE 'reprovado' END
+    ELSE ''
+  END
+  FROM (
+    SELECT
+      btrim(COALESCE(p_avaliado ->> 'status', '')) AS status,
+      public.analytics_numero(p_avaliado ->> 'idade') AS idade,
+      COALESCE(p_avaliado ->> 'tempo', '') AS tempo,
+      public.analytics_tempo_para_unidades(p_avaliado ->> 'tempo') AS segundos
+  ) s;
+$$;
+
+COMMENT ON FUNCTION public.taf_status_avaliado(JSONB) IS
+  'Status TAF de um avaliado em minúsculo (aprovado/reprovado/...); calcula por idade e tempo quando ausente.';
+
+CREATE OR REPLACE FUNCTION public.lancamentos_agg_contribuicao(p_schema_type TEXT, p_conteudo JSONB)
+RETURNS TABLE (
+    taf_avaliados INTEGER,
+    taf_aprovados INTEGER,
+    taf_reprovados INTEGER,
+    treinamento_minutos BIGINT,
+    tempo_resposta_qtd INTEGER,
+    tempo_resposta_soma_seg BIGINT,
+    tempo_resposta_soma_quadrados BIGINT
+)
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  WITH itens AS (
+    SELECT i.valor
+    FROM jsonb_array_elements(
+      CASE
+        WHEN p_schema_type = 'taf' AND jsonb_typeof(p_conteudo -> 'avaliados') = 'array'
+          THEN p_conteudo -> 'avaliados'
+        WHEN p_schema_type = 'treinamento' AND jsonb_typeof(p_conteudo -> 'participantes') = 'array'
+          THEN p_conteudo -> 'participantes'
+        WHEN p_schema_type IN ('tempo_resposta', 'exercicio_posicionamento') AND jsonb_typeof(p_conteudo -> 'afericoes') = 'array'
+          THEN p_conteudo -> 'afericoes'
+        ELSE '[]'::jsonb
+      END
+    ) AS i(valor)
+  ),
+  taf AS (
+    SELECT public.taf_status_avaliado(valor) AS status FROM itens WHERE p_schema_type = 'taf'
+  ),
+  tempos AS (
+    SELECT public.analytics_tempo_para_unidades(valor ->> 'tempo')::bigint AS segundos
+    FROM itens
+    WHERE p_schema_type IN ('tempo_resposta', 'exercicio_posicionamento')
+      AND COALESCE(valor ->> 'tempo', '') <> ''
+  )
+  SELECT
+    (SELECT count(*) FROM taf)::int,
+    (SELECT count(*) FROM taf WHERE status = 'aprovado')::int,
+    (SELECT count(*) FROM taf WHERE status = 'reprovado')::int,
+    COALESCE((
+      SELECT sum(public.analytics_tempo_para_unidades(COALESCE(NULLIF(valor ->> 'total_dia', ''), valor ->> 'horas')))
+      FROM itens
+      WHERE p_schema_type = 'treinamento'
+    ), 0)::bigint,
+    (SELECT count(*) FROM tempos)::int,
+    COALESCE((SELECT sum(segundos) FROM tempos), 0)::bigint,
+    COALESCE((SELECT sum(segundos * segundos) FROM tempos), 0)::bigint;
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_agg_contribuicao(TEXT, JSONB) IS
+  'Valores que um lançamento soma em lancamentos_monthly_agg, conforme o schema_type do indicador.';
+
+-- --------------------------------------------
+-- 3. Aplicação incremental (+1 / -1) e trigger
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.lancamentos_monthly_agg_aplicar(
+  p_base_id UUID,
+  p_equipe_id UUID,
+  p_indicador_id UUID,
+  p_data_referencia DATE,
+  p_conteudo JSONB,
+  p_sinal INTEGER
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_schema_type TEXT;
+  v_mes DATE := date_trunc('month', p_data_referencia)::date;
+BEGIN
+  SELECT ic.schema_type INTO v_schema_type
+  FROM public.indicadores_config ic
+  WHERE ic.id = p_indicador_id;
+
+  INSERT INTO public.lancamentos_monthly_agg AS a (
+    base_id, equipe_id, indicador_id, mes,
+    total_lancamentos, taf_avaliados, taf_aprovados, taf_reprovados,
+    treinamento_minutos, tempo_resposta_qtd, tempo_resposta_soma_seg, tempo_resposta_soma_quadrados,
+    updated_at
+  )
+  SELECT
+    p_base_id, p_equipe_id, p_indicador_id, v_mes,
+    p_sinal, p_sinal * c.taf_avaliados, p_sinal * c.taf_aprovados, p_sinal * c.taf_reprovados,
+    p_sinal * c.treinamento_minutos, p_sinal * c.tempo_resposta_qtd, p_sinal * c.tempo_resposta_soma_seg,
+    p_sinal * c.tempo_resposta_soma_quadrados,
+    NOW()
+  FROM public.lancamentos_agg_contribuicao(v_schema_type, p_conteudo) c
+  ON CONFLICT (base_id, equipe_id, indicador_id, mes) DO UPDATE SET
+    total_lancamentos = a.total_lancamentos + EXCLUDED.total_lancamentos,
+    taf_avaliados = a.taf_avaliados + EXCLUDED.taf_avaliados,
+    taf_aprovados = a.taf_aprovados + EXCLUDED.taf_aprovados,
+    taf_reprovados = a.taf_reprovados + EXCLUDED.taf_reprovados,
+    treinamento_minutos = a.treinamento_minutos + EXCLUDED.treinamento_minutos,
+    tempo_resposta_qtd = a.tempo_resposta_qtd + EXCLUDED.tempo_resposta_qtd,
+    tempo_resposta_soma_seg = a.tempo_resposta_soma_seg + EXCLUDED.tempo_resposta_soma_seg,
+    tempo_resposta_soma_quadrados = a.tempo_resposta_soma_quadrados + EXCLUDED.tempo_resposta_soma_quadrados,
+    updated_at = NOW();
+
+  -- Mês/equipe/indicador sem lançamentos: remove a linha (mantém a tabela enxuta)
+  DELETE FROM public.lancamentos_monthly_agg
+  WHERE base_id = p_base_id
+    AND equipe_id = p_equipe_id
+    AND indicador_id = p_indicador_id
+    AND mes = v_mes
+    AND total_lancamentos <= 0;
+END;
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_monthly_agg_aplicar(UUID, UUID, UUID, DATE, JSONB, INTEGER) IS
+  'Soma (+1) ou subtrai (-1) a contribuição de um lançamento em lancamentos_monthly_agg. Uso interno do trigger.';
+
+REVOKE ALL ON FUNCTION public.lancamentos_monthly_agg_aplicar(UUID, UUID, UUID, DATE, JSONB, INTEGER) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.lancamentos_monthly_agg_aplicar(UUID, UUID, UUID, DATE, JSONB, INTEGER) FROM anon, authenticated;
+
+CREATE OR REPLACE FUNCTION public.lancamentos_monthly_agg_sync()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  -- UPDATE que não mexe nas chaves nem no conteudo (ex.: autor_nome) não altera o agregado
+  IF TG_OP = 'UPDATE'
+     AND OLD.base_id = NEW.base_id
+     AND OLD.equipe_id = NEW.equipe_id
+     AND OLD.indicador_id = NEW.indicador_id
+     AND OLD.data_referencia = NEW.data_referencia
+     AND OLD.conteudo = NEW.conteudo THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM public.lancamentos_monthly_agg_aplicar(
+      OLD.base_id, OLD.equipe_id, OLD.indicador_id, OLD.data_referencia, OLD.conteudo, -1
+    );
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM public.lancamentos_monthly_agg_aplicar(
+      NEW.base_id, NEW.equipe_id, NEW.indicador_id, NEW.data_referencia, NEW.conteudo, 1
+    );
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_monthly_agg_sync() IS
+  'Trigger AFTER INSERT/UPDATE/DELETE em lancamentos que mantém lancamentos_monthly_agg.';
+
+-- --------------------------------------------
+-- 4. Trigger + backfill (lancamentos bloqueada para escrita durante a carga,
+--    evitando perder lançamentos gravados entre o backfill e o trigger)
+-- --------------------------------------------
+LOCK TABLE public.lancamentos IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS trg_lancamentos_monthly_agg ON public.lancamentos;
+CREATE TRIGGER trg_lancamentos_monthly_agg
+    AFTER INSERT OR UPDATE OR DELETE ON public.lancamentos
+    FOR EACH ROW
+    EXECUTE FUNCTION public.lancamentos_monthly_agg_sync();
+
+TRUNCATE public.lancamentos_monthly_agg;
+
+INSERT INTO public.lancamentos_monthly_agg (
+    base_id, equipe_id, indicador_id, mes,
+    total_lancamentos, taf_avaliados, taf_aprovados, taf_reprovados,
+    treinamento_minutos, tempo_resposta_qtd, tempo_resposta_soma_seg, tempo_resposta_soma_quadrados
+)
+SELECT
+    l.base_id,
+    l.equipe_id,
+    l.indicador_id,
+    date_trunc('month', l.data_referencia)::date,
+    count(*),
+    sum(c.taf_avaliados),
+    sum(c.taf_aprovados),
+    sum(c.taf_reprovados),
+    sum(c.treinamento_minutos),
+    sum(c.tempo_resposta_qtd),
+    sum(c.tempo_resposta_soma_seg),
+    sum(c.tempo_resposta_soma_quadrados)
+FROM public.lancamentos l
+LEFT JOIN public.indicadores_config ic ON ic.id = l.indicador_id
+CROSS JOIN LATERAL public.lancamentos_agg_contribuicao(ic.schema_type, l.conteudo) c
+GROUP BY 1, 2, 3, 4;
+
+-- --------------------------------------------
+-- 5. RLS: leitura por base (Gerente Geral vê todas)
+-- --------------------------------------------
+ALTER TABLE public.lancamentos_monthly_agg ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "lancamentos_monthly_agg_select" ON public.lancamentos_monthly_agg;
+CREATE POLICY "lancamentos_monthly_agg_select" ON public.lancamentos_monthly_agg
+    FOR SELECT
+    TO authenticated
+    USING (
+        EXISTS (
+            SELECT 1 FROM public.get_current_user_role_and_base() AS my
+            WHERE my.role = 'geral'
+               OR (my.base_id IS NOT NULL AND my.base_id = lancamentos_monthly_agg.base_id)
+        )
+    );
+
+COMMENT ON POLICY "lancamentos_monthly_agg_select" ON public.lancamentos_monthly_agg IS
+  'Gerente Geral lê todas as bases; demais roles apenas a própria base (mesma visibilidade de lancamentos).';
+
+RESET lock_timeout;
+RESET statement_timeout;
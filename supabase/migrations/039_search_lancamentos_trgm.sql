@@ -0,0 +1,116 @@
+-- ============================================
+-- MIGRATION 039: Busca textual em lançamentos com pg_trgm e filtros
+-- ============================================
+-- search_lancamentos_jsonb (migration 003) fazia quatro ILIKE '%termo%'
+-- sobre conteudo->>... na tabela inteira, ignorava base/equipe/indicador/
+-- período e devolvia todos os IDs encontrados (o frontend reenviava a
+-- lista em .in('id', ...) e, em caso de erro, baixava tudo e filtrava
+-- no navegador).
+--
+-- Agora:
+--   - lancamentos_search_text(conteudo): texto pesquisável (local,
+--     observacoes, tipo_ocorrencia, tipo_atividade) em minúsculas;
+--   - índice GIN gin_trgm_ops sobre essa expressão (LIKE '%termo%');
+--   - search_lancamentos(...): mesmos filtros do useLancamentos,
+--     paginação no SQL e retorno { total, rows } em uma única chamada.
+--
+-- SECURITY INVOKER (padrão): o RLS de lancamentos continua valendo.
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '300s';
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- --------------------------------------------
+-- Texto pesquisável (IMMUTABLE para poder ser indexado)
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.lancamentos_search_text(p_conteudo JSONB)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+SET search_path = public
+AS $$
+  SELECT lower(
+    COALESCE(p_conteudo->>'local', '') || ' ' ||
+    COALESCE(p_conteudo->>'observacoes', '') || ' ' ||
+    COALESCE(p_conteudo->>'tipo_ocorrencia', '') || ' ' ||
+    COALESCE(p_conteudo->>'tipo_atividade', '')
+  );
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_search_text(JSONB) IS
+  'Concatena local, observacoes, tipo_ocorrencia e tipo_atividade do conteudo em minúsculas. Base do índice trigram da busca do Histórico.';
+
+CREATE INDEX IF NOT EXISTS idx_lancamentos_search_text_trgm
+ON public.lancamentos USING GIN (public.lancamentos_search_text(conteudo) gin_trgm_ops);
+
+COMMENT ON INDEX idx_lancamentos_search_text_trgm IS
+  'Trigram sobre lancamentos_search_text(conteudo): acelera LIKE ''%termo%'' em search_lancamentos';
+
+-- --------------------------------------------
+-- Busca paginada com filtros
+-- --------------------------------------------
+-- Retorno: { "total": n, "rows": [ lancamento + "profiles": { "nome" } ] }
+-- (mesmo formato do select '*, profiles!lancamentos_user_id_fkey(nome)').
+-- O termo é tratado como texto literal (% e _ escapados).
+CREATE OR REPLACE FUNCTION public.search_lancamentos(
+  p_search TEXT,
+  p_base_id UUID DEFAULT NULL,
+  p_equipe_id UUID DEFAULT NULL,
+  p_indicador_id UUID DEFAULT NULL,
+  p_data_inicio DATE DEFAULT NULL,
+  p_data_fim DATE DEFAULT NULL,
+  p_limit INTEGER DEFAULT 20,
+  p_offset INTEGER DEFAULT 0
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH filtrados AS (
+    SELECT l.*
+    FROM lancamentos l
+    WHERE lancamentos_search_text(l.conteudo) LIKE
+            '%' || replace(replace(replace(lower(trim(p_search)), '\', '\\'), '%', '\%'), '_', '\_') || '%'
+      AND (p_base_id IS NULL OR l.base_id = p_base_id)
+      AND (p_equipe_id IS NULL OR l.equipe_id = p_equipe_id)
+      AND (p_indicador_id IS NULL OR l.indicador_id = p_indicador_id)
+      AND (p_data_inicio IS NULL OR l.data_referencia >= p_data_inicio)
+      AND (p_data_fim IS NULL OR l.data_referencia <= p_data_fim)
+  ),
+  pagina AS (
+    SELECT f.*
+    FROM filtrados f
+    ORDER BY f.data_referencia DESC, f.created_at DESC, f.id DESC
+    LIMIT GREATEST(COALESCE(p_limit, 20), 1)
+    OFFSET GREATEST(COALESCE(p_offset, 0), 0)
+  )
+  SELECT jsonb_build_object(
+    'total', (SELECT count(*) FROM filtrados),
+    'rows', COALESCE((
+      SELECT jsonb_agg(
+               to_jsonb(pg) || jsonb_build_object(
+                 'profiles',
+                 CASE WHEN p.id IS NULL THEN NULL ELSE jsonb_build_object('nome', p.nome) END
+               )
+               ORDER BY pg.data_referencia DESC, pg.created_at DESC, pg.id DESC
+             )
+      FROM pagina pg
+      LEFT JOIN profiles p ON p.id = pg.user_id
+    ), '[]'::jsonb)
+  );
+$$;
+
+COMMENT ON FUNCTION public.search_lancamentos(TEXT, UUID, UUID, UUID, DATE, DATE, INTEGER, INTEGER) IS
+  'Busca textual (local, observacoes, tipo_ocorrencia, tipo_atividade) com filtros de base/equipe/indicador/período e paginação. Retorna { total, rows }.';
+
+GRANT EXECUTE ON FUNCTION public.search_lancamentos(TEXT, UUID, UUID, UUID, DATE, DATE, INTEGER, INTEGER) TO authenticated;
+
+-- Substituída por search_lancamentos (o frontend não a chama mais)
+DROP FUNCTION IF EXISTS public.search_lancamentos_jsonb(TEXT);
+
+RESET lock_timeout;
+RESET statement_timeout;
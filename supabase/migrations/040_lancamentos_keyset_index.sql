@@ -0,0 +1,28 @@
+-- ============================================
+-- MIGRATION 040: Índices para paginação keyset do histórico
+-- ============================================
+-- HistoryTable e Explorador de Dados paginam por cursor na ordenação
+-- (data_referencia DESC, created_at DESC, id DESC) em vez de OFFSET.
+-- Com o índice na mesma ordem, cada página é um index scan curto,
+-- independente da profundidade.
+--   - idx_lancamentos_keyset: Gerente Geral sem filtro de base
+--   - idx_lancamentos_base_keyset: Histórico (sempre filtrado pela base)
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '300s';
+
+CREATE INDEX IF NOT EXISTS idx_lancamentos_keyset
+ON public.lancamentos (data_referencia DESC, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_lancamentos_base_keyset
+ON public.lancamentos (base_id, data_referencia DESC, created_at DESC, id DESC);
+
+COMMENT ON INDEX idx_lancamentos_keyset IS
+  'Paginação keyset (data_referencia, created_at, id DESC) do Explorador de Dados';
+
+COMMENT ON INDEX idx_lancamentos_base_keyset IS
+  'Paginação keyset por base (Histórico de Lançamentos)';
+
+RESET lock_timeout;
+RESET statement_timeout;
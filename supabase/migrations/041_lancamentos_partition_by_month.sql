@@ -0,0 +1,278 @@
+-- ============================================
+-- MIGRATION 041: Particionamento mensal de lancamentos (data_referencia)
+-- ============================================
+-- lancamentos era uma única heap; todas as consultas de Analytics,
+-- Aderência e Histórico são limitadas por data_referencia. Com partições
+-- mensais (RANGE) o planner descarta os meses fora do período e o vacuum
+-- trabalha partição a partição. Meses antigos podem ser desanexados
+-- (lancamentos_arquivar_particao) sem reescrever a tabela.
+--
+-- Conversão (uma vez, idempotente):
+--   1. Captura do catálogo o que existe hoje em lancamentos: policies (RLS),
+--      triggers, índices, FKs, grants e funções que usam o tipo da tabela
+--      (ex.: analytics_lancamentos_filtrados RETURNS SETOF lancamentos).
+--   2. Renomeia a tabela, cria lancamentos particionada com as mesmas
+--      colunas/defaults/checks, cria as partições e copia os dados.
+--   3. Recria tudo o que foi capturado na nova tabela, com os mesmos nomes
+--      (inclusive lancamentos_user_id_fkey, usado no embed do PostgREST).
+--   4. Realtime: publica pela raiz (publish_via_partition_root) para que
+--      o canal de lancamentos (migration 011) continue recebendo eventos
+--      com o nome da tabela pai.
+--
+-- Observações:
+--   - PK passa a ser (id, data_referencia): exigência do Postgres para
+--     tabelas particionadas. id continua UUID gerado pelo banco.
+--   - Alterar data_referencia move a linha de partição; os triggers
+--     (updated_at, agregado mensal 038) continuam corretos.
+--   - Partições são acessíveis apenas pela tabela pai: RLS habilitado sem
+--     policies e sem grants para anon/authenticated.
+--   - Datas fora das partições criadas caem em lancamentos_default.
+-- ============================================
+
+SET lock_timeout = '60s';
+SET statement_timeout = '1800s';
+
+-- --------------------------------------------
+-- 1. Gestão de partições
+-- --------------------------------------------
+
+-- Cria (se não existir) a partição do mês de p_mes: lancamentos_pYYYYMM.
+CREATE OR REPLACE FUNCTION public.lancamentos_criar_particao(p_mes DATE)
+RETURNS TEXT
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+  v_inicio DATE := date_trunc('month', p_mes)::date;
+  v_nome TEXT := 'lancamentos_p' || to_char(date_trunc('month', p_mes), 'YYYYMM');
+BEGIN
+  IF to_regclass('public.' || v_nome) IS NULL THEN
+    EXECUTE format(
+      'CREATE TABLE public.%I PARTITION OF public.lancamentos FOR VALUES FROM (%L) TO (%L)',
+      v_nome, v_inicio, (v_inicio + INTERVAL '1 month')::date
+    );
+    EXECUTE format('ALTER TABLE public.%I ENABLE ROW LEVEL SECURITY', v_nome);
+    EXECUTE format('REVOKE ALL ON public.%I FROM anon, authenticated', v_nome);
+  END IF;
+  RETURN v_nome;
+END;
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_criar_particao(DATE) IS
+  'Cria a partição mensal lancamentos_pYYYYMM (RLS sem policies; acesso só pela tabela pai).';
+
+-- Garante as partições do mês atual até p_meses_a_frente meses adiante.
+CREATE OR REPLACE FUNCTION public.lancamentos_garantir_particoes(p_meses_a_frente INTEGER DEFAULT 3)
+RETURNS VOID
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+  i INTEGER;
+BEGIN
+  FOR i IN 0..GREATEST(p_meses_a_frente, 0) LOOP
+    PERFORM public.lancamentos_criar_particao((date_trunc('month', current_date) + make_interval(months => i))::date);
+  END LOOP;
+END;
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_garantir_particoes(INTEGER) IS
+  'Cria as partições do mês atual e dos próximos N meses (agendada mensalmente via pg_cron quando disponível).';
+
+-- Desanexa a partição do mês (continua existindo como tabela comum, fora
+-- das consultas). lancamentos_monthly_agg mantém os totais do mês, pois o
+-- DETACH não dispara triggers. Depois de exportada, pode ser removida com DROP TABLE.
+CREATE OR REPLACE FUNCTION public.lancamentos_arquivar_particao(p_mes DATE)
+RETURNS TEXT
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+  v_nome TEXT := 'lancamentos_p' || to_char(date_trunc('month', p_mes), 'YYYYMM');
+BEGIN
+  IF to_regclass('public.' || v_nome) IS NULL THEN
+    RAISE EXCEPTION 'Partição % não existe', v_nome;
+  END IF;
+  EXECUTE format('ALTER TABLE public.lancamentos DETACH PARTITION public.%I', v_nome);
+  RETURN v_nome;
+END;
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_arquivar_particao(DATE) IS
+  'Desanexa a partição mensal de lancamentos (arquivamento). Os totais em lancamentos_monthly_agg são preservados.';
+
+REVOKE EXECUTE ON FUNCTION public.lancamentos_criar_particao(DATE) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.lancamentos_garantir_particoes(INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.lancamentos_arquivar_particao(DATE) FROM PUBLIC, anon, authenticated;
+
+-- --------------------------------------------
+-- 2. Conversão da tabela
+-- --------------------------------------------
+DO $$
+DECLARE
+  v_rel REGCLASS := 'public.lancamentos'::regclass;
+  v_rowtype REGTYPE := 'public.lancamentos'::regtype;
+  v_comentario TEXT;
+  v_force_rls BOOLEAN;
+  v_inicio DATE;
+  v_mes DATE;
+  v_fks TEXT[];
+  v_indices TEXT[];
+  v_triggers TEXT[];
+  v_policies TEXT[];
+  v_policy_comentarios TEXT[];
+  v_grants TEXT[];
+  v_funcoes TEXT[];
+  v_funcoes_pos TEXT[];
+  v_funcoes_drop TEXT[];
+  v_stmt TEXT;
+BEGIN
+  IF (SELECT relkind FROM pg_class WHERE oid = v_rel) = 'p' THEN
+    RAISE NOTICE 'lancamentos já é particionada; nada a fazer.';
+    RETURN;
+  END IF;
+
+  LOCK TABLE public.lancamentos IN ACCESS EXCLUSIVE MODE;
+
+  v_comentario := obj_description(v_rel, 'pg_class');
+  SELECT relforcerowsecurity INTO v_force_rls FROM pg_class WHERE oid = v_rel;
+
+  -- FKs (mesmo nome de constraint)
+  SELECT COALESCE(array_agg(format('ALTER TABLE public.lancamentos ADD CONSTRAINT %I %s', conname, pg_get_constraintdef(oid))), '{}')
+    INTO v_fks
+  FROM pg_constraint
+  WHERE conrelid = v_rel AND contype = 'f';
+
+  -- Índices não únicos (únicos sem data_referencia não são permitidos em tabela particionada)
+  SELECT COALESCE(array_agg(pg_get_indexdef(i.indexrelid)), '{}')
+    INTO v_indices
+  FROM pg_index i
+  WHERE i.indrelid = v_rel AND NOT i.indisunique;
+
+  -- Triggers de usuário
+  SELECT COALESCE(array_agg(pg_get_triggerdef(t.oid)), '{}')
+    INTO v_triggers
+  FROM pg_trigger t
+  WHERE t.tgrelid = v_rel AND NOT t.tgisinternal;
+
+  -- Policies de RLS (+ comentários)
+  SELECT COALESCE(array_agg(
+           format('CREATE POLICY %I ON public.lancamentos AS %s FOR %s TO %s', p.policyname, p.permissive, p.cmd,
+                  (SELECT string_agg(CASE WHEN r = 'public' THEN 'PUBLIC' ELSE quote_ident(r) END, ', ') FROM unnest(p.roles) r))
+           || COALESCE(' USING (' || p.qual || ')', '')
+           || COALESCE(' WITH CHECK (' || p.with_check || ')', '')
+         ), '{}')
+    INTO v_policies
+  FROM pg_policies p
+  WHERE p.schemaname = 'public' AND p.tablename = 'lancamentos';
+
+  SELECT COALESCE(array_agg(format('COMMENT ON POLICY %I ON public.lancamentos IS %L', pol.polname, d.description)), '{}')
+    INTO v_policy_comentarios
+  FROM pg_policy pol
+  JOIN pg_description d ON d.objoid = pol.oid AND d.classoid = 'pg_policy'::regclass
+  WHERE pol.polrelid = v_rel;
+
+  -- Grants da tabela
+  SELECT COALESCE(array_agg(format('GRANT %s ON public.lancamentos TO %s', a.privilege_type,
+                                   CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(a.grantee)) END)), '{}')
+    INTO v_grants
+  FROM pg_class c, aclexplode(c.relacl) a
+  WHERE c.oid = v_rel;
+
+  -- Funções que dependem do tipo-linha de lancamentos (recriadas com o novo tipo)
+  SELECT
+    COALESCE(array_agg(pg_get_functiondef(p.oid)), '{}'),
+    COALESCE(array_agg(p.oid::regprocedure::text), '{}')
+    INTO v_funcoes, v_funcoes_drop
+  FROM pg_proc p
+  WHERE p.prorettype = v_rowtype OR v_rowtype = ANY (p.proargtypes);
+
+  SELECT COALESCE(array_agg(stmt), '{}')
+    INTO v_funcoes_pos
+  FROM (
+    SELECT format('COMMENT ON FUNCTION %s IS %L', p.oid::regprocedure, obj_description(p.oid, 'pg_proc')) AS stmt
+    FROM pg_proc p
+    WHERE (p.prorettype = v_rowtype OR v_rowtype = ANY (p.proargtypes))
+      AND obj_description(p.oid, 'pg_proc') IS NOT NULL
+    UNION ALL
+    SELECT format('GRANT EXECUTE ON FUNCTION %s TO %s', p.oid::regprocedure,
+                  CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(a.grantee)) END)
+    FROM pg_proc p, aclexplode(p.proacl) a
+    WHERE (p.prorettype = v_rowtype OR v_rowtype = ANY (p.proargtypes))
+      AND a.privilege_type = 'EXECUTE'
+  ) s;
+
+  -- Troca de tabelas
+  ALTER TABLE public.lancamentos RENAME TO lancamentos_legado;
+  ALTER TABLE public.lancamentos_legado RENAME CONSTRAINT lancamentos_pkey TO lancamentos_legado_pkey;
+
+  CREATE TABLE public.lancamentos (
+    LIKE public.lancamentos_legado INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS INCLUDING STORAGE
+  ) PARTITION BY RANGE (data_referencia);
+
+  ALTER TABLE public.lancamentos ADD CONSTRAINT lancamentos_pkey PRIMARY KEY (id, data_referencia);
+
+  -- Partições: do mês mais antigo (limitado a 10 anos) até 3 meses à frente + default
+  SELECT date_trunc('month', GREATEST(min(data_referencia), (current_date - INTERVAL '10 years')::date))::date
+    INTO v_inicio
+  FROM public.lancamentos_legado;
+  v_mes := COALESCE(v_inicio, date_trunc('month', current_date)::date);
+  WHILE v_mes < date_trunc('month', current_date)::date LOOP
+    PERFORM public.lancamentos_criar_particao(v_mes);
+    v_mes := (v_mes + INTERVAL '1 month')::date;
+  END LOOP;
+  PERFORM public.lancamentos_garantir_particoes(3);
+
+  CREATE TABLE public.lancamentos_default PARTITION OF public.lancamentos DEFAULT;
+  ALTER TABLE public.lancamentos_default ENABLE ROW LEVEL SECURITY;
+  REVOKE ALL ON public.lancamentos_default FROM anon, authenticated;
+
+  -- Cópia (antes dos triggers: agregado mensal já está consistente e updated_at é preservado)
+  INSERT INTO public.lancamentos SELECT * FROM public.lancamentos_legado;
+
+  FOREACH v_stmt IN ARRAY v_funcoes_drop LOOP
+    EXECUTE 'DROP FUNCTION ' || v_stmt;
+  END LOOP;
+
+  DROP TABLE public.lancamentos_legado;
+
+  -- Recria o que foi capturado
+  FOREACH v_stmt IN ARRAY v_funcoes || v_funcoes_pos || v_fks || v_indices || v_triggers || v_grants LOOP
+    EXECUTE v_stmt;
+  END LOOP;
+
+  ALTER TABLE public.lancamentos ENABLE ROW LEVEL SECURITY;
+  IF v_force_rls THEN
+    ALTER TABLE public.lancamentos FORCE ROW LEVEL SECURITY;
+  END IF;
+  FOREACH v_stmt IN ARRAY v_policies || v_policy_comentarios LOOP
+    EXECUTE v_stmt;
+  END LOOP;
+
+  IF v_comentario IS NOT NULL THEN
+    EXECUTE format('COMMENT ON TABLE public.lancamentos IS %L', v_comentario);
+  END IF;
+
+  -- Realtime (migration 011): a tabela antiga saiu da publicação no DROP
+  IF EXISTS (SELECT 1 FROM pg_publication WHERE pubname = 'supabase_realtime') THEN
+    ALTER PUBLICATION supabase_realtime SET (publish_via_partition_root = true);
+    ALTER PUBLICATION supabase_realtime ADD TABLE public.lancamentos;
+  END IF;
+END;
+$$;
+
+-- --------------------------------------------
+-- 3. Agendamento mensal das próximas partições (se pg_cron estiver habilitado)
+-- --------------------------------------------
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    EXECUTE $cron$SELECT cron.schedule('lancamentos-garantir-particoes', '0 3 1 * *', 'SELECT public.lancamentos_garantir_particoes(3)')$cron$;
+  ELSE
+    RAISE NOTICE 'pg_cron indisponível: executar SELECT public.lancamentos_garantir_particoes(3) periodicamente.';
+  END IF;
+END;
+$$;
+
+RESET lock_timeout;
+RESET statement_timeout;
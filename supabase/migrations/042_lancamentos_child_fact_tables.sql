@@ -0,0 +1,400 @@
+-- ============================================
+-- MIGRATION 042: Tabelas filhas para os arrays do conteudo
+-- ============================================
+-- TAF/Prova Teórica/TP-EPR (avaliados), Treinamento/PTR-BA extras
+-- (participantes), Tempo Resposta/Exercício de Posicionamento (afericoes) e
+-- Inspeção de Viaturas (inspecoes) guardam listas dentro do JSONB conteudo.
+-- Métricas por colaborador e o filtro de colaborador precisavam expandir
+-- esses arrays a cada consulta (no navegador ou com jsonb_array_elements).
+--
+-- Cada item passa a ter uma linha em:
+--   - lancamento_avaliados
+--   - lancamento_participantes
+--   - lancamento_afericoes
+--   - lancamento_inspecoes
+-- com as chaves do lançamento (base, equipe, indicador, data) copiadas para
+-- consultas indexadas por colaborador/equipe/período.
+--
+-- Mantidas pelo trigger trg_lancamentos_fatos (AFTER INSERT/UPDATE/DELETE,
+-- SECURITY DEFINER); leitura com RLS por base, igual a lancamentos_monthly_agg.
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '600s';
+
+-- --------------------------------------------
+-- 1. Tabelas
+-- --------------------------------------------
+CREATE TABLE IF NOT EXISTS public.lancamento_avaliados (
+    lancamento_id UUID NOT NULL,
+    ordem INTEGER NOT NULL,
+    data_referencia DATE NOT NULL,
+    base_id UUID NOT NULL,
+    equipe_id UUID NOT NULL,
+    indicador_id UUID NOT NULL,
+    nome TEXT NOT NULL DEFAULT '',
+    nome_normalizado TEXT GENERATED ALWAYS AS (lower(btrim(nome))) STORED,
+    idade INTEGER,
+    tempo TEXT,
+    tempo_segundos INTEGER,
+    nota NUMERIC,
+    status TEXT,
+    PRIMARY KEY (lancamento_id, ordem)
+);
+
+CREATE TABLE IF NOT EXISTS public.lancamento_participantes (
+    lancamento_id UUID NOT NULL,
+    ordem INTEGER NOT NULL,
+    data_referencia DATE NOT NULL,
+    base_id UUID NOT NULL,
+    equipe_id UUID NOT NULL,
+    indicador_id UUID NOT NULL,
+    nome TEXT NOT NULL DEFAULT '',
+    nome_normalizado TEXT GENERATED ALWAYS AS (lower(btrim(nome))) STORED,
+    horas TEXT,
+    minutos INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (lancamento_id, ordem)
+);
+
+CREATE TABLE IF NOT EXISTS public.lancamento_afericoes (
+    lancamento_id UUID NOT NULL,
+    ordem INTEGER NOT NULL,
+    data_referencia DATE NOT NULL,
+    base_id UUID NOT NULL,
+    equipe_id UUID NOT NULL,
+    indicador_id UUID NOT NULL,
+    viatura TEXT,
+    motorista TEXT NOT NULL DEFAULT '',
+    motorista_normalizado TEXT GENERATED ALWAYS AS (lower(btrim(motorista))) STORED,
+    local TEXT,
+    tempo TEXT,
+    tempo_segundos INTEGER,
+    PRIMARY KEY (lancamento_id, ordem)
+);
+
+CREATE TABLE IF NOT EXISTS public.lancamento_inspecoes (
+    lancamento_id UUID NOT NULL,
+    ordem INTEGER NOT NULL,
+    data_referencia DATE NOT NULL,
+    base_id UUID NOT NULL,
+    equipe_id UUID NOT NULL,
+    indicador_id UUID NOT NULL,
+    viatura TEXT,
+    qtd_inspecoes INTEGER NOT NULL DEFAULT 0,
+    qtd_itens_inspecionados INTEGER NOT NULL DEFAULT 0,
+    qtd_itens_nao_conforme INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (lancamento_id, ordem)
+);
+
+-- Consultas por período/equipe e por colaborador (igualdade ou trecho do nome)
+CREATE INDEX IF NOT EXISTS idx_lancamento_avaliados_base_data ON public.lancamento_avaliados (base_id, data_referencia, equipe_id);
+CREATE INDEX IF NOT EXISTS idx_lancamento_avaliados_indicador_data ON public.lancamento_avaliados (indicador_id, data_referencia);
+CREATE INDEX IF NOT EXISTS idx_lancamento_avaliados_nome ON public.lancamento_avaliados (nome_normalizado, data_referencia);
+CREATE INDEX IF NOT EXISTS idx_lancamento_avaliados_nome_trgm ON public.lancamento_avaliados USING GIN (nome_normalizado gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_lancamento_participantes_base_data ON public.lancamento_participantes (base_id, data_referencia, equipe_id);
+CREATE INDEX IF NOT EXISTS idx_lancamento_participantes_indicador_data ON public.lancamento_participantes (indicador_id, data_referencia);
+CREATE INDEX IF NOT EXISTS idx_lancamento_participantes_nome ON public.lancamento_participantes (nome_normalizado, data_referencia);
+CREATE INDEX IF NOT EXISTS idx_lancamento_participantes_nome_trgm ON public.lancamento_participantes USING GIN (nome_normalizado gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_lancamento_afericoes_base_data ON public.lancamento_afericoes (base_id, data_referencia, equipe_id);
+CREATE INDEX IF NOT EXISTS idx_lancamento_afericoes_indicador_data ON public.lancamento_afericoes (indicador_id, data_referencia);
+CREATE INDEX IF NOT EXISTS idx_lancamento_afericoes_motorista ON public.lancamento_afericoes (motorista_normalizado, data_referencia);
+CREATE INDEX IF NOT EXISTS idx_lancamento_afericoes_motorista_trgm ON public.lancamento_afericoes USING GIN (motorista_normalizado gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_lancamento_inspecoes_base_data ON public.lancamento_inspecoes (base_id, data_referencia, equipe_id);
+CREATE INDEX IF NOT EXISTS idx_lancamento_inspecoes_viatura ON public.lancamento_inspecoes (viatura, data_referencia);
+
+COMMENT ON TABLE public.lancamento_avaliados IS
+  'Itens de conteudo.avaliados (TAF, Prova Teórica, TP/EPR). Mantida por trg_lancamentos_fatos; não escrever diretamente.';
+COMMENT ON TABLE public.lancamento_participantes IS
+  'Itens de conteudo.participantes (Treinamento, PTR-BA extras). Mantida por trg_lancamentos_fatos; não escrever diretamente.';
+COMMENT ON TABLE public.lancamento_afericoes IS
+  'Itens de conteudo.afericoes (Tempo Resposta, Exercício de Posicionamento). Mantida por trg_lancamentos_fatos; não escrever diretamente.';
+COMMENT ON TABLE public.lancamento_inspecoes IS
+  'Itens de conteudo.inspecoes (Inspeção de Viaturas). Mantida por trg_lancamentos_fatos; não escrever diretamente.';
+COMMENT ON COLUMN public.lancamento_avaliados.tempo_segundos IS 'tempo "mm:ss" convertido em segundos (NULL se vazio).';
+COMMENT ON COLUMN public.lancamento_participantes.minutos IS 'total_dia (ou horas) "hh:mm" convertido em minutos.';
+COMMENT ON COLUMN public.lancamento_afericoes.tempo_segundos IS 'tempo "mm:ss" convertido em segundos (NULL se vazio).';
+
+-- --------------------------------------------
+-- 2. Extração dos itens (usada pelo trigger e pelo backfill)
+-- --------------------------------------------
+
+-- Array do conteudo (ou vazio se ausente / não for array)
+CREATE OR REPLACE FUNCTION public.conteudo_array(p_conteudo JSONB, p_chave TEXT)
+RETURNS JSONB
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT CASE WHEN jsonb_typeof(p_conteudo -> p_chave) = 'array' THEN p_conteudo -> p_chave ELSE '[]'::jsonb END;
+$$;
+
+-- Número opcional do JSONB (NULL quando vazio)
+CREATE OR REPLACE FUNCTION public.conteudo_numero_opcional(p_valor TEXT)
+RETURNS NUMERIC
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT CASE WHEN NULLIF(btrim(COALESCE(p_valor, '')), '') IS NULL THEN NULL ELSE public.analytics_numero(p_valor) END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.lancamento_avaliados_extrair(p_conteudo JSONB)
+RETURNS TABLE (ordem INTEGER, nome TEXT, idade INTEGER, tempo TEXT, tempo_segundos INTEGER, nota NUMERIC, status TEXT)
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT
+    i.ordem::int,
+    COALESCE(i.item ->> 'nome', ''),
+    public.conteudo_numero_opcional(i.item ->> 'idade')::int,
+    NULLIF(btrim(COALESCE(i.item ->> 'tempo', '')), ''),
+    CASE WHEN COALESCE(i.item ->> 'tempo', '') LIKE '%:%' THEN public.analytics_tempo_para_unidades(i.item ->> 'tempo') END,
+    public.conteudo_numero_opcional(i.item ->> 'nota'),
+    NULLIF(btrim(COALESCE(i.item ->> 'status', '')), '')
+  FROM jsonb_array_elements(public.conteudo_array(p_conteudo, 'avaliados')) WITH ORDINALITY AS i(item, ordem)
+  WHERE jsonb_typeof(i.item) = 'object';
+$$;
+
+CREATE OR REPLACE FUNCTION public.lancamento_participantes_extrair(p_conteudo JSONB)
+RETURNS TABLE (ordem INTEGER, nome TEXT, horas TEXT, minutos INTEGER)
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT
+    i.ordem::int,
+    COALESCE(i.item ->> 'nome', ''),
+    NULLIF(btrim(COALESCE(i.item ->> 'total_dia', i.item ->> 'horas', '')), ''),
+    public.analytics_tempo_para_unidades(COALESCE(i.item ->> 'total_dia', i.item ->> 'horas'))
+  FROM jsonb_array_elements(public.conteudo_array(p_conteudo, 'participantes')) WITH ORDINALITY AS i(item, ordem)
+  WHERE jsonb_typeof(i.item) = 'object';
+$$;
+
+CREATE OR REPLACE FUNCTION public.lancamento_afericoes_extrair(p_conteudo JSONB)
+RETURNS TABLE (ordem INTEGER, viatura TEXT, motorista TEXT, local TEXT, tempo TEXT, tempo_segundos INTEGER)
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT
+    i.ordem::int,
+    NULLIF(btrim(COALESCE(i.item ->> 'viatura', '')), ''),
+    COALESCE(NULLIF(i.item ->> 'motorista', ''), i.item ->> 'nome', ''),
+    NULLIF(btrim(COALESCE(i.item ->> 'local', '')), ''),
+    NULLIF(btrim(COALESCE(i.item ->> 'tempo', '')), ''),
+    CASE WHEN COALESCE(i.item ->> 'tempo', '') LIKE '%:%' THEN public.analytics_tempo_para_unidades(i.item ->> 'tempo') END
+  FROM jsonb_array_elements(public.conteudo_array(p_conteudo, 'afericoes')) WITH ORDINALITY AS i(item, ordem)
+  WHERE jsonb_typeof(i.item) = 'object';
+$$;
+
+CREATE OR REPLACE FUNCTION public.lancamento_inspecoes_extrair(p_conteudo JSONB)
+RETURNS TABLE (ordem INTEGER, viatura TEXT, qtd_inspecoes INTEGER, qtd_itens_inspecionados INTEGER, qtd_itens_nao_conforme INTEGER)
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT
+    i.ordem::int,
+    NULLIF(btrim(COALESCE(i.item ->> 'viatura', '')), ''),
+    public.analytics_numero(i.item ->> 'qtd_inspecoes')::int,
+    public.analytics_numero(i.item ->> 'qtd_itens_inspecionados')::int,
+    public.analytics_numero(COALESCE(i.item ->> 'qtd_itens_nao_conforme', i.item ->> 'qtd_nao_conforme'))::int
+  FROM jsonb_array_elements(public.conteudo_array(p_conteudo, 'inspecoes')) WITH ORDINALITY AS i(item, ordem)
+  WHERE jsonb_typeof(i.item) = 'object';
+$$;
+
+COMMENT ON FUNCTION public.lancamento_avaliados_extrair(JSONB) IS 'Linhas de conteudo.avaliados com tipos normalizados.';
+COMMENT ON FUNCTION public.lancamento_participantes_extrair(JSONB) IS 'Linhas de conteudo.participantes com horas em minutos.';
+COMMENT ON FUNCTION public.lancamento_afericoes_extrair(JSONB) IS 'Linhas de conteudo.afericoes com tempo em segundos.';
+COMMENT ON FUNCTION public.lancamento_inspecoes_extrair(JSONB) IS 'Linhas de conteudo.inspecoes com quantidades inteiras.';
+
+-- --------------------------------------------
+-- 3. Trigger
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.lancamentos_fatos_sync()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'UPDATE'
+     AND NEW.id = OLD.id
+     AND NEW.base_id = OLD.base_id
+     AND NEW.equipe_id = OLD.equipe_id
+     AND NEW.indicador_id = OLD.indicador_id
+     AND NEW.data_referencia = OLD.data_referencia
+     AND NEW.conteudo IS NOT DISTINCT FROM OLD.conteudo THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    DELETE FROM public.lancamento_avaliados WHERE lancamento_id = OLD.id;
+    DELETE FROM public.lancamento_participantes WHERE lancamento_id = OLD.id;
+    DELETE FROM public.lancamento_afericoes WHERE lancamento_id = OLD.id;
+    DELETE FROM public.lancamento_inspecoes WHERE lancamento_id = OLD.id;
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO public.lancamento_avaliados
+      (lancamento_id, ordem, data_referencia, base_id, equipe_id, indicador_id, nome, idade, tempo, tempo_segundos, nota, status)
+    SELECT NEW.id, e.ordem, NEW.data_referencia, NEW.base_id, NEW.equipe_id, NEW.indicador_id,
+           e.nome, e.idade, e.tempo, e.tempo_segundos, e.nota, e.status
+    FROM public.lancamento_avaliados_extrair(NEW.conteudo) e;
+
+    INSERT INTO public.lancamento_participantes
+      (lancamento_id, ordem, data_referencia, base_id, equipe_id, indicador_id, nome, horas, minutos)
+    SELECT NEW.id, e.ordem, NEW.data_referencia, NEW.base_id, NEW.equipe_id, NEW.indicador_id,
+           e.nome, e.horas, e.minutos
+    FROM public.lancamento_participantes_extrair(NEW.conteudo) e;
+
+    INSERT INTO public.lancamento_afericoes
+      (lancamento_id, ordem, data_referencia, base_id, equipe_id, indicador_id, viatura, motorista, local, tempo, tempo_segundos)
+    SELECT NEW.id, e.ordem, NEW.data_referencia, NEW.base_id, NEW.equipe_id, NEW.indicador_id,
+           e.viatura, e.motorista, e.local, e.tempo, e.tempo_segundos
+    FROM public.lancamento_afericoes_extrair(NEW.conteudo) e;
+
+    INSERT INTO public.lancamento_inspecoes
+      (lancamento_id, ordem, data_referencia, base_id, equipe_id, indicador_id, viatura, qtd_inspecoes, qtd_itens_inspecionados, qtd_itens_nao_conforme)
+    SELECT NEW.id, e.ordem, NEW.data_referencia, NEW.base_id, NEW.equipe_id, NEW.indicador_id,
+           e.viatura, e.qtd_inspecoes, e.qtd_itens_inspecionados, e.qtd_itens_nao_conforme
+    FROM public.lancamento_inspecoes_extrair(NEW.conteudo) e;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_fatos_sync() IS
+  'Trigger AFTER INSERT/UPDATE/DELETE em lancamentos que projeta avaliados/participantes/afericoes/inspecoes nas tabelas filhas.';
+
+REVOKE EXECUTE ON FUNCTION public.lancamentos_fatos_sync() FROM PUBLIC, anon, authenticated;
+
+-- --------------------------------------------
+-- 4. Trigger + backfill (lancamentos bloqueada para escrita durante a carga)
+-- --------------------------------------------
+LOCK TABLE public.lancamentos IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS trg_lancamentos_fatos ON public.lancamentos;
+CREATE TRIGGER trg_lancamentos_fatos
+    AFTER INSERT OR UPDATE OR DELETE ON public.lancamentos
+    FOR EACH ROW
+    EXECUTE FUNCTION public.lancamentos_fatos_sync();
+
+TRUNCATE public.lancamento_avaliados, public.lancamento_participantes, public.lancamento_afericoes, public.lancamento_inspecoes;
+
+INSERT INTO public.lancamento_avaliados
+  (lancamento_id, ordem, data_referencia, base_id, equipe_id, indicador_id, nome, idade, tempo, tempo_segundos, nota, status)
+SELECT l.id, e.ordem, l.data_referencia, l.base_id, l.equipe_id, l.indicador_id,
+       e.nome, e.idade, e.tempo, e.tempo_segundos, e.nota, e.status
+FROM public.lancamentos l
+CROSS JOIN LATERAL public.lancamento_avaliados_extrair(l.conteudo) e;
+
+INSERT INTO public.lancamento_participantes
+  (lancamento_id, ordem, data_referencia, base_id, equipe_id, indicador_id, nome, horas, minutos)
+SELECT l.id, e.ordem, l.data_referencia, l.base_id, l.equipe_id, l.indicador_id,
+       e.nome, e.horas, e.minutos
+FROM public.lancamentos l
+CROSS JOIN LATERAL public.lancamento_participantes_extrair(l.conteudo) e;
+
+INSERT INTO public.lancamento_afericoes
+  (lancamento_id, ordem, data_referencia, base_id, equipe_id, indicador_id, viatura, motorista, local, tempo, tempo_segundos)
+SELECT l.id, e.ordem, l.data_referencia, l.base_id, l.equipe_id, l.indicador_id,
+       e.viatura, e.motorista, e.local, e.tempo, e.tempo_segundos
+FROM public.lancamentos l
+CROSS JOIN LATERAL public.lancamento_afericoes_extrair(l.conteudo) e;
+
+INSERT INTO public.lancamento_inspecoes
+  (lancamento_id, ordem, data_referencia, base_id, equipe_id, indicador_id, viatura, qtd_inspecoes, qtd_itens_inspecionados, qtd_itens_nao_conforme)
+SELECT l.id, e.ordem, l.data_referencia, l.base_id, l.equipe_id, l.indicador_id,
+       e.viatura, e.qtd_inspecoes, e.qtd_itens_inspecionados, e.qtd_itens_nao_conforme
+FROM public.lancamentos l
+CROSS JOIN LATERAL public.lancamento_inspecoes_extrair(l.conteudo) e;
+
+-- --------------------------------------------
+-- 5. RLS: leitura por base (Gerente Geral vê todas); sem escrita pelo cliente
+-- --------------------------------------------
+DO $$
+DECLARE
+  v_tabela TEXT;
+BEGIN
+  FOREACH v_tabela IN ARRAY ARRAY['lancamento_avaliados', 'lancamento_participantes', 'lancamento_afericoes', 'lancamento_inspecoes'] LOOP
+    EXECUTE format('ALTER TABLE public.%I ENABLE ROW LEVEL SECURITY', v_tabela);
+    EXECUTE format('DROP POLICY IF EXISTS %I ON public.%I', v_tabela || '_select', v_tabela);
+    EXECUTE format(
+      'CREATE POLICY %I ON public.%I FOR SELECT TO authenticated USING (
+         EXISTS (
+           SELECT 1 FROM public.get_current_user_role_and_base() AS my
+           WHERE my.role = ''geral''
+              OR (my.base_id IS NOT NULL AND my.base_id = %I.base_id)
+         )
+       )',
+      v_tabela || '_select', v_tabela, v_tabela
+    );
+    EXECUTE format('COMMENT ON POLICY %I ON public.%I IS %L', v_tabela || '_select', v_tabela,
+      'Gerente Geral lê todas as bases; demais roles apenas a própria base (mesma visibilidade de lancamentos).');
+    EXECUTE format('REVOKE INSERT, UPDATE, DELETE, TRUNCATE ON public.%I FROM anon, authenticated', v_tabela);
+  END LOOP;
+END;
+$$;
+
+-- --------------------------------------------
+-- 6. Filtro de colaborador das RPCs de Analytics (037) via tabelas filhas
+-- --------------------------------------------
+-- Mesma regra de filterByColaborador (trecho do nome/motorista, sem
+-- diferenciar maiúsculas), agora por índice trigram em vez de expandir o
+-- JSONB de cada lançamento. conteudo.colaboradores (sem tabela filha)
+-- continua verificado no JSONB.
+CREATE OR REPLACE FUNCTION public.analytics_lancamentos_filtrados(
+  p_schema_type TEXT,
+  p_base_id UUID DEFAULT NULL,
+  p_equipe_id UUID DEFAULT NULL,
+  p_data_inicio DATE DEFAULT NULL,
+  p_data_fim DATE DEFAULT NULL,
+  p_colaborador TEXT DEFAULT NULL
+)
+RETURNS SETOF public.lancamentos
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH filtro AS (
+    SELECT
+      NULLIF(btrim(COALESCE(p_colaborador, '')), '') AS nome,
+      '%' || replace(replace(replace(lower(btrim(COALESCE(p_colaborador, ''))), '\', '\\'), '%', '\%'), '_', '\_') || '%' AS padrao
+  )
+  SELECT l.*
+  FROM public.lancamentos l
+  JOIN public.indicadores_config ic ON ic.id = l.indicador_id
+  CROSS JOIN filtro f
+  WHERE ic.schema_type = p_schema_type
+    AND (p_base_id IS NULL OR l.base_id = p_base_id)
+    AND (p_equipe_id IS NULL OR l.equipe_id = p_equipe_id)
+    AND (p_data_inicio IS NULL OR l.data_referencia >= p_data_inicio)
+    AND (p_data_fim IS NULL OR l.data_referencia <= p_data_fim)
+    AND (
+      f.nome IS NULL
+      OR l.id IN (
+        SELECT a.lancamento_id FROM public.lancamento_avaliados a WHERE a.nome_normalizado LIKE f.padrao
+        UNION
+        SELECT p.lancamento_id FROM public.lancamento_participantes p WHERE p.nome_normalizado LIKE f.padrao
+        UNION
+        SELECT af.lancamento_id FROM public.lancamento_afericoes af WHERE af.motorista_normalizado LIKE f.padrao
+      )
+      OR EXISTS (
+        SELECT 1
+        FROM jsonb_array_elements(public.conteudo_array(l.conteudo, 'colaboradores')) AS c(item)
+        WHERE strpos(lower(COALESCE(NULLIF(c.item ->> 'nome', ''), c.item ->> 'motorista', '')), lower(f.nome)) > 0
+      )
+    );
+$$;
+
+COMMENT ON FUNCTION public.analytics_lancamentos_filtrados(TEXT, UUID, UUID, DATE, DATE, TEXT) IS
+  'Lançamentos do schema_type informado filtrados por base/equipe/período/colaborador (RLS do chamador; colaborador via tabelas filhas).';
+
+RESET lock_timeout;
+RESET statement_timeout;
@@ -0,0 +1,376 @@
+-- ============================================
+-- MIGRATION 043: RLS com helpers avaliados uma vez por consulta (initPlan)
+-- ============================================
+-- Várias policies de lancamentos/colaboradores ainda faziam
+--   EXISTS (SELECT 1 FROM profiles WHERE profiles.id = auth.uid() ...)
+-- e as que usam get_current_user_role_and_base() (migration 013/017) o
+-- chamavam dentro de EXISTS correlacionado com a linha. Nos dois casos o
+-- Postgres reavalia a subconsulta para cada linha lida.
+--
+-- Agora todas as policies de lancamentos, profiles e colaboradores (e das
+-- tabelas derivadas 038/042) comparam colunas da linha com valores
+-- escalares envoltos em (SELECT ...). Sem referência à linha, o planner
+-- transforma cada um em InitPlan: uma leitura de profiles por consulta.
+--
+-- Helpers (STABLE, SECURITY DEFINER para não disparar o RLS de profiles):
+--   current_user_role()               -> 'geral' | 'chefe' | 'gerente_sci' | 'auxiliar' | NULL
+--   current_user_base_id()            -> base_id do perfil (NULL para geral)
+--   current_user_acesso_gerente_sci() -> acesso_gerente_sci (false se ausente)
+--
+-- As regras de acesso são exatamente as mesmas das policies substituídas.
+-- Benchmark por role: scripts/rls-benchmark.sql
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '120s';
+
+-- --------------------------------------------
+-- 1. Helpers escalares
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.current_user_role()
+RETURNS TEXT
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT p.role FROM public.profiles p WHERE p.id = auth.uid();
+$$;
+
+CREATE OR REPLACE FUNCTION public.current_user_base_id()
+RETURNS UUID
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT p.base_id FROM public.profiles p WHERE p.id = auth.uid();
+$$;
+
+CREATE OR REPLACE FUNCTION public.current_user_acesso_gerente_sci()
+RETURNS BOOLEAN
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT COALESCE((SELECT p.acesso_gerente_sci FROM public.profiles p WHERE p.id = auth.uid()), false);
+$$;
+
+COMMENT ON FUNCTION public.current_user_role() IS
+  'Role do usuário logado. Usar nas policies como (SELECT public.current_user_role()) para virar InitPlan.';
+COMMENT ON FUNCTION public.current_user_base_id() IS
+  'base_id do usuário logado. Usar nas policies como (SELECT public.current_user_base_id()).';
+COMMENT ON FUNCTION public.current_user_acesso_gerente_sci() IS
+  'acesso_gerente_sci do usuário logado (false se ausente). Usar nas policies como (SELECT ...).';
+
+REVOKE EXECUTE ON FUNCTION public.current_user_role() FROM PUBLIC, anon;
+REVOKE EXECUTE ON FUNCTION public.current_user_base_id() FROM PUBLIC, anon;
+REVOKE EXECUTE ON FUNCTION public.current_user_acesso_gerente_sci() FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.current_user_role() TO authenticated;
+GRANT EXECUTE ON FUNCTION public.current_user_base_id() TO authenticated;
+GRANT EXECUTE ON FUNCTION public.current_user_acesso_gerente_sci() TO authenticated;
+
+-- --------------------------------------------
+-- 2. lancamentos
+-- --------------------------------------------
+
+-- LEITURA
+DROP POLICY IF EXISTS "lancamentos_select_geral" ON public.lancamentos;
+CREATE POLICY "lancamentos_select_geral" ON public.lancamentos
+    FOR SELECT
+    USING ((SELECT public.current_user_role()) = 'geral');
+
+DROP POLICY IF EXISTS "lancamentos_select_chefe" ON public.lancamentos;
+CREATE POLICY "lancamentos_select_chefe" ON public.lancamentos
+    FOR SELECT
+    USING (
+        (SELECT public.current_user_role()) = 'chefe'
+        AND base_id = (SELECT public.current_user_base_id())
+    );
+
+DROP POLICY IF EXISTS "lancamentos_select_auxiliar" ON public.lancamentos;
+CREATE POLICY "lancamentos_select_auxiliar" ON public.lancamentos
+    FOR SELECT
+    USING (
+        (SELECT public.current_user_role()) = 'auxiliar'
+        AND base_id = (SELECT public.current_user_base_id())
+    );
+
+DROP POLICY IF EXISTS "lancamentos_select_gerente_sci" ON public.lancamentos;
+CREATE POLICY "lancamentos_select_gerente_sci" ON public.lancamentos
+    FOR SELECT
+    USING (
+        (
+            (SELECT public.current_user_role()) = 'gerente_sci'
+            OR ((SELECT public.current_user_role()) = 'chefe' AND (SELECT public.current_user_acesso_gerente_sci()))
+        )
+        AND base_id = (SELECT public.current_user_base_id())
+    );
+
+-- INSERÇÃO
+DROP POLICY IF EXISTS "lancamentos_insert_geral" ON public.lancamentos;
+CREATE POLICY "lancamentos_insert_geral" ON public.lancamentos
+    FOR INSERT
+    WITH CHECK ((SELECT public.current_user_role()) = 'geral');
+
+DROP POLICY IF EXISTS "lancamentos_insert_chefe" ON public.lancamentos;
+CREATE POLICY "lancamentos_insert_chefe" ON public.lancamentos
+    FOR INSERT
+    WITH CHECK (
+        (SELECT public.current_user_role()) = 'chefe'
+        AND base_id = (SELECT public.current_user_base_id())
+        AND user_id = (SELECT auth.uid())
+    );
+
+COMMENT ON POLICY "lancamentos_insert_chefe" ON public.lancamentos IS
+    'Chefe pode inserir lançamentos para qualquer equipe da sua base (permite troca de equipe sem atualizar perfil).';
+
+DROP POLICY IF EXISTS "lancamentos_insert_auxiliar" ON public.lancamentos;
+CREATE POLICY "lancamentos_insert_auxiliar" ON public.lancamentos
+    FOR INSERT
+    WITH CHECK (
+        (SELECT public.current_user_role()) = 'auxiliar'
+        AND base_id = (SELECT public.current_user_base_id())
+        AND user_id = (SELECT auth.uid())
+    );
+
+-- EDIÇÃO
+DROP POLICY IF EXISTS "lancamentos_update_geral" ON public.lancamentos;
+CREATE POLICY "lancamentos_update_geral" ON public.lancamentos
+    FOR UPDATE
+    USING ((SELECT public.current_user_role()) = 'geral');
+
+DROP POLICY IF EXISTS "lancamentos_update_chefe" ON public.lancamentos;
+CREATE POLICY "lancamentos_update_chefe" ON public.lancamentos
+    FOR UPDATE
+    USING (
+        (SELECT public.current_user_role()) = 'chefe'
+        AND base_id = (SELECT public.current_user_base_id())
+    );
+
+COMMENT ON POLICY "lancamentos_update_chefe" ON public.lancamentos IS
+    'Chefe pode editar lançamentos de qualquer equipe da sua base.';
+
+DROP POLICY IF EXISTS "lancamentos_update_auxiliar" ON public.lancamentos;
+CREATE POLICY "lancamentos_update_auxiliar" ON public.lancamentos
+    FOR UPDATE
+    USING (
+        (SELECT public.current_user_role()) = 'auxiliar'
+        AND base_id = (SELECT public.current_user_base_id())
+    );
+
+-- EXCLUSÃO
+DROP POLICY IF EXISTS "lancamentos_delete_geral" ON public.lancamentos;
+CREATE POLICY "lancamentos_delete_geral" ON public.lancamentos
+    FOR DELETE
+    USING ((SELECT public.current_user_role()) = 'geral');
+
+DROP POLICY IF EXISTS "lancamentos_delete_chefe" ON public.lancamentos;
+CREATE POLICY "lancamentos_delete_chefe" ON public.lancamentos
+    FOR DELETE
+    USING (
+        (SELECT public.current_user_role()) = 'chefe'
+        AND base_id = (SELECT public.current_user_base_id())
+    );
+
+COMMENT ON POLICY "lancamentos_delete_chefe" ON public.lancamentos IS
+    'Chefe pode excluir lançamentos de qualquer equipe da sua base.';
+
+DROP POLICY IF EXISTS "lancamentos_delete_auxiliar" ON public.lancamentos;
+CREATE POLICY "lancamentos_delete_auxiliar" ON public.lancamentos
+    FOR DELETE
+    USING (
+        (SELECT public.current_user_role()) = 'auxiliar'
+        AND base_id = (SELECT public.current_user_base_id())
+    );
+
+-- --------------------------------------------
+-- 3. profiles
+-- --------------------------------------------
+DROP POLICY IF EXISTS "profiles_select_own" ON public.profiles;
+CREATE POLICY "profiles_select_own" ON public.profiles
+    FOR SELECT
+    USING (id = (SELECT auth.uid()));
+
+COMMENT ON POLICY "profiles_select_own" ON public.profiles IS
+  'Permite que qualquer usuário autenticado leia seu próprio perfil. Garante login para todos os roles.';
+
+DROP POLICY IF EXISTS "profiles_select_restricted_by_base" ON public.profiles;
+CREATE POLICY "profiles_select_restricted_by_base" ON public.profiles
+    FOR SELECT
+    USING (
+        (SELECT auth.uid()) IS NOT NULL
+        AND (
+            (SELECT public.current_user_role()) = 'geral'
+            OR id = (SELECT auth.uid())
+            OR base_id = (SELECT public.current_user_base_id())
+        )
+    );
+
+COMMENT ON POLICY "profiles_select_restricted_by_base" ON public.profiles IS
+  'SELECT: geral vê todos; demais veem apenas próprio perfil ou profiles da mesma base. Isolamento entre bases.';
+
+DROP POLICY IF EXISTS "profiles_select_gerente_sci" ON public.profiles;
+CREATE POLICY "profiles_select_gerente_sci" ON public.profiles
+    FOR SELECT
+    USING (
+        (
+            (SELECT public.current_user_role()) = 'gerente_sci'
+            OR ((SELECT public.current_user_role()) = 'chefe' AND (SELECT public.current_user_acesso_gerente_sci()))
+        )
+        AND base_id = (SELECT public.current_user_base_id())
+    );
+
+DROP POLICY IF EXISTS "profiles_insert_gerente_sci" ON public.profiles;
+CREATE POLICY "profiles_insert_gerente_sci" ON public.profiles
+    FOR INSERT
+    WITH CHECK (
+        (
+            (SELECT public.current_user_role()) = 'gerente_sci'
+            OR ((SELECT public.current_user_role()) = 'chefe' AND (SELECT public.current_user_acesso_gerente_sci()))
+        )
+        AND base_id = (SELECT public.current_user_base_id())
+    );
+
+DROP POLICY IF EXISTS "profiles_update_gerente_sci" ON public.profiles;
+CREATE POLICY "profiles_update_gerente_sci" ON public.profiles
+    FOR UPDATE
+    USING (
+        (
+            (SELECT public.current_user_role()) = 'gerente_sci'
+            OR ((SELECT public.current_user_role()) = 'chefe' AND (SELECT public.current_user_acesso_gerente_sci()))
+        )
+        AND base_id = (SELECT public.current_user_base_id())
+    )
+    WITH CHECK (
+        (
+            (SELECT public.current_user_role()) = 'gerente_sci'
+            OR ((SELECT public.current_user_role()) = 'chefe' AND (SELECT public.current_user_acesso_gerente_sci()))
+        )
+        AND base_id = (SELECT public.current_user_base_id())
+    );
+
+DROP POLICY IF EXISTS "profiles_delete_gerente_sci" ON public.profiles;
+CREATE POLICY "profiles_delete_gerente_sci" ON public.profiles
+    FOR DELETE
+    USING (
+        (
+            (SELECT public.current_user_role()) = 'gerente_sci'
+            OR ((SELECT public.current_user_role()) = 'chefe' AND (SELECT public.current_user_acesso_gerente_sci()))
+        )
+        AND base_id = (SELECT public.current_user_base_id())
+    );
+
+DROP POLICY IF EXISTS "profiles_update_geral" ON public.profiles;
+CREATE POLICY "profiles_update_geral" ON public.profiles
+    FOR UPDATE
+    USING ((SELECT public.current_user_role()) = 'geral')
+    WITH CHECK ((SELECT public.current_user_role()) = 'geral');
+
+COMMENT ON POLICY "profiles_update_geral" ON public.profiles IS
+  'Administrador (Gerente Geral) pode atualizar qualquer perfil. Usado na Gestão de Usuários.';
+
+-- --------------------------------------------
+-- 4. colaboradores
+-- --------------------------------------------
+DROP POLICY IF EXISTS "colaboradores_select_same_base" ON public.colaboradores;
+CREATE POLICY "colaboradores_select_same_base" ON public.colaboradores
+    FOR SELECT
+    USING (
+        (SELECT public.current_user_role()) = 'geral'
+        OR (
+            (SELECT public.current_user_role()) IN ('chefe', 'gerente_sci', 'auxiliar')
+            AND base_id = (SELECT public.current_user_base_id())
+        )
+    );
+
+COMMENT ON POLICY "colaboradores_select_same_base" ON public.colaboradores IS
+  'Leitura: geral vê tudo; chefe, gerente_sci e auxiliar veem apenas sua base.';
+
+DROP POLICY IF EXISTS "colaboradores_insert_geral" ON public.colaboradores;
+CREATE POLICY "colaboradores_insert_geral" ON public.colaboradores
+    FOR INSERT
+    WITH CHECK ((SELECT public.current_user_role()) = 'geral');
+
+DROP POLICY IF EXISTS "colaboradores_update_geral" ON public.colaboradores;
+CREATE POLICY "colaboradores_update_geral" ON public.colaboradores
+    FOR UPDATE
+    USING ((SELECT public.current_user_role()) = 'geral')
+    WITH CHECK ((SELECT public.current_user_role()) = 'geral');
+
+DROP POLICY IF EXISTS "colaboradores_delete_geral" ON public.colaboradores;
+CREATE POLICY "colaboradores_delete_geral" ON public.colaboradores
+    FOR DELETE
+    USING ((SELECT public.current_user_role()) = 'geral');
+
+COMMENT ON POLICY "colaboradores_insert_geral" ON public.colaboradores IS 'Permite inserção de colaboradores apenas para Gerente Geral';
+COMMENT ON POLICY "colaboradores_update_geral" ON public.colaboradores IS 'Permite atualização de colaboradores apenas para Gerente Geral';
+COMMENT ON POLICY "colaboradores_delete_geral" ON public.colaboradores IS 'Permite exclusão de colaboradores apenas para Gerente Geral';
+
+DROP POLICY IF EXISTS "colaboradores_insert_gerente_sci" ON public.colaboradores;
+CREATE POLICY "colaboradores_insert_gerente_sci" ON public.colaboradores
+    FOR INSERT
+    WITH CHECK (
+        (
+            (SELECT public.current_user_role()) = 'gerente_sci'
+            OR ((SELECT public.current_user_role()) = 'chefe' AND (SELECT public.current_user_acesso_gerente_sci()))
+        )
+        AND base_id = (SELECT public.current_user_base_id())
+    );
+
+DROP POLICY IF EXISTS "colaboradores_update_gerente_sci" ON public.colaboradores;
+CREATE POLICY "colaboradores_update_gerente_sci" ON public.colaboradores
+    FOR UPDATE
+    USING (
+        (
+            (SELECT public.current_user_role()) = 'gerente_sci'
+            OR ((SELECT public.current_user_role()) = 'chefe' AND (SELECT public.current_user_acesso_gerente_sci()))
+        )
+        AND base_id = (SELECT public.current_user_base_id())
+    )
+    WITH CHECK (
+        (
+            (SELECT public.current_user_role()) = 'gerente_sci'
+            OR ((SELECT public.current_user_role()) = 'chefe' AND (SELECT public.current_user_acesso_gerente_sci()))
+        )
+        AND base_id = (SELECT public.current_user_base_id())
+    );
+
+DROP POLICY IF EXISTS "colaboradores_delete_gerente_sci" ON public.colaboradores;
+CREATE POLICY "colaboradores_delete_gerente_sci" ON public.colaboradores
+    FOR DELETE
+    USING (
+        (
+            (SELECT public.current_user_role()) = 'gerente_sci'
+            OR ((SELECT public.current_user_role()) = 'chefe' AND (SELECT public.current_user_acesso_gerente_sci()))
+        )
+        AND base_id = (SELECT public.current_user_base_id())
+    );
+
+-- --------------------------------------------
+-- 5. Tabelas derivadas de lancamentos (038, 042): leitura por base
+-- --------------------------------------------
+DO $$
+DECLARE
+  v_tabela TEXT;
+BEGIN
+  FOREACH v_tabela IN ARRAY ARRAY[
+    'lancamentos_monthly_agg', 'lancamento_avaliados', 'lancamento_participantes', 'lancamento_afericoes', 'lancamento_inspecoes'
+  ] LOOP
+    EXECUTE format('DROP POLICY IF EXISTS %I ON public.%I', v_tabela || '_select', v_tabela);
+    EXECUTE format(
+      'CREATE POLICY %I ON public.%I FOR SELECT TO authenticated USING (
+         (SELECT public.current_user_role()) = ''geral''
+         OR base_id = (SELECT public.current_user_base_id())
+       )',
+      v_tabela || '_select', v_tabela
+    );
+    EXECUTE format('COMMENT ON POLICY %I ON public.%I IS %L', v_tabela || '_select', v_tabela,
+      'Gerente Geral lê todas as bases; demais roles apenas a própria base (mesma visibilidade de lancamentos).');
+  END LOOP;
+END;
+$$;
+
+RESET lock_timeout;
+RESET statement_timeout;
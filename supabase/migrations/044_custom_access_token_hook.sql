@@ -0,0 +1,187 @@
+-- ============================================
+-- MIGRATION 044: Perfil do usuário no JWT (Custom Access Token Hook)
+-- ============================================
+-- RLS (helpers da 043), resolveUserManagementCaller (edge functions) e o
+-- AuthContext liam public.profiles para descobrir role, base_id e
+-- acesso_gerente_sci do usuário logado — uma leitura por consulta, por
+-- requisição e no boot do app.
+--
+-- Agora o Supabase Auth chama custom_access_token_hook ao emitir cada
+-- access token e grava o perfil na claim "perfil":
+--   { nome, role, base_id, equipe_id, acesso_gerente_sci, created_at, updated_at }
+-- O token é assinado pelo Auth, então a claim é confiável.
+--
+--   - current_user_role() / current_user_base_id() /
+--     current_user_acesso_gerente_sci() leem auth.jwt() -> 'perfil' e só
+--     consultam profiles quando a claim não existe (tokens emitidos antes
+--     do hook ou hook desativado). As policies da 043 não mudam.
+--   - Alteração de nome/role/base/equipe/acesso_gerente_sci em profiles
+--     (update_user_profile, edge functions, SQL direto) envia broadcast
+--     Realtime "perfil_alterado" no tópico "perfil:<user_id>"; o app do
+--     usuário afetado chama refreshSession() e recebe o token novo.
+--     Sem Realtime, a claim se atualiza no próximo refresh (expiração do JWT).
+--
+-- ATIVAÇÃO (obrigatória, fora do SQL):
+--   Dashboard > Authentication > Hooks > Customize Access Token (JWT) Claims
+--   -> Postgres function: public.custom_access_token_hook
+-- ou, no supabase/config.toml local:
+--   [auth.hook.custom_access_token]
+--   enabled = true
+--   uri = "pg-functions://postgres/public/custom_access_token_hook"
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '120s';
+
+-- --------------------------------------------
+-- 1. Hook: perfil nas claims do access token
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.custom_access_token_hook(event JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+STABLE
+SET search_path = public
+AS $$
+DECLARE
+  v_claims JSONB;
+  v_perfil JSONB;
+BEGIN
+  SELECT jsonb_build_object(
+           'nome', p.nome,
+           'role', p.role,
+           'base_id', p.base_id,
+           'equipe_id', p.equipe_id,
+           'acesso_gerente_sci', COALESCE(p.acesso_gerente_sci, false),
+           'created_at', p.created_at,
+           'updated_at', p.updated_at
+         )
+    INTO v_perfil
+  FROM public.profiles p
+  WHERE p.id = (event->>'user_id')::uuid;
+
+  v_claims := COALESCE(event->'claims', '{}'::jsonb);
+
+  -- Sem perfil (usuário recém-criado): sem claim; os helpers consultam profiles
+  IF v_perfil IS NULL THEN
+    v_claims := v_claims - 'perfil';
+  ELSE
+    v_claims := jsonb_set(v_claims, '{perfil}', v_perfil);
+  END IF;
+
+  RETURN jsonb_set(event, '{claims}', v_claims);
+END;
+$$;
+
+COMMENT ON FUNCTION public.custom_access_token_hook(JSONB) IS
+  'Custom Access Token Hook do Supabase Auth: grava o perfil (role, base_id, equipe_id, acesso_gerente_sci, nome) na claim "perfil" do JWT.';
+
+GRANT USAGE ON SCHEMA public TO supabase_auth_admin;
+GRANT EXECUTE ON FUNCTION public.custom_access_token_hook(JSONB) TO supabase_auth_admin;
+REVOKE EXECUTE ON FUNCTION public.custom_access_token_hook(JSONB) FROM PUBLIC, anon, authenticated;
+
+-- O hook roda como supabase_auth_admin: precisa ler profiles (com RLS ativo)
+GRANT SELECT ON public.profiles TO supabase_auth_admin;
+
+DROP POLICY IF EXISTS "profiles_select_auth_admin" ON public.profiles;
+CREATE POLICY "profiles_select_auth_admin" ON public.profiles
+    AS PERMISSIVE
+    FOR SELECT
+    TO supabase_auth_admin
+    USING (true);
+
+-- --------------------------------------------
+-- 2. Helpers da 043: claim primeiro, profiles como fallback
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.current_user_role()
+RETURNS TEXT
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT CASE
+    WHEN auth.jwt() ? 'perfil' THEN auth.jwt() -> 'perfil' ->> 'role'
+    ELSE (SELECT p.role FROM public.profiles p WHERE p.id = auth.uid())
+  END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.current_user_base_id()
+RETURNS UUID
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT CASE
+    WHEN auth.jwt() ? 'perfil' THEN (auth.jwt() -> 'perfil' ->> 'base_id')::uuid
+    ELSE (SELECT p.base_id FROM public.profiles p WHERE p.id = auth.uid())
+  END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.current_user_acesso_gerente_sci()
+RETURNS BOOLEAN
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT COALESCE(
+    CASE
+      WHEN auth.jwt() ? 'perfil' THEN (auth.jwt() -> 'perfil' ->> 'acesso_gerente_sci')::boolean
+      ELSE (SELECT p.acesso_gerente_sci FROM public.profiles p WHERE p.id = auth.uid())
+    END,
+    false
+  );
+$$;
+
+COMMENT ON FUNCTION public.current_user_role() IS
+  'Role do usuário logado (claim "perfil" do JWT; profiles se ausente). Usar nas policies como (SELECT public.current_user_role()) para virar InitPlan.';
+COMMENT ON FUNCTION public.current_user_base_id() IS
+  'base_id do usuário logado (claim "perfil" do JWT; profiles se ausente). Usar nas policies como (SELECT public.current_user_base_id()).';
+COMMENT ON FUNCTION public.current_user_acesso_gerente_sci() IS
+  'acesso_gerente_sci do usuário logado (claim "perfil" do JWT; profiles se ausente; false por padrão). Usar nas policies como (SELECT ...).';
+
+-- --------------------------------------------
+-- 3. Perfil alterado -> avisar o app do usuário para renovar o token
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.profiles_notificar_claims_alteradas()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  -- realtime.send só existe com o Realtime (broadcast a partir do banco) habilitado
+  IF to_regprocedure('realtime.send(jsonb,text,text,boolean)') IS NOT NULL THEN
+    BEGIN
+      EXECUTE 'SELECT realtime.send($1, $2, $3, false)'
+        USING jsonb_build_object('user_id', NEW.id), 'perfil_alterado', 'perfil:' || NEW.id::text;
+    EXCEPTION WHEN OTHERS THEN
+      -- O aviso é best-effort: nunca bloquear a alteração do perfil
+      RAISE WARNING 'Não foi possível enviar perfil_alterado para %: %', NEW.id, SQLERRM;
+    END;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+COMMENT ON FUNCTION public.profiles_notificar_claims_alteradas() IS
+  'Envia broadcast Realtime "perfil_alterado" (tópico perfil:<id>) quando muda um campo presente na claim "perfil" do JWT.';
+
+REVOKE EXECUTE ON FUNCTION public.profiles_notificar_claims_alteradas() FROM PUBLIC, anon, authenticated;
+
+DROP TRIGGER IF EXISTS trg_profiles_claims_alteradas ON public.profiles;
+CREATE TRIGGER trg_profiles_claims_alteradas
+    AFTER UPDATE OF nome, role, base_id, equipe_id, acesso_gerente_sci ON public.profiles
+    FOR EACH ROW
+    WHEN (
+        OLD.nome IS DISTINCT FROM NEW.nome
+        OR OLD.role IS DISTINCT FROM NEW.role
+        OR OLD.base_id IS DISTINCT FROM NEW.base_id
+        OR OLD.equipe_id IS DISTINCT FROM NEW.equipe_id
+        OR OLD.acesso_gerente_sci IS DISTINCT FROM NEW.acesso_gerente_sci
+    )
+    EXECUTE FUNCTION public.profiles_notificar_claims_alteradas();
+
+RESET lock_timeout;
+RESET statement_timeout;
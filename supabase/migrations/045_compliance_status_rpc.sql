@@ -0,0 +1,174 @@
+-- ============================================
+-- MIGRATION 045: Aderência (compliance) calculada no banco
+-- ============================================
+-- A página Aderência baixava todos os lançamentos do início do mês
+-- selecionado até hoje, todos os chefes e todos os indicadores e montava
+-- Grupo A / B / C com filtros repetidos no React.
+--
+-- Agora:
+--   - compliance_regras(): espelho de src/lib/compliance-rules.ts
+--     (MANTER EM SINCRONIA ao alterar grupos/indicadores);
+--   - compliance_status(p_mes, p_hoje): uma chamada, um agregado por
+--     (base, schema_type) e o resultado já no formato BaseComplianceStatus
+--     da página, mais a lista de chefes inativos.
+--
+-- Regras (idênticas às da página):
+--   Grupo A: lançamento hoje -> 'ok'; ontem -> 'pendente'; senão 'atrasado'.
+--   Grupo C: pelo menos 1 lançamento no mês selecionado (só indicadores
+--            que existem em indicadores_config contam).
+--   Grupo B: data do último lançamento.
+--   Janela: do início do mês selecionado até p_hoje.
+--   Inativos: chefes sem lançamento nos últimos 30 dias dentro da janela.
+--
+-- p_hoje vem do navegador (data local), como o isToday() da página.
+-- SECURITY INVOKER (padrão): o RLS de bases/lancamentos/profiles vale.
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '120s';
+
+-- --------------------------------------------
+-- 1. Regras de compliance (espelho do frontend)
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.compliance_regras()
+RETURNS TABLE (schema_type TEXT, nome TEXT, grupo TEXT, ordem INTEGER)
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+SET search_path = public
+AS $$
+  VALUES
+    ('atividades_acessorias',    'Atividades Acessórias',             'A', 1),
+    ('treinamento',              'PTR-BA - Horas treinamento diário', 'A', 2),
+    ('ocorrencia_aero',          'Ocorrência Aeronáutica',            'B', 3),
+    ('ocorrencia_nao_aero',      'Ocorrência Não Aeronáutica',        'B', 4),
+    ('taf',                      'Teste de Aptidão Física (TAF)',     'B', 5),
+    ('prova_teorica',            'Prova Teórica',                     'C', 6),
+    ('inspecao_viaturas',        'Inspeção de Viaturas',              'C', 7),
+    ('tempo_tp_epr',             'Tempo de TP/EPR',                   'C', 8),
+    ('tempo_resposta',           'Exercício de Tempo Resposta',       'C', 9),
+    ('exercicio_posicionamento', 'Exercício de Posicionamento',       'C', 10),
+    ('estoque',                  'Controle de Estoque',               'C', 11),
+    ('controle_trocas',          'Controle de Trocas',                'C', 12),
+    ('verificacao_tp',           'Verificação de TP',                 'C', 13),
+    ('higienizacao_tp',          'Higienização de TP',                'C', 14),
+    ('controle_epi',             'Controle de EPI',                   'C', 15)
+$$;
+
+COMMENT ON FUNCTION public.compliance_regras() IS
+  'Regras de aderência (Grupo A diário, B eventual, C mensal). Espelho de src/lib/compliance-rules.ts.';
+
+GRANT EXECUTE ON FUNCTION public.compliance_regras() TO authenticated;
+
+-- --------------------------------------------
+-- 2. Status por base
+-- --------------------------------------------
+-- Retorno:
+-- {
+--   "bases": [{ baseId, baseNome, grupoAStatus: { atividadesAcessorias, treinamento },
+--               grupoCCompliant, grupoCFaltantes, ultimaOcorrencia }],
+--   "usuariosInativos": [{ id, nome }]
+-- }
+CREATE OR REPLACE FUNCTION public.compliance_status(
+  p_mes DATE,
+  p_hoje DATE DEFAULT CURRENT_DATE
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH params AS (
+    SELECT
+      date_trunc('month', p_mes)::date AS inicio_mes,
+      (date_trunc('month', p_mes) + INTERVAL '1 month')::date AS fim_mes,
+      COALESCE(p_hoje, CURRENT_DATE) AS hoje
+  ),
+  regras AS (
+    SELECT r.schema_type, r.nome, r.grupo, r.ordem
+    FROM compliance_regras() r
+    WHERE EXISTS (SELECT 1 FROM indicadores_config i WHERE i.schema_type = r.schema_type)
+  ),
+  -- Uma passada na janela [início do mês, hoje]: um agregado por base e schema_type
+  agregado AS (
+    SELECT
+      l.base_id,
+      i.schema_type,
+      max(l.data_referencia) AS ultima,
+      bool_or(l.data_referencia = pr.hoje) AS tem_hoje,
+      bool_or(l.data_referencia = pr.hoje - 1) AS tem_ontem,
+      bool_or(l.data_referencia < pr.fim_mes) AS tem_no_mes
+    FROM params pr
+    JOIN lancamentos l
+      ON l.data_referencia >= pr.inicio_mes
+     AND l.data_referencia <= pr.hoje
+    JOIN indicadores_config i ON i.id = l.indicador_id
+    JOIN regras r ON r.schema_type = i.schema_type
+    GROUP BY l.base_id, i.schema_type
+  ),
+  por_base AS (
+    SELECT
+      b.id,
+      b.nome,
+      jsonb_build_object(
+        'baseId', b.id,
+        'baseNome', b.nome,
+        'grupoAStatus', jsonb_build_object(
+          'atividadesAcessorias', COALESCE((
+            SELECT CASE WHEN a.tem_hoje THEN 'ok' WHEN a.tem_ontem THEN 'pendente' END
+            FROM agregado a
+            WHERE a.base_id = b.id AND a.schema_type = 'atividades_acessorias'
+          ), 'atrasado'),
+          'treinamento', COALESCE((
+            SELECT CASE WHEN a.tem_hoje THEN 'ok' WHEN a.tem_ontem THEN 'pendente' END
+            FROM agregado a
+            WHERE a.base_id = b.id AND a.schema_type = 'treinamento'
+          ), 'atrasado')
+        ),
+        'grupoCCompliant', (
+          SELECT count(*)
+          FROM regras r
+          JOIN agregado a ON a.base_id = b.id AND a.schema_type = r.schema_type AND a.tem_no_mes
+          WHERE r.grupo = 'C'
+        ),
+        'grupoCFaltantes', COALESCE((
+          SELECT jsonb_agg(r.nome ORDER BY r.ordem)
+          FROM regras r
+          LEFT JOIN agregado a ON a.base_id = b.id AND a.schema_type = r.schema_type
+          WHERE r.grupo = 'C' AND NOT COALESCE(a.tem_no_mes, false)
+        ), '[]'::jsonb),
+        'ultimaOcorrencia', (
+          SELECT max(a.ultima)
+          FROM agregado a
+          JOIN regras r ON r.schema_type = a.schema_type AND r.grupo = 'B'
+          WHERE a.base_id = b.id
+        )
+      ) AS status
+    FROM bases b
+    WHERE b.nome <> 'ADMINISTRATIVO'
+  ),
+  inativos AS (
+    SELECT p.id, p.nome
+    FROM profiles p, params pr
+    WHERE p.role = 'chefe'
+      AND NOT EXISTS (
+        SELECT 1
+        FROM lancamentos l
+        WHERE l.user_id = p.id
+          AND l.data_referencia >= GREATEST(pr.inicio_mes, pr.hoje - 30)
+          AND l.data_referencia <= pr.hoje
+      )
+  )
+  SELECT jsonb_build_object(
+    'bases', COALESCE((SELECT jsonb_agg(pb.status ORDER BY pb.nome) FROM por_base pb), '[]'::jsonb),
+    'usuariosInativos', COALESCE((SELECT jsonb_agg(jsonb_build_object('id', i.id, 'nome', i.nome) ORDER BY i.nome) FROM inativos i), '[]'::jsonb)
+  );
+$$;
+
+COMMENT ON FUNCTION public.compliance_status(DATE, DATE) IS
+  'Aderência por base para o mês de p_mes (Grupo A em p_hoje, Grupo C no mês, última ocorrência do Grupo B) e chefes sem lançamento há 30 dias. Retorna { bases, usuariosInativos }.';
+
+GRANT EXECUTE ON FUNCTION public.compliance_status(DATE, DATE) TO authenticated;
+
+RESET lock_timeout;
+RESET statement_timeout;
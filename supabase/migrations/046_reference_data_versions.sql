@@ -0,0 +1,91 @@
+-- ============================================
+-- MIGRATION 046: Versão dos dados de referência (cache persistente no app)
+-- ============================================
+-- bases, equipes, indicadores_config e colaboradores mudam raramente, mas
+-- cada página os buscava de novo. O frontend agora guarda essas listas no
+-- IndexedDB (src/lib/reference-data.ts) e só as baixa de novo quando a
+-- versão da tabela muda — no estilo ETag.
+--
+--   - reference_data_versions: uma linha por tabela com um contador;
+--   - trigger por instrução (INSERT/UPDATE/DELETE/TRUNCATE) incrementa o
+--     contador da tabela alterada, qualquer que seja a origem da escrita;
+--   - leitura liberada para authenticated (só números, nenhum dado).
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '120s';
+
+CREATE TABLE IF NOT EXISTS public.reference_data_versions (
+    tabela TEXT PRIMARY KEY,
+    versao BIGINT NOT NULL DEFAULT 1,
+    atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+COMMENT ON TABLE public.reference_data_versions IS
+  'Contador de versão por tabela de referência (bases, equipes, indicadores_config, colaboradores). Usado pelo cache persistente do frontend.';
+
+INSERT INTO public.reference_data_versions (tabela)
+VALUES ('bases'), ('equipes'), ('indicadores_config'), ('colaboradores')
+ON CONFLICT (tabela) DO NOTHING;
+
+ALTER TABLE public.reference_data_versions ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "reference_data_versions_select" ON public.reference_data_versions;
+CREATE POLICY "reference_data_versions_select" ON public.reference_data_versions
+    FOR SELECT
+    TO authenticated
+    USING (true);
+
+REVOKE ALL ON public.reference_data_versions FROM anon;
+REVOKE INSERT, UPDATE, DELETE, TRUNCATE ON public.reference_data_versions FROM authenticated;
+GRANT SELECT ON public.reference_data_versions TO authenticated;
+
+-- --------------------------------------------
+-- Incremento por instrução
+-- --------------------------------------------
+-- SECURITY DEFINER: quem escreve na tabela de referência (ex.: geral via
+-- RLS) não tem permissão de escrita em reference_data_versions.
+CREATE OR REPLACE FUNCTION public.reference_data_incrementar_versao()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  INSERT INTO public.reference_data_versions AS v (tabela, versao, atualizado_em)
+  VALUES (TG_TABLE_NAME, 2, now())
+  ON CONFLICT (tabela) DO UPDATE
+    SET versao = v.versao + 1,
+        atualizado_em = now();
+  RETURN NULL;
+END;
+$$;
+
+COMMENT ON FUNCTION public.reference_data_incrementar_versao() IS
+  'Trigger FOR EACH STATEMENT: incrementa reference_data_versions.versao da tabela alterada.';
+
+REVOKE EXECUTE ON FUNCTION public.reference_data_incrementar_versao() FROM PUBLIC, anon, authenticated;
+
+DO $$
+DECLARE
+  v_tabela TEXT;
+BEGIN
+  FOREACH v_tabela IN ARRAY ARRAY['bases', 'equipes', 'indicadores_config', 'colaboradores'] LOOP
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_%1$s_versao ON public.%1$I', v_tabela);
+    EXECUTE format(
+      'CREATE TRIGGER trg_%1$s_versao AFTER INSERT OR UPDATE OR DELETE ON public.%1$I '
+      'FOR EACH STATEMENT EXECUTE FUNCTION public.reference_data_incrementar_versao()',
+      v_tabela
+    );
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_%1$s_versao_truncate ON public.%1$I', v_tabela);
+    EXECUTE format(
+      'CREATE TRIGGER trg_%1$s_versao_truncate AFTER TRUNCATE ON public.%1$I '
+      'FOR EACH STATEMENT EXECUTE FUNCTION public.reference_data_incrementar_versao()',
+      v_tabela
+    );
+  END LOOP;
+END;
+$$;
+
+RESET lock_timeout;
+RESET statement_timeout;
@@ -0,0 +1,137 @@
+-- ============================================
+-- MIGRATION 047: Sincronização incremental de lancamentos (watermark + tombstones)
+-- ============================================
+-- O frontend mantém no IndexedDB os lançamentos visíveis de uma base
+-- (src/lib/lancamentos-sync.ts) e, ao reabrir o dashboard, busca só o que
+-- mudou desde a última sincronização:
+--
+--   - alterações: lancamentos com updated_at > watermark (handle_updated_at
+--     já mantém updated_at em todo INSERT/UPDATE);
+--   - exclusões: lancamentos_excluidos guarda id/base/data de cada linha
+--     removida (tombstone), gravado por trigger AFTER DELETE.
+--
+-- Mudar data_referencia move a linha de partição (DELETE + INSERT): gera um
+-- tombstone e a linha volta com updated_at novo; o cliente aplica exclusões
+-- antes das alterações, então a linha permanece.
+--
+-- Tombstones são expurgados após 90 dias (lancamentos_excluidos_purgar);
+-- clientes sem sincronizar há mais tempo que isso recarregam a base inteira.
+-- Partições desanexadas (lancamentos_arquivar_particao) não geram
+-- tombstones: ficam fora da janela local do cliente.
+-- ============================================
+
+SET lock_timeout = '60s';
+SET statement_timeout = '600s';
+
+-- --------------------------------------------
+-- 1. Índice para "o que mudou desde o watermark" por base
+-- --------------------------------------------
+CREATE INDEX IF NOT EXISTS idx_lancamentos_base_updated_at
+  ON public.lancamentos (base_id, updated_at);
+
+COMMENT ON INDEX idx_lancamentos_base_updated_at IS
+  'Sincronização incremental do frontend: base_id = X AND updated_at > watermark.';
+
+-- --------------------------------------------
+-- 2. Tombstones
+-- --------------------------------------------
+CREATE TABLE IF NOT EXISTS public.lancamentos_excluidos (
+    id UUID PRIMARY KEY,
+    data_referencia DATE NOT NULL,
+    base_id UUID NOT NULL,
+    equipe_id UUID,
+    indicador_id UUID,
+    excluido_em TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+COMMENT ON TABLE public.lancamentos_excluidos IS
+  'Tombstones de lancamentos excluídos (sincronização incremental do frontend). Expurgados após 90 dias.';
+
+CREATE INDEX IF NOT EXISTS idx_lancamentos_excluidos_base_excluido_em
+  ON public.lancamentos_excluidos (base_id, excluido_em);
+
+ALTER TABLE public.lancamentos_excluidos ENABLE ROW LEVEL SECURITY;
+
+-- Mesma visibilidade de lancamentos (policies da migration 043): geral vê
+-- todas as bases; os demais perfis, só a própria base.
+DROP POLICY IF EXISTS "lancamentos_excluidos_select" ON public.lancamentos_excluidos;
+CREATE POLICY "lancamentos_excluidos_select" ON public.lancamentos_excluidos
+    FOR SELECT
+    TO authenticated
+    USING (
+        (SELECT public.current_user_role()) = 'geral'
+        OR (
+            (SELECT public.current_user_role()) IN ('chefe', 'auxiliar', 'gerente_sci')
+            AND base_id = (SELECT public.current_user_base_id())
+        )
+    );
+
+REVOKE ALL ON public.lancamentos_excluidos FROM anon;
+REVOKE INSERT, UPDATE, DELETE, TRUNCATE ON public.lancamentos_excluidos FROM authenticated;
+GRANT SELECT ON public.lancamentos_excluidos TO authenticated;
+
+-- SECURITY DEFINER: quem exclui o lançamento não escreve em lancamentos_excluidos
+CREATE OR REPLACE FUNCTION public.lancamentos_registrar_exclusao()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  INSERT INTO public.lancamentos_excluidos (id, data_referencia, base_id, equipe_id, indicador_id, excluido_em)
+  VALUES (OLD.id, OLD.data_referencia, OLD.base_id, OLD.equipe_id, OLD.indicador_id, now())
+  ON CONFLICT (id) DO UPDATE
+    SET data_referencia = EXCLUDED.data_referencia,
+        base_id = EXCLUDED.base_id,
+        equipe_id = EXCLUDED.equipe_id,
+        indicador_id = EXCLUDED.indicador_id,
+        excluido_em = EXCLUDED.excluido_em;
+  RETURN NULL;
+END;
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_registrar_exclusao() IS
+  'Trigger AFTER DELETE em lancamentos: grava o tombstone em lancamentos_excluidos.';
+
+REVOKE EXECUTE ON FUNCTION public.lancamentos_registrar_exclusao() FROM PUBLIC, anon, authenticated;
+
+DROP TRIGGER IF EXISTS trg_lancamentos_registrar_exclusao ON public.lancamentos;
+CREATE TRIGGER trg_lancamentos_registrar_exclusao
+  AFTER DELETE ON public.lancamentos
+  FOR EACH ROW
+  EXECUTE FUNCTION public.lancamentos_registrar_exclusao();
+
+-- --------------------------------------------
+-- 3. Expurgo dos tombstones
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.lancamentos_excluidos_purgar(p_retencao INTERVAL DEFAULT INTERVAL '90 days')
+RETURNS INTEGER
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+  v_removidos INTEGER;
+BEGIN
+  DELETE FROM public.lancamentos_excluidos WHERE excluido_em < now() - p_retencao;
+  GET DIAGNOSTICS v_removidos = ROW_COUNT;
+  RETURN v_removidos;
+END;
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_excluidos_purgar(INTERVAL) IS
+  'Remove tombstones mais antigos que a retenção (padrão 90 dias; o frontend recarrega tudo após 60 dias sem sincronizar).';
+
+REVOKE EXECUTE ON FUNCTION public.lancamentos_excluidos_purgar(INTERVAL) FROM PUBLIC, anon, authenticated;
+
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    EXECUTE $cron$SELECT cron.schedule('lancamentos-excluidos-purgar', '30 3 * * *', 'SELECT public.lancamentos_excluidos_purgar()')$cron$;
+  ELSE
+    RAISE NOTICE 'pg_cron indisponível: executar SELECT public.lancamentos_excluidos_purgar() periodicamente.';
+  END IF;
+END;
+$$;
+
+RESET lock_timeout;
+RESET statement_timeout;
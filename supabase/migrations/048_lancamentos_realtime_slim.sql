@@ -0,0 +1,153 @@
+-- ============================================
+-- MIGRATION 048: Realtime enxuto e filtrado por base para lancamentos
+-- ============================================
+-- A migration 011/041 publica public.lancamentos inteira no Realtime: cada
+-- cliente inscrito decodifica todas as mudanças de todas as bases, com o
+-- conteudo (JSONB) completo no payload.
+--
+-- Agora a publicação carrega só public.lancamentos_eventos, uma linha enxuta
+-- por INSERT/UPDATE/DELETE (ids, chaves de filtro e updated_at), gravada por
+-- trigger. O frontend (useRealtimeSync):
+--   - assina com filtro base_id=eq.<base do usuário> (geral: sem filtro);
+--   - o RLS abaixo é o mesmo de lancamentos, então o Realtime só entrega
+--     eventos que o usuário poderia ler;
+--   - busca as linhas alteradas em lote por id e aplica no cache.
+--
+-- Os eventos só servem à entrega em tempo real (o Realtime lê o WAL), então
+-- são expurgados após 1 hora (lancamentos_eventos_purgar).
+-- ============================================
+
+SET lock_timeout = '60s';
+SET statement_timeout = '600s';
+
+-- --------------------------------------------
+-- 1. Tabela de eventos
+-- --------------------------------------------
+CREATE TABLE IF NOT EXISTS public.lancamentos_eventos (
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    lancamento_id UUID NOT NULL,
+    operacao TEXT NOT NULL CHECK (operacao IN ('INSERT', 'UPDATE', 'DELETE')),
+    data_referencia DATE NOT NULL,
+    base_id UUID NOT NULL,
+    equipe_id UUID,
+    indicador_id UUID,
+    updated_at TIMESTAMPTZ,
+    criado_em TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+COMMENT ON TABLE public.lancamentos_eventos IS
+  'Eventos enxutos de lancamentos para o Realtime (sem conteudo). Expurgados após 1 hora.';
+
+CREATE INDEX IF NOT EXISTS idx_lancamentos_eventos_criado_em
+  ON public.lancamentos_eventos (criado_em);
+
+ALTER TABLE public.lancamentos_eventos ENABLE ROW LEVEL SECURITY;
+
+-- Mesma visibilidade de lancamentos (policies da migration 043)
+DROP POLICY IF EXISTS "lancamentos_eventos_select" ON public.lancamentos_eventos;
+CREATE POLICY "lancamentos_eventos_select" ON public.lancamentos_eventos
+    FOR SELECT
+    TO authenticated
+    USING (
+        (SELECT public.current_user_role()) = 'geral'
+        OR (
+            (SELECT public.current_user_role()) IN ('chefe', 'auxiliar', 'gerente_sci')
+            AND base_id = (SELECT public.current_user_base_id())
+        )
+    );
+
+REVOKE ALL ON public.lancamentos_eventos FROM anon;
+REVOKE INSERT, UPDATE, DELETE, TRUNCATE ON public.lancamentos_eventos FROM authenticated;
+GRANT SELECT ON public.lancamentos_eventos TO authenticated;
+
+-- SECURITY DEFINER: quem grava o lançamento não escreve em lancamentos_eventos
+CREATE OR REPLACE FUNCTION public.lancamentos_registrar_evento()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    INSERT INTO public.lancamentos_eventos (lancamento_id, operacao, data_referencia, base_id, equipe_id, indicador_id, updated_at)
+    VALUES (OLD.id, TG_OP, OLD.data_referencia, OLD.base_id, OLD.equipe_id, OLD.indicador_id, OLD.updated_at);
+  ELSE
+    -- UPDATE que troca de base gera evento nas duas: a base antiga precisa remover a linha
+    IF TG_OP = 'UPDATE' AND OLD.base_id IS DISTINCT FROM NEW.base_id THEN
+      INSERT INTO public.lancamentos_eventos (lancamento_id, operacao, data_referencia, base_id, equipe_id, indicador_id, updated_at)
+      VALUES (OLD.id, 'DELETE', OLD.data_referencia, OLD.base_id, OLD.equipe_id, OLD.indicador_id, NEW.updated_at);
+    END IF;
+    INSERT INTO public.lancamentos_eventos (lancamento_id, operacao, data_referencia, base_id, equipe_id, indicador_id, updated_at)
+    VALUES (NEW.id, TG_OP, NEW.data_referencia, NEW.base_id, NEW.equipe_id, NEW.indicador_id, NEW.updated_at);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_registrar_evento() IS
+  'Trigger AFTER INSERT/UPDATE/DELETE em lancamentos: grava o evento enxuto em lancamentos_eventos (Realtime).';
+
+REVOKE EXECUTE ON FUNCTION public.lancamentos_registrar_evento() FROM PUBLIC, anon, authenticated;
+
+DROP TRIGGER IF EXISTS trg_lancamentos_registrar_evento ON public.lancamentos;
+CREATE TRIGGER trg_lancamentos_registrar_evento
+  AFTER INSERT OR UPDATE OR DELETE ON public.lancamentos
+  FOR EACH ROW
+  EXECUTE FUNCTION public.lancamentos_registrar_evento();
+
+-- --------------------------------------------
+-- 2. Publicação: eventos enxutos no lugar da tabela inteira
+-- --------------------------------------------
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_publication WHERE pubname = 'supabase_realtime') THEN
+    IF EXISTS (
+      SELECT 1 FROM pg_publication_tables
+      WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = 'lancamentos'
+    ) THEN
+      ALTER PUBLICATION supabase_realtime DROP TABLE public.lancamentos;
+    END IF;
+    IF NOT EXISTS (
+      SELECT 1 FROM pg_publication_tables
+      WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = 'lancamentos_eventos'
+    ) THEN
+      ALTER PUBLICATION supabase_realtime ADD TABLE public.lancamentos_eventos;
+    END IF;
+  END IF;
+END;
+$$;
+
+-- --------------------------------------------
+-- 3. Expurgo
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.lancamentos_eventos_purgar(p_retencao INTERVAL DEFAULT INTERVAL '1 hour')
+RETURNS INTEGER
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+  v_removidos INTEGER;
+BEGIN
+  DELETE FROM public.lancamentos_eventos WHERE criado_em < now() - p_retencao;
+  GET DIAGNOSTICS v_removidos = ROW_COUNT;
+  RETURN v_removidos;
+END;
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_eventos_purgar(INTERVAL) IS
+  'Remove eventos Realtime já entregues (padrão: mais antigos que 1 hora).';
+
+REVOKE EXECUTE ON FUNCTION public.lancamentos_eventos_purgar(INTERVAL) FROM PUBLIC, anon, authenticated;
+
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    EXECUTE $cron$SELECT cron.schedule('lancamentos-eventos-purgar', '*/15 * * * *', 'SELECT public.lancamentos_eventos_purgar()')$cron$;
+  ELSE
+    RAISE NOTICE 'pg_cron indisponível: executar SELECT public.lancamentos_eventos_purgar() periodicamente.';
+  END IF;
+END;
+$$;
+
+RESET lock_timeout;
+RESET statement_timeout;
@@ -0,0 +1,338 @@
+-- ============================================
+-- MIGRATION 049: Tempos do conteudo também como inteiros
+-- ============================================
+-- Os tempos ficam no JSONB conteudo como texto de exibição ("02:02" mm:ss,
+-- "08:00" hh:mm) e eram convertidos em cada agregação e exportação (no
+-- navegador e com analytics_tempo_para_unidades nas funções SQL).
+--
+-- Agora cada campo de tempo válido, na raiz ou nos itens das listas, tem ao
+-- lado o inteiro correspondente:
+--   - mm:ss -> <campo>_seg (segundos): tempo, tempo_chegada_1_cci,
+--     tempo_chegada_ult_cci, tempo_medio
+--   - hh:mm -> <campo>_min (minutos): hora_acionamento, hora_chegada,
+--     hora_termino, termino_ocorrencia, duracao_total, horas, total_dia,
+--     tempo_gasto
+-- O frontend grava os mesmos campos (comDuracoesNumericas no useLancamento);
+-- o trigger trg_lancamentos_duracoes (BEFORE INSERT/UPDATE) os recalcula para
+-- qualquer escritor, então o inteiro nunca diverge da string.
+--
+-- Extração das tabelas filhas (042) e contribuição do agregado mensal (038)
+-- passam a somar os inteiros, com a conversão da string só como reserva.
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '600s';
+
+-- --------------------------------------------
+-- 1. Conversão (mesmas regras de comDuracoesNumericas)
+-- --------------------------------------------
+
+-- Campos de tempo do conteudo e o campo inteiro gravado ao lado de cada um
+CREATE OR REPLACE FUNCTION public.conteudo_campos_tempo()
+RETURNS TABLE (campo TEXT, formato TEXT, campo_numerico TEXT)
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT c.campo, c.formato, c.campo || CASE c.formato WHEN 'mm:ss' THEN '_seg' ELSE '_min' END
+  FROM (VALUES
+    ('tempo', 'mm:ss'),
+    ('tempo_chegada_1_cci', 'mm:ss'),
+    ('tempo_chegada_ult_cci', 'mm:ss'),
+    ('tempo_medio', 'mm:ss'),
+    ('hora_acionamento', 'hh:mm'),
+    ('hora_chegada', 'hh:mm'),
+    ('hora_termino', 'hh:mm'),
+    ('termino_ocorrencia', 'hh:mm'),
+    ('duracao_total', 'hh:mm'),
+    ('horas', 'hh:mm'),
+    ('total_dia', 'hh:mm'),
+    ('tempo_gasto', 'hh:mm')
+  ) AS c(campo, formato);
+$$;
+
+-- "mm:ss" -> segundos; "hh:mm" (ou só "hh") -> minutos. Inválido/vazio -> NULL.
+-- Dígitos limitados: um valor absurdo não pode estourar INTEGER e barrar o save.
+CREATE OR REPLACE FUNCTION public.conteudo_duracao_numerica(p_valor TEXT, p_formato TEXT)
+RETURNS INTEGER
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT CASE
+    WHEN p_formato = 'mm:ss' THEN (
+      SELECT COALESCE(NULLIF(m[1], ''), '0')::int * 60 + COALESCE(NULLIF(m[2], ''), '0')::int
+      FROM (SELECT regexp_match(COALESCE(p_valor, ''), '^\s*(\d{0,6})\s*:\s*(\d{0,6})\s*(?::|$)') AS m) t
+      WHERE m IS NOT NULL
+    )
+    ELSE (
+      SELECT m[1]::int * 60 + COALESCE(m[2], '0')::int
+      FROM (SELECT regexp_match(COALESCE(p_valor, ''), '^\s*(\d{1,6})(?::(\d{1,6}))?') AS m) t
+      WHERE m IS NOT NULL
+    )
+  END;
+$$;
+
+-- Objeto com os inteiros refeitos a partir das strings (inteiros de tempos
+-- apagados ou inválidos são removidos). Não-objetos voltam inalterados.
+CREATE OR REPLACE FUNCTION public.conteudo_item_com_duracoes(p_item JSONB)
+RETURNS JSONB
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT CASE
+    WHEN COALESCE(jsonb_typeof(p_item), '') <> 'object' THEN p_item
+    ELSE
+      (p_item - ARRAY(SELECT c.campo_numerico FROM public.conteudo_campos_tempo() c))
+      || COALESCE((
+        SELECT jsonb_object_agg(c.campo_numerico, d.valor)
+        FROM public.conteudo_campos_tempo() c
+        CROSS JOIN LATERAL (SELECT public.conteudo_duracao_numerica(p_item ->> c.campo, c.formato) AS valor) d
+        WHERE jsonb_typeof(p_item -> c.campo) = 'string'
+          AND d.valor IS NOT NULL
+      ), '{}'::jsonb)
+  END;
+$$;
+
+-- Conteúdo com os inteiros na raiz e nos itens das listas
+CREATE OR REPLACE FUNCTION public.conteudo_com_duracoes(p_conteudo JSONB)
+RETURNS JSONB
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT CASE
+    WHEN COALESCE(jsonb_typeof(p_conteudo), '') <> 'object' THEN p_conteudo
+    ELSE
+      public.conteudo_item_com_duracoes(p_conteudo)
+      || COALESCE((
+        SELECT jsonb_object_agg(
+          l.lista,
+          (
+            SELECT COALESCE(jsonb_agg(public.conteudo_item_com_duracoes(i.item) ORDER BY i.ordem), '[]'::jsonb)
+            FROM jsonb_array_elements(p_conteudo -> l.lista) WITH ORDINALITY AS i(item, ordem)
+          )
+        )
+        FROM unnest(ARRAY['avaliados', 'participantes', 'afericoes', 'colaboradores', 'inspecoes', 'atividades']) AS l(lista)
+        WHERE jsonb_typeof(p_conteudo -> l.lista) = 'array'
+      ), '{}'::jsonb)
+  END;
+$$;
+
+-- Inteiro gravado no JSONB (NULL se ausente ou não numérico)
+CREATE OR REPLACE FUNCTION public.conteudo_inteiro(p_item JSONB, p_chave TEXT)
+RETURNS INTEGER
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT CASE WHEN jsonb_typeof(p_item -> p_chave) = 'number' THEN round((p_item ->> p_chave)::numeric)::int END;
+$$;
+
+COMMENT ON FUNCTION public.conteudo_campos_tempo() IS
+  'Campos de tempo do conteudo, formato (mm:ss/hh:mm) e campo inteiro gravado ao lado (<campo>_seg / <campo>_min).';
+COMMENT ON FUNCTION public.conteudo_duracao_numerica(TEXT, TEXT) IS
+  'Converte "mm:ss" em segundos ou "hh:mm" em minutos. Inválido/vazio retorna NULL.';
+COMMENT ON FUNCTION public.conteudo_item_com_duracoes(JSONB) IS
+  'Objeto do conteudo com <campo>_seg / <campo>_min recalculados a partir das strings de tempo.';
+COMMENT ON FUNCTION public.conteudo_com_duracoes(JSONB) IS
+  'Conteudo com os tempos também como inteiros, na raiz e nos itens das listas (mesma regra de comDuracoesNumericas).';
+COMMENT ON FUNCTION public.conteudo_inteiro(JSONB, TEXT) IS
+  'Valor numérico do JSONB como inteiro; NULL se ausente ou não numérico.';
+
+-- --------------------------------------------
+-- 2. Trigger (qualquer escritor: app, SQL Editor, scripts)
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.lancamentos_duracoes_sync()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'UPDATE' AND NEW.conteudo IS NOT DISTINCT FROM OLD.conteudo THEN
+    RETURN NEW;
+  END IF;
+  NEW.conteudo := public.conteudo_com_duracoes(NEW.conteudo);
+  RETURN NEW;
+END;
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_duracoes_sync() IS
+  'Trigger BEFORE INSERT/UPDATE em lancamentos que grava os tempos do conteudo também como inteiros.';
+
+REVOKE EXECUTE ON FUNCTION public.lancamentos_duracoes_sync() FROM PUBLIC, anon, authenticated;
+
+-- --------------------------------------------
+-- 3. Extração das tabelas filhas (042) pelos inteiros
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.lancamento_avaliados_extrair(p_conteudo JSONB)
+RETURNS TABLE (ordem INTEGER, nome TEXT, idade INTEGER, tempo TEXT, tempo_segundos INTEGER, nota NUMERIC, status TEXT)
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT
+    i.ordem::int,
+    COALESCE(i.item ->> 'nome', ''),
+    public.conteudo_numero_opcional(i.item ->> 'idade')::int,
+    NULLIF(btrim(COALESCE(i.item ->> 'tempo', '')), ''),
+    COALESCE(
+      public.conteudo_inteiro(i.item, 'tempo_seg'),
+      CASE WHEN COALESCE(i.item ->> 'tempo', '') LIKE '%:%' THEN public.analytics_tempo_para_unidades(i.item ->> 'tempo') END
+    ),
+    public.conteudo_numero_opcional(i.item ->> 'nota'),
+    NULLIF(btrim(COALESCE(i.item ->> 'status', '')), '')
+  FROM jsonb_array_elements(public.conteudo_array(p_conteudo, 'avaliados')) WITH ORDINALITY AS i(item, ordem)
+  WHERE jsonb_typeof(i.item) = 'object';
+$$;
+
+CREATE OR REPLACE FUNCTION public.lancamento_participantes_extrair(p_conteudo JSONB)
+RETURNS TABLE (ordem INTEGER, nome TEXT, horas TEXT, minutos INTEGER)
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT
+    i.ordem::int,
+    COALESCE(i.item ->> 'nome', ''),
+    NULLIF(btrim(COALESCE(i.item ->> 'total_dia', i.item ->> 'horas', '')), ''),
+    COALESCE(
+      public.conteudo_inteiro(i.item, 'total_dia_min'),
+      public.conteudo_inteiro(i.item, 'horas_min'),
+      public.analytics_tempo_para_unidades(COALESCE(i.item ->> 'total_dia', i.item ->> 'horas'))
+    )
+  FROM jsonb_array_elements(public.conteudo_array(p_conteudo, 'participantes')) WITH ORDINALITY AS i(item, ordem)
+  WHERE jsonb_typeof(i.item) = 'object';
+$$;
+
+CREATE OR REPLACE FUNCTION public.lancamento_afericoes_extrair(p_conteudo JSONB)
+RETURNS TABLE (ordem INTEGER, viatura TEXT, motorista TEXT, local TEXT, tempo TEXT, tempo_segundos INTEGER)
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT
+    i.ordem::int,
+    NULLIF(btrim(COALESCE(i.item ->> 'viatura', '')), ''),
+    COALESCE(NULLIF(i.item ->> 'motorista', ''), i.item ->> 'nome', ''),
+    NULLIF(btrim(COALESCE(i.item ->> 'local', '')), ''),
+    NULLIF(btrim(COALESCE(i.item ->> 'tempo', '')), ''),
+    COALESCE(
+      public.conteudo_inteiro(i.item, 'tempo_seg'),
+      CASE WHEN COALESCE(i.item ->> 'tempo', '') LIKE '%:%' THEN public.analytics_tempo_para_unidades(i.item ->> 'tempo') END
+    )
+  FROM jsonb_array_elements(public.conteudo_array(p_conteudo, 'afericoes')) WITH ORDINALITY AS i(item, ordem)
+  WHERE jsonb_typeof(i.item) = 'object';
+$$;
+
+-- --------------------------------------------
+-- 4. Agregado mensal (038) pelos inteiros
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.taf_status_avaliado(p_avaliado JSONB)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT CASE
+    WHEN s.status NOT IN ('', '-') THEN lower(s.status)
+    WHEN s.idade > 0 AND s.tempo LIKE '%:%' THEN
+      CASE WHEN s.segundos <= CASE WHEN s.idade < 40 THEN 180 ELSE 240 END THEN 'aprovado' ELSE 'reprovado' END
+    ELSE ''
+  END
+  FROM (
+    SELECT
+      btrim(COALESCE(p_avaliado ->> 'status', '')) AS status,
+      public.analytics_numero(p_avaliado ->> 'idade') AS idade,
+      COALESCE(p_avaliado ->> 'tempo', '') AS tempo,
+      COALESCE(
+        public.conteudo_inteiro(p_avaliado, 'tempo_seg'),
+        public.analytics_tempo_para_unidades(p_avaliado ->> 'tempo')
+      ) AS segundos
+  ) s;
+$$;
+
+CREATE OR REPLACE FUNCTION public.lancamentos_agg_contribuicao(p_schema_type TEXT, p_conteudo JSONB)
+RETURNS TABLE (
+    taf_avaliados INTEGER,
+    taf_aprovados INTEGER,
+    taf_reprovados INTEGER,
+    treinamento_minutos BIGINT,
+    tempo_resposta_qtd INTEGER,
+    tempo_resposta_soma_seg BIGINT,
+    tempo_resposta_soma_quadrados BIGINT
+)
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  WITH itens AS (
+    SELECT i.valor
+    FROM jsonb_array_elements(
+      CASE
+        WHEN p_schema_type = 'taf' AND jsonb_typeof(p_conteudo -> 'avaliados') = 'array'
+          THEN p_conteudo -> 'avaliados'
+        WHEN p_schema_type = 'treinamento' AND jsonb_typeof(p_conteudo -> 'participantes') = 'array'
+          THEN p_conteudo -> 'participantes'
+        WHEN p_schema_type IN ('tempo_resposta', 'exercicio_posicionamento') AND jsonb_typeof(p_conteudo -> 'afericoes') = 'array'
+          THEN p_conteudo -> 'afericoes'
+        ELSE '[]'::jsonb
+      END
+    ) AS i(valor)
+  ),
+  taf AS (
+    SELECT public.taf_status_avaliado(valor) AS status FROM itens WHERE p_schema_type = 'taf'
+  ),
+  tempos AS (
+    SELECT COALESCE(
+      public.conteudo_inteiro(valor, 'tempo_seg'),
+      public.analytics_tempo_para_unidades(valor ->> 'tempo')
+    )::bigint AS segundos
+    FROM itens
+    WHERE p_schema_type IN ('tempo_resposta', 'exercicio_posicionamento')
+      AND COALESCE(valor ->> 'tempo', '') <> ''
+  )
+  SELECT
+    (SELECT count(*) FROM taf)::int,
+    (SELECT count(*) FROM taf WHERE status = 'aprovado')::int,
+    (SELECT count(*) FROM taf WHERE status = 'reprovado')::int,
+    COALESCE((
+      SELECT sum(COALESCE(
+        public.conteudo_inteiro(valor, 'total_dia_min'),
+        public.conteudo_inteiro(valor, 'horas_min'),
+        public.analytics_tempo_para_unidades(COALESCE(NULLIF(valor ->> 'total_dia', ''), valor ->> 'horas'))
+      ))
+      FROM itens
+      WHERE p_schema_type = 'treinamento'
+    ), 0)::bigint,
+    (SELECT count(*) FROM tempos)::int,
+    COALESCE((SELECT sum(segundos) FROM tempos), 0)::bigint,
+    COALESCE((SELECT sum(segundos * segundos) FROM tempos), 0)::bigint;
+$$;
+
+-- --------------------------------------------
+-- 5. Trigger + backfill (lancamentos bloqueada para escrita durante a carga)
+-- --------------------------------------------
+LOCK TABLE public.lancamentos IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS trg_lancamentos_duracoes ON public.lancamentos;
+CREATE TRIGGER trg_lancamentos_duracoes
+    BEFORE INSERT OR UPDATE ON public.lancamentos
+    FOR EACH ROW
+    EXECUTE FUNCTION public.lancamentos_duracoes_sync();
+
+-- Só acrescenta os inteiros: tabelas filhas e agregado mensal já têm esses
+-- valores, updated_at é preservado (o sync incremental não reenvia tudo) e
+-- nenhum evento de Realtime é gerado. Por isso os triggers ficam desligados
+-- durante a carga, como na cópia da migration 041.
+SET session_replication_role = replica;
+
+UPDATE public.lancamentos
+SET conteudo = public.conteudo_com_duracoes(conteudo)
+WHERE conteudo IS DISTINCT FROM public.conteudo_com_duracoes(conteudo);
+
+RESET session_replication_role;
+
+RESET lock_timeout;
+RESET statement_timeout;
@@ -0,0 +1,161 @@
+-- ============================================
+-- MIGRATION 050: schema_type desnormalizado em lancamentos
+-- ============================================
+-- Analytics, exportação e compliance mapeavam indicador_id ->
+-- indicadores_config.schema_type no navegador: a Visão Geral e a Logística
+-- (estoque / controle_epi / controle_trocas) baixavam lançamentos de vários
+-- indicadores só para separá-los por tipo no cliente.
+--
+-- lancamentos.schema_type passa a guardar o tipo do indicador:
+--   - trg_lancamentos_schema_type (BEFORE INSERT/UPDATE) copia de
+--     indicadores_config ao gravar (valor enviado pelo cliente é ignorado);
+--   - trg_indicadores_config_schema_type propaga uma renomeação do tipo
+--     (como a da migration 031) para os lançamentos do indicador.
+-- Índice (schema_type, base_id, data_referencia) para buscar uma classe de
+-- indicadores por base e período no servidor (.in('schema_type', ...)).
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '600s';
+
+-- --------------------------------------------
+-- 1. Coluna
+-- --------------------------------------------
+ALTER TABLE public.lancamentos ADD COLUMN IF NOT EXISTS schema_type TEXT;
+
+COMMENT ON COLUMN public.lancamentos.schema_type IS
+  'Cópia de indicadores_config.schema_type do indicador. Mantida por trg_lancamentos_schema_type; não escrever diretamente.';
+
+-- --------------------------------------------
+-- 2. Triggers
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.lancamentos_schema_type_sync()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'UPDATE'
+     AND NEW.indicador_id = OLD.indicador_id
+     AND NEW.schema_type IS NOT DISTINCT FROM OLD.schema_type THEN
+    RETURN NEW;
+  END IF;
+  NEW.schema_type := (SELECT ic.schema_type FROM public.indicadores_config ic WHERE ic.id = NEW.indicador_id);
+  RETURN NEW;
+END;
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_schema_type_sync() IS
+  'Trigger BEFORE INSERT/UPDATE em lancamentos que copia o schema_type do indicador.';
+
+REVOKE EXECUTE ON FUNCTION public.lancamentos_schema_type_sync() FROM PUBLIC, anon, authenticated;
+
+CREATE OR REPLACE FUNCTION public.indicadores_config_schema_type_propagar()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF NEW.schema_type IS DISTINCT FROM OLD.schema_type THEN
+    UPDATE public.lancamentos SET schema_type = NEW.schema_type WHERE indicador_id = NEW.id;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+COMMENT ON FUNCTION public.indicadores_config_schema_type_propagar() IS
+  'Trigger AFTER UPDATE em indicadores_config que atualiza lancamentos.schema_type do indicador.';
+
+REVOKE EXECUTE ON FUNCTION public.indicadores_config_schema_type_propagar() FROM PUBLIC, anon, authenticated;
+
+DROP TRIGGER IF EXISTS trg_indicadores_config_schema_type ON public.indicadores_config;
+CREATE TRIGGER trg_indicadores_config_schema_type
+    AFTER UPDATE OF schema_type ON public.indicadores_config
+    FOR EACH ROW
+    EXECUTE FUNCTION public.indicadores_config_schema_type_propagar();
+
+-- --------------------------------------------
+-- 3. Trigger + backfill (lancamentos bloqueada para escrita durante a carga)
+-- --------------------------------------------
+LOCK TABLE public.lancamentos IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS trg_lancamentos_schema_type ON public.lancamentos;
+CREATE TRIGGER trg_lancamentos_schema_type
+    BEFORE INSERT OR UPDATE ON public.lancamentos
+    FOR EACH ROW
+    EXECUTE FUNCTION public.lancamentos_schema_type_sync();
+
+-- Triggers desligados na carga (tabelas filhas e agregado mensal não mudam,
+-- sem eventos de Realtime). updated_at avança de propósito: a cópia local
+-- (migration 047) recebe a coluna nova na próxima sincronização incremental.
+SET session_replication_role = replica;
+
+UPDATE public.lancamentos l
+SET schema_type = ic.schema_type,
+    updated_at = now()
+FROM public.indicadores_config ic
+WHERE ic.id = l.indicador_id
+  AND l.schema_type IS DISTINCT FROM ic.schema_type;
+
+RESET session_replication_role;
+
+-- --------------------------------------------
+-- 4. Índice
+-- --------------------------------------------
+-- Índice composto: schema_type + base_id + data_referencia (uma classe de indicadores por base e período)
+CREATE INDEX IF NOT EXISTS idx_lancamentos_schema_base_data
+ON public.lancamentos(schema_type, base_id, data_referencia DESC);
+
+COMMENT ON INDEX idx_lancamentos_schema_base_data IS
+    'Índice composto para queries filtradas por tipo de indicador, base e data (Visão Geral, Logística, RPCs de Analytics)';
+
+-- --------------------------------------------
+-- 5. Filtro das RPCs de Analytics (037/042) pela coluna, sem join
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.analytics_lancamentos_filtrados(
+  p_schema_type TEXT,
+  p_base_id UUID DEFAULT NULL,
+  p_equipe_id UUID DEFAULT NULL,
+  p_data_inicio DATE DEFAULT NULL,
+  p_data_fim DATE DEFAULT NULL,
+  p_colaborador TEXT DEFAULT NULL
+)
+RETURNS SETOF public.lancamentos
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH filtro AS (
+    SELECT
+      NULLIF(btrim(COALESCE(p_colaborador, '')), '') AS nome,
+      '%' || replace(replace(replace(lower(btrim(COALESCE(p_colaborador, ''))), '\', '\\'), '%', '\%'), '_', '\_') || '%' AS padrao
+  )
+  SELECT l.*
+  FROM public.lancamentos l
+  CROSS JOIN filtro f
+  WHERE l.schema_type = p_schema_type
+    AND (p_base_id IS NULL OR l.base_id = p_base_id)
+    AND (p_equipe_id IS NULL OR l.equipe_id = p_equipe_id)
+    AND (p_data_inicio IS NULL OR l.data_referencia >= p_data_inicio)
+    AND (p_data_fim IS NULL OR l.data_referencia <= p_data_fim)
+    AND (
+      f.nome IS NULL
+      OR l.id IN (
+        SELECT a.lancamento_id FROM public.lancamento_avaliados a WHERE a.nome_normalizado LIKE f.padrao
+        UNION
+        SELECT p.lancamento_id FROM public.lancamento_participantes p WHERE p.nome_normalizado LIKE f.padrao
+        UNION
+        SELECT af.lancamento_id FROM public.lancamento_afericoes af WHERE af.motorista_normalizado LIKE f.padrao
+      )
+      OR EXISTS (
+        SELECT 1
+        FROM jsonb_array_elements(public.conteudo_array(l.conteudo, 'colaboradores')) AS c(item)
+        WHERE strpos(lower(COALESCE(NULLIF(c.item ->> 'nome', ''), c.item ->> 'motorista', '')), lower(f.nome)) > 0
+      )
+    );
+$$;
+
+RESET lock_timeout;
+RESET statement_timeout;
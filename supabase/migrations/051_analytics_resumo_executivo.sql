@@ -0,0 +1,152 @@
+-- ============================================
+-- MIGRATION 051: Resumo executivo (Visão Geral) com período anterior
+-- ============================================
+-- generateExecutiveSummary comparava o volume de ocorrências com os 30 dias
+-- antes da ocorrência mais antiga, filtrando os lançamentos já baixados.
+-- Esses dias quase nunca estão na faixa buscada: o "período anterior" vinha
+-- vazio (crescimento +100%) ou parcial, e os demais KPIs não tinham
+-- comparação.
+--
+-- analytics_resumo_executivo devolve, numa chamada, os KPIs do período
+-- filtrado e do período anterior de mesma duração (imediatamente antes de
+-- p_data_inicio):
+--   - volume: ocorrências aeronáuticas + não aeronáuticas;
+--   - agilidade: tempo médio das aferições de Tempo Resposta;
+--   - treinamento: horas totais e conformidade PTR-BA (>= 16 h por
+--     colaborador, mesma regra de processHorasTreinamento);
+--   - TAF: aprovados / avaliados (mesma regra de taf_status_avaliado).
+-- Cada período lê faixas de data indexadas: lancamentos por
+-- (schema_type, base_id, data_referencia) (migration 050) e as tabelas
+-- filhas por (indicador_id, data_referencia) (migration 042).
+--
+-- SECURITY INVOKER (padrão): o RLS de lancamentos e das tabelas filhas vale.
+-- Sem p_data_inicio não há período anterior ("anterior": null).
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '120s';
+
+-- --------------------------------------------
+-- KPIs de um período
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.analytics_resumo_executivo_periodo(
+  p_base_id UUID,
+  p_equipe_id UUID,
+  p_data_inicio DATE,
+  p_data_fim DATE
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH
+  indicadores AS (
+    SELECT ic.id, ic.schema_type
+    FROM public.indicadores_config ic
+    WHERE ic.schema_type IN ('tempo_resposta', 'treinamento', 'taf')
+  ),
+  ocorrencias AS (
+    SELECT count(*)::int AS total
+    FROM public.lancamentos l
+    WHERE l.schema_type IN ('ocorrencia_aero', 'ocorrencia_nao_aero')
+      AND (p_base_id IS NULL OR l.base_id = p_base_id)
+      AND (p_equipe_id IS NULL OR l.equipe_id = p_equipe_id)
+      AND (p_data_inicio IS NULL OR l.data_referencia >= p_data_inicio)
+      AND (p_data_fim IS NULL OR l.data_referencia <= p_data_fim)
+  ),
+  afericoes AS (
+    SELECT count(*)::int AS total, avg(COALESCE(a.tempo_segundos, 0)) AS media_segundos
+    FROM public.lancamento_afericoes a
+    JOIN indicadores i ON i.id = a.indicador_id AND i.schema_type = 'tempo_resposta'
+    WHERE COALESCE(a.tempo, '') <> ''
+      AND (p_base_id IS NULL OR a.base_id = p_base_id)
+      AND (p_equipe_id IS NULL OR a.equipe_id = p_equipe_id)
+      AND (p_data_inicio IS NULL OR a.data_referencia >= p_data_inicio)
+      AND (p_data_fim IS NULL OR a.data_referencia <= p_data_fim)
+  ),
+  participantes AS (
+    SELECT p.nome, p.horas, p.minutos
+    FROM public.lancamento_participantes p
+    JOIN indicadores i ON i.id = p.indicador_id AND i.schema_type = 'treinamento'
+    WHERE (p_base_id IS NULL OR p.base_id = p_base_id)
+      AND (p_equipe_id IS NULL OR p.equipe_id = p_equipe_id)
+      AND (p_data_inicio IS NULL OR p.data_referencia >= p_data_inicio)
+      AND (p_data_fim IS NULL OR p.data_referencia <= p_data_fim)
+  ),
+  -- Conformidade por colaborador (nome), só participantes com horas informadas
+  colaboradores AS (
+    SELECT sum(minutos) AS minutos
+    FROM participantes
+    WHERE nome <> '' AND COALESCE(horas, '') <> ''
+    GROUP BY nome
+  ),
+  avaliados AS (
+    SELECT CASE
+      WHEN btrim(COALESCE(a.status, '')) NOT IN ('', '-') THEN lower(btrim(a.status))
+      WHEN COALESCE(a.idade, 0) > 0 AND COALESCE(a.tempo, '') LIKE '%:%' THEN
+        CASE WHEN a.tempo_segundos <= CASE WHEN a.idade < 40 THEN 180 ELSE 240 END THEN 'aprovado' ELSE 'reprovado' END
+      ELSE ''
+    END AS status
+    FROM public.lancamento_avaliados a
+    JOIN indicadores i ON i.id = a.indicador_id AND i.schema_type = 'taf'
+    WHERE (p_base_id IS NULL OR a.base_id = p_base_id)
+      AND (p_equipe_id IS NULL OR a.equipe_id = p_equipe_id)
+      AND (p_data_inicio IS NULL OR a.data_referencia >= p_data_inicio)
+      AND (p_data_fim IS NULL OR a.data_referencia <= p_data_fim)
+  )
+  SELECT jsonb_build_object(
+    'dataInicio', p_data_inicio,
+    'dataFim', p_data_fim,
+    'volume', (SELECT total FROM ocorrencias),
+    'afericoes', (SELECT total FROM afericoes),
+    'tempoMedioSegundos', (SELECT COALESCE(round(media_segundos, 2), 0) FROM afericoes),
+    'treinamentoMinutos', (SELECT COALESCE(sum(minutos), 0)::bigint FROM participantes),
+    'efetivoTreinamento', (SELECT count(*)::int FROM colaboradores),
+    'efetivoConforme', (SELECT count(*)::int FROM colaboradores WHERE minutos >= 16 * 60),
+    'tafAvaliados', (SELECT count(*)::int FROM avaliados),
+    'tafAprovados', (SELECT count(*)::int FROM avaliados WHERE status = 'aprovado')
+  );
+$$;
+
+COMMENT ON FUNCTION public.analytics_resumo_executivo_periodo(UUID, UUID, DATE, DATE) IS
+  'KPIs do resumo executivo (volume, agilidade, treinamento, TAF) de um período. Usada por analytics_resumo_executivo.';
+
+-- --------------------------------------------
+-- Período filtrado + período anterior equivalente
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.analytics_resumo_executivo(
+  p_base_id UUID DEFAULT NULL,
+  p_equipe_id UUID DEFAULT NULL,
+  p_data_inicio DATE DEFAULT NULL,
+  p_data_fim DATE DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH anterior AS (
+    -- Mesma quantidade de dias, terminando na véspera de p_data_inicio
+    SELECT
+      p_data_inicio - (COALESCE(p_data_fim, current_date) - p_data_inicio + 1) AS inicio,
+      p_data_inicio - 1 AS fim
+    WHERE p_data_inicio IS NOT NULL
+  )
+  SELECT jsonb_build_object(
+    'atual', public.analytics_resumo_executivo_periodo(p_base_id, p_equipe_id, p_data_inicio, p_data_fim),
+    'anterior', (
+      SELECT public.analytics_resumo_executivo_periodo(p_base_id, p_equipe_id, a.inicio, a.fim)
+      FROM anterior a
+    )
+  );
+$$;
+
+COMMENT ON FUNCTION public.analytics_resumo_executivo(UUID, UUID, DATE, DATE) IS
+  'Resumo executivo da Visão Geral: KPIs do período filtrado ("atual") e do período anterior de mesma duração ("anterior").';
+
+GRANT EXECUTE ON FUNCTION public.analytics_resumo_executivo_periodo(UUID, UUID, DATE, DATE) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.analytics_resumo_executivo(UUID, UUID, DATE, DATE) TO authenticated;
+
+RESET lock_timeout;
+RESET statement_timeout;
@@ -0,0 +1,109 @@
+-- ============================================
+-- MIGRATION 052: Autorização pelo perfil atual, aviso em canal privado
+-- ============================================
+-- A 044 fez os helpers de RLS confiarem na claim "perfil" do JWT. A claim
+-- vale até o token expirar: um usuário rebaixado ou movido de base mantinha
+-- os direitos antigos até lá. O único aviso de renovação era um broadcast
+-- público em "perfil:<id>", que qualquer cliente pode enviar ou ignorar.
+--
+-- Agora:
+--   - current_user_role() / current_user_base_id() /
+--     current_user_acesso_gerente_sci() voltam a ler public.profiles
+--     (leitura por chave primária, uma vez por consulta via InitPlan, 043).
+--     A claim continua no token só para o app montar a tela sem ir ao banco.
+--   - perfil_alterado é enviado em canal privado (realtime.send(..., true)).
+--     Só o próprio usuário recebe (policy de SELECT em realtime.messages) e
+--     nenhum cliente envia (sem policy de INSERT).
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '120s';
+
+-- --------------------------------------------
+-- 1. Helpers de RLS: sempre o perfil atual
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.current_user_role()
+RETURNS TEXT
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT p.role FROM public.profiles p WHERE p.id = auth.uid();
+$$;
+
+CREATE OR REPLACE FUNCTION public.current_user_base_id()
+RETURNS UUID
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT p.base_id FROM public.profiles p WHERE p.id = auth.uid();
+$$;
+
+CREATE OR REPLACE FUNCTION public.current_user_acesso_gerente_sci()
+RETURNS BOOLEAN
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT COALESCE((SELECT p.acesso_gerente_sci FROM public.profiles p WHERE p.id = auth.uid()), false);
+$$;
+
+COMMENT ON FUNCTION public.current_user_role() IS
+  'Role do usuário logado (sempre de profiles; a claim "perfil" do JWT pode estar desatualizada). Usar nas policies como (SELECT public.current_user_role()) para virar InitPlan.';
+COMMENT ON FUNCTION public.current_user_base_id() IS
+  'base_id do usuário logado (sempre de profiles). Usar nas policies como (SELECT public.current_user_base_id()).';
+COMMENT ON FUNCTION public.current_user_acesso_gerente_sci() IS
+  'acesso_gerente_sci do usuário logado (sempre de profiles; false se ausente). Usar nas policies como (SELECT ...).';
+
+-- --------------------------------------------
+-- 2. Aviso de perfil alterado em canal privado
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.profiles_notificar_claims_alteradas()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  -- realtime.send só existe com o Realtime (broadcast a partir do banco) habilitado
+  IF to_regprocedure('realtime.send(jsonb,text,text,boolean)') IS NOT NULL THEN
+    BEGIN
+      EXECUTE 'SELECT realtime.send($1, $2, $3, true)'
+        USING jsonb_build_object('user_id', NEW.id), 'perfil_alterado', 'perfil:' || NEW.id::text;
+    EXCEPTION WHEN OTHERS THEN
+      -- O aviso é best-effort: nunca bloquear a alteração do perfil
+      RAISE WARNING 'Não foi possível enviar perfil_alterado para %: %', NEW.id, SQLERRM;
+    END;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+COMMENT ON FUNCTION public.profiles_notificar_claims_alteradas() IS
+  'Envia broadcast Realtime privado "perfil_alterado" (tópico perfil:<id>) quando muda um campo presente na claim "perfil" do JWT.';
+
+-- Autorização do Realtime: cada usuário só escuta o próprio tópico perfil:<id>.
+-- Sem policy de INSERT, clientes não publicam nesses tópicos privados.
+DO $$
+BEGIN
+  IF to_regclass('realtime.messages') IS NOT NULL THEN
+    EXECUTE 'DROP POLICY IF EXISTS "perfil_alterado_receber_proprio" ON realtime.messages';
+    EXECUTE $policy$
+      CREATE POLICY "perfil_alterado_receber_proprio" ON realtime.messages
+          FOR SELECT
+          TO authenticated
+          USING (
+            realtime.messages.extension = 'broadcast'
+            AND (SELECT realtime.topic()) = 'perfil:' || (SELECT auth.uid())::text
+          )
+    $policy$;
+  END IF;
+END;
+$$;
+
+RESET lock_timeout;
+RESET statement_timeout;
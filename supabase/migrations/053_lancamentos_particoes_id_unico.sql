@@ -0,0 +1,154 @@
+-- ============================================
+-- MIGRATION 053: id único em lancamentos particionada + partição default
+-- ============================================
+-- Desde a 041 a PK é (id, data_referencia): o Postgres não aceita índice
+-- único sem a chave de partição, então id sozinho deixou de ser único.
+-- Update/delete por id (.eq('id', ...).single()), os tombstones da 047
+-- (ON CONFLICT (id)) e as tabelas filhas da 042 (lancamento_id) contam com
+-- um lançamento por id.
+--   - trg_lancamentos_id_unico (BEFORE INSERT/UPDATE) recusa id repetido
+--     e alteração de id. O advisory lock por id serializa inserções
+--     concorrentes do mesmo id. Mudar data_referencia continua permitido:
+--     a linha sai da partição antiga antes de entrar na nova.
+--
+-- Datas fora das partições criadas (mais de 10 anos atrás ou além dos 3
+-- meses à frente) caem em lancamentos_default. Com uma linha de um mês no
+-- default, criar a partição desse mês falhava (e o job do pg_cron junto).
+--   - lancamentos_criar_particao agora monta a partição como tabela
+--     comum, move para ela as linhas do mês que estão no default e só
+--     então a anexa. A mudança é física (triggers desligados): agregados,
+--     tabelas filhas, tombstones e eventos de realtime não mudam.
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '600s';
+
+-- --------------------------------------------
+-- 1. id único
+-- --------------------------------------------
+DO $$
+DECLARE
+  v_duplicados INTEGER;
+BEGIN
+  SELECT count(*) INTO v_duplicados
+  FROM (SELECT id FROM public.lancamentos GROUP BY id HAVING count(*) > 1) d;
+  IF v_duplicados > 0 THEN
+    RAISE EXCEPTION 'lancamentos tem % id(s) repetido(s); corrigir antes de aplicar a migration 053', v_duplicados;
+  END IF;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.lancamentos_id_unico()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'UPDATE' THEN
+    IF NEW.id IS DISTINCT FROM OLD.id THEN
+      RAISE EXCEPTION 'O id de um lançamento não pode ser alterado' USING ERRCODE = 'unique_violation';
+    END IF;
+    RETURN NEW;
+  END IF;
+
+  PERFORM pg_advisory_xact_lock(hashtextextended('lancamentos:' || NEW.id::text, 0));
+  -- Função volátil: enxerga a remoção da partição antiga quando a linha só muda de mês
+  IF EXISTS (SELECT 1 FROM public.lancamentos l WHERE l.id = NEW.id) THEN
+    RAISE EXCEPTION 'Já existe um lançamento com id %', NEW.id USING ERRCODE = 'unique_violation';
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_id_unico() IS
+  'Trigger BEFORE INSERT/UPDATE em lancamentos: id único entre partições (a PK é (id, data_referencia)) e imutável.';
+
+REVOKE EXECUTE ON FUNCTION public.lancamentos_id_unico() FROM PUBLIC, anon, authenticated;
+
+DROP TRIGGER IF EXISTS trg_lancamentos_id_unico ON public.lancamentos;
+CREATE TRIGGER trg_lancamentos_id_unico
+    BEFORE INSERT OR UPDATE OF id ON public.lancamentos
+    FOR EACH ROW
+    EXECUTE FUNCTION public.lancamentos_id_unico();
+
+-- --------------------------------------------
+-- 2. Criação de partição com linhas do mês no default
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.lancamentos_criar_particao(p_mes DATE)
+RETURNS TEXT
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+  v_inicio DATE := date_trunc('month', p_mes)::date;
+  v_fim DATE := (date_trunc('month', p_mes) + INTERVAL '1 month')::date;
+  v_nome TEXT := 'lancamentos_p' || to_char(date_trunc('month', p_mes), 'YYYYMM');
+  v_replicacao TEXT;
+BEGIN
+  IF to_regclass('public.' || v_nome) IS NOT NULL THEN
+    RETURN v_nome;
+  END IF;
+
+  IF to_regclass('public.lancamentos_default') IS NOT NULL
+     AND EXISTS (
+       SELECT 1 FROM public.lancamentos_default
+       WHERE data_referencia >= v_inicio AND data_referencia < v_fim
+     ) THEN
+    -- Linhas do mês já gravadas no default: mover para a partição nova antes de anexá-la
+    EXECUTE format(
+      'CREATE TABLE public.%I (LIKE public.lancamentos INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE)',
+      v_nome
+    );
+    v_replicacao := current_setting('session_replication_role');
+    PERFORM set_config('session_replication_role', 'replica', true);
+    EXECUTE format(
+      'WITH movidas AS (
+         DELETE FROM public.lancamentos_default
+         WHERE data_referencia >= %L AND data_referencia < %L
+         RETURNING *
+       )
+       INSERT INTO public.%I SELECT * FROM movidas',
+      v_inicio, v_fim, v_nome
+    );
+    PERFORM set_config('session_replication_role', v_replicacao, true);
+    EXECUTE format(
+      'ALTER TABLE public.lancamentos ATTACH PARTITION public.%I FOR VALUES FROM (%L) TO (%L)',
+      v_nome, v_inicio, v_fim
+    );
+  ELSE
+    EXECUTE format(
+      'CREATE TABLE public.%I PARTITION OF public.lancamentos FOR VALUES FROM (%L) TO (%L)',
+      v_nome, v_inicio, v_fim
+    );
+  END IF;
+
+  EXECUTE format('ALTER TABLE public.%I ENABLE ROW LEVEL SECURITY', v_nome);
+  EXECUTE format('REVOKE ALL ON public.%I FROM anon, authenticated', v_nome);
+  RETURN v_nome;
+END;
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_criar_particao(DATE) IS
+  'Cria a partição mensal lancamentos_pYYYYMM (RLS sem policies; acesso só pela tabela pai). Linhas do mês que estavam em lancamentos_default são movidas para ela.';
+
+REVOKE EXECUTE ON FUNCTION public.lancamentos_criar_particao(DATE) FROM PUBLIC, anon, authenticated;
+
+-- Meses que já têm linhas no default ganham a própria partição agora
+DO $$
+DECLARE
+  v_mes DATE;
+BEGIN
+  IF to_regclass('public.lancamentos_default') IS NULL THEN
+    RETURN;
+  END IF;
+  FOR v_mes IN
+    SELECT DISTINCT date_trunc('month', data_referencia)::date FROM public.lancamentos_default ORDER BY 1
+  LOOP
+    PERFORM public.lancamentos_criar_particao(v_mes);
+  END LOOP;
+END;
+$$;
+
+RESET lock_timeout;
+RESET statement_timeout;
@@ -0,0 +1,90 @@
+-- ============================================
+-- MIGRATION 054: Horas e nomes das tabelas filhas iguais ao app
+-- ============================================
+-- lancamento_participantes_extrair (042, refeita na 049) lia
+-- COALESCE(total_dia, horas): um total_dia vazio ("") escondia as horas
+-- válidas. A linha ficava com horas NULL e 0 minutos, e o participante
+-- sumia do PTR-BA e da conformidade do resumo executivo (051), que conta
+-- só linhas com horas. Agora vale NULLIF(total_dia, ''), como em
+-- lancamentos_agg_contribuicao (038/049).
+--
+-- lancamento_afericoes_extrair preferia motorista a nome; o app
+-- (normalizarLancamento / filterByColaborador) e as RPCs (037, 050)
+-- preferem nome. Agora a ordem é a mesma em todos: nome, depois motorista.
+--
+-- As duas tabelas são recarregadas a partir de lancamentos.
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '600s';
+
+-- --------------------------------------------
+-- 1. Extração
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.lancamento_participantes_extrair(p_conteudo JSONB)
+RETURNS TABLE (ordem INTEGER, nome TEXT, horas TEXT, minutos INTEGER)
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT
+    i.ordem::int,
+    COALESCE(i.item ->> 'nome', ''),
+    NULLIF(btrim(COALESCE(NULLIF(i.item ->> 'total_dia', ''), i.item ->> 'horas', '')), ''),
+    COALESCE(
+      public.conteudo_inteiro(i.item, 'total_dia_min'),
+      public.conteudo_inteiro(i.item, 'horas_min'),
+      public.analytics_tempo_para_unidades(COALESCE(NULLIF(i.item ->> 'total_dia', ''), i.item ->> 'horas'))
+    )
+  FROM jsonb_array_elements(public.conteudo_array(p_conteudo, 'participantes')) WITH ORDINALITY AS i(item, ordem)
+  WHERE jsonb_typeof(i.item) = 'object';
+$$;
+
+CREATE OR REPLACE FUNCTION public.lancamento_afericoes_extrair(p_conteudo JSONB)
+RETURNS TABLE (ordem INTEGER, viatura TEXT, motorista TEXT, local TEXT, tempo TEXT, tempo_segundos INTEGER)
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT
+    i.ordem::int,
+    NULLIF(btrim(COALESCE(i.item ->> 'viatura', '')), ''),
+    COALESCE(NULLIF(i.item ->> 'nome', ''), i.item ->> 'motorista', ''),
+    NULLIF(btrim(COALESCE(i.item ->> 'local', '')), ''),
+    NULLIF(btrim(COALESCE(i.item ->> 'tempo', '')), ''),
+    COALESCE(
+      public.conteudo_inteiro(i.item, 'tempo_seg'),
+      CASE WHEN COALESCE(i.item ->> 'tempo', '') LIKE '%:%' THEN public.analytics_tempo_para_unidades(i.item ->> 'tempo') END
+    )
+  FROM jsonb_array_elements(public.conteudo_array(p_conteudo, 'afericoes')) WITH ORDINALITY AS i(item, ordem)
+  WHERE jsonb_typeof(i.item) = 'object';
+$$;
+
+COMMENT ON FUNCTION public.lancamento_participantes_extrair(JSONB) IS
+  'Linhas de conteudo.participantes com horas em minutos (total_dia, ou horas quando total_dia está vazio).';
+COMMENT ON FUNCTION public.lancamento_afericoes_extrair(JSONB) IS
+  'Linhas de conteudo.afericoes com tempo em segundos; motorista = nome, ou motorista quando nome está vazio.';
+
+-- --------------------------------------------
+-- 2. Recarga (lancamentos bloqueada para escrita durante a carga)
+-- --------------------------------------------
+LOCK TABLE public.lancamentos IN SHARE ROW EXCLUSIVE MODE;
+
+TRUNCATE public.lancamento_participantes, public.lancamento_afericoes;
+
+INSERT INTO public.lancamento_participantes
+  (lancamento_id, ordem, data_referencia, base_id, equipe_id, indicador_id, nome, horas, minutos)
+SELECT l.id, e.ordem, l.data_referencia, l.base_id, l.equipe_id, l.indicador_id,
+       e.nome, e.horas, e.minutos
+FROM public.lancamentos l
+CROSS JOIN LATERAL public.lancamento_participantes_extrair(l.conteudo) e;
+
+INSERT INTO public.lancamento_afericoes
+  (lancamento_id, ordem, data_referencia, base_id, equipe_id, indicador_id, viatura, motorista, local, tempo, tempo_segundos)
+SELECT l.id, e.ordem, l.data_referencia, l.base_id, l.equipe_id, l.indicador_id,
+       e.viatura, e.motorista, e.local, e.tempo, e.tempo_segundos
+FROM public.lancamentos l
+CROSS JOIN LATERAL public.lancamento_afericoes_extrair(l.conteudo) e;
+
+RESET lock_timeout;
+RESET statement_timeout;
@@ -0,0 +1,355 @@
+-- ============================================
+-- MIGRATION 055: RPCs de Analytics pelos tempos inteiros
+-- ============================================
+-- A 049 grava ao lado de cada tempo do conteudo o inteiro correspondente
+-- (<campo>_seg para mm:ss, <campo>_min para hh:mm), e as tabelas filhas
+-- (042) e o agregado mensal (038) já somam esses inteiros. As RPCs da 037
+-- ainda convertiam a string em cada item com analytics_tempo_para_unidades.
+--
+-- Agora:
+--   - analytics_tempo_resposta / analytics_tempo_tp_epr: tempo_seg;
+--   - analytics_horas_treinamento: total_dia_min, depois horas_min.
+-- A conversão da string fica só como reserva (item sem o inteiro). O
+-- payload e as regras de cada view não mudam.
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '120s';
+
+-- --------------------------------------------
+-- Tempo Resposta / Exercício de Posicionamento (espelha processTempoResposta)
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.analytics_tempo_resposta(
+  p_schema_type TEXT DEFAULT 'tempo_resposta',
+  p_base_id UUID DEFAULT NULL,
+  p_equipe_id UUID DEFAULT NULL,
+  p_data_inicio DATE DEFAULT NULL,
+  p_data_fim DATE DEFAULT NULL,
+  p_colaborador TEXT DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH lanc AS (
+    SELECT * FROM public.analytics_lancamentos_filtrados(
+      p_schema_type, p_base_id, p_equipe_id, p_data_inicio, p_data_fim, p_colaborador
+    )
+  ),
+  afericoes AS (
+    SELECT
+      COALESCE(a.valor ->> 'viatura', '') AS viatura,
+      l.data_referencia,
+      a.ord,
+      COALESCE(
+        public.conteudo_inteiro(a.valor, 'tempo_seg'),
+        public.analytics_tempo_para_unidades(a.valor ->> 'tempo')
+      ) AS segundos
+    FROM lanc l
+    CROSS JOIN LATERAL jsonb_array_elements(
+      CASE WHEN jsonb_typeof(l.conteudo -> 'afericoes') = 'array' THEN l.conteudo -> 'afericoes' ELSE '[]'::jsonb END
+    ) WITH ORDINALITY AS a(valor, ord)
+  ),
+  validas AS (
+    SELECT * FROM afericoes WHERE segundos > 0
+  ),
+  resumo AS (
+    SELECT count(*) AS total, avg(segundos) AS media, min(segundos) AS menor, max(segundos) AS maior
+    FROM validas
+  ),
+  recorde AS (
+    SELECT viatura, segundos FROM validas ORDER BY segundos ASC, data_referencia DESC, ord LIMIT 1
+  ),
+  alerta AS (
+    SELECT viatura, segundos FROM validas ORDER BY segundos DESC, data_referencia DESC, ord LIMIT 1
+  ),
+  por_viatura AS (
+    SELECT viatura, avg(segundos) AS media FROM validas GROUP BY viatura
+  ),
+  por_mes AS (
+    SELECT date_trunc('month', data_referencia)::date AS mes, avg(segundos) AS media
+    FROM validas
+    GROUP BY 1
+  ),
+  faixas AS (
+    SELECT
+      count(*) FILTER (WHERE segundos < 120) AS excelente,
+      count(*) FILTER (WHERE segundos BETWEEN 120 AND 180) AS bom,
+      count(*) FILTER (WHERE segundos > 180) AS critico
+    FROM validas
+  )
+  SELECT jsonb_build_object(
+    'kpis', jsonb_build_object(
+      'menorTempo', (SELECT jsonb_build_object('tempo', public.analytics_segundos_para_mmss(segundos), 'viatura', viatura) FROM recorde),
+      'maiorTempo', (SELECT jsonb_build_object('tempo', public.analytics_segundos_para_mmss(segundos), 'viatura', viatura) FROM alerta),
+      'tempoMedioGeral', public.analytics_segundos_para_mmss(round(COALESCE(r.media, 0))),
+      'tempoMedioGeralSegundos', COALESCE(r.media, 0),
+      'totalExercicios', r.total
+    ),
+    'graficoPerformancePorViatura', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+        'viatura', viatura,
+        'mediaSegundos', media,
+        'mediaFormatada', public.analytics_segundos_para_mmss(round(media))
+      ) ORDER BY viatura)
+      FROM por_viatura
+    ), '[]'::jsonb),
+    'graficoCurvaAgilidade', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+        'mes', to_char(mes, 'Mon/YYYY'),
+        'mesKey', to_char(mes, 'YYYY-MM'),
+        'mediaSegundos', media,
+        'mediaFormatada', public.analytics_segundos_para_mmss(round(media))
+      ) ORDER BY mes)
+      FROM por_mes
+    ), '[]'::jsonb),
+    'graficoConsistencia', jsonb_build_array(
+      jsonb_build_object('name', 'Excelente (< 2min)', 'value', f.excelente,
+        'porcentagem', CASE WHEN r.total > 0 THEN f.excelente * 100.0 / r.total ELSE 0 END),
+      jsonb_build_object('name', 'Bom (2min - 3min)', 'value', f.bom,
+        'porcentagem', CASE WHEN r.total > 0 THEN f.bom * 100.0 / r.total ELSE 0 END),
+      jsonb_build_object('name', 'Crítico (> 3min)', 'value', f.critico,
+        'porcentagem', CASE WHEN r.total > 0 THEN f.critico * 100.0 / r.total ELSE 0 END)
+    ),
+    -- A view não exibe a lista linha a linha; omitida para manter o payload pequeno.
+    'listaCompleta', '[]'::jsonb
+  )
+  FROM resumo r, faixas f
+  WHERE EXISTS (SELECT 1 FROM lanc);
+$$;
+
+COMMENT ON FUNCTION public.analytics_tempo_resposta(TEXT, UUID, UUID, DATE, DATE, TEXT) IS
+  'Analytics de Tempo Resposta / Exercício de Posicionamento agregado no servidor (payload de processTempoResposta).';
+
+-- --------------------------------------------
+-- PTR-BA Horas de Treinamento (espelha processHorasTreinamento)
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.analytics_horas_treinamento(
+  p_schema_type TEXT DEFAULT 'treinamento',
+  p_base_id UUID DEFAULT NULL,
+  p_equipe_id UUID DEFAULT NULL,
+  p_data_inicio DATE DEFAULT NULL,
+  p_data_fim DATE DEFAULT NULL,
+  p_colaborador TEXT DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH lanc AS (
+    SELECT * FROM public.analytics_lancamentos_filtrados(
+      p_schema_type, p_base_id, p_equipe_id, p_data_inicio, p_data_fim, p_colaborador
+    )
+  ),
+  participantes AS (
+    SELECT
+      p.valor ->> 'nome' AS nome,
+      COALESCE(NULLIF(p.valor ->> 'total_dia', ''), p.valor ->> 'horas') AS horas,
+      COALESCE(
+        public.conteudo_inteiro(p.valor, 'total_dia_min'),
+        public.conteudo_inteiro(p.valor, 'horas_min'),
+        public.analytics_tempo_para_unidades(COALESCE(NULLIF(p.valor ->> 'total_dia', ''), p.valor ->> 'horas'))
+      ) AS minutos,
+      l.equipe_id,
+      l.data_referencia
+    FROM lanc l
+    CROSS JOIN LATERAL jsonb_array_elements(
+      CASE WHEN jsonb_typeof(l.conteudo -> 'participantes') = 'array' THEN l.conteudo -> 'participantes' ELSE '[]'::jsonb END
+    ) AS p(valor)
+  ),
+  por_colaborador AS (
+    SELECT
+      nome,
+      sum(minutos) AS minutos,
+      (array_agg(equipe_id ORDER BY data_referencia ASC))[1] AS equipe_id
+    FROM participantes
+    WHERE COALESCE(nome, '') <> '' AND COALESCE(horas, '') <> ''
+    GROUP BY nome
+  ),
+  resumo AS (
+    SELECT
+      count(*) AS total,
+      count(*) FILTER (WHERE minutos >= 16 * 60) AS apto,
+      count(*) FILTER (WHERE minutos < 16 * 60) AS irregular,
+      COALESCE(avg(minutos / 60.0), 0) AS media_horas
+    FROM por_colaborador
+  ),
+  faixas AS (
+    SELECT
+      CASE
+        WHEN minutos / 60.0 < 8 THEN '0-8h'
+        WHEN minutos / 60.0 < 16 THEN '8-15h'
+        WHEN minutos / 60.0 <= 24 THEN '16-24h'
+        ELSE '25h+'
+      END AS faixa,
+      count(*) AS quantidade
+    FROM por_colaborador
+    GROUP BY 1
+  ),
+  por_equipe AS (
+    SELECT equipe_id, avg(minutos / 60.0) AS media_horas
+    FROM por_colaborador
+    GROUP BY equipe_id
+  )
+  SELECT jsonb_build_object(
+    'kpis', jsonb_build_object(
+      'efetivoTotalAnalisado', r.total,
+      'efetivoApto', r.apto,
+      'efetivoAptoPercentual', CASE WHEN r.total > 0 THEN round(r.apto * 100.0 / r.total, 1) ELSE 0 END,
+      'efetivoIrregular', r.irregular,
+      'efetivoIrregularPercentual', CASE WHEN r.total > 0 THEN round(r.irregular * 100.0 / r.total, 1) ELSE 0 END,
+      'mediaHorasGeral', round(r.media_horas, 2),
+      'mediaHorasGeralFormatada', to_char(round(r.media_horas, 2), 'FM9999990.00')
+    ),
+    'graficoSituacaoTropa', jsonb_build_array(
+      jsonb_build_object('name', 'Conforme (>=16h)', 'value', r.apto,
+        'porcentagem', CASE WHEN r.total > 0 THEN r.apto * 100.0 / r.total ELSE 0 END),
+      jsonb_build_object('name', 'Não Conforme (<16h)', 'value', r.irregular,
+        'porcentagem', CASE WHEN r.total > 0 THEN r.irregular * 100.0 / r.total ELSE 0 END)
+    ),
+    'graficoDistribuicaoCargaHoraria', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object('faixa', faixa, 'quantidade', quantidade)
+        ORDER BY array_position(ARRAY['0-8h', '8-15h', '16-24h', '25h+'], faixa))
+      FROM faixas
+    ), '[]'::jsonb),
+    'graficoDesempenhoPorEquipe', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object('equipe', equipe_id, 'mediaHoras', media_horas) ORDER BY media_horas DESC)
+      FROM por_equipe
+    ), '[]'::jsonb),
+    'listaCompleta', '[]'::jsonb
+  )
+  FROM resumo r
+  WHERE EXISTS (SELECT 1 FROM lanc);
+$$;
+
+COMMENT ON FUNCTION public.analytics_horas_treinamento(TEXT, UUID, UUID, DATE, DATE, TEXT) IS
+  'Analytics de PTR-BA Horas de Treinamento (meta 16h) agregado no servidor (payload de processHorasTreinamento).';
+
+-- --------------------------------------------
+-- Tempo TP/EPR (espelha processTempoTPEPR; meta 59s)
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.analytics_tempo_tp_epr(
+  p_schema_type TEXT DEFAULT 'tempo_tp_epr',
+  p_base_id UUID DEFAULT NULL,
+  p_equipe_id UUID DEFAULT NULL,
+  p_data_inicio DATE DEFAULT NULL,
+  p_data_fim DATE DEFAULT NULL,
+  p_colaborador TEXT DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH lanc AS (
+    SELECT * FROM public.analytics_lancamentos_filtrados(
+      p_schema_type, p_base_id, p_equipe_id, p_data_inicio, p_data_fim, p_colaborador
+    )
+  ),
+  avaliados AS (
+    SELECT
+      COALESCE(a.valor ->> 'nome', '') AS nome,
+      l.equipe_id,
+      l.data_referencia,
+      a.ord,
+      COALESCE(
+        public.conteudo_inteiro(a.valor, 'tempo_seg'),
+        public.analytics_tempo_para_unidades(a.valor ->> 'tempo')
+      ) AS segundos
+    FROM lanc l
+    CROSS JOIN LATERAL jsonb_array_elements(
+      CASE WHEN jsonb_typeof(l.conteudo -> 'avaliados') = 'array' THEN l.conteudo -> 'avaliados' ELSE '[]'::jsonb END
+    ) WITH ORDINALITY AS a(valor, ord)
+  ),
+  validas AS (
+    SELECT * FROM avaliados WHERE segundos > 0
+  ),
+  resumo AS (
+    SELECT
+      count(*) AS total,
+      count(*) FILTER (WHERE segundos <= 59) AS dentro_meta,
+      avg(segundos) AS media
+    FROM validas
+  ),
+  recorde AS (
+    SELECT nome, equipe_id, segundos FROM validas ORDER BY segundos ASC, data_referencia DESC, ord LIMIT 1
+  ),
+  por_equipe AS (
+    SELECT equipe_id, avg(segundos) AS media FROM validas GROUP BY equipe_id
+  ),
+  faixas AS (
+    SELECT
+      CASE
+        WHEN segundos BETWEEN 30 AND 40 THEN '30-40s'
+        WHEN segundos BETWEEN 41 AND 50 THEN '41-50s'
+        WHEN segundos BETWEEN 51 AND 59 THEN '51-59s'
+        WHEN segundos BETWEEN 60 AND 70 THEN '1m-1m10s'
+        WHEN segundos > 70 THEN '1m10s+'
+        ELSE '<30s'
+      END AS faixa,
+      count(*) AS qtd
+    FROM validas
+    GROUP BY 1
+  ),
+  por_mes AS (
+    SELECT date_trunc('month', data_referencia)::date AS mes, avg(segundos) AS media
+    FROM validas
+    GROUP BY 1
+  ),
+  taxa AS (
+    SELECT CASE WHEN total > 0 THEN dentro_meta * 100.0 / total ELSE 0 END AS prontidao FROM resumo
+  )
+  SELECT jsonb_build_object(
+    'kpis', jsonb_build_object(
+      'totalAvaliacoes', r.total,
+      'taxaProntidao', round(t.prontidao, 2),
+      'tempoMedioGeral', public.analytics_segundos_para_mmss(round(COALESCE(r.media, 0))),
+      'tempoMedioGeralSegundos', COALESCE(r.media, 0),
+      'recorde', (
+        SELECT jsonb_build_object(
+          'tempo', public.analytics_segundos_para_mmss(segundos),
+          'nome', nome,
+          'equipe_id', equipe_id
+        )
+        FROM recorde
+      )
+    ),
+    'graficoAderenciaMeta', jsonb_build_array(
+      jsonb_build_object('name', 'Dentro da Meta (≤59s)', 'value', r.dentro_meta, 'porcentagem', t.prontidao),
+      jsonb_build_object('name', 'Acima da Meta (>59s)', 'value', r.total - r.dentro_meta, 'porcentagem', 100 - t.prontidao)
+    ),
+    'graficoPerformancePorEquipe', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+        'equipe', equipe_id,
+        'mediaSegundos', media,
+        'mediaFormatada', public.analytics_segundos_para_mmss(round(media))
+      ))
+      FROM por_equipe
+    ), '[]'::jsonb),
+    'graficoDistribuicaoTempos', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object('faixa', faixa, 'qtd', qtd)
+        ORDER BY array_position(ARRAY['<30s', '30-40s', '41-50s', '51-59s', '1m-1m10s', '1m10s+'], faixa))
+      FROM faixas
+    ), '[]'::jsonb),
+    'graficoEvolucaoMediaMensal', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+        'mes', to_char(mes, 'Mon/YYYY'),
+        'mesKey', to_char(mes, 'YYYY-MM'),
+        'mediaSegundos', media,
+        'mediaFormatada', public.analytics_segundos_para_mmss(round(media))
+      ) ORDER BY mes)
+      FROM por_mes
+    ), '[]'::jsonb),
+    'listaCompleta', '[]'::jsonb
+  )
+  FROM resumo r, taxa t
+  WHERE EXISTS (SELECT 1 FROM lanc);
+$$;
+
+COMMENT ON FUNCTION public.analytics_tempo_tp_epr(TEXT, UUID, UUID, DATE, DATE, TEXT) IS
+  'Analytics de Tempo TP/EPR (meta 59s) agregado no servidor (payload de processTempoTPEPR).';
+
+RESET lock_timeout;
+RESET statement_timeout;
@@ -0,0 +1,163 @@
+-- ============================================
+-- MIGRATION 056: Claim "perfil" nas policies, com revogação
+-- ============================================
+-- A 052 voltou os helpers de RLS para public.profiles porque a claim
+-- "perfil" do JWT (044) vale até o token expirar: um usuário rebaixado ou
+-- movido de base mantinha os direitos antigos até lá. Com isso, toda
+-- consulta voltou a ler profiles.
+--
+-- Agora a claim volta a ser a fonte, com controle de validade:
+--   - perfil_claims_revogadas guarda, por usuário, quando role, base_id ou
+--     acesso_gerente_sci mudaram (ou o perfil foi excluído). Só entram
+--     usuários alterados recentemente, então a tabela fica pequena.
+--   - perfil_claim() devolve a claim do token só se ele foi emitido (iat)
+--     depois da última alteração. Token anterior à alteração, ou sem
+--     claim, cai na leitura de profiles, como antes.
+--   - Os helpers (current_user_role / base_id / acesso_gerente_sci) leem
+--     perfil_claim(); o caller-guard das edge functions segue a mesma regra.
+--   - O aviso perfil_alterado (canal privado, 052) continua: o app renova o
+--     token e volta a usar a claim.
+-- Linhas mais antigas que a validade máxima de um JWT (7 dias) não revogam
+-- mais nenhum token e são removidas a cada nova alteração.
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '120s';
+
+-- --------------------------------------------
+-- 1. Revogações
+-- --------------------------------------------
+CREATE TABLE IF NOT EXISTS public.perfil_claims_revogadas (
+    user_id UUID PRIMARY KEY,
+    alterado_em TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+COMMENT ON TABLE public.perfil_claims_revogadas IS
+  'Última alteração de role/base_id/acesso_gerente_sci por usuário: tokens emitidos antes dela não valem como claim "perfil" (migration 056).';
+
+-- Lida só pelos helpers (SECURITY DEFINER) e pelo service role
+ALTER TABLE public.perfil_claims_revogadas ENABLE ROW LEVEL SECURITY;
+REVOKE ALL ON public.perfil_claims_revogadas FROM anon, authenticated;
+
+CREATE OR REPLACE FUNCTION public.profiles_revogar_claim()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  INSERT INTO public.perfil_claims_revogadas (user_id, alterado_em)
+  VALUES (OLD.id, clock_timestamp())
+  ON CONFLICT (user_id) DO UPDATE SET alterado_em = EXCLUDED.alterado_em;
+
+  DELETE FROM public.perfil_claims_revogadas WHERE alterado_em < now() - INTERVAL '7 days';
+  RETURN NULL;
+END;
+$$;
+
+COMMENT ON FUNCTION public.profiles_revogar_claim() IS
+  'Trigger AFTER UPDATE/DELETE em profiles: registra a alteração de role/base_id/acesso_gerente_sci em perfil_claims_revogadas.';
+
+REVOKE EXECUTE ON FUNCTION public.profiles_revogar_claim() FROM PUBLIC, anon, authenticated;
+
+DROP TRIGGER IF EXISTS trg_profiles_revogar_claim ON public.profiles;
+CREATE TRIGGER trg_profiles_revogar_claim
+    AFTER UPDATE OF role, base_id, acesso_gerente_sci ON public.profiles
+    FOR EACH ROW
+    WHEN (
+        OLD.role IS DISTINCT FROM NEW.role
+        OR OLD.base_id IS DISTINCT FROM NEW.base_id
+        OR OLD.acesso_gerente_sci IS DISTINCT FROM NEW.acesso_gerente_sci
+    )
+    EXECUTE FUNCTION public.profiles_revogar_claim();
+
+DROP TRIGGER IF EXISTS trg_profiles_revogar_claim_exclusao ON public.profiles;
+CREATE TRIGGER trg_profiles_revogar_claim_exclusao
+    AFTER DELETE ON public.profiles
+    FOR EACH ROW
+    EXECUTE FUNCTION public.profiles_revogar_claim();
+
+-- --------------------------------------------
+-- 2. Claim válida e helpers de RLS
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.perfil_claim()
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT CASE
+    WHEN auth.jwt() ? 'perfil'
+     AND auth.jwt() ? 'iat'
+     AND NOT EXISTS (
+       SELECT 1
+       FROM public.perfil_claims_revogadas r
+       WHERE r.user_id = auth.uid()
+         -- iat tem resolução de segundos: no mesmo segundo, vale o perfil atual
+         AND r.alterado_em >= to_timestamp((auth.jwt() ->> 'iat')::double precision)
+     )
+    THEN auth.jwt() -> 'perfil'
+  END;
+$$;
+
+COMMENT ON FUNCTION public.perfil_claim() IS
+  'Claim "perfil" do JWT, ou NULL se ausente ou emitida antes da última alteração do perfil (perfil_claims_revogadas).';
+
+REVOKE EXECUTE ON FUNCTION public.perfil_claim() FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.perfil_claim() TO authenticated;
+
+CREATE OR REPLACE FUNCTION public.current_user_role()
+RETURNS TEXT
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT CASE
+    WHEN c.perfil IS NOT NULL THEN c.perfil ->> 'role'
+    ELSE (SELECT p.role FROM public.profiles p WHERE p.id = auth.uid())
+  END
+  FROM (SELECT public.perfil_claim() AS perfil) c;
+$$;
+
+CREATE OR REPLACE FUNCTION public.current_user_base_id()
+RETURNS UUID
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT CASE
+    WHEN c.perfil IS NOT NULL THEN (c.perfil ->> 'base_id')::uuid
+    ELSE (SELECT p.base_id FROM public.profiles p WHERE p.id = auth.uid())
+  END
+  FROM (SELECT public.perfil_claim() AS perfil) c;
+$$;
+
+CREATE OR REPLACE FUNCTION public.current_user_acesso_gerente_sci()
+RETURNS BOOLEAN
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT COALESCE(
+    CASE
+      WHEN c.perfil IS NOT NULL THEN (c.perfil ->> 'acesso_gerente_sci')::boolean
+      ELSE (SELECT p.acesso_gerente_sci FROM public.profiles p WHERE p.id = auth.uid())
+    END,
+    false
+  )
+  FROM (SELECT public.perfil_claim() AS perfil) c;
+$$;
+
+COMMENT ON FUNCTION public.current_user_role() IS
+  'Role do usuário logado (claim "perfil" válida do JWT; profiles se ausente ou revogada). Usar nas policies como (SELECT public.current_user_role()) para virar InitPlan.';
+COMMENT ON FUNCTION public.current_user_base_id() IS
+  'base_id do usuário logado (claim "perfil" válida do JWT; profiles se ausente ou revogada). Usar nas policies como (SELECT public.current_user_base_id()).';
+COMMENT ON FUNCTION public.current_user_acesso_gerente_sci() IS
+  'acesso_gerente_sci do usuário logado (claim "perfil" válida do JWT; profiles se ausente ou revogada; false por padrão). Usar nas policies como (SELECT ...).';
+
+RESET lock_timeout;
+RESET statement_timeout;
@@ -0,0 +1,57 @@
+-- ============================================
+-- MIGRATION 057: Tombstone quando o lançamento troca de base
+-- ============================================
+-- O tombstone da 047 só era gravado no DELETE. Um UPDATE que troca base_id
+-- sem mudar data_referencia fica na mesma partição (não vira DELETE +
+-- INSERT): a base antiga não recebia exclusão nem alteração (a sincronização
+-- filtra por base_id) e a cópia local mantinha a linha até a recarga
+-- completa de 60 dias.
+--
+-- Agora a troca de base grava o tombstone com a base antiga, como o evento
+-- DELETE da 048 no Realtime. Um cliente da base nova (ou que sincroniza as
+-- duas) não é afetado: o tombstone fica na base antiga e, de todo modo, as
+-- exclusões são aplicadas antes das alterações.
+--
+-- Trocas de base anteriores a esta migration não são reconstituídas: a linha
+-- some da cópia local na próxima recarga completa.
+-- ============================================
+
+SET lock_timeout = '60s';
+SET statement_timeout = '120s';
+
+-- DELETE: linha removida. UPDATE (trigger abaixo): linha saiu da base antiga.
+-- Nos dois casos o tombstone vai para OLD.base_id.
+CREATE OR REPLACE FUNCTION public.lancamentos_registrar_exclusao()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  INSERT INTO public.lancamentos_excluidos (id, data_referencia, base_id, equipe_id, indicador_id, excluido_em)
+  VALUES (OLD.id, OLD.data_referencia, OLD.base_id, OLD.equipe_id, OLD.indicador_id, now())
+  ON CONFLICT (id) DO UPDATE
+    SET data_referencia = EXCLUDED.data_referencia,
+        base_id = EXCLUDED.base_id,
+        equipe_id = EXCLUDED.equipe_id,
+        indicador_id = EXCLUDED.indicador_id,
+        excluido_em = EXCLUDED.excluido_em;
+  RETURN NULL;
+END;
+$$;
+
+COMMENT ON FUNCTION public.lancamentos_registrar_exclusao() IS
+  'Trigger AFTER DELETE (e AFTER UPDATE que troca base_id) em lancamentos: grava o tombstone da base antiga em lancamentos_excluidos.';
+
+REVOKE EXECUTE ON FUNCTION public.lancamentos_registrar_exclusao() FROM PUBLIC, anon, authenticated;
+
+-- Mudança de partição (data_referencia) já passa pelo AFTER DELETE da 047
+DROP TRIGGER IF EXISTS trg_lancamentos_registrar_troca_base ON public.lancamentos;
+CREATE TRIGGER trg_lancamentos_registrar_troca_base
+  AFTER UPDATE OF base_id ON public.lancamentos
+  FOR EACH ROW
+  WHEN (OLD.base_id IS DISTINCT FROM NEW.base_id)
+  EXECUTE FUNCTION public.lancamentos_registrar_exclusao();
+
+RESET lock_timeout;
+RESET statement_timeout;
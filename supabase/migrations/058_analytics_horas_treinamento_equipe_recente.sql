@@ -0,0 +1,127 @@
+-- ============================================
+-- MIGRATION 058: Equipe do colaborador nas Horas de Treinamento
+-- ============================================
+-- analytics_horas_treinamento (037, refeita na 055) atribuía ao colaborador a
+-- equipe do lançamento mais ANTIGO do período (array_agg ... ASC), enquanto
+-- processHorasTreinamento ficava com a do último participante percorrido,
+-- que depende da ordem do array recebido. Um colaborador que trocou de
+-- equipe caía em equipes diferentes no gráfico de desempenho por equipe
+-- conforme o caminho (RPC ou cálculo no navegador).
+--
+-- Agora os dois usam a equipe do lançamento mais recente: maior
+-- data_referencia e, no mesmo dia, maior id. O restante da 055 (minutos
+-- inteiros total_dia_min / horas_min) não muda.
+-- ============================================
+
+SET lock_timeout = '20s';
+SET statement_timeout = '120s';
+
+-- --------------------------------------------
+-- PTR-BA Horas de Treinamento (espelha processHorasTreinamento)
+-- --------------------------------------------
+CREATE OR REPLACE FUNCTION public.analytics_horas_treinamento(
+  p_schema_type TEXT DEFAULT 'treinamento',
+  p_base_id UUID DEFAULT NULL,
+  p_equipe_id UUID DEFAULT NULL,
+  p_data_inicio DATE DEFAULT NULL,
+  p_data_fim DATE DEFAULT NULL,
+  p_colaborador TEXT DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH lanc AS (
+    SELECT * FROM public.analytics_lancamentos_filtrados(
+      p_schema_type, p_base_id, p_equipe_id, p_data_inicio, p_data_fim, p_colaborador
+    )
+  ),
+  participantes AS (
+    SELECT
+      p.valor ->> 'nome' AS nome,
+      COALESCE(NULLIF(p.valor ->> 'total_dia', ''), p.valor ->> 'horas') AS horas,
+      COALESCE(
+        public.conteudo_inteiro(p.valor, 'total_dia_min'),
+        public.conteudo_inteiro(p.valor, 'horas_min'),
+        public.analytics_tempo_para_unidades(COALESCE(NULLIF(p.valor ->> 'total_dia', ''), p.valor ->> 'horas'))
+      ) AS minutos,
+      l.id AS lancamento_id,
+      l.equipe_id,
+      l.data_referencia
+    FROM lanc l
+    CROSS JOIN LATERAL jsonb_array_elements(
+      CASE WHEN jsonb_typeof(l.conteudo -> 'participantes') = 'array' THEN l.conteudo -> 'participantes' ELSE '[]'::jsonb END
+    ) AS p(valor)
+  ),
+  por_colaborador AS (
+    SELECT
+      nome,
+      sum(minutos) AS minutos,
+      -- Equipe do lançamento mais recente (mesma regra de processHorasTreinamento)
+      (array_agg(equipe_id ORDER BY data_referencia DESC, lancamento_id DESC))[1] AS equipe_id
+    FROM participantes
+    WHERE COALESCE(nome, '') <> '' AND COALESCE(horas, '') <> ''
+    GROUP BY nome
+  ),
+  resumo AS (
+    SELECT
+      count(*) AS total,
+      count(*) FILTER (WHERE minutos >= 16 * 60) AS apto,
+      count(*) FILTER (WHERE minutos < 16 * 60) AS irregular,
+      COALESCE(avg(minutos / 60.0), 0) AS media_horas
+    FROM por_colaborador
+  ),
+  faixas AS (
+    SELECT
+      CASE
+        WHEN minutos / 60.0 < 8 THEN '0-8h'
+        WHEN minutos / 60.0 < 16 THEN '8-15h'
+        WHEN minutos / 60.0 <= 24 THEN '16-24h'
+        ELSE '25h+'
+      END AS faixa,
+      count(*) AS quantidade
+    FROM por_colaborador
+    GROUP BY 1
+  ),
+  por_equipe AS (
+    SELECT equipe_id, avg(minutos / 60.0) AS media_horas
+    FROM por_colaborador
+    GROUP BY equipe_id
+  )
+  SELECT jsonb_build_object(
+    'kpis', jsonb_build_object(
+      'efetivoTotalAnalisado', r.total,
+      'efetivoApto', r.apto,
+      'efetivoAptoPercentual', CASE WHEN r.total > 0 THEN round(r.apto * 100.0 / r.total, 1) ELSE 0 END,
+      'efetivoIrregular', r.irregular,
+      'efetivoIrregularPercentual', CASE WHEN r.total > 0 THEN round(r.irregular * 100.0 / r.total, 1) ELSE 0 END,
+      'mediaHorasGeral', round(r.media_horas, 2),
+      'mediaHorasGeralFormatada', to_char(round(r.media_horas, 2), 'FM9999990.00')
+    ),
+    'graficoSituacaoTropa', jsonb_build_array(
+      jsonb_build_object('name', 'Conforme (>=16h)', 'value', r.apto,
+        'porcentagem', CASE WHEN r.total > 0 THEN r.apto * 100.0 / r.total ELSE 0 END),
+      jsonb_build_object('name', 'Não Conforme (<16h)', 'value', r.irregular,
+        'porcentagem', CASE WHEN r.total > 0 THEN r.irregular * 100.0 / r.total ELSE 0 END)
+    ),
+    'graficoDistribuicaoCargaHoraria', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object('faixa', faixa, 'quantidade', quantidade)
+        ORDER BY array_position(ARRAY['0-8h', '8-15h', '16-24h', '25h+'], faixa))
+      FROM faixas
+    ), '[]'::jsonb),
+    'graficoDesempenhoPorEquipe', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object('equipe', equipe_id, 'mediaHoras', media_horas) ORDER BY media_horas DESC)
+      FROM por_equipe
+    ), '[]'::jsonb),
+    'listaCompleta', '[]'::jsonb
+  )
+  FROM resumo r
+  WHERE EXISTS (SELECT 1 FROM lanc);
+$$;
+
+COMMENT ON FUNCTION public.analytics_horas_treinamento(TEXT, UUID, UUID, DATE, DATE, TEXT) IS
+  'Analytics de PTR-BA Horas de Treinamento (meta 16h) agregado no servidor (payload de processHorasTreinamento).';
+
+RESET lock_timeout;
+RESET statement_timeout;
@@ -0,0 +1,76 @@
+/**
+ * Conversão de tempos (mm:ss / hh:mm) para inteiros
+ *
+ * mmssParaSegundos / hhmmParaSegundos (app) e conteudo_duracao_numerica
+ * (migration 049, trigger trg_lancamentos_duracoes) precisam dar o mesmo
+ * valor: o inteiro gravado pelo trigger substitui a conversão da string no app.
+ * A coluna "sql" é o resultado da função no banco; scripts/duracoes-paridade.sql
+ * confere a mesma tabela lá.
+ */
+
+import { comDuracoesNumericas, hhmmParaSegundos, mmssParaSegundos } from '../../src/lib/lancamento-normalizado'
+
+// hh:mm: minutos (conteudo_duracao_numerica(valor, 'hh:mm'))
+const CASOS_HHMM: Array<{ valor: string; sql: number | null }> = [
+  { valor: '', sql: null },
+  { valor: '   ', sql: null },
+  { valor: '08:00', sql: 480 },
+  { valor: '08:', sql: 480 },
+  { valor: '8', sql: 480 },
+  { valor: '1:5', sql: 65 },
+  { valor: ' 02:30', sql: 150 },
+  { valor: '08:30:15', sql: 510 },
+  { valor: '08:ab', sql: 480 },
+  { valor: '-01:00', sql: null },
+  { valor: '+01:00', sql: null },
+  { valor: ':30', sql: null },
+  { valor: 'abc', sql: null },
+]
+
+// mm:ss: segundos (conteudo_duracao_numerica(valor, 'mm:ss'))
+const CASOS_MMSS: Array<{ valor: string; sql: number | null }> = [
+  { valor: '', sql: null },
+  { valor: '02:02', sql: 122 },
+  { valor: '05:', sql: 300 },
+  { valor: ':30', sql: 30 },
+  { valor: '1:5', sql: 65 },
+  { valor: ' 02 : 02 ', sql: 122 },
+  { valor: '02:02:10', sql: 122 },
+  { valor: '-01:00', sql: null },
+  { valor: '1.5:30', sql: null },
+  { valor: '02:02abc', sql: null },
+  { valor: '0202', sql: null },
+]
+
+describe('Durações numéricas: app igual à migration 049', () => {
+  CASOS_HHMM.forEach(({ valor, sql }) => {
+    it(`hh:mm "${valor}" -> ${sql} min`, () => {
+      const segundos = hhmmParaSegundos(valor)
+      expect(segundos === null ? null : segundos / 60).to.equal(sql)
+    })
+  })
+
+  CASOS_MMSS.forEach(({ valor, sql }) => {
+    it(`mm:ss "${valor}" -> ${sql} s`, () => {
+      expect(mmssParaSegundos(valor)).to.equal(sql)
+    })
+  })
+
+  it('comDuracoesNumericas grava só os tempos válidos, como o trigger', () => {
+    const conteudo = comDuracoesNumericas({
+      tempo: '02:02',
+      total_dia_min: 999,
+      participantes: [
+        { nome: 'A', total_dia: '08:' },
+        { nome: 'B', total_dia: '-01:00', total_dia_min: -60 },
+        { nome: 'C', horas: '' },
+      ],
+    })
+    expect(conteudo.tempo_seg).to.equal(122)
+    expect(conteudo).not.to.have.property('total_dia_min')
+    const participantes = conteudo.participantes as Array<Record<string, unknown>>
+    expect(participantes[0].total_dia_min).to.equal(480)
+    expect(participantes[1]).not.to.have.property('total_dia_min')
+    expect(participantes[2]).not.to.have.property('horas_min')
+  })
+})
@@ -10,6 +10,10 @@ export default defineConfig(({ mode }) => ({
       '@': path.resolve(__dirname, './src'),
     },
   },
+  worker: {
+    // analytics.worker é criado com { type: 'module' }
+    format: 'es',
+  },
   server: {
     hmr: {
       protocol: 'ws',